@@ -9,6 +9,7 @@ import itertools
 import cea.config
 import cea.inputlocator
 from cea.analysis.costs.equations import calc_capex_annualized, calc_opex_annualized
+from cea.utilities.database_cache import read_database
 
 __author__ = "Jimeno A. Fonseca"
 __copyright__ = "Copyright 2020, Architecture and Building Systems - ETH Zurich"
@@ -173,12 +174,12 @@ def calc_scale_costs(value, flag_scale):
 
 def get_databases(demand, locator):
     supply_systems = gpdf.from_file(locator.get_building_supply()).drop('geometry', axis=1)
-    data_all_in_one_systems = pd.read_excel(locator.get_database_supply_assemblies(), sheet_name=None)
+    data_all_in_one_systems = read_database(locator.get_database_supply_assemblies(), sheet_name=None)
     factors_heating = data_all_in_one_systems['HEATING']
     factors_dhw = data_all_in_one_systems['HOT_WATER']
     factors_cooling = data_all_in_one_systems['COOLING']
     factors_electricity = data_all_in_one_systems['ELECTRICITY']
-    factors_resources = pd.read_excel(locator.get_database_feedstocks(), sheet_name=None)
+    factors_resources = read_database(locator.get_database_feedstocks(), sheet_name=None)
     # get the mean of all values for this
     factors_resources_simple = [(name, values['Opex_var_buy_USD2015kWh'].mean()) for name, values in
                                 factors_resources.items() if name != 'ENERGY_CARRIERS']
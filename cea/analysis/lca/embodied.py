@@ -9,13 +9,13 @@ import os
 
 import numpy as np
 from geopandas import GeoDataFrame as Gdf
-import pandas as pd
 
 import cea.config
 import cea.inputlocator
 from cea.constants import SERVICE_LIFE_OF_BUILDINGS, SERVICE_LIFE_OF_TECHNICAL_SYSTEMS, \
     CONVERSION_AREA_TO_FLOOR_AREA_RATIO, EMISSIONS_EMBODIED_TECHNICAL_SYSTEMS
 from cea.utilities.dbf import dbf_to_dataframe
+from cea.utilities.database_cache import read_database
 
 __author__ = "Jimeno A. Fonseca"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -107,10 +107,10 @@ def lca_embodied(year_to_calculate, locator):
     geometry_df = geometry_df.drop('geometry', axis=1)
 
     # local variables
-    surface_database_windows = pd.read_excel(locator.get_database_envelope_systems(), "WINDOW")
-    surface_database_roof = pd.read_excel(locator.get_database_envelope_systems(), "ROOF")
-    surface_database_walls = pd.read_excel(locator.get_database_envelope_systems(), "WALL")
-    surface_database_floors = pd.read_excel(locator.get_database_envelope_systems(), "FLOOR")
+    surface_database_windows = read_database(locator.get_database_envelope_systems(), "WINDOW")
+    surface_database_roof = read_database(locator.get_database_envelope_systems(), "ROOF")
+    surface_database_walls = read_database(locator.get_database_envelope_systems(), "WALL")
+    surface_database_floors = read_database(locator.get_database_envelope_systems(), "FLOOR")
 
     # query data
     df = architecture_df.merge(surface_database_windows, left_on='type_win', right_on='code')
@@ -12,6 +12,7 @@ from geopandas import GeoDataFrame as gpdf
 
 import cea.config
 import cea.inputlocator
+from cea.utilities.database_cache import read_database
 
 __author__ = "Jimeno A. Fonseca"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -51,12 +52,12 @@ def lca_operation(locator):
     ## get the supply systems for each building in the scenario
     supply_systems = gpdf.from_file(locator.get_building_supply()).drop('geometry', axis=1)
     ## get the non-renewable primary energy and greenhouse gas emissions factors for each supply system in the database
-    data_all_in_one_systems = pd.read_excel(locator.get_database_supply_assemblies(), sheet_name=None)
+    data_all_in_one_systems = read_database(locator.get_database_supply_assemblies(), sheet_name=None)
     factors_heating = data_all_in_one_systems['HEATING']
     factors_dhw = data_all_in_one_systems['HOT_WATER']
     factors_cooling = data_all_in_one_systems['COOLING']
     factors_electricity = data_all_in_one_systems['ELECTRICITY']
-    factors_resources = pd.read_excel(locator.get_database_feedstocks(), sheet_name=None)
+    factors_resources = read_database(locator.get_database_feedstocks(), sheet_name=None)
     # get the mean of all values for this
     factors_resources_simple = [(name, values['GHG_kgCO2MJ'].mean()) for name, values in factors_resources.items()
                                 if name != 'ENERGY_CARRIERS']
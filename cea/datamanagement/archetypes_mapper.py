@@ -11,12 +11,12 @@ building properties algorithm
 
 
 import numpy as np
-import pandas as pd
 
 import cea.config
 import cea.inputlocator
 from cea.datamanagement.schedule_helper import calc_mixed_schedule, get_list_of_uses_in_case_study, get_lists_of_var_names_and_var_values
 from cea.utilities.dbf import dbf_to_dataframe, dataframe_to_dbf
+from cea.utilities.database_cache import read_database
 
 
 __author__ = "Jimeno A. Fonseca"
@@ -72,7 +72,7 @@ def archetypes_mapper(locator,
 
     # get occupant densities from archetypes schedules
     occupant_densities = {}
-    occ_densities = pd.read_excel(locator.get_database_use_types_properties(), 'INTERNAL_LOADS').set_index('code')
+    occ_densities = read_database(locator.get_database_use_types_properties(), 'INTERNAL_LOADS').set_index('code')
     for use in list_uses:
         if occ_densities.loc[use, 'Occ_m2p'] > 0.0:
             occupant_densities[use] = 1 / occ_densities.loc[use, 'Occ_m2p']
@@ -101,7 +101,7 @@ def archetypes_mapper(locator,
 
 
 def indoor_comfort_mapper(list_uses, locator, occupant_densities, building_typology_df):
-    comfort_DB = pd.read_excel(locator.get_database_use_types_properties(), 'INDOOR_COMFORT')
+    comfort_DB = read_database(locator.get_database_use_types_properties(), 'INDOOR_COMFORT')
     # define comfort
     prop_comfort_df = building_typology_df.merge(comfort_DB, left_on='1ST_USE', right_on='code')
     # write to shapefile
@@ -122,7 +122,7 @@ def indoor_comfort_mapper(list_uses, locator, occupant_densities, building_typol
 
 
 def internal_loads_mapper(list_uses, locator, occupant_densities, building_typology_df):
-    internal_DB = pd.read_excel(locator.get_database_use_types_properties(), 'INTERNAL_LOADS')
+    internal_DB = read_database(locator.get_database_use_types_properties(), 'INTERNAL_LOADS')
     # define comfort
     prop_internal_df = building_typology_df.merge(internal_DB, left_on='1ST_USE', right_on='code')
     # write to shapefile
@@ -149,7 +149,7 @@ def internal_loads_mapper(list_uses, locator, occupant_densities, building_typol
 
 
 def supply_mapper(locator, building_typology_df):
-    supply_DB = pd.read_excel(locator.get_database_construction_standards(), 'SUPPLY_ASSEMBLIES')
+    supply_DB = read_database(locator.get_database_construction_standards(), 'SUPPLY_ASSEMBLIES')
     prop_supply_df = building_typology_df.merge(supply_DB, left_on='STANDARD', right_on='STANDARD')
     fields = ['Name',
               'type_cs',
@@ -159,7 +159,7 @@ def supply_mapper(locator, building_typology_df):
     dataframe_to_dbf(prop_supply_df[fields], locator.get_building_supply())
 
 def aircon_mapper(locator, typology_df):
-    air_conditioning_DB = pd.read_excel(locator.get_database_construction_standards(), 'HVAC_ASSEMBLIES')
+    air_conditioning_DB = read_database(locator.get_database_construction_standards(), 'HVAC_ASSEMBLIES')
     # define HVAC systems types
     prop_HVAC_df = typology_df.merge(air_conditioning_DB, left_on='STANDARD', right_on='STANDARD')
     # write to shapefile
@@ -177,7 +177,7 @@ def aircon_mapper(locator, typology_df):
 
 
 def architecture_mapper(locator, typology_df):
-    architecture_DB = pd.read_excel(locator.get_database_construction_standards(), 'ENVELOPE_ASSEMBLIES')
+    architecture_DB = read_database(locator.get_database_construction_standards(), 'ENVELOPE_ASSEMBLIES')
     prop_architecture_df = typology_df.merge(architecture_DB, left_on='STANDARD', right_on='STANDARD')
     fields = ['Name',
               'Hs_ag',
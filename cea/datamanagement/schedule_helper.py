@@ -5,7 +5,6 @@ This script creates schedules per building in CEA
 import os
 
 import numpy as np
-import pandas as pd
 
 import cea
 import cea.config
@@ -13,6 +12,7 @@ import cea.inputlocator
 from cea.demand.constants import VARIABLE_CEA_SCHEDULE_RELATION
 from cea.utilities.dbf import dbf_to_dataframe
 from cea.utilities.schedule_reader import read_cea_schedule, save_cea_schedule
+from cea.utilities.database_cache import read_database
 
 __author__ = "Jimeno Fonseca"
 __copyright__ = "Copyright 2018, Architecture and Building Systems - ETH Zurich"
@@ -62,7 +62,7 @@ def calc_mixed_schedule(locator, building_typology_df, buildings, list_var_names
     # get list of uses only with a valid value in building_occupancy_df
     list_uses = get_list_of_uses_in_case_study(building_typology_df)
 
-    internal_loads = pd.read_excel(locator.get_database_use_types_properties(), 'INTERNAL_LOADS')
+    internal_loads = read_database(locator.get_database_use_types_properties(), 'INTERNAL_LOADS')
     building_typology_df.set_index('Name', inplace=True)
     internal_loads = internal_loads.set_index('code')
 
@@ -20,6 +20,7 @@ from cea.demand import constants
 from cea.datamanagement.constants import OSM_BUILDING_CATEGORIES, OTHER_OSM_CATEGORIES_UNCONDITIONED, GRID_SIZE_M, EARTH_RADIUS_M
 from cea.utilities.dbf import dataframe_to_dbf
 from cea.utilities.standardize_coordinates import get_projected_coordinate_system, get_geographic_coordinate_system
+from cea.utilities.database_cache import read_database
 
 __author__ = "Jimeno Fonseca"
 __copyright__ = "Copyright 2019, Architecture and Building Systems - ETH Zurich"
@@ -386,7 +387,7 @@ def calculate_typology_file(locator, zone_df, year_construction, occupancy_type,
     typology_df = calculate_age(zone_df, year_construction)
 
     # calculate the most likely construction standard
-    standard_database = pd.read_excel(
+    standard_database = read_database(
         locator.get_database_construction_standards(), sheet_name='STANDARD_DEFINITION')
     typology_df['STANDARD'] = calc_category(
         standard_database, typology_df['YEAR'].values)
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Batch engine of the demand calculation
+
+The default demand calculation (:py:func:`cea.demand.thermal_loads.calc_thermal_loads`) simulates one building per
+worker call. This module simulates a batch of buildings that share the same HVAC / control archetype per call: the
+schedules of all buildings in the batch are stacked into ``(n_buildings, HOURS_IN_YEAR)`` arrays, the electrical,
+latent and hot water end-use loads are calculated for all buildings at once and the hourly sensible procedure runs in
+a single call to the compiled RC-model kernel (see :py:mod:`cea.demand.rc_model_kernel`). The remaining steps (system
+losses, auxiliary loads, final energy) are shared with the default engine and the results of each building are written
+with the same demand writers.
+
+Buildings the compiled kernel does not cover and buildings without conditioned area are simulated with the default
+engine inside the batch.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from cea.demand import thermal_loads, rc_model_kernel, electrical_loads, latent_loads, hotwater_loads
+from cea.demand import ventilation_air_flows_simple
+from cea.demand.building_properties import get_thermal_resistance_surface
+
+__author__ = "Daren Thomas"
+__copyright__ = "Copyright 2024, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Jimeno A. Fonseca", "Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+# buildings with the same values of these hvac properties are simulated in the same batch
+ARCHETYPE_FIELDS = ['type_hs', 'type_cs', 'type_dhw', 'type_ctrl', 'type_vent']
+
+# schedule columns used by the stacked end-use load calculations
+BATCH_SCHEDULES = ['Ea_W', 'El_W', 'Ev_W', 'Epro_W', 'X_gh', 'Vw_lph', 'Vww_lph']
+
+
+def split_buildings_into_batches(building_names, building_properties, max_batch_size):
+    """
+    Group the buildings by HVAC / control archetype and split the groups into batches of at most ``max_batch_size``
+    buildings.
+
+    :param building_names: names of the buildings to simulate
+    :type building_names: list[str]
+    :param building_properties: the building properties of the scenario
+    :type building_properties: cea.demand.building_properties.BuildingProperties
+    :param max_batch_size: maximum number of buildings per batch
+    :type max_batch_size: int
+    :return: list of batches, each batch a list of building names
+    :rtype: list[list[str]]
+    """
+    archetypes = OrderedDict()
+    for building_name in building_names:
+        bpr = building_properties[building_name]
+        archetype = tuple(bpr.hvac[field] for field in ARCHETYPE_FIELDS)
+        archetypes.setdefault(archetype, []).append(building_name)
+
+    max_batch_size = max(int(max_batch_size), 1)
+    batches = []
+    for names in archetypes.values():
+        batches.extend(names[i:i + max_batch_size] for i in range(0, len(names), max_batch_size))
+    return batches
+
+
+def can_run_batch(bpr, use_dynamic_infiltration_calculation):
+    """
+    Checks whether a building can be simulated with the stacked calculation of :py:func:`calc_thermal_loads_batch`
+
+    :param bpr: Building Properties
+    :type bpr: BuildingPropertiesRow
+    :param use_dynamic_infiltration_calculation: True if the dynamic infiltration model is used
+    :type use_dynamic_infiltration_calculation: bool
+    :rtype: bool
+    """
+    return (not np.isclose(bpr.rc_model['Af'], 0.0)
+            and rc_model_kernel.can_run_kernel(bpr, use_dynamic_infiltration_calculation))
+
+
+def calc_thermal_loads_batch(building_names, bprs, weather_data, date_range, locator,
+                             use_dynamic_infiltration_calculation, resolution_outputs, loads_output, massflows_output,
+                             temperatures_output, config, debug):
+    """
+    Batch version of :py:func:`cea.demand.thermal_loads.calc_thermal_loads`. Calculates the thermal loads of a batch
+    of buildings and writes the demand results of each building.
+
+    :param building_names: names of the buildings in the batch
+    :type building_names: list[str]
+    :param bprs: building properties of each building in the batch
+    :type bprs: list[BuildingPropertiesRow]
+
+    The other parameters are the same as for :py:func:`cea.demand.thermal_loads.calc_thermal_loads`.
+
+    :returns: This function does not return anything
+    :rtype: NoneType
+    """
+    batch = []
+    for building_name, bpr in zip(building_names, bprs):
+        if can_run_batch(bpr, use_dynamic_infiltration_calculation):
+            batch.append((building_name, bpr))
+        else:
+            thermal_loads.calc_thermal_loads(building_name, bpr, weather_data, date_range, locator,
+                                             use_dynamic_infiltration_calculation, resolution_outputs, loads_output,
+                                             massflows_output, temperatures_output, config, debug)
+    if not batch:
+        return
+
+    building_names, bprs = [list(x) for x in zip(*batch)]
+    schedules, tsds = zip(*[thermal_loads.initialize_inputs(bpr, weather_data, locator) for bpr in bprs])
+
+    # CALCULATE END-USE ELECTRICITY, LATENT AND HOT WATER LOADS OF ALL BUILDINGS AT ONCE
+    stacked_schedules = stack_schedules(schedules, BATCH_SCHEDULES)
+    stacked_tsd = {'T_ext': tsds[0]['T_ext']}
+    stacked_tsd = electrical_loads.calc_Eal_Epro(stacked_tsd, stacked_schedules)
+    stacked_tsd = latent_loads.calc_Qgain_lat(stacked_tsd, stacked_schedules)
+    stacked_tsd = calc_Eaux_fw_batch(stacked_tsd, bprs, stacked_schedules)
+    stacked_tsd = calc_Qww_batch(stacked_tsd, bprs, stacked_schedules)
+    unstack_tsd(stacked_tsd, tsds, exclude=['T_ext'])
+
+    # CALCULATE SENSIBLE LOADS
+    for building_name, bpr, tsd, schedule in zip(building_names, bprs, tsds, schedules):
+        tsd = thermal_loads.calc_refrigeration_process_and_data_center_loads(bpr, tsd, schedule, locator)
+        tsd['RSE_wall'], tsd['RSE_roof'], tsd['RSE_win'] = get_thermal_resistance_surface(bpr.architecture,
+                                                                                          weather_data)
+        tsd = thermal_loads.calc_set_points(bpr, date_range, tsd, building_name, config, locator, schedule)
+        ventilation_air_flows_simple.calc_m_ve_required(tsd)
+        ventilation_air_flows_simple.calc_m_ve_leakage_simple(bpr, tsd)
+    tsds = rc_model_kernel.calc_heating_cooling_loads_batch(bprs, tsds, [thermal_loads.get_hours(bpr) for bpr in bprs],
+                                                           config)
+
+    # CALCULATE SYSTEM AND FINAL LOADS AND WRITE RESULTS
+    for building_name, bpr, tsd in zip(building_names, bprs, tsds):
+        tsd = thermal_loads.calc_space_conditioning_system_loads(bpr, tsd)
+        if hotwater_loads.has_hot_water_technical_system(bpr):
+            tsd = thermal_loads.calc_hot_water_system_loads(bpr, tsd)
+        else:
+            tsd = thermal_loads.calc_no_hot_water_loads(tsd)
+        tsd = thermal_loads.calc_final_loads(bpr, tsd)
+        thermal_loads.write_results(bpr, building_name, date_range, loads_output, locator, massflows_output,
+                                    resolution_outputs, temperatures_output, tsd, debug, config.demand.output_format)
+
+
+def stack_schedules(schedules, columns):
+    """
+    Stack the columns of the schedules of a batch of buildings into ``(n_buildings, HOURS_IN_YEAR)`` arrays.
+
+    :param schedules: the schedules of each building (as read by :py:func:`cea.demand.thermal_loads.initialize_inputs`)
+    :type schedules: list[pandas.DataFrame]
+    :param columns: the columns to stack
+    :type columns: list[str]
+    :rtype: dict[str, numpy.ndarray]
+    """
+    return {column: np.array([schedule[column].values for schedule in schedules], dtype=np.float64)
+            for column in columns}
+
+
+def unstack_tsd(stacked_tsd, tsds, exclude):
+    """Copy the rows of the stacked time series data to the ``tsd`` of each building."""
+    for field, values in stacked_tsd.items():
+        if field in exclude:
+            continue
+        for i, tsd in enumerate(tsds):
+            tsd[field] = values[i]
+
+
+def calc_Eaux_fw_batch(stacked_tsd, bprs, stacked_schedules):
+    """
+    Stacked version of :py:func:`cea.demand.electrical_loads.calc_Eaux_fw` (auxiliary electricity to distribute
+    fresh water) for a batch of buildings.
+    """
+    stacked_tsd['vfw_m3perh'] = stacked_schedules['Vw_lph'] / 1000  # m3/h
+
+    height_ag = np.array([bpr.geometry['height_ag'] for bpr in bprs])
+    # pumping required for buildings above 15m (or 5 floors)
+    requires_pumping = height_ag > electrical_loads.MIN_HEIGHT_THAT_REQUIRES_PUMPING
+    effective_height = np.where(requires_pumping, height_ag - electrical_loads.MIN_HEIGHT_THAT_REQUIRES_PUMPING, 0.0)
+    deltaP_kPa = (electrical_loads.DELTA_P_1 * effective_height)[:, np.newaxis]
+    b = 1  # assuming a good pumping system
+
+    Cpump = 0.97
+    Vfw_m3h = stacked_tsd['vfw_m3perh']
+    is_pumping = (Vfw_m3h > 0.0) & requires_pumping[:, np.newaxis]
+    Phydr_kW = np.where(is_pumping, deltaP_kPa * Vfw_m3h * 1 / 3600, 0.0)
+    feff = (1.5 * b) / (0.015 * Phydr_kW ** 0.74 + 0.4)
+    epmp_eff = feff * Cpump * 1 ** -0.94
+    stacked_tsd['Eaux_fw'] = np.where(is_pumping, epmp_eff * Phydr_kW * 1000, 0.0)
+    return stacked_tsd
+
+
+def calc_Qww_batch(stacked_tsd, bprs, stacked_schedules):
+    """
+    Stacked version of :py:func:`cea.demand.hotwater_loads.calc_Qww` (end-use hot water demand) for a batch of
+    buildings. The ground water temperature only depends on the weather and is calculated once for the batch.
+    """
+    Tww_re_C = np.asarray(hotwater_loads.calc_water_temperature(stacked_tsd['T_ext'], depth_m=1))
+    Tww_sup_0_C = np.array([bpr.building_systems['Tww_sup_0'] for bpr in bprs])[:, np.newaxis]
+    # the default engine leaves the tap water capacity of buildings without hot water system undefined
+    has_hot_water = np.array([hotwater_loads.has_hot_water_technical_system(bpr) for bpr in bprs])[:, np.newaxis]
+
+    # calc end-use demand
+    stacked_tsd['Tww_re'] = np.tile(Tww_re_C, (len(bprs), 1))
+    stacked_tsd['vww_m3perh'] = stacked_schedules['Vww_lph'] / 1000  # m3/h
+    stacked_tsd['mww_kgs'] = stacked_tsd['vww_m3perh'] * hotwater_loads.P_WATER / 3600  # kg/s
+    mcptw = ((stacked_tsd['vfw_m3perh'] - stacked_tsd['vww_m3perh']) * hotwater_loads.CP_KJPERKGK
+             * hotwater_loads.P_WATER / 3600)  # kW_K tap water
+    stacked_tsd['mcptw'] = np.where(has_hot_water, mcptw, np.nan)
+
+    mcp_dhw_WperK = stacked_tsd['mww_kgs'] * hotwater_loads.CP_KJPERKGK * 1000  # W/K
+    stacked_tsd['Qww'] = mcp_dhw_WperK * (Tww_sup_0_C - Tww_re_C)  # heating for dhw in W
+    return stacked_tsd
+
+
+def print_batch_progress(i, n, args, _):
+    print("Batch No. {i} completed out of {n}: {buildings}".format(i=i + 1, n=n, buildings=", ".join(args[0])))
@@ -13,6 +13,7 @@ from cea.demand.sensible_loads import calc_hr, calc_hc
 from cea.resources.radiation.geometry_generator import calc_floor_to_floor_height
 from cea.utilities.dbf import dbf_to_dataframe
 from cea.technologies import blinds
+from cea.utilities.database_cache import read_database
 
 __author__ = "Gabriel Happle"
 __copyright__ = "Copyright 2017, Architecture and Building Systems - ETH Zurich"
@@ -626,7 +627,7 @@ class SolarProperties(object):
 
 
 def get_properties_supply_sytems(locator, properties_supply):
-    data_all_in_one_systems = pd.read_excel(locator.get_database_supply_assemblies(), sheet_name=None)
+    data_all_in_one_systems = read_database(locator.get_database_supply_assemblies(), sheet_name=None)
     supply_heating = data_all_in_one_systems['HEATING']
     supply_dhw = data_all_in_one_systems['HOT_WATER']
     supply_cooling = data_all_in_one_systems['COOLING']
@@ -719,12 +720,12 @@ def get_properties_technical_systems(locator, prop_hvac):
 
     """
 
-    prop_emission_heating = pd.read_excel(locator.get_database_air_conditioning_systems(), 'HEATING')
-    prop_emission_cooling = pd.read_excel(locator.get_database_air_conditioning_systems(), 'COOLING')
-    prop_emission_dhw = pd.read_excel(locator.get_database_air_conditioning_systems(), 'HOT_WATER')
-    prop_emission_control_heating_and_cooling = pd.read_excel(locator.get_database_air_conditioning_systems(),
+    prop_emission_heating = read_database(locator.get_database_air_conditioning_systems(), 'HEATING')
+    prop_emission_cooling = read_database(locator.get_database_air_conditioning_systems(), 'COOLING')
+    prop_emission_dhw = read_database(locator.get_database_air_conditioning_systems(), 'HOT_WATER')
+    prop_emission_control_heating_and_cooling = read_database(locator.get_database_air_conditioning_systems(),
                                                               'CONTROLLER')
-    prop_ventilation_system_and_control = pd.read_excel(locator.get_database_air_conditioning_systems(), 'VENTILATION')
+    prop_ventilation_system_and_control = read_database(locator.get_database_air_conditioning_systems(), 'VENTILATION')
     df_emission_heating = prop_hvac.merge(prop_emission_heating, left_on='type_hs', right_on='code')
     df_emission_cooling = prop_hvac.merge(prop_emission_cooling, left_on='type_cs', right_on='code')
     df_emission_control_heating_and_cooling = prop_hvac.merge(prop_emission_control_heating_and_cooling,
@@ -870,13 +871,13 @@ def get_envelope_properties(locator, prop_architecture):
                 'WARNING: Invalid floor type found in architecture inputs. The following buildings will not be modeled: {}.'.format(
                     list(df_floor.loc[df_floor['code'].isna()]['Name'])))
 
-    prop_roof = pd.read_excel(locator.get_database_envelope_systems(), 'ROOF')
-    prop_wall = pd.read_excel(locator.get_database_envelope_systems(), 'WALL')
-    prop_floor = pd.read_excel(locator.get_database_envelope_systems(), 'FLOOR')
-    prop_win = pd.read_excel(locator.get_database_envelope_systems(), 'WINDOW')
-    prop_shading = pd.read_excel(locator.get_database_envelope_systems(), 'SHADING')
-    prop_construction = pd.read_excel(locator.get_database_envelope_systems(), 'CONSTRUCTION')
-    prop_leakage = pd.read_excel(locator.get_database_envelope_systems(), 'TIGHTNESS')
+    prop_roof = read_database(locator.get_database_envelope_systems(), 'ROOF')
+    prop_wall = read_database(locator.get_database_envelope_systems(), 'WALL')
+    prop_floor = read_database(locator.get_database_envelope_systems(), 'FLOOR')
+    prop_win = read_database(locator.get_database_envelope_systems(), 'WINDOW')
+    prop_shading = read_database(locator.get_database_envelope_systems(), 'SHADING')
+    prop_construction = read_database(locator.get_database_envelope_systems(), 'CONSTRUCTION')
+    prop_leakage = read_database(locator.get_database_envelope_systems(), 'TIGHTNESS')
 
     df_construction = prop_architecture.merge(prop_construction, left_on='type_cons', right_on='code', how='left')
     df_leakage = prop_architecture.merge(prop_leakage, left_on='type_leak', right_on='code', how='left')
@@ -1029,7 +1030,7 @@ def verify_hvac_system_combination(result, locator):
         building_name = result.loc[idx, 'Name']
         class_cs = result.loc[idx, 'class_cs']
         type_vent = result.loc[idx,'type_vent']
-        hvac_database = pd.read_excel(locator.get_database_air_conditioning_systems(), sheet_name='VENTILATION')
+        hvac_database = read_database(locator.get_database_air_conditioning_systems(), sheet_name='VENTILATION')
         mechanical_ventilation_systems = list(hvac_database.loc[hvac_database['MECH_VENT'], 'code'])
         list_exceptions.append(Exception(
             f'\nBuilding {building_name} has a cooling system as {class_cs} with a ventilation system {type_vent}.'
@@ -3,18 +3,22 @@
 Analytical energy demand model algorithm
 """
 
+import math
 import os
 import time
 import warnings
 from itertools import repeat
 
+import pandas as pd
+
+import cea
 import cea.config
 import cea.inputlocator
 import cea.utilities.parallel
 from cea import MissingInputDataException
-from cea.demand import thermal_loads
+from cea.demand import thermal_loads, batch_demand
 from cea.demand.building_properties import BuildingProperties
-from cea.utilities import epwreader
+from cea.utilities import epwreader, fingerprints
 from cea.utilities.date import get_date_range_hours_from_year
 from cea.demand import demand_writers
 from cea.datamanagement.data_migrator import is_3_22
@@ -68,6 +72,8 @@ def demand_calculation(locator, config):
     massflows_output = config.demand.massflows_output
     temperatures_output = config.demand.temperatures_output
     debug = config.debug
+    if config.demand.output_format == demand_writers.DEMAND_STORE and resolution_output != 'hourly':
+        raise ValueError("The demand output-format 'store' requires the hourly resolution-output")
     weather_path = locator.get_weather_file()
     weather_data = epwreader.epw_reader(weather_path)[['year', 'drybulb_C', 'wetbulb_C',
                                                        'relhum_percent', 'windspd_ms', 'skytemp_C']]
@@ -98,32 +104,112 @@ def demand_calculation(locator, config):
         print(
             'Warning! The following list of buildings have less than 100 m2 of gross floor area, CEA might fail: %s' % list_buildings_less_100m2)
 
+    # SKIP BUILDINGS WITH UNCHANGED INPUTS
+    demand_fingerprints = calc_demand_fingerprints(locator, config, building_properties, building_names,
+                                                   weather_path)
+    reused_buildings = []
+    if config.demand.incremental:
+        reused_buildings = get_reusable_buildings(locator, config, demand_fingerprints)
+        if reused_buildings:
+            print('Inputs unchanged since the last run, skipping buildings=%s' % reused_buildings)
+    total_building_names = building_names
+    building_names = [b for b in building_names if b not in reused_buildings]
+    # forget the fingerprints of the buildings to simulate, an interrupted run must not leave new results of a
+    # building next to the fingerprint of its old inputs
+    fingerprints.remove_fingerprints(locator.get_demand_results_folder(), building_names)
+
     # DEMAND CALCULATION
-    n = len(building_names)
-    calc_thermal_loads = cea.utilities.parallel.vectorize(thermal_loads.calc_thermal_loads,
-                                                          config.get_number_of_processes(), on_complete=print_progress)
-
-    calc_thermal_loads(
-        building_names,
-        [building_properties[b] for b in building_names],
-        repeat(weather_data, n),
-        repeat(date_range, n),
-        repeat(locator, n),
-        repeat(use_dynamic_infiltration, n),
-        repeat(resolution_output, n),
-        repeat(loads_output, n),
-        repeat(massflows_output, n),
-        repeat(temperatures_output, n),
-         repeat(config, n),
-        repeat(debug, n))
+    if not building_names:
+        print('The results of all buildings are up to date')
+    elif config.demand.engine == 'batch':
+        # simulate buildings with the same HVAC / control archetype together, use all processes for large groups
+        max_batch_size = min(config.demand.batch_size,
+                             int(math.ceil(len(building_names) / float(config.get_number_of_processes()))))
+        batches = batch_demand.split_buildings_into_batches(building_names, building_properties, max_batch_size)
+        calc_thermal_loads = cea.utilities.parallel.vectorize(batch_demand.calc_thermal_loads_batch,
+                                                              config.get_number_of_processes(),
+                                                              on_complete=batch_demand.print_batch_progress)
+        n = len(batches)
+        calc_thermal_loads(
+            batches,
+            [[building_properties[b] for b in batch] for batch in batches],
+            repeat(weather_data, n),
+            repeat(date_range, n),
+            repeat(locator, n),
+            repeat(use_dynamic_infiltration, n),
+            repeat(resolution_output, n),
+            repeat(loads_output, n),
+            repeat(massflows_output, n),
+            repeat(temperatures_output, n),
+            repeat(config, n),
+            repeat(debug, n))
+    else:
+        n = len(building_names)
+        calc_thermal_loads = cea.utilities.parallel.vectorize(thermal_loads.calc_thermal_loads,
+                                                              config.get_number_of_processes(),
+                                                              on_complete=print_progress)
+
+        calc_thermal_loads(
+            building_names,
+            [building_properties[b] for b in building_names],
+            repeat(weather_data, n),
+            repeat(date_range, n),
+            repeat(locator, n),
+            repeat(use_dynamic_infiltration, n),
+            repeat(resolution_output, n),
+            repeat(loads_output, n),
+            repeat(massflows_output, n),
+            repeat(temperatures_output, n),
+            repeat(config, n),
+            repeat(debug, n))
 
     # WRITE TOTAL YEARLY VALUES
-    writer_totals = demand_writers.YearlyDemandWriter(loads_output, massflows_output, temperatures_output)
-    writer_totals.write_to_csv(building_names, locator)
+    writer_totals = demand_writers.YearlyDemandWriter(loads_output, massflows_output, temperatures_output,
+                                                      config.demand.output_format)
+    writer_totals.write_to_csv(total_building_names, locator, reused_buildings)
+    fingerprints.write_fingerprints(locator.get_demand_results_folder(),
+                                    {b: demand_fingerprints[b] for b in building_names})
     time_elapsed = time.perf_counter() - t0
     print('done - time elapsed: %d.2 seconds' % time_elapsed)
 
 
+def calc_demand_fingerprints(locator, config, building_properties, building_names, weather_path):
+    """
+    Calculate the fingerprint of the inputs of the demand calculation of each building: its building properties, its
+    occupancy schedule and radiation files, the weather file and the parameters that change the demand results.
+
+    :return: the fingerprint of each building
+    :rtype: dict[str, str]
+    """
+    weather_fingerprint = fingerprints.calc_file_fingerprint(weather_path)
+    parameters = {parameter: getattr(config.demand, parameter)
+                  for parameter in ['loads_output', 'massflows_output', 'temperatures_output', 'resolution_output',
+                                    'use_dynamic_infiltration_calculation', 'output_format']}
+    return {building: fingerprints.calc_fingerprint(
+        cea.__version__, parameters, weather_fingerprint, building_properties[building],
+        fingerprints.calc_file_fingerprint(locator.get_schedule_model_file(building)),
+        fingerprints.calc_file_fingerprint(locator.get_radiation_building(building)))
+        for building in building_names}
+
+
+def get_reusable_buildings(locator, config, demand_fingerprints):
+    """
+    Return the buildings whose inputs did not change since their results were written, and whose results (including
+    their row in the total demand file, if it is refreshed from it) are still there.
+
+    :param demand_fingerprints: the current fingerprint of each building (see :py:func:`calc_demand_fingerprints`)
+    :type demand_fingerprints: dict[str, str]
+    :rtype: list[str]
+    """
+    unchanged = fingerprints.unchanged_buildings(locator.get_demand_results_folder(), demand_fingerprints)
+    unchanged = [b for b in unchanged if demand_writers.demand_results_exist(locator, b)]
+    if config.demand.output_format != demand_writers.DEMAND_STORE:
+        totals_file = locator.get_total_demand()
+        totals = set(pd.read_csv(totals_file, usecols=['Name'])['Name']) if os.path.exists(totals_file) else set()
+        unchanged = [b for b in unchanged if b in totals]
+    return unchanged
+
+
 def print_progress(i, n, args, _):
     print("Building No. {i} completed out of {n}: {building}".format(i=i + 1, n=n, building=args[0]))
 
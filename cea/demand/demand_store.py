@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Consolidated store of the hourly demand results of all buildings in a scenario
+
+Instead of one results file per building (see :py:mod:`cea.demand.demand_writers`), the hourly results of every building
+are kept in a single parquet dataset keyed by building (``Name``) and hour (``DATE``) in
+``outputs/data/demand/store``:
+
+- while the demand runs, each worker appends the results of its buildings as a part file to ``store/parts``
+- after the run, :py:meth:`DemandStore.compact` merges the parts into ``store/demand_hourly.parquet`` (one row group
+  per building, the row group of each building is recorded in the file metadata) and calculates the yearly totals of
+  the buildings in the same pass, so ``Total_demand.csv`` is written without re-reading a temporary file per building.
+
+Use :py:func:`cea.demand.demand_writers.read_demand_results` to read the results of a building, it falls back to the
+store when a building has no results file.
+"""
+
+import json
+import os
+import shutil
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+__author__ = "Daren Thomas"
+__copyright__ = "Copyright 2024, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+STORE_FILE = 'demand_hourly.parquet'
+
+# constant per building, stored with the hourly results for the yearly totals (dictionary encoded, so ~free on disk)
+AREA_COLUMNS = ['Af_m2', 'Aroof_m2', 'GFA_m2', 'Aocc_m2']
+
+# key of the file metadata that maps building names to row groups
+BUILDINGS_METADATA_KEY = b'cea_buildings'
+
+
+class DemandStore(object):
+    """The consolidated hourly demand results of the buildings of a scenario"""
+
+    def __init__(self, locator):
+        self.folder = locator.get_demand_store_folder()
+        self.parts_folder = os.path.join(self.folder, 'parts')
+        self.store_file = os.path.join(self.folder, STORE_FILE)
+
+    def append(self, building_name, hourly_data, areas):
+        """
+        Add the hourly results of a building to the store. Safe to call from several worker processes at once: each
+        call writes its own part file, which replaces the results of the building in the store when compacted.
+
+        :param str building_name: name of the building
+        :param hourly_data: the hourly results, with the ``DATE`` as first column
+        :type hourly_data: pd.DataFrame
+        :param areas: the values of the `AREA_COLUMNS` of the building
+        :type areas: dict[str, float]
+        """
+        table = pa.Table.from_pandas(hourly_data.assign(**{column: areas[column] for column in AREA_COLUMNS}),
+                                     preserve_index=False)
+        if not os.path.exists(self.parts_folder):
+            os.makedirs(self.parts_folder, exist_ok=True)
+        # write to a temporary file first, so readers never see half a part
+        temporary_file = os.path.join(self.parts_folder, '.{name}.{uuid}'.format(name=building_name,
+                                                                                uuid=uuid.uuid4().hex))
+        pq.write_table(table, temporary_file)
+        os.replace(temporary_file, self._part_file(building_name))
+
+    def contains(self, building_name):
+        return os.path.exists(self._part_file(building_name)) or building_name in self._compacted_buildings()
+
+    def buildings(self):
+        """The names of the buildings in the store"""
+        return sorted(set(self._compacted_buildings()) | set(self._part_buildings()))
+
+    def read(self, building_name, columns=None):
+        """
+        Read the hourly results of a building (the same columns as the hourly results files).
+
+        :param str building_name: name of the building
+        :param columns: the columns to read (default: all columns)
+        :type columns: list[str]
+        :rtype: pd.DataFrame
+        """
+        part_file = self._part_file(building_name)
+        if os.path.exists(part_file):
+            parquet_file = pq.ParquetFile(part_file)
+            row_group = 0
+        else:
+            compacted = self._compacted_buildings()
+            if building_name not in compacted:
+                raise KeyError("Building {building} not in demand store {folder}".format(building=building_name,
+                                                                                          folder=self.folder))
+            parquet_file = pq.ParquetFile(self.store_file)
+            row_group = compacted[building_name]
+        if columns is None:
+            columns = [c for c in parquet_file.schema_arrow.names if c not in AREA_COLUMNS]
+        return parquet_file.read_row_group(row_group, columns=list(columns)).to_pandas()
+
+    def compact(self, buildings, load_vars):
+        """
+        Merge the part files into the store file and calculate the yearly totals of ``buildings`` in the same pass.
+        Buildings in the store that were not recalculated keep their results.
+
+        :param buildings: the buildings to calculate the yearly totals for
+        :type buildings: list[str]
+        :param load_vars: the loads to calculate the yearly totals for (``loads-output`` of the demand)
+        :type load_vars: list[str]
+        :return: the yearly totals (same columns as ``Total_demand.csv``), in the order of ``buildings``
+        :rtype: pd.DataFrame
+        """
+        parts = set(self._part_buildings())
+        compacted = self._compacted_buildings()
+        previous_store = pq.ParquetFile(self.store_file) if compacted else None
+        load_columns = [x + '_kWh' for x in load_vars]
+
+        order = sorted(set(compacted) | parts)
+        selected = set(buildings)
+        totals = {}
+        writer = None
+        temporary_file = os.path.join(self.folder, '.{uuid}.{file}'.format(uuid=uuid.uuid4().hex, file=STORE_FILE))
+        try:
+            for building_name in order:
+                if building_name in parts:
+                    table = pq.read_table(self._part_file(building_name))
+                else:
+                    table = previous_store.read_row_group(compacted[building_name])
+                if writer is None:
+                    metadata = dict(table.schema.metadata or {})
+                    metadata[BUILDINGS_METADATA_KEY] = json.dumps(order)
+                    writer = pq.ParquetWriter(temporary_file, table.schema.with_metadata(metadata))
+                elif not table.schema.equals(writer.schema, check_metadata=False):
+                    table = table.select(writer.schema.names).cast(writer.schema)
+                writer.write_table(table)
+                if building_name in selected:
+                    totals[building_name] = calc_yearly_totals(
+                        building_name, table.select(AREA_COLUMNS + ['people'] + load_columns).to_pandas(), load_vars)
+        except Exception:
+            if writer is not None:
+                writer.close()
+                os.remove(temporary_file)
+            raise
+        finally:
+            if previous_store is not None:
+                previous_store.close()
+
+        if writer is not None:
+            writer.close()
+            os.replace(temporary_file, self.store_file)
+        if os.path.exists(self.parts_folder):
+            shutil.rmtree(self.parts_folder)
+
+        missing = [b for b in buildings if b not in totals]
+        if missing:
+            raise ValueError("No results in demand store for buildings: {missing}".format(missing=missing))
+        return pd.DataFrame([totals[b] for b in buildings])
+
+    def _part_file(self, building_name):
+        return os.path.join(self.parts_folder, '{name}.parquet'.format(name=building_name))
+
+    def _part_buildings(self):
+        if not os.path.exists(self.parts_folder):
+            return []
+        return [f[:-len('.parquet')] for f in os.listdir(self.parts_folder)
+                if f.endswith('.parquet') and not f.startswith('.')]
+
+    def _compacted_buildings(self):
+        """Map the names of the buildings in the store file to their row group"""
+        if not os.path.exists(self.store_file):
+            return {}
+        metadata = pq.read_metadata(self.store_file).metadata or {}
+        return {name: i for i, name in enumerate(json.loads(metadata.get(BUILDINGS_METADATA_KEY, b'[]')))}
+
+
+def calc_yearly_totals(building_name, hourly_data, load_vars):
+    """
+    Yearly totals of a building from its hourly results, as calculated by
+    :py:meth:`cea.demand.demand_writers.DemandWriter.calc_yearly_dataframe`
+
+    :rtype: dict
+    """
+    totals = {'Name': building_name}
+    totals.update({column: hourly_data[column].iloc[0] for column in AREA_COLUMNS})
+    totals['people0'] = hourly_data['people'].max()
+    totals.update({x + '_MWhyr': hourly_data[x + '_kWh'].sum() / 1000 for x in load_vars})
+    totals.update({x + '0_kW': hourly_data[x + '_kWh'].max() for x in load_vars})
+    return totals
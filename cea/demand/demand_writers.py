@@ -2,17 +2,129 @@
 A collection of classes that write out the demand results files. The default is `HourlyDemandWriter`. A `MonthlyDemandWriter` is provided
 that sums the values up monthly. See the `cea.analysis.sensitivity.sensitivity_demand` module for an example of using
 the `MonthlyDemandWriter`.
-"""
-
-
 
+The results of each building are written as csv (default) or in one of the columnar binary formats parquet and feather
+(``config.demand.output_format``). With the output format ``store``, the hourly results of all buildings are kept in a
+single consolidated store instead (see `cea.demand.demand_store`). Use `read_demand_results` to read them back in
+whichever format they were written.
+"""
 
+import os
 
 import numpy as np
 import pandas as pd
 
+from cea.demand.demand_store import DemandStore
+from cea.utilities.fingerprints import calc_fingerprint, calc_file_fingerprint
+
 FLOAT_FORMAT = '%.3f'
 
+# file formats of the demand results of each building (see `InputLocator.get_demand_results_file`)
+DEMAND_RESULTS_FORMATS = ['csv', 'parquet', 'feather']
+
+# the consolidated store of the hourly results of all buildings (see `cea.demand.demand_store`)
+DEMAND_STORE = 'store'
+DEMAND_OUTPUT_FORMATS = DEMAND_RESULTS_FORMATS + [DEMAND_STORE]
+
+
+def get_demand_results_format(locator, building):
+    """
+    Return the format the demand results of a building were written in (the most recent, if there are several). Results
+    files take precedence over the consolidated store.
+
+    :param locator: the input locator
+    :type locator: cea.inputlocator.InputLocator
+    :param str building: name of the building
+    :return: one of `DEMAND_OUTPUT_FORMATS`
+    :rtype: str
+    """
+    paths = {fmt: locator.get_demand_results_file(building, fmt) for fmt in DEMAND_RESULTS_FORMATS}
+    existing = [fmt for fmt in DEMAND_RESULTS_FORMATS if os.path.exists(paths[fmt])]
+    if not existing:
+        if DemandStore(locator).contains(building):
+            return DEMAND_STORE
+        raise FileNotFoundError("No demand results found for building {building}: {path}".format(
+            building=building, path=paths['csv']))
+    return max(existing, key=lambda fmt: os.path.getmtime(paths[fmt]))
+
+
+def demand_results_exist(locator, building):
+    """True, if the demand results of a building exist in any of the `DEMAND_OUTPUT_FORMATS`"""
+    return (any(os.path.exists(locator.get_demand_results_file(building, fmt)) for fmt in DEMAND_RESULTS_FORMATS)
+            or DemandStore(locator).contains(building))
+
+
+def read_demand_results(locator, building, columns=None):
+    """
+    Read the demand results of a building, in whichever format they were written. The columnar formats only load the
+    requested ``columns`` from disk.
+
+    :param locator: the input locator
+    :type locator: cea.inputlocator.InputLocator
+    :param str building: name of the building
+    :param columns: the columns to read (default: all columns)
+    :type columns: list[str]
+    :rtype: pd.DataFrame
+    """
+    fmt = get_demand_results_format(locator, building)
+    if fmt == DEMAND_STORE:
+        return DemandStore(locator).read(building, columns)
+    return read_demand_results_file(locator.get_demand_results_file(building, fmt), columns)
+
+
+def calc_demand_results_fingerprint(locator, building):
+    """
+    The fingerprint of the demand results of a building, in whichever format they were written: the contents of its
+    results file, or its hourly results in the consolidated store.
+
+    :param locator: the input locator
+    :type locator: cea.inputlocator.InputLocator
+    :param str building: name of the building
+    :rtype: str
+    """
+    fmt = get_demand_results_format(locator, building)
+    if fmt == DEMAND_STORE:
+        return calc_fingerprint(DemandStore(locator).read(building))
+    return calc_file_fingerprint(locator.get_demand_results_file(building, fmt))
+
+
+def read_demand_results_file(path, columns=None):
+    """
+    Read a demand results file, the format is determined by the file extension (see `read_demand_results`).
+
+    :param str path: path to the demand results file
+    :param columns: the columns to read (default: all columns)
+    :type columns: list[str]
+    :rtype: pd.DataFrame
+    """
+    if columns is not None:
+        columns = list(columns)
+    extension = os.path.splitext(path)[1]
+    if extension == '.parquet':
+        return pd.read_parquet(path, columns=columns)
+    elif extension == '.feather':
+        return pd.read_feather(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+def write_columnar(df, path, output_format):
+    """Write ``df`` (without index) to ``path`` in one of the columnar formats ('parquet' or 'feather')"""
+    df = df.reset_index(drop=True)
+    if output_format == 'parquet':
+        df.to_parquet(path, index=False)
+    elif output_format == 'feather':
+        df.to_feather(path)
+    else:
+        raise ValueError("Unknown columnar format: {output_format}".format(output_format=output_format))
+
+
+def remove_stale_demand_results(locator, building, output_format):
+    """Delete results of a building written in other formats by a previous run, so readers find the current ones"""
+    for fmt in DEMAND_RESULTS_FORMATS:
+        path = locator.get_demand_results_file(building, fmt)
+        if fmt != output_format and os.path.exists(path):
+            os.remove(path)
+
 
 class DemandWriter(object):
     """
@@ -22,10 +134,14 @@ class DemandWriter(object):
     - implement the `write_to_csv` method
     """
 
-    def __init__(self, loads, massflows, temperatures):
+    def __init__(self, loads, massflows, temperatures, output_format='csv'):
 
         from cea.demand.thermal_loads import TSD_KEYS_ENERGY_BALANCE_DASHBOARD, TSD_KEYS_SOLAR
 
+        if output_format not in DEMAND_OUTPUT_FORMATS:
+            raise ValueError("Unknown demand results format: {output_format}".format(output_format=output_format))
+        self.output_format = output_format
+
         self.load_vars = loads
         self.load_plotting_vars = TSD_KEYS_ENERGY_BALANCE_DASHBOARD + TSD_KEYS_SOLAR
         self.mass_flow_vars = massflows
@@ -47,9 +163,18 @@ class DemandWriter(object):
             key='dataset')
 
     def results_to_csv(self, tsd, bpr, locator, date, building_name):
-        # save hourly data
+        # save hourly data (in the columnar formats if requested)
         columns, hourly_data = self.calc_hourly_dataframe(building_name, date, tsd)
-        self.write_to_csv(building_name, columns, hourly_data, locator)
+        if self.output_format == DEMAND_STORE:
+            # the yearly totals are aggregated from the store, no temporary file needed
+            self.write_to_store(building_name, columns, hourly_data, locator, bpr)
+            remove_stale_demand_results(locator, building_name, self.output_format)
+            return
+        if self.output_format == 'csv':
+            self.write_to_csv(building_name, columns, hourly_data, locator)
+        else:
+            self.write_to_columnar(building_name, columns, hourly_data, locator)
+        remove_stale_demand_results(locator, building_name, self.output_format)
 
         # save annual values to a temp file for YearlyDemandWriter
         columns, data = self.calc_yearly_dataframe(bpr, building_name, tsd)
@@ -101,13 +226,24 @@ class DemandWriter(object):
 class HourlyDemandWriter(DemandWriter):
     """Write out the hourly demand results"""
 
-    def __init__(self, loads, massflows, temperatures):
-        super(HourlyDemandWriter, self).__init__(loads, massflows, temperatures)
+    def __init__(self, loads, massflows, temperatures, output_format='csv'):
+        super(HourlyDemandWriter, self).__init__(loads, massflows, temperatures, output_format)
 
     def write_to_csv(self, building_name, columns, hourly_data, locator):
         hourly_data.to_csv(locator.get_demand_results_file(building_name, 'csv'), columns=columns,
                            float_format=FLOAT_FORMAT, na_rep='nan')
 
+    def write_to_columnar(self, building_name, columns, hourly_data, locator):
+        # same columns as the csv file, DATE included as a column of datetimes
+        write_columnar(hourly_data[columns].reset_index(), locator.get_demand_results_file(building_name,
+                                                                                           self.output_format),
+                       self.output_format)
+
+    def write_to_store(self, building_name, columns, hourly_data, locator, bpr):
+        areas = {'Af_m2': bpr.rc_model['Af'], 'Aroof_m2': bpr.rc_model['Aroof'], 'GFA_m2': bpr.rc_model['GFA_m2'],
+                 'Aocc_m2': bpr.rc_model['Aocc']}
+        DemandStore(locator).append(building_name, hourly_data[columns].reset_index(), areas)
+
     def write_to_hdf5(self, building_name, columns, hourly_data, locator):
         # fixing columns with strings
         hourly_data.drop('Name', inplace=True, axis=1)
@@ -117,8 +253,11 @@ class HourlyDemandWriter(DemandWriter):
 class MonthlyDemandWriter(DemandWriter):
     """Write out the monthly demand results"""
 
-    def __init__(self, loads, massflows, temperatures):
-        super(MonthlyDemandWriter, self).__init__(loads, massflows, temperatures)
+    def __init__(self, loads, massflows, temperatures, output_format='csv'):
+        if output_format == DEMAND_STORE:
+            raise ValueError("The consolidated demand store only holds hourly results, "
+                             "use it with the hourly resolution-output")
+        super(MonthlyDemandWriter, self).__init__(loads, massflows, temperatures, output_format)
         self.MONTHS = ['january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september',
                        'october', 'november', 'december']
 
@@ -128,6 +267,11 @@ class MonthlyDemandWriter(DemandWriter):
         monthly_data_new.to_csv(locator.get_demand_results_file(building_name, 'csv'), index=False,
                                 float_format=FLOAT_FORMAT, na_rep='nan')
 
+    def write_to_columnar(self, building_name, columns, hourly_data, locator):
+        monthly_data_new = self.calc_monthly_dataframe(building_name, hourly_data)
+        write_columnar(monthly_data_new, locator.get_demand_results_file(building_name, self.output_format),
+                       self.output_format)
+
     def write_to_hdf5(self, building_name, columns, hourly_data, locator):
         # get monthly totals and rename to MWhyr
         monthly_data_new = self.calc_monthly_dataframe(building_name, hourly_data)
@@ -155,18 +299,24 @@ class MonthlyDemandWriter(DemandWriter):
 class YearlyDemandWriter(DemandWriter):
     """Write out the yearly demand results"""
 
-    def __init__(self, loads, massflows, temperatures):
-        super(YearlyDemandWriter, self).__init__(loads, massflows, temperatures)
-
-    def write_to_csv(self, list_buildings, locator):
-        """read in the temporary results files and append them to the Totals.csv file."""
-        df = None
-        for name in list_buildings:
-            temporary_file = locator.get_temporary_file('%(name)sT.csv' % locals())
-            if df is None:
-                df = pd.read_csv(temporary_file)
-            else:
-                df = pd.concat([df, pd.read_csv(temporary_file)], ignore_index=True)
+    def __init__(self, loads, massflows, temperatures, output_format='csv'):
+        super(YearlyDemandWriter, self).__init__(loads, massflows, temperatures, output_format)
+
+    def write_to_csv(self, list_buildings, locator, reused_buildings=()):
+        """
+        read in the temporary results files (or aggregate the consolidated store) and write the Totals.csv file.
+        The rows of the ``reused_buildings`` (not recalculated in this run) are taken from the current Totals.csv file.
+        """
+        if self.output_format == DEMAND_STORE:
+            df = DemandStore(locator).compact(list_buildings, self.load_vars)
+        else:
+            reused_buildings = set(reused_buildings)
+            if reused_buildings:
+                previous_totals = pd.read_csv(locator.get_total_demand('csv')).set_index('Name', drop=False)
+            rows = [previous_totals.loc[[name]] if name in reused_buildings
+                    else pd.read_csv(locator.get_temporary_file('%(name)sT.csv' % locals()))
+                    for name in list_buildings]
+            df = pd.concat(rows, ignore_index=True)
         df.to_csv(locator.get_total_demand('csv'), index=False, float_format='%.3f', na_rep='nan')
 
         # """read saved data of monthly values and return as totals"""
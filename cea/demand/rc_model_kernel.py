@@ -0,0 +1,756 @@
+# -*- coding: utf-8 -*-
+"""
+Compiled hourly engine of the space heating / cooling demand (ISO 13790 / SIA 2044 RC-model)
+
+The python engine in :py:func:`cea.demand.thermal_loads.calc_Qhs_Qcs` loops over all hours of the year and calls the
+procedures in :py:mod:`cea.demand.hourly_procedure_heating_cooling_system_load` once per hour, which look up every
+value in the ``tsd`` dict. This module runs the same procedure as a single Numba kernel over contiguous arrays of one
+building: the inputs are stacked into a ``(n_inputs, HOURS_IN_YEAR)`` matrix, the ``tsd`` fields written by the hourly
+procedure into a ``(n_outputs, HOURS_IN_YEAR)`` matrix, and the building properties into a vector of scalars.
+
+The kernel covers buildings with radiative (or no) heating and cooling emission systems and the static infiltration
+model. The air-conditioning models of AHU / ARU systems and the dynamic infiltration model stay in the python engine,
+:py:func:`can_run_kernel` tells which engine is used for a building.
+
+The equations are taken over from :py:mod:`cea.demand.rc_model_SIA`, :py:mod:`cea.demand.sensible_loads`,
+:py:mod:`cea.demand.ventilation_air_flows_simple`, :py:mod:`cea.demand.latent_loads` and
+:py:mod:`cea.demand.space_emission_systems` with the same order of operations, so results match the python engine up
+to floating point round-off.
+"""
+
+import math
+import warnings
+
+import numpy as np
+from numba import jit
+
+from cea.constants import HOURS_IN_YEAR, BOLTZMANN, KELVIN_OFFSET
+from cea.demand import constants, control_heating_cooling_systems, control_ventilation_systems, \
+    space_emission_systems
+from cea.demand.latent_loads import P_ATM, RHO_A, DELTA_T
+from cea.demand.rc_model_SIA import h_cv_i, h_ic, f_sa, f_r_l, f_r_p, f_r_a, T_WARNING_LOW, T_WARNING_HIGH
+
+__author__ = "Daren Thomas"
+__copyright__ = "Copyright 2024, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Gabriel Happle", "Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+ETA_REC = constants.ETA_REC
+B_F = constants.B_F
+TEMPERATURE_ZONE_CONTROL_NIGHT_FLUSHING = constants.TEMPERATURE_ZONE_CONTROL_NIGHT_FLUSHING
+DELTA_T_NIGHT_FLUSHING = constants.DELTA_T_NIGHT_FLUSHING
+
+SUPPORTED_HEATING_SYSTEMS = ['NONE', 'RADIATOR', 'FLOOR_HEATING']
+SUPPORTED_COOLING_SYSTEMS = ['NONE', 'CEILING_COOLING', 'FLOOR_COOLING']
+
+# rows of the input matrix (read-only time series)
+KERNEL_INPUTS = ['T_ext', 'T_sky', 'rh_ext', 'RSE_wall', 'RSE_roof', 'RSE_win', 'I_sol_gross', 'm_ve_required',
+                 'm_ve_inf', 'El', 'Ea', 'Epro', 'Qs', 'w_int', 'ta_hs_set', 'ta_cs_set', 'Qcdata_sys',
+                 'heating_season', 'cooling_season']
+(IN_T_EXT, IN_T_SKY, IN_RH_EXT, IN_RSE_WALL, IN_RSE_ROOF, IN_RSE_WIN, IN_I_SOL_GROSS, IN_M_VE_REQUIRED,
+ IN_M_VE_INF, IN_EL, IN_EA, IN_EPRO, IN_QS, IN_W_INT, IN_TA_HS_SET, IN_TA_CS_SET, IN_QCDATA_SYS,
+ IN_HEATING_SEASON, IN_COOLING_SEASON) = range(len(KERNEL_INPUTS))
+
+# rows of the output matrix (the `tsd` fields written by the hourly procedure)
+KERNEL_OUTPUTS = ['T_int', 'theta_m', 'theta_c', 'theta_o', 'x_int', 'I_sol_and_I_rad', 'I_rad', 'I_sol',
+                  'm_ve_mech', 'm_ve_window', 'theta_ve_mech', 'x_ve_inf', 'x_ve_mech', 'g_hu_ld', 'g_dhu_ld',
+                  'Qhs_sen_rc', 'Qhs_sen_shu', 'Qhs_sen_ahu', 'Qhs_sen_aru', 'Qhs_lat_ahu', 'Qhs_lat_aru',
+                  'Qhs_sen_sys', 'Qhs_lat_sys', 'Qhs_em_ls', 'Ehs_lat_aux',
+                  'ma_sup_hs_ahu', 'ta_sup_hs_ahu', 'ta_re_hs_ahu', 'ma_sup_hs_aru', 'ta_sup_hs_aru', 'ta_re_hs_aru',
+                  'Qcs_sen_rc', 'Qcs_sen_scu', 'Qcs_sen_ahu', 'Qcs_sen_aru', 'Qcs_lat_ahu', 'Qcs_lat_aru',
+                  'Qcs_sen_sys', 'Qcs_lat_sys', 'Qcs_em_ls',
+                  'ma_sup_cs_ahu', 'ta_sup_cs_ahu', 'ta_re_cs_ahu', 'ma_sup_cs_aru', 'ta_sup_cs_aru', 'ta_re_cs_aru',
+                  'Q_gain_sen_light', 'Q_gain_sen_app', 'Q_gain_sen_pro', 'Q_gain_sen_data', 'Q_gain_sen_peop',
+                  'Q_gain_sen_wall', 'Q_gain_sen_base', 'Q_gain_sen_roof', 'Q_gain_sen_wind', 'Q_gain_sen_vent']
+(T_INT, THETA_M, THETA_C, THETA_O, X_INT, I_SOL_AND_I_RAD, I_RAD, I_SOL,
+ M_VE_MECH, M_VE_WINDOW, THETA_VE_MECH, X_VE_INF, X_VE_MECH, G_HU_LD, G_DHU_LD,
+ QHS_SEN_RC, QHS_SEN_SHU, QHS_SEN_AHU, QHS_SEN_ARU, QHS_LAT_AHU, QHS_LAT_ARU,
+ QHS_SEN_SYS, QHS_LAT_SYS, QHS_EM_LS, EHS_LAT_AUX,
+ MA_SUP_HS_AHU, TA_SUP_HS_AHU, TA_RE_HS_AHU, MA_SUP_HS_ARU, TA_SUP_HS_ARU, TA_RE_HS_ARU,
+ QCS_SEN_RC, QCS_SEN_SCU, QCS_SEN_AHU, QCS_SEN_ARU, QCS_LAT_AHU, QCS_LAT_ARU,
+ QCS_SEN_SYS, QCS_LAT_SYS, QCS_EM_LS,
+ MA_SUP_CS_AHU, TA_SUP_CS_AHU, TA_RE_CS_AHU, MA_SUP_CS_ARU, TA_SUP_CS_ARU, TA_RE_CS_ARU,
+ Q_GAIN_SEN_LIGHT, Q_GAIN_SEN_APP, Q_GAIN_SEN_PRO, Q_GAIN_SEN_DATA, Q_GAIN_SEN_PEOP,
+ Q_GAIN_SEN_WALL, Q_GAIN_SEN_BASE, Q_GAIN_SEN_ROOF, Q_GAIN_SEN_WIND, Q_GAIN_SEN_VENT) = range(len(KERNEL_OUTPUTS))
+
+# scalar building properties
+KERNEL_PARAMETERS = ['Af', 'Htr_op', 'Htr_w', 'Atot', 'Am', 'Awin_ag', 'Cm', 'Awall_ag', 'Aop_bg', 'Aroof',
+                     'U_wall', 'U_roof', 'U_win', 'U_base', 'e_wall', 'e_roof', 'e_win', 'f_internal_gains',
+                     'f_solar_gains', 'floor_height', 'MECH_VENT', 'WIN_VENT', 'HEAT_REC', 'NIGHT_FLSH',
+                     'ECONOMIZER', 'Tcs_set_C', 'RH_max_pc', 'm_ve_required_max', 'T_sup_air_max',
+                     'has_heating_system', 'has_cooling_system', 'convection_hs', 'convection_cs',
+                     'Qhsmax_Wm2', 'Qcsmax_Wm2', 'delta_theta_int_inc_heating', 'delta_theta_int_inc_cooling',
+                     'delta_theta_e_sol', 'overheating_warning']
+(P_AF, P_HTR_OP, P_HTR_W, P_ATOT, P_AM, P_AWIN_AG, P_CM, P_AWALL_AG, P_AOP_BG, P_AROOF,
+ P_U_WALL, P_U_ROOF, P_U_WIN, P_U_BASE, P_E_WALL, P_E_ROOF, P_E_WIN, P_F_INTERNAL_GAINS,
+ P_F_SOLAR_GAINS, P_FLOOR_HEIGHT, P_MECH_VENT, P_WIN_VENT, P_HEAT_REC, P_NIGHT_FLSH,
+ P_ECONOMIZER, P_TCS_SET_C, P_RH_MAX_PC, P_M_VE_REQUIRED_MAX, P_T_SUP_AIR_MAX,
+ P_HAS_HEATING_SYSTEM, P_HAS_COOLING_SYSTEM, P_CONVECTION_HS, P_CONVECTION_CS,
+ P_QHSMAX_WM2, P_QCSMAX_WM2, P_DELTA_THETA_INT_INC_HEATING, P_DELTA_THETA_INT_INC_COOLING,
+ P_DELTA_THETA_E_SOL, P_OVERHEATING_WARNING) = range(len(KERNEL_PARAMETERS))
+
+# codes of the system status logs (`sys_status_ahu`, `sys_status_aru`, `sys_status_sen`), -1 leaves the log untouched
+SYS_STATUS = ['no system', 'system off', 'On', 'Off']
+STATUS_NO_SYSTEM, STATUS_SYSTEM_OFF, STATUS_ON, STATUS_OFF = range(len(SYS_STATUS))
+
+# error codes returned by the kernel
+OK, ERROR_RC_TEMPERATURE_OUT_OF_BOUNDS, ERROR_NEGATIVE_MOISTURE, ERROR_HEATING_DEMAND, ERROR_COOLING_DEMAND = range(5)
+
+
+def can_run_kernel(bpr, use_dynamic_infiltration_calculation):
+    """
+    Checks whether the hourly procedure of a building is covered by the compiled kernel
+
+    :param bpr: Building Properties
+    :type bpr: BuildingPropertiesRow
+    :param use_dynamic_infiltration_calculation: True if the dynamic infiltration model is used
+    :type use_dynamic_infiltration_calculation: bool
+    :return: True, if the building can be simulated with :py:func:`calc_heating_cooling_loads_all_hours`
+    :rtype: bool
+    """
+    return (not use_dynamic_infiltration_calculation
+            and bpr.hvac['class_hs'] in SUPPORTED_HEATING_SYSTEMS
+            and bpr.hvac['class_cs'] in SUPPORTED_COOLING_SYSTEMS)
+
+
+def calc_heating_cooling_loads_all_hours(bpr, tsd, hours, config):
+    """
+    Compiled equivalent of the hourly loop in :py:func:`cea.demand.thermal_loads.calc_Qhs_Qcs`. Calculates the heat
+    gains, ventilation air flows, RC-model temperatures, zone humidity and sensible heating / cooling loads for all
+    ``hours`` and writes them to ``tsd``.
+
+    :param bpr: Building Properties
+    :type bpr: BuildingPropertiesRow
+    :param tsd: Time series data of building, with ventilation requirements and infiltration already calculated
+    :type tsd: dict
+    :param hours: sequence of simulated hours of the year (see :py:func:`cea.demand.thermal_loads.get_hours`)
+    :type hours: Iterable[int]
+    :param config: the configuration object (``config.demand.overheating_warning`` is used)
+    :type config: cea.config.Configuration
+    :return: updated tsd
+    :rtype: dict
+    """
+    inputs = get_kernel_inputs(bpr, tsd)
+    outputs = get_kernel_outputs(tsd)
+    parameters = get_kernel_parameters(bpr, tsd, config)
+    status = np.full((3, HOURS_IN_YEAR), -1, dtype=np.int8)
+    no_season = np.zeros(HOURS_IN_YEAR, dtype=np.bool_)
+    hours = np.fromiter(hours, dtype=np.int64)
+
+    error, error_t, last_balance_t = hourly_procedure_kernel(inputs, outputs, parameters, status, no_season, hours)
+
+    return kernel_results_to_tsd(bpr, tsd, outputs, status, no_season, error, error_t, last_balance_t)
+
+
+def calc_heating_cooling_loads_batch(bprs, tsds, hours, config):
+    """
+    Batch version of :py:func:`calc_heating_cooling_loads_all_hours`: the matrices of all buildings are stacked
+    along a leading building axis and simulated in a single call to the compiled kernel.
+
+    :param bprs: Building Properties of each building
+    :type bprs: list[BuildingPropertiesRow]
+    :param tsds: Time series data of each building, with ventilation requirements and infiltration already calculated
+    :type tsds: list[dict]
+    :param hours: sequence of simulated hours of each building (see :py:func:`cea.demand.thermal_loads.get_hours`)
+    :type hours: list[Iterable[int]]
+    :param config: the configuration object (``config.demand.overheating_warning`` is used)
+    :type config: cea.config.Configuration
+    :return: updated tsds
+    :rtype: list[dict]
+    """
+    n = len(bprs)
+    inputs = np.array([get_kernel_inputs(bpr, tsd) for bpr, tsd in zip(bprs, tsds)])
+    outputs = np.array([get_kernel_outputs(tsd) for tsd in tsds])
+    parameters = np.array([get_kernel_parameters(bpr, tsd, config) for bpr, tsd in zip(bprs, tsds)])
+    status = np.full((n, 3, HOURS_IN_YEAR), -1, dtype=np.int8)
+    no_season = np.zeros((n, HOURS_IN_YEAR), dtype=np.bool_)
+    hours = np.array([np.fromiter(h, dtype=np.int64) for h in hours])
+    errors = np.zeros((n, 3), dtype=np.int64)
+
+    hourly_procedure_kernel_batch(inputs, outputs, parameters, status, no_season, hours, errors)
+
+    return [kernel_results_to_tsd(bprs[i], tsds[i], outputs[i], status[i], no_season[i], *errors[i])
+            for i in range(n)]
+
+
+def kernel_results_to_tsd(bpr, tsd, outputs, status, no_season, error, error_t, last_balance_t):
+    """
+    Raise the errors of the python engine for the error code returned by the kernel, or copy the kernel results to
+    ``tsd``.
+    """
+    if error == ERROR_RC_TEMPERATURE_OUT_OF_BOUNDS:
+        T_int, theta_c, theta_m = outputs[T_INT, error_t], outputs[THETA_C, error_t], outputs[THETA_M, error_t]
+        raise Exception("Temperature in RC-Model of building {} out of bounds! First occurred at timestep = {}. "
+                        "The results were Tint = {}, theta_c = {}, theta_m = {}.\n"
+                        "If it is an expected behavior, consider turning off over-heating warning in the "
+                        "advanced parameters to continue the simulation.\n"
+                        "If it is not expected, check building geometry and internal loads.\n"
+                        "Building might be too small in size or architecture parameter Hs_ag = {} might be too "
+                        "small for this geometry. Current bounds of range for RC-model temperatures are "
+                        "between {} and {}.".format(bpr.name, error_t, round(T_int, 2), round(theta_c, 2),
+                                                     round(theta_m, 2), bpr.architecture.Hs_ag, T_WARNING_LOW,
+                                                     T_WARNING_HIGH))
+    elif error == ERROR_NEGATIVE_MOISTURE:
+        raise Exception("Bug in moisture balance in zone. Negative moisture content detected.")
+    elif error == ERROR_HEATING_DEMAND:
+        raise Exception("Unexpected status in 'calc_rc_heating_demand'")
+    elif error == ERROR_COOLING_DEMAND:
+        raise Exception("Unexpected status in 'calc_rc_cooling_demand'")
+
+    for t in np.flatnonzero(no_season):
+        warnings.warn('Timestep %s not in heating season nor cooling season' % t)
+
+    for i, field in enumerate(KERNEL_OUTPUTS):
+        tsd[field] = outputs[i]
+    for i, log in enumerate(['sys_status_ahu', 'sys_status_aru', 'sys_status_sen']):
+        for code, label in enumerate(SYS_STATUS):
+            tsd[log][status[i] == code] = label
+    if last_balance_t >= 0:
+        # the python engine overwrites the whole field with the value of the last hour (see
+        # `detailed_thermal_balance_to_tsd`), keep it that way for comparable results
+        tsd['Q_loss_sen_ref'] = -tsd['Qcre_sys'][last_balance_t]
+
+    return tsd
+
+
+def get_kernel_inputs(bpr, tsd):
+    """Stack the time series read by the kernel into a contiguous ``(len(KERNEL_INPUTS), HOURS_IN_YEAR)`` matrix."""
+    inputs = np.empty((len(KERNEL_INPUTS), HOURS_IN_YEAR), dtype=np.float64)
+    for i, field in enumerate(KERNEL_INPUTS[:IN_HEATING_SEASON]):
+        if field == 'I_sol_gross':
+            inputs[i] = bpr.solar.I_sol
+        else:
+            inputs[i] = tsd[field]
+    inputs[IN_HEATING_SEASON] = calc_season_mask(bpr.hvac['has-heating-season'], bpr.hvac['heat_starts'],
+                                                 bpr.hvac['heat_ends'])
+    inputs[IN_COOLING_SEASON] = calc_season_mask(bpr.hvac['has-cooling-season'], bpr.hvac['cool_starts'],
+                                                 bpr.hvac['cool_ends'])
+    return inputs
+
+
+def get_kernel_outputs(tsd):
+    """Copy the ``tsd`` fields written by the kernel into a ``(len(KERNEL_OUTPUTS), HOURS_IN_YEAR)`` matrix."""
+    return np.array([np.asarray(tsd[field], dtype=np.float64) for field in KERNEL_OUTPUTS])
+
+
+def get_kernel_parameters(bpr, tsd, config):
+    """Collect the scalar building properties used by the kernel into a vector (see ``KERNEL_PARAMETERS``)."""
+    rc_model = bpr.rc_model
+    architecture = bpr.architecture
+    has_heating_system = control_heating_cooling_systems.has_heating_system(bpr.hvac['class_hs'])
+    has_cooling_system = control_heating_cooling_systems.has_cooling_system(bpr.hvac['class_cs'])
+    parameters = {
+        'Af': rc_model['Af'],
+        'Htr_op': rc_model['Htr_op'],
+        'Htr_w': rc_model['Htr_w'],
+        'Atot': rc_model['Atot'],
+        'Am': rc_model['Am'],
+        'Awin_ag': rc_model['Awin_ag'],
+        'Cm': rc_model['Cm'],
+        'Awall_ag': rc_model['Awall_ag'],
+        'Aop_bg': rc_model['Aop_bg'],
+        'Aroof': rc_model['Aroof'],
+        'U_wall': rc_model['U_wall'],
+        'U_roof': rc_model['U_roof'],
+        'U_win': rc_model['U_win'],
+        'U_base': rc_model['U_base'],
+        'e_wall': architecture.e_wall,
+        'e_roof': architecture.e_roof,
+        'e_win': architecture.e_win,
+        'f_internal_gains': min(rc_model['Af'] / rc_model['Aef'], 1.0),
+        'f_solar_gains': np.sqrt(architecture.Hs_ag),
+        'floor_height': bpr.geometry['floor_height'],
+        'MECH_VENT': control_ventilation_systems.has_mechanical_ventilation(bpr),
+        'WIN_VENT': control_ventilation_systems.has_window_ventilation(bpr),
+        'HEAT_REC': control_ventilation_systems.has_mechanical_ventilation_heat_recovery(bpr),
+        'NIGHT_FLSH': control_ventilation_systems.has_night_flushing(bpr),
+        'ECONOMIZER': control_ventilation_systems.has_mechanical_ventilation_economizer(bpr),
+        'Tcs_set_C': bpr.comfort['Tcs_set_C'],
+        'RH_max_pc': bpr.comfort['RH_max_pc'],
+        'm_ve_required_max': tsd['m_ve_required'].max(),
+        'T_sup_air_max': np.max([bpr.hvac['Tc_sup_air_ahu_C'], bpr.hvac['Tc_sup_air_aru_C']]),
+        'has_heating_system': has_heating_system,
+        'has_cooling_system': has_cooling_system,
+        'convection_hs': bpr.hvac['convection_hs'],
+        'convection_cs': bpr.hvac['convection_cs'],
+        'Qhsmax_Wm2': bpr.hvac['Qhsmax_Wm2'],
+        'Qcsmax_Wm2': bpr.hvac['Qcsmax_Wm2'],
+        'delta_theta_int_inc_heating': space_emission_systems.calc_delta_theta_int_inc_heating(bpr),
+        'delta_theta_int_inc_cooling': space_emission_systems.calc_delta_theta_int_inc_cooling(bpr),
+        'delta_theta_e_sol': (space_emission_systems.get_delta_theta_e_sol(bpr) if has_cooling_system
+                              else np.nan),
+        'overheating_warning': config.demand.overheating_warning,
+    }
+    return np.array([parameters[p] for p in KERNEL_PARAMETERS], dtype=np.float64)
+
+
+def calc_season_mask(has_season, season_starts, season_ends):
+    """
+    Vectorized version of :py:func:`cea.demand.control_heating_cooling_systems.is_heating_season` /
+    :py:func:`cea.demand.control_heating_cooling_systems.is_cooling_season` for all hours of the year.
+
+    :param has_season: True, if the building has a heating (cooling) season
+    :param season_starts: start of the season in 'DD|MM' format
+    :param season_ends: end of the season in 'DD|MM' format
+    :return: boolean array with one value per hour of the year
+    :rtype: np.ndarray
+    """
+    hours = np.arange(HOURS_IN_YEAR)
+    if not has_season:
+        return np.zeros(HOURS_IN_YEAR, dtype=bool)
+    start = control_heating_cooling_systems.convert_date_to_hour(season_starts)
+    end = control_heating_cooling_systems.convert_date_to_hour(season_ends) + 23  # end at the last hour of the day
+    if start < end:
+        return (start <= hours) & (hours <= end)
+    elif start > end:
+        return (start <= hours) | (hours <= end)
+    return np.zeros(HOURS_IN_YEAR, dtype=bool)
+
+
+@jit(nopython=True, cache=True)
+def calc_rc_model_temperatures(phi_hc_cv, phi_hc_r, inputs, outputs, p, t, t_1):
+    """
+    Kernel version of :py:func:`cea.demand.rc_model_SIA.calc_rc_model_temperatures`, returns the node temperatures and
+    the heat transfer coefficients used for the detailed thermal balance.
+    """
+    theta_m_t_1 = outputs[THETA_M, t_1]
+    if np.isnan(theta_m_t_1):
+        theta_m_t_1 = inputs[IN_T_EXT, t_1]
+
+    m_ve_mech = outputs[M_VE_MECH, t]
+    m_ve_window = outputs[M_VE_WINDOW, t]
+    m_ve_inf = inputs[IN_M_VE_INF, t]
+    Elf = inputs[IN_EL, t] * p[P_F_INTERNAL_GAINS]
+    Eaf = inputs[IN_EA, t] * p[P_F_INTERNAL_GAINS]
+    Epro = inputs[IN_EPRO, t]
+    I_sol = outputs[I_SOL_AND_I_RAD, t] * p[P_F_SOLAR_GAINS]
+    T_ext = inputs[IN_T_EXT, t]
+    theta_ve_mech = outputs[THETA_VE_MECH, t]
+    Qs = inputs[IN_QS, t]
+    a_t = p[P_ATOT]
+    a_m = p[P_AM]
+    a_w = p[P_AWIN_AG]
+    c_m = p[P_CM] / 3600  # (Wh/K) SIA 2044 unit is Wh/K, ISO unit is J/K
+
+    h_ec = p[P_HTR_W]
+    h_ac = a_t / (1 / h_cv_i - 1 / h_ic)
+    cp = 1.005 / 3.6  # (Wh/kg/K)
+    h_ea = (m_ve_mech * 3600 + m_ve_window * 3600 + m_ve_inf * 3600) * cp
+    f_sc = (a_t - a_m - a_w - h_ec / h_ic) / (a_t - a_w)
+    f_ic = (a_t - a_m - h_ec / h_ic) / a_t
+    h_op_m = p[P_HTR_OP]
+    h_mc = h_ic * a_m
+    h_em = 1.0 / (1.0 / h_op_m - 1.0 / h_mc)
+    f_im = a_m / a_t
+    f_sm = a_m / (a_t - a_w)
+    phi_i_l = 0.9 * Elf
+    phi_i_a = 0.9 * (Eaf + Epro)
+    phi_i_p = Qs
+    h_1 = 1 / (1 / h_ea + 1 / h_ac)
+    phi_a = f_sa * I_sol + (1 - f_r_l) * phi_i_l + (1 - f_r_p) * phi_i_p + (1 - f_r_a) * phi_i_a + phi_hc_cv
+    phi_m = f_im * (f_r_l * phi_i_l + f_r_p * phi_i_p + f_r_a * phi_i_a + phi_hc_r) + (1 - f_sa) * f_sm * I_sol
+    phi_c = f_ic * (f_r_l * phi_i_l + f_r_p * phi_i_p + f_r_a * phi_i_a + phi_hc_r) + (1 - f_sa) * f_sc * I_sol
+    theta_ea = (m_ve_mech * theta_ve_mech + (m_ve_window + m_ve_inf) * T_ext) / (m_ve_mech + m_ve_window + m_ve_inf)
+    theta_em = T_ext
+    theta_ec = T_ext
+    h_2 = h_1 + h_ec
+    h_3 = 1.0 / (1.0 / h_2 + 1.0 / h_mc)
+    phi_m_tot = phi_m + h_em * theta_em + (h_3 * (phi_c + h_ec * theta_ec + h_1 * (phi_a / h_ea + theta_ea))) / h_2
+    theta_m_t = (theta_m_t_1 * (c_m - 0.5 * (h_3 + h_em)) + phi_m_tot) / (c_m + 0.5 * (h_3 + h_em))
+    theta_m = (theta_m_t + theta_m_t_1) / 2
+    theta_c = (h_mc * theta_m + phi_c + h_ec * theta_ec + h_1 * (phi_a / h_ea + theta_ea)) / (h_mc + h_ec + h_1)
+    T_int = (h_ac * theta_c + h_ea * theta_ea + phi_a) / (h_ac + h_ea)
+    theta_o = T_int * 0.31 + theta_c * 0.69
+
+    out_of_bounds = (T_WARNING_LOW > T_int or T_WARNING_LOW > theta_c or T_WARNING_LOW > theta_m
+                     or T_int > T_WARNING_HIGH or theta_c > T_WARNING_HIGH or theta_m > T_WARNING_HIGH)
+    out_of_bounds = out_of_bounds and p[P_OVERHEATING_WARNING] > 0.0
+
+    return (out_of_bounds, T_int, theta_c, theta_m, theta_o, theta_ea, theta_ec, theta_em, h_ea, h_ec, h_em,
+            h_op_m)
+
+
+@jit(nopython=True, cache=True)
+def is_night_flushing_active(inputs, outputs, p, t, t_1):
+    return (p[P_NIGHT_FLSH] > 0.0
+            and not (7 < t % 24 < 21)
+            and outputs[T_INT, t_1] > TEMPERATURE_ZONE_CONTROL_NIGHT_FLUSHING
+            and outputs[T_INT, t_1] > inputs[IN_T_EXT, t] + DELTA_T_NIGHT_FLUSHING
+            and inputs[IN_RH_EXT, t] < p[P_RH_MAX_PC])
+
+
+@jit(nopython=True, cache=True)
+def calc_ventilation(inputs, outputs, p, t, t_1):
+    """
+    Kernel version of the ventilation procedures in :py:mod:`cea.demand.ventilation_air_flows_simple` (mechanical and
+    window air flows, supply temperature of mechanical ventilation) and of
+    :py:func:`cea.demand.latent_loads.calc_moisture_content_airflows`.
+    """
+    T_ext = inputs[IN_T_EXT, t]
+    m_ve_required = inputs[IN_M_VE_REQUIRED, t]
+    m_ve_inf = inputs[IN_M_VE_INF, t]
+    has_mech_vent = p[P_MECH_VENT] > 0.0
+
+    night_flushing = is_night_flushing_active(inputs, outputs, p, t, t_1)
+    economizer = p[P_ECONOMIZER] > 0.0 and outputs[T_INT, t_1] > p[P_TCS_SET_C] >= T_ext
+    mech_vent_active = has_mech_vent and (m_ve_required > 0 or night_flushing)
+
+    # mechanical ventilation
+    if mech_vent_active and not night_flushing and not economizer:
+        m_ve_mech = m_ve_required - m_ve_inf
+        if 0.0 > m_ve_mech:
+            m_ve_mech = 0.0
+    elif has_mech_vent and (night_flushing or economizer):
+        m_ve_mech = p[P_M_VE_REQUIRED_MAX]
+    else:
+        m_ve_mech = 0.0
+    outputs[M_VE_MECH, t] = m_ve_mech
+
+    # window ventilation
+    window_vent_active = p[P_WIN_VENT] > 0.0 and not mech_vent_active
+    if window_vent_active and not night_flushing:
+        m_ve_window = m_ve_required - m_ve_inf
+        if 0.0 > m_ve_window:
+            m_ve_window = 0.0
+    elif window_vent_active and night_flushing:
+        m_ve_window = p[P_M_VE_REQUIRED_MAX]
+    else:
+        m_ve_window = 0.0
+    outputs[M_VE_WINDOW, t] = m_ve_window
+
+    # supply temperature of mechanical ventilation
+    heat_recovery = False
+    if mech_vent_active and p[P_HEAT_REC] > 0.0 and inputs[IN_HEATING_SEASON, t] > 0.0:
+        heat_recovery = not (night_flushing or economizer)
+    elif mech_vent_active and p[P_HEAT_REC] > 0.0 and inputs[IN_COOLING_SEASON, t] > 0.0 \
+            and outputs[T_INT, t_1] < T_ext:
+        heat_recovery = True
+    if heat_recovery:
+        outputs[THETA_VE_MECH, t] = T_ext + ETA_REC * (outputs[T_INT, t_1] - T_ext)
+    else:
+        outputs[THETA_VE_MECH, t] = T_ext
+
+    # moisture content of ventilation air flows
+    p_sat = 611.2 * math.exp(17.62 * T_ext / (243.12 + T_ext))
+    x_ve = 0.622 * inputs[IN_RH_EXT, t] / 100 * p_sat / P_ATM
+    outputs[X_VE_INF, t] = x_ve
+    outputs[X_VE_MECH, t] = x_ve
+
+
+@jit(nopython=True, cache=True)
+def calc_solar_gains(inputs, outputs, p, t, t_1):
+    """Kernel version of :py:func:`cea.demand.sensible_loads.calc_I_sol`"""
+    temp_s_prev = outputs[THETA_C, t_1]
+    if np.isnan(temp_s_prev):
+        temp_s_prev = inputs[IN_T_EXT, t_1]
+    theta_ss = 0.5 * (inputs[IN_T_SKY, t] + temp_s_prev)
+    delta_theta_er = inputs[IN_T_EXT, t] - inputs[IN_T_SKY, t]
+
+    I_rad_win = inputs[IN_RSE_WIN, t] * p[P_U_WIN] * (
+            4.0 * p[P_E_WIN] * BOLTZMANN * (theta_ss + KELVIN_OFFSET) ** 3.0) * p[P_AWIN_AG] * delta_theta_er
+    I_rad_roof = inputs[IN_RSE_ROOF, t] * p[P_U_ROOF] * (
+            4.0 * p[P_E_ROOF] * BOLTZMANN * (theta_ss + KELVIN_OFFSET) ** 3.0) * p[P_AROOF] * delta_theta_er
+    I_rad_wall = inputs[IN_RSE_WALL, t] * p[P_U_WALL] * (
+            4.0 * p[P_E_WALL] * BOLTZMANN * (theta_ss + KELVIN_OFFSET) ** 3.0) * p[P_AWALL_AG] * delta_theta_er
+    I_rad = 0.5 * I_rad_wall + 0.5 * I_rad_win + 1 * I_rad_roof
+
+    I_sol_gross = inputs[IN_I_SOL_GROSS, t]
+    outputs[I_SOL_AND_I_RAD, t] = I_sol_gross - I_rad
+    outputs[I_RAD, t] = I_rad
+    outputs[I_SOL, t] = I_sol_gross
+
+
+@jit(nopython=True, cache=True)
+def calc_moisture_content_in_zone_local(inputs, outputs, p, t, t_1):
+    """Kernel version of :py:func:`cea.demand.latent_loads.calc_moisture_content_in_zone_local`"""
+    vol_int_a_ztc = p[P_AF] * p[P_FLOOR_HEIGHT]
+    m_ve_mech = outputs[M_VE_MECH, t]
+    m_ve_inf = inputs[IN_M_VE_INF, t] + outputs[M_VE_WINDOW, t]
+    x_int_a_t = (m_ve_mech * outputs[X_VE_MECH, t] + m_ve_inf * outputs[X_VE_INF, t] +
+                 outputs[G_HU_LD, t] + outputs[G_DHU_LD, t] + inputs[IN_W_INT, t] + (
+                     RHO_A * vol_int_a_ztc) / DELTA_T * outputs[X_INT, t_1]) / \
+                ((m_ve_mech + m_ve_inf) + (RHO_A * vol_int_a_ztc) / DELTA_T)
+    outputs[X_INT, t] = x_int_a_t
+    return x_int_a_t >= 0
+
+
+@jit(nopython=True, cache=True)
+def calc_zone_humidity_no_loads(inputs, outputs, p, t, t_1):
+    """Moisture balance of the zone without humidification or dehumidification, False if it turns negative"""
+    outputs[G_HU_LD, t] = 0.0
+    outputs[G_DHU_LD, t] = 0.0
+    return calc_moisture_content_in_zone_local(inputs, outputs, p, t, t_1)
+
+
+@jit(nopython=True, cache=True)
+def calc_q_em_ls(q_em_out, delta_theta_int_inc, theta_int_inc, theta_e_comb, q_em_max):
+    """Kernel version of :py:func:`cea.demand.space_emission_systems.calc_q_em_ls`"""
+    if abs(theta_int_inc - theta_e_comb) < 1e-6:
+        q_em_ls = 0.0
+    else:
+        q_em_ls = q_em_out * (delta_theta_int_inc / (theta_int_inc - theta_e_comb))
+        if abs(q_em_ls + q_em_out) > abs(q_em_max):
+            q_em_ls = q_em_max - q_em_out
+        if not np.sign(q_em_ls) == np.sign(q_em_out):
+            q_em_ls = 0.0
+    return q_em_ls
+
+
+@jit(nopython=True, cache=True)
+def update_no_heating(outputs, t):
+    """Kernel version of :py:func:`cea.demand.hourly_procedure_heating_cooling_system_load.update_tsd_no_heating`"""
+    for field in (QHS_SEN_RC, QHS_SEN_SHU, QHS_SEN_ARU, QHS_SEN_AHU, QHS_LAT_ARU, QHS_LAT_AHU, QHS_SEN_SYS,
+                  QHS_LAT_SYS, QHS_EM_LS, EHS_LAT_AUX, MA_SUP_HS_AHU, MA_SUP_HS_ARU):
+        outputs[field, t] = 0.0
+    for field in (TA_SUP_HS_AHU, TA_RE_HS_AHU, TA_SUP_HS_ARU, TA_RE_HS_ARU):
+        outputs[field, t] = np.nan
+
+
+@jit(nopython=True, cache=True)
+def update_no_cooling(outputs, t):
+    """Kernel version of :py:func:`cea.demand.hourly_procedure_heating_cooling_system_load.update_tsd_no_cooling`"""
+    for field in (QCS_SEN_RC, QCS_SEN_SCU, QCS_SEN_ARU, QCS_SEN_AHU, QCS_LAT_ARU, QCS_LAT_AHU, QCS_SEN_SYS,
+                  QCS_LAT_SYS, QCS_EM_LS, MA_SUP_CS_AHU, MA_SUP_CS_ARU):
+        outputs[field, t] = 0.0
+    for field in (TA_SUP_CS_AHU, TA_RE_CS_AHU, TA_SUP_CS_ARU, TA_RE_CS_ARU):
+        outputs[field, t] = np.nan
+
+
+@jit(nopython=True, cache=True)
+def detailed_thermal_balance(inputs, outputs, p, t, rc):
+    """
+    Kernel version of :py:func:`cea.demand.hourly_procedure_heating_cooling_system_load.detailed_thermal_balance_to_tsd`
+    """
+    (_, T_int, theta_c, theta_m, _, theta_ea, theta_ec, theta_em, h_ea, h_ec, h_em, h_op_m) = rc
+    Ea = inputs[IN_EA, t]
+    Epro = inputs[IN_EPRO, t]
+    outputs[Q_GAIN_SEN_LIGHT, t] = 0.9 * inputs[IN_EL, t]
+    outputs[Q_GAIN_SEN_APP, t] = (0.9 * (Ea + Epro) - 0.9 * Epro) / 0.9
+    outputs[Q_GAIN_SEN_PRO, t] = Epro
+    outputs[Q_GAIN_SEN_DATA, t] = inputs[IN_QCDATA_SYS, t]
+    outputs[Q_GAIN_SEN_PEOP, t] = inputs[IN_QS, t]
+
+    h_wall_em = h_em * p[P_AWALL_AG] * p[P_U_WALL] / h_op_m
+    h_base_em = h_em * p[P_AOP_BG] * B_F * p[P_U_BASE] / h_op_m
+    h_roof_em = h_em * p[P_AROOF] * p[P_U_ROOF] / h_op_m
+    outputs[Q_GAIN_SEN_WALL, t] = h_wall_em * (theta_em - theta_m)
+    outputs[Q_GAIN_SEN_BASE, t] = h_base_em * (theta_em - theta_m)
+    outputs[Q_GAIN_SEN_ROOF, t] = h_roof_em * (theta_em - theta_m)
+    outputs[Q_GAIN_SEN_WIND, t] = h_ec * (theta_ec - theta_c)
+    outputs[Q_GAIN_SEN_VENT, t] = h_ea * (theta_ea - T_int)
+
+
+@jit(nopython=True, cache=True)
+def rc_temperatures_to_outputs(outputs, t, rc):
+    outputs[T_INT, t] = rc[1]
+    outputs[THETA_M, t] = rc[3]
+    outputs[THETA_C, t] = rc[2]
+    outputs[THETA_O, t] = rc[4]
+
+
+@jit(nopython=True, cache=True)
+def hourly_procedure_kernel(inputs, outputs, p, status, no_season, hours):
+    """
+    Runs the hourly space heating / cooling procedure for all ``hours`` in sequence. Mirrors
+    :py:func:`cea.demand.hourly_procedure_heating_cooling_system_load.calc_heating_cooling_loads` for buildings with
+    radiative (or no) emission systems.
+
+    :param inputs: ``(len(KERNEL_INPUTS), HOURS_IN_YEAR)`` matrix of read-only time series
+    :param outputs: ``(len(KERNEL_OUTPUTS), HOURS_IN_YEAR)`` matrix of results, updated in place
+    :param p: vector of building properties (see ``KERNEL_PARAMETERS``)
+    :param status: ``(3, HOURS_IN_YEAR)`` matrix of system status codes (ahu, aru, sensible), updated in place
+    :param no_season: boolean vector, set to True for hours in neither (or both) heating and cooling season
+    :param hours: sequence of simulated hours
+    :return: error code, hour of the error and last hour the detailed thermal balance was calculated
+    """
+    last_balance_t = -1
+    for i in range(hours.shape[0]):
+        t = hours[i]
+        t_1 = t - 1 if t > 0 else HOURS_IN_YEAR - 1
+
+        calc_solar_gains(inputs, outputs, p, t, t_1)
+        calc_ventilation(inputs, outputs, p, t, t_1)
+
+        heating_season = inputs[IN_HEATING_SEASON, t] > 0.0
+        cooling_season = inputs[IN_COOLING_SEASON, t] > 0.0
+
+        if heating_season and not cooling_season:
+            ta_hs_set = inputs[IN_TA_HS_SET, t]
+            rc = calc_rc_model_temperatures(0.0, 0.0, inputs, outputs, p, t, t_1)
+            if rc[0]:
+                rc_temperatures_to_outputs(outputs, t, rc)
+                return ERROR_RC_TEMPERATURE_OUT_OF_BOUNDS, t, last_balance_t
+
+            if p[P_HAS_HEATING_SYSTEM] == 0.0 or np.isnan(ta_hs_set):
+                # no system = no loads
+                if not calc_zone_humidity_no_loads(inputs, outputs, p, t, t_1):
+                    return ERROR_NEGATIVE_MOISTURE, t, last_balance_t
+                rc_temperatures_to_outputs(outputs, t, rc)
+                update_no_cooling(outputs, t)
+                update_no_heating(outputs, t)
+                status[0, t] = STATUS_SYSTEM_OFF
+                status[1, t] = STATUS_SYSTEM_OFF
+                status[2, t] = STATUS_SYSTEM_OFF
+            else:
+                # radiator or floor heating
+                phi_h_act = 0.0
+                if rc[1] < ta_hs_set - 0.001:
+                    f_hc_cv = p[P_CONVECTION_HS]
+                    phi_hc_10 = 10.0 * p[P_AF]
+                    rc_10 = calc_rc_model_temperatures(f_hc_cv * phi_hc_10, (1 - f_hc_cv) * phi_hc_10, inputs,
+                                                       outputs, p, t, t_1)
+                    if rc_10[0]:
+                        rc_temperatures_to_outputs(outputs, t, rc_10)
+                        return ERROR_RC_TEMPERATURE_OUT_OF_BOUNDS, t, last_balance_t
+                    phi_hc_ul = phi_hc_10 * (ta_hs_set - rc[1]) / (rc_10[1] - rc[1])
+                    phi_h_max = p[P_QHSMAX_WM2] * p[P_AF]
+                    if 0.0 < phi_hc_ul <= phi_h_max:
+                        phi_h_act = phi_hc_ul
+                    elif 0.0 < phi_hc_ul > phi_h_max:
+                        phi_h_act = phi_h_max
+                    else:
+                        return ERROR_HEATING_DEMAND, t, last_balance_t
+                    rc = calc_rc_model_temperatures(f_hc_cv * phi_h_act, (1 - f_hc_cv) * phi_h_act, inputs,
+                                                    outputs, p, t, t_1)
+                    if rc[0]:
+                        rc_temperatures_to_outputs(outputs, t, rc)
+                        return ERROR_RC_TEMPERATURE_OUT_OF_BOUNDS, t, last_balance_t
+
+                # a radiative system does not act on humidity
+                if not calc_zone_humidity_no_loads(inputs, outputs, p, t, t_1):
+                    return ERROR_NEGATIVE_MOISTURE, t, last_balance_t
+                outputs[QHS_SEN_RC, t] = phi_h_act
+                outputs[QHS_SEN_SHU, t] = phi_h_act
+                outputs[QHS_SEN_AHU, t] = 0.0
+                status[0, t] = STATUS_NO_SYSTEM
+                outputs[QHS_SEN_ARU, t] = 0.0
+                status[1, t] = STATUS_NO_SYSTEM
+                outputs[QHS_SEN_SYS, t] = phi_h_act
+                rc_temperatures_to_outputs(outputs, t, rc)
+                outputs[QHS_LAT_SYS, t] = 0.0
+                outputs[MA_SUP_HS_AHU, t] = 0.0
+                outputs[TA_SUP_HS_AHU, t] = np.nan
+                outputs[TA_RE_HS_AHU, t] = np.nan
+                outputs[MA_SUP_HS_ARU, t] = 0.0
+                outputs[TA_SUP_HS_ARU, t] = np.nan
+                outputs[TA_RE_HS_ARU, t] = np.nan
+                delta_theta_int_inc = p[P_DELTA_THETA_INT_INC_HEATING]
+                outputs[QHS_EM_LS, t] = calc_q_em_ls(phi_h_act, delta_theta_int_inc,
+                                                     outputs[T_INT, t] + delta_theta_int_inc,
+                                                     inputs[IN_T_EXT, t], p[P_QHSMAX_WM2] * p[P_AF])
+                status[2, t] = STATUS_ON if phi_h_act > 0.0 else STATUS_OFF
+                outputs[EHS_LAT_AUX, t] = 0
+
+            update_no_cooling(outputs, t)
+            detailed_thermal_balance(inputs, outputs, p, t, rc)
+            last_balance_t = t
+
+        elif cooling_season and not heating_season:
+            ta_cs_set = inputs[IN_TA_CS_SET, t]
+            rc = calc_rc_model_temperatures(0.0, 0.0, inputs, outputs, p, t, t_1)
+            if rc[0]:
+                rc_temperatures_to_outputs(outputs, t, rc)
+                return ERROR_RC_TEMPERATURE_OUT_OF_BOUNDS, t, last_balance_t
+
+            cooling_system_active = not np.isnan(ta_cs_set) and not outputs[T_INT, t_1] <= p[P_T_SUP_AIR_MAX]
+            if p[P_HAS_COOLING_SYSTEM] == 0.0 or not cooling_system_active:
+                # no system = no loads
+                if not calc_zone_humidity_no_loads(inputs, outputs, p, t, t_1):
+                    return ERROR_NEGATIVE_MOISTURE, t, last_balance_t
+                rc_temperatures_to_outputs(outputs, t, rc)
+                update_no_cooling(outputs, t)
+                update_no_heating(outputs, t)
+                status[0, t] = STATUS_SYSTEM_OFF
+                status[1, t] = STATUS_SYSTEM_OFF
+                status[2, t] = STATUS_SYSTEM_OFF
+            else:
+                # ceiling or floor cooling
+                phi_c_act = 0.0
+                if rc[1] > ta_cs_set + 0.001:
+                    f_hc_cv = p[P_CONVECTION_CS]
+                    phi_hc_10 = 10.0 * p[P_AF]
+                    rc_10 = calc_rc_model_temperatures(f_hc_cv * phi_hc_10, (1 - f_hc_cv) * phi_hc_10, inputs,
+                                                       outputs, p, t, t_1)
+                    if rc_10[0]:
+                        rc_temperatures_to_outputs(outputs, t, rc_10)
+                        return ERROR_RC_TEMPERATURE_OUT_OF_BOUNDS, t, last_balance_t
+                    phi_hc_ul = phi_hc_10 * (ta_cs_set - rc[1]) / (rc_10[1] - rc[1])
+                    phi_c_max = -p[P_QCSMAX_WM2] * p[P_AF]
+                    if 0.0 > phi_hc_ul >= phi_c_max:
+                        phi_c_act = phi_hc_ul
+                    elif 0.0 > phi_hc_ul < phi_c_max:
+                        phi_c_act = phi_c_max
+                    else:
+                        return ERROR_COOLING_DEMAND, t, last_balance_t
+                    rc = calc_rc_model_temperatures(f_hc_cv * phi_c_act, (1 - f_hc_cv) * phi_c_act, inputs,
+                                                    outputs, p, t, t_1)
+                    if rc[0]:
+                        rc_temperatures_to_outputs(outputs, t, rc)
+                        return ERROR_RC_TEMPERATURE_OUT_OF_BOUNDS, t, last_balance_t
+
+                # a radiative system does not act on humidity
+                if not calc_zone_humidity_no_loads(inputs, outputs, p, t, t_1):
+                    return ERROR_NEGATIVE_MOISTURE, t, last_balance_t
+                outputs[QCS_SEN_RC, t] = phi_c_act
+                outputs[QCS_SEN_SCU, t] = phi_c_act
+                outputs[QCS_SEN_AHU, t] = 0.0
+                status[0, t] = STATUS_NO_SYSTEM
+                outputs[QCS_SEN_ARU, t] = 0.0
+                status[1, t] = STATUS_NO_SYSTEM
+                outputs[QCS_SEN_SYS, t] = phi_c_act
+                rc_temperatures_to_outputs(outputs, t, rc)
+                outputs[QCS_LAT_AHU, t] = 0.0
+                outputs[QCS_LAT_ARU, t] = 0.0
+                outputs[QCS_LAT_SYS, t] = 0.0
+                outputs[MA_SUP_CS_AHU, t] = 0.0
+                outputs[TA_SUP_CS_AHU, t] = np.nan
+                outputs[TA_RE_CS_AHU, t] = np.nan
+                outputs[MA_SUP_CS_ARU, t] = 0.0
+                outputs[TA_SUP_CS_ARU, t] = np.nan
+                outputs[TA_RE_CS_ARU, t] = np.nan
+                delta_theta_int_inc = p[P_DELTA_THETA_INT_INC_COOLING]
+                outputs[QCS_EM_LS, t] = calc_q_em_ls(phi_c_act, delta_theta_int_inc,
+                                                     outputs[T_INT, t] + delta_theta_int_inc,
+                                                     inputs[IN_T_EXT, t] + p[P_DELTA_THETA_E_SOL],
+                                                     -p[P_QCSMAX_WM2] * p[P_AF])
+                status[2, t] = STATUS_ON if phi_c_act < 0.0 else STATUS_OFF
+
+            update_no_heating(outputs, t)
+            detailed_thermal_balance(inputs, outputs, p, t, rc)
+            last_balance_t = t
+
+        else:
+            no_season[t] = True
+            rc = calc_rc_model_temperatures(0.0, 0.0, inputs, outputs, p, t, t_1)
+            if rc[0]:
+                rc_temperatures_to_outputs(outputs, t, rc)
+                return ERROR_RC_TEMPERATURE_OUT_OF_BOUNDS, t, last_balance_t
+            if not calc_zone_humidity_no_loads(inputs, outputs, p, t, t_1):
+                return ERROR_NEGATIVE_MOISTURE, t, last_balance_t
+            rc_temperatures_to_outputs(outputs, t, rc)
+            update_no_cooling(outputs, t)
+            update_no_heating(outputs, t)
+            status[0, t] = STATUS_SYSTEM_OFF
+            status[1, t] = STATUS_SYSTEM_OFF
+            status[2, t] = STATUS_SYSTEM_OFF
+
+    return OK, -1, last_balance_t
+
+
+@jit(nopython=True, cache=True)
+def hourly_procedure_kernel_batch(inputs, outputs, p, status, no_season, hours, errors):
+    """
+    Runs :py:func:`hourly_procedure_kernel` for a batch of buildings. All arguments carry a leading building axis,
+    the error code, hour of the error and last hour of the detailed thermal balance of each building are written to
+    the rows of ``errors``. An error in one building does not stop the simulation of the others.
+    """
+    for b in range(inputs.shape[0]):
+        error, error_t, last_balance_t = hourly_procedure_kernel(inputs[b], outputs[b], p[b], status[b], no_season[b],
+                                                                 hours[b])
+        errors[b, 0] = error
+        errors[b, 1] = error_t
+        errors[b, 2] = last_balance_t
@@ -1,5 +1,5 @@
 import os
-import random
+import zlib
 
 import numpy as np
 import pandas as pd
@@ -7,6 +7,7 @@ from geopandas import GeoDataFrame as Gdf
 
 from itertools import repeat
 
+import cea
 import cea.config
 import cea.inputlocator
 import cea.utilities.parallel
@@ -15,7 +16,7 @@ from cea.datamanagement.schedule_helper import read_cea_schedule
 from cea.datamanagement.data_migrator import is_3_22
 from cea.demand.building_properties import calc_useful_areas
 from cea.demand.constants import VARIABLE_CEA_SCHEDULE_RELATION
-from cea.utilities import epwreader
+from cea.utilities import epwreader, fingerprints
 from cea.utilities.date import get_date_range_hours_from_year
 from cea.utilities.dbf import dbf_to_dataframe
 
@@ -33,6 +34,7 @@ def schedule_maker_main(locator, config, building=None):
     # local variables
     buildings = config.schedule_maker.buildings
     schedule_model = config.schedule_maker.schedule_model
+    random_seed = config.schedule_maker.random_seed
 
     if schedule_model == 'deterministic':
         stochastic_schedule = False
@@ -40,6 +42,9 @@ def schedule_maker_main(locator, config, building=None):
         stochastic_schedule = True
     else:
         raise ValueError("Invalid schedule model: {schedule_model}".format(**locals()))
+    if random_seed is not None and random_seed < 0:
+        raise ValueError("Invalid random seed: {random_seed}, the random seed of the stochastic schedule model must "
+                         "be a non-negative integer".format(**locals()))
 
     if building is not None:
         buildings = [building]  # this is to run the tests
@@ -66,6 +71,24 @@ def schedule_maker_main(locator, config, building=None):
 
     # create date range for the calculation year
     date_range = get_date_range_hours_from_year(year)
+    # index of the hours of the year into the schedules, shared by all buildings
+    schedule_index = calc_yearly_schedule_index(date_range)
+
+    # SKIP BUILDINGS WITH UNCHANGED INPUTS
+    weather_fingerprint = fingerprints.calc_file_fingerprint(weather_path)
+    schedule_fingerprints = {b: fingerprints.calc_fingerprint(
+        cea.__version__, schedule_model, random_seed, weather_fingerprint,
+        fingerprints.calc_file_fingerprint(locator.get_building_weekly_schedules(b)),
+        internal_loads.loc[b], indoor_comfort.loc[b], prop_geometry.loc[b]) for b in buildings}
+    if config.schedule_maker.incremental:
+        unchanged = fingerprints.unchanged_buildings(locator.get_schedule_model_folder(), schedule_fingerprints)
+        unchanged = set(b for b in unchanged if os.path.exists(locator.get_schedule_model_file(b)))
+        if unchanged:
+            print('Inputs unchanged since the last run, skipping buildings=%s' % sorted(unchanged))
+        buildings = [b for b in buildings if b not in unchanged]
+    # forget the fingerprints of the buildings to calculate, an interrupted run must not leave new schedules of a
+    # building next to the fingerprint of its old inputs
+    fingerprints.remove_fingerprints(locator.get_schedule_model_folder(), buildings)
 
     # SCHEDULE MAKER
     n = len(buildings)
@@ -79,7 +102,11 @@ def schedule_maker_main(locator, config, building=None):
                                    [internal_loads.loc[b] for b in buildings],
                                    [indoor_comfort.loc[b] for b in buildings],
                                    [prop_geometry.loc[b] for b in buildings],
-                                   repeat(stochastic_schedule, n))
+                                   repeat(stochastic_schedule, n),
+                                   repeat(random_seed, n),
+                                   repeat(schedule_index, n))
+    fingerprints.write_fingerprints(locator.get_schedule_model_folder(),
+                                    {b: schedule_fingerprints[b] for b in buildings})
     return None
 
 
@@ -93,7 +120,9 @@ def calc_schedules(locator,
                    internal_loads_building,
                    indoor_comfort_building,
                    prop_geometry_building,
-                   stochastic_schedule):
+                   stochastic_schedule,
+                   random_seed=None,
+                   schedule_index=None):
     """
     Calculate the profile of occupancy, electricity demand and domestic hot water consumption from the input schedules.
     For variables that depend on the number of people (humidity gains, heat gains and ventilation demand), additional
@@ -115,11 +144,19 @@ def calc_schedules(locator,
     :param indoor_comfort_building: indoor comfort properties for the current building (from case study inputs)
     :param prop_geometry_building: building geometry (from case study inputs)
     :param stochastic_schedule: Boolean that defines whether the stochastic occupancy model should be used
+    :param random_seed: seed of the stochastic occupancy model (None for a non-reproducible schedule)
+    :type random_seed: int
+    :param schedule_index: index of the hours of ``date_range`` into the schedules (see
+        :py:func:`calc_yearly_schedule_index`), calculated if not given
+    :type schedule_index: dict[str, numpy.ndarray]
 
     .. [Page, J., et al., 2008] Page, J., et al. A generalised stochastic model for the simulation of occupant presence.
         Energy and Buildings, Vol. 40, No. 2, 2008, pp 83-98.
 
     """
+    if schedule_index is None:
+        schedule_index = calc_yearly_schedule_index(date_range)
+
     # read building schedules input data:
     schedule = read_cea_schedule(locator.get_building_weekly_schedules(building))
     daily_schedule_building = schedule[0]
@@ -131,13 +168,13 @@ def calc_schedules(locator,
     # SCHEDULE FOR PEOPLE OCCUPANCY
     array = daily_schedule_building[VARIABLE_CEA_SCHEDULE_RELATION['Occ_m2p']]
     if internal_loads_building['Occ_m2p'] > 0.0:
-        yearly_array = get_yearly_vectors(date_range, days_in_schedule, array, monthly_multiplier)
+        yearly_array = get_yearly_vectors(date_range, days_in_schedule, array, monthly_multiplier,
+                                          schedule_index=schedule_index)
         number_of_occupants = int(1 / internal_loads_building['Occ_m2p'] * prop_geometry_building['Aocc'])
         if stochastic_schedule:
-            # if the stochastic schedules are used, the stochastic schedule generator is called once for every occupant
-            final_schedule['Occ_m2p'] = np.zeros(HOURS_IN_YEAR)
-            for occupant in range(number_of_occupants):
-                final_schedule['Occ_m2p'] += calc_individual_occupant_schedule(yearly_array)
+            # if the stochastic schedules are used, the presence of all occupants is simulated at once
+            rng = get_random_generator(random_seed, building)
+            final_schedule['Occ_m2p'] = calc_occupant_schedules(yearly_array, number_of_occupants, rng).sum(axis=0)
         else:
             final_schedule['Occ_m2p'] = np.round(yearly_array * number_of_occupants)
     else:
@@ -159,7 +196,8 @@ def calc_schedules(locator,
                                               days_in_schedule,
                                               array,
                                               monthly_multiplier,
-                                              normalize_first_daily_profile=True)
+                                              normalize_first_daily_profile=True,
+                                              schedule_index=schedule_index)
             if stochastic_schedule:
                 # TODO: define how stochastic occupancy affects water schedules
                 # currently MULTI_RES water schedules include water consumption at times of zero occupancy
@@ -179,12 +217,13 @@ def calc_schedules(locator,
         # adjust the demand for appliances based on the number of occupants
         if stochastic_schedule:
             # get yearly array for occupant-related loads
-            yearly_array = get_yearly_vectors(date_range, days_in_schedule, occupant_load, monthly_multiplier)
+            yearly_array = get_yearly_vectors(date_range, days_in_schedule, occupant_load, monthly_multiplier,
+                                              schedule_index=schedule_index)
             # adjust the yearly array based on the number of occupants produced by the stochastic occupancy model
             deterministic_occupancy_array = np.round(
                 get_yearly_vectors(date_range, days_in_schedule,
                                    daily_schedule_building[VARIABLE_CEA_SCHEDULE_RELATION['Occ_m2p']],
-                                   monthly_multiplier) * 1 / internal_loads_building['Occ_m2p'] *
+                                   monthly_multiplier, schedule_index=schedule_index) * 1 / internal_loads_building['Occ_m2p'] *
                 prop_geometry_building['Aocc'])
             adjusted_array = yearly_array * final_schedule['Occ_m2p'] / deterministic_occupancy_array
             # nan values correspond to time steps where both occupant schedules are 0
@@ -200,7 +239,7 @@ def calc_schedules(locator,
                                        prop_geometry_building['Aef']
         else:
             yearly_array = get_yearly_vectors(date_range, days_in_schedule, occupant_load,
-                                              monthly_multiplier) + base_load
+                                              monthly_multiplier, schedule_index=schedule_index) + base_load
             final_schedule[variable] = yearly_array * internal_loads_building[variable] * \
                                        prop_geometry_building['Aef']
     else:
@@ -213,7 +252,8 @@ def calc_schedules(locator,
     base_load = np.min(array)
     occupant_load = array - base_load
     # this schedule is assumed to be independent of occupant presence
-    yearly_array = get_yearly_vectors(date_range, days_in_schedule, occupant_load, monthly_multiplier) + base_load
+    yearly_array = get_yearly_vectors(date_range, days_in_schedule, occupant_load, monthly_multiplier,
+                                      schedule_index=schedule_index) + base_load
     final_schedule[variable] = yearly_array * internal_loads_building[variable] * prop_geometry_building['Aef']
 
     # ELECTROMOVILITYSCHEDULE
@@ -223,7 +263,8 @@ def calc_schedules(locator,
     base_load = np.min(array)
     occupant_load = array - base_load
     # this schedule is assumed to be independent of occupant presence
-    yearly_array = get_yearly_vectors(date_range, days_in_schedule, occupant_load, monthly_multiplier) + base_load
+    yearly_array = get_yearly_vectors(date_range, days_in_schedule, occupant_load, monthly_multiplier,
+                                      schedule_index=schedule_index) + base_load
     final_schedule[variable] = yearly_array * internal_loads_building[variable] * 1000  # convert to Wh
 
     # DATACENTRE AND PROCESS ENERGY DEMAND SCHEDULES
@@ -231,7 +272,8 @@ def calc_schedules(locator,
         # these schedules are assumed to be independent of occupant presence and have no monthly variations
         array = daily_schedule_building[VARIABLE_CEA_SCHEDULE_RELATION[variable]]
         yearly_array = get_yearly_vectors(date_range, days_in_schedule, array,
-                                          monthly_multiplier=list(np.ones(MONTHS_IN_YEAR)))
+                                          monthly_multiplier=list(np.ones(MONTHS_IN_YEAR)),
+                                          schedule_index=schedule_index)
         final_schedule[variable] = yearly_array * internal_loads_building[variable] * prop_geometry_building['Aef']
 
     # SCHEDULE FOR HEATING/COOLING SET POINT TEMPERATURES
@@ -244,7 +286,8 @@ def calc_schedules(locator,
                                                                      indoor_comfort_building['Tcs_set_C'],
                                                                      indoor_comfort_building['Tcs_setb_C'])
         final_schedule[variable] = get_yearly_vectors(date_range, days_in_schedule, array,
-                                                      monthly_multiplier=list(np.ones(MONTHS_IN_YEAR)))
+                                                      monthly_multiplier=list(np.ones(MONTHS_IN_YEAR)),
+                                                      schedule_index=schedule_index)
 
     final_dict = {
         'DATE': date_range,
@@ -313,48 +356,79 @@ def convert_schedule_string_to_temperature(schedule_string, schedule_type, Ths_s
     return schedule_float
 
 
-def calc_individual_occupant_schedule(deterministic_schedule):
+def get_random_generator(random_seed, building):
+    """
+    Random number generator of the stochastic occupancy model of a building. With a seed, each building gets its own
+    reproducible stream (derived from the seed and the building name), independent of the order the buildings are
+    simulated in.
+
+    :param random_seed: seed of the stochastic occupancy model (None for a non-reproducible generator)
+    :type random_seed: int
+    :param str building: name of the building
+    :rtype: numpy.random.Generator
     """
-    Calculates the stochastic occupancy pattern for an individual based on Page et al. (2008). The so-called parameter
-    of mobility mu is assumed to be a uniformly-distributed random float between 0 and 0.5 based on the range of values
-    presented in the aforementioned paper.
+    if random_seed is None:
+        return np.random.default_rng()
+    return np.random.default_rng([random_seed, zlib.crc32(building.encode('utf-8'))])
+
+
+def calc_occupant_schedules(deterministic_schedule, number_of_occupants, rng):
+    """
+    Calculates the stochastic occupancy patterns of all occupants of a building based on the two-state Markov chain
+    model of Page et al. (2008). The so-called parameter of mobility mu of each occupant is a uniformly-distributed
+    random float between 0 and 0.5 based on the range of values presented in the aforementioned paper.
+
+    The occupants are simulated together: at each hour, the transition probabilities of all occupants are calculated
+    with :py:func:`calculate_transition_probabilities` and their next states are drawn at once.
 
     :param deterministic_schedule: deterministic schedule of occupancy provided in the user inputs
     :type deterministic_schedule: array(float)
+    :param number_of_occupants: number of occupants of the building
+    :type number_of_occupants: int
+    :param rng: random number generator (see :py:func:`get_random_generator`)
+    :type rng: numpy.random.Generator
 
-    :return pattern: yearly occupancy pattern for a given occupant in a given occupancy type
-    :rtype pattern: list[int]
+    :return patterns: yearly occupancy pattern (presence = 1, absence = 0) of each occupant
+    :rtype patterns: array(int8), shape (number_of_occupants, len(deterministic_schedule))
     """
+    deterministic_schedule = np.asarray(deterministic_schedule, dtype=float)
+    hours = len(deterministic_schedule)
+    patterns = np.zeros((number_of_occupants, hours), dtype=np.int8)
+    if number_of_occupants == 0:
+        return patterns
 
-    # get a random mobility parameter mu between 0 and 0.5
-    mu = random.uniform(0, 0.5)
+    # get a random mobility parameter mu between 0 and 0.5 for each occupant
+    mu = rng.uniform(0, 0.5, number_of_occupants)
 
-    # assign initial state by comparing a random number to the deterministic schedule's probability of occupant presence at t = 0
-    if random.random() <= deterministic_schedule[0]:
-        state = 1
-    else:
-        state = 0
-
-    # start list of occupancy states throughout the year
-    pattern = [state]
+    # assign initial states by comparing random numbers to the deterministic schedule's probability of presence at t = 0
+    state = rng.random(number_of_occupants) <= deterministic_schedule[0]
+    patterns[:, 0] = state
 
-    # calculate probability of presence for each hour of the year
-    for i in range(len(deterministic_schedule[:-1])):
-        # get probability of presence at t and t+1 from archetypal schedule
-        p_0 = deterministic_schedule[i]
-        p_1 = deterministic_schedule[i + 1]
+    for i in range(hours - 1):
         # calculate probability of transition from absence to presence (T01) and from presence to presence (T11)
-        T01, T11 = calculate_transition_probabilities(mu, p_0, p_1)
+        T01, T11 = calculate_transition_probabilities(mu, deterministic_schedule[i], deterministic_schedule[i + 1])
+        state = rng.random(number_of_occupants) < np.where(state, T11, T01)
+        patterns[:, i + 1] = state
+
+    return patterns
 
-        if state == 1:
-            next = get_random_presence(T11)
-        else:
-            next = get_random_presence(T01)
 
-        pattern.append(next)
-        state = next
+def calc_individual_occupant_schedule(deterministic_schedule, rng=None):
+    """
+    Calculates the stochastic occupancy pattern for an individual based on Page et al. (2008), see
+    :py:func:`calc_occupant_schedules`.
+
+    :param deterministic_schedule: deterministic schedule of occupancy provided in the user inputs
+    :type deterministic_schedule: array(float)
+    :param rng: random number generator (default: a new, non-reproducible generator)
+    :type rng: numpy.random.Generator
 
-    return np.array(pattern)
+    :return pattern: yearly occupancy pattern for a given occupant in a given occupancy type
+    :rtype pattern: array(int)
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    return calc_occupant_schedules(deterministic_schedule, 1, rng)[0].astype(int)
 
 
 def calculate_transition_probabilities(mu, P0, P1):
@@ -363,7 +437,7 @@ def calculate_transition_probabilities(mu, P0, P1):
     probability of arriving (T01) and the probability of staying in (T11) given the parameter of mobility mu, the
     probability of the present state (P0), and the probability of the next state t+1 (P1).
 
-    :param mu: parameter of mobility
+    :param mu: parameter of mobility (a float, or an array with the parameter of each occupant)
     :type mu: float
     :param P0: probability of presence at the current time step t
     :type P0: float
@@ -384,83 +458,47 @@ def calculate_transition_probabilities(mu, P0, P1):
     if P0 != 0:
         T11 = ((P0 - 1) / P0) * (m * P0 + P1) + P1 / P0
     else:
-        T11 = 0
+        T11 = 0 * m
 
     # For some instances of mu the probabilities are bigger than 1, so the min function is used in the return statement.
-    return min(1, T01), min(1, T11)
+    return np.minimum(1, T01), np.minimum(1, T11)
 
 
-def get_random_presence(p):
+def calc_yearly_schedule_index(date_range):
     """
-    Get the current occupant state (presence=1 or absence=0) at the current time step given a probability p.
-
-    :param p: A probability (e.g. T01, T11)
-    :type p: float
+    Index of the hours of the year into the daily schedules (day type and hour of the day) and the monthly multipliers.
+    It only depends on the ``date_range``, so it is calculated once per run and shared by all buildings and variables.
 
-    Returns the randomly-chosen state (0 or 1).
+    :param DatetimeIndex date_range: range of dates being considered
+    :return: arrays (of the length of ``date_range``) with the day type (0: weekday, 1: saturday, 2: sunday), the hour
+        of the day and the month (0-based) of each hour
+    :rtype: dict[str, numpy.ndarray]
     """
-
-    # Calculate probability of presence
-    P1 = int(p * 100)
-    # Calculate probability of absence
-    P0 = 100 - P1
-
-    # Create population of possible values and choose one value
-    weighted_choices = [(1, P1), (0, P0)]
-    population = [val for val, cnt in weighted_choices for i in range(cnt)]
-
-    return random.choice(population)
+    dayofweek = np.asarray(date_range.dayofweek)
+    day_type = np.where(dayofweek < 5, 0, np.where(dayofweek == 5, 1, 2))
+    return {'day_type': day_type, 'hour': np.asarray(date_range.hour), 'month': np.asarray(date_range.month) - 1}
 
 
 def get_yearly_vectors(date_range, days_in_schedule, schedule_array, monthly_multiplier,
-                       normalize_first_daily_profile=False):
+                       normalize_first_daily_profile=False, schedule_index=None):
     # transform into arrays
     # per weekday, saturday, sunday
-    array_per_day = schedule_array.reshape(3, int(len(schedule_array) / days_in_schedule))
-    array_week = array_per_day[0]
-    array_sat = array_per_day[1]
-    array_sun = array_per_day[2]
+    array_per_day = np.asarray(schedule_array).reshape(3, int(len(schedule_array) / days_in_schedule))
     if normalize_first_daily_profile:
         # for water consumption we need to normalize to the daily maximum
         # this is to account for typical units of water consumption in liters per person per day (lpd).
-
-        if array_week.sum() != 0.0:
-            norm_weekday_max = array_week.sum() ** -1
-        else:
-            norm_weekday_max = 0.0
-
-        if array_sat.sum() != 0.0:
-            norm_sat_max = array_sat.sum() ** -1
-        else:
-            norm_sat_max = 0.0
-
-        if array_sun.sum() != 0.0:
-            norm_sun_max = array_sun.sum() ** -1
-        else:
-            norm_sun_max = 0.0
+        daily_sum = array_per_day.sum(axis=1)
+        norm_max = np.zeros(3)
+        norm_max[daily_sum != 0.0] = daily_sum[daily_sum != 0.0] ** -1
     else:
-        norm_weekday_max = 1.0
-        norm_sat_max = 1.0
-        norm_sun_max = 1.0
-
-    yearly_array = [
-        calc_hourly_value(date, array_week, array_sat, array_sun, norm_weekday_max, norm_sat_max, norm_sun_max,
-                          monthly_multiplier) for date in date_range]
-
-    return np.array(yearly_array)
-
-
-def calc_hourly_value(date, array_week, array_sat, array_sun, norm_weekday_max, norm_sat_max, norm_sun_max,
-                      monthly_multiplier):
-    month_year = monthly_multiplier[date.month - 1]
-    hour_day = date.hour
-    dayofweek = date.dayofweek
-    if 0 <= dayofweek < 5:  # weekday
-        return array_week[hour_day] * month_year * norm_weekday_max  # normalized dhw demand flow rates
-    elif dayofweek == 5:  # saturday
-        return array_sat[hour_day] * month_year * norm_sat_max  # normalized dhw demand flow rates
-    else:  # sunday
-        return array_sun[hour_day] * month_year * norm_sun_max  # normalized dhw demand flow rates
+        norm_max = np.ones(3)
+
+    if schedule_index is None:
+        schedule_index = calc_yearly_schedule_index(date_range)
+    day_type = schedule_index['day_type']
+    month_year = np.asarray(monthly_multiplier, dtype=float)[schedule_index['month']]
+    # normalized dhw demand flow rates
+    return array_per_day[day_type, schedule_index['hour']] * month_year * norm_max[day_type]
 
 
 def main(config):
@@ -14,7 +14,7 @@ from cea.demand import demand_writers
 from cea.demand import hourly_procedure_heating_cooling_system_load, ventilation_air_flows_simple
 from cea.demand import latent_loads
 from cea.demand import sensible_loads, electrical_loads, hotwater_loads, refrigeration_loads, datacenter_loads
-from cea.demand import ventilation_air_flows_detailed, control_heating_cooling_systems
+from cea.demand import ventilation_air_flows_detailed, control_heating_cooling_systems, rc_model_kernel
 from cea.demand.building_properties import get_thermal_resistance_surface
 from cea.demand.latent_loads import convert_rh_to_moisture_content
 from cea.utilities import reporting
@@ -77,30 +77,8 @@ def calc_thermal_loads(building_name, bpr, weather_data, date_range, locator,
     # CALCULATE ELECTRICITY LOADS
     tsd = electrical_loads.calc_Eal_Epro(tsd, schedules)
 
-    # CALCULATE REFRIGERATION LOADS
-    if refrigeration_loads.has_refrigeration_load(bpr):
-        tsd = refrigeration_loads.calc_Qcre_sys(bpr, tsd, schedules)
-        tsd = refrigeration_loads.calc_Qref(locator, bpr, tsd)
-    else:
-        tsd['DC_cre'] = tsd['Qcre_sys'] = tsd['Qcre'] = np.zeros(HOURS_IN_YEAR)
-        tsd['mcpcre_sys'] = tsd['Tcre_sys_re'] = tsd['Tcre_sys_sup'] = np.zeros(HOURS_IN_YEAR)
-        tsd['E_cre'] = np.zeros(HOURS_IN_YEAR)
-
-    # CALCULATE PROCESS HEATING
-    tsd['Qhpro_sys'] = schedules['Qhpro_W']  # in Wh
-
-    # CALCULATE PROCESS COOLING
-    tsd['Qcpro_sys'] = schedules['Qcpro_W']  # in Wh
-
-    # CALCULATE DATA CENTER LOADS
-    if datacenter_loads.has_data_load(bpr):
-        tsd = datacenter_loads.calc_Edata(tsd, schedules)  # end-use electricity
-        tsd = datacenter_loads.calc_Qcdata_sys(bpr, tsd)  # system need for cooling
-        tsd = datacenter_loads.calc_Qcdataf(locator, bpr, tsd)  # final need for cooling
-    else:
-        tsd['DC_cdata'] = tsd['Qcdata_sys'] = tsd['Qcdata'] = np.zeros(HOURS_IN_YEAR)
-        tsd['mcpcdata_sys'] = tsd['Tcdata_sys_re'] = tsd['Tcdata_sys_sup'] = np.zeros(HOURS_IN_YEAR)
-        tsd['Edata'] = tsd['E_cdata'] = np.zeros(HOURS_IN_YEAR)
+    # CALCULATE REFRIGERATION, PROCESS AND DATA CENTER LOADS
+    tsd = calc_refrigeration_process_and_data_center_loads(bpr, tsd, schedules, locator)
 
     # CALCULATE SPACE CONDITIONING DEMANDS
     if np.isclose(bpr.rc_model['Af'], 0.0):  # if building does not have conditioned area
@@ -120,36 +98,91 @@ def calc_thermal_loads(building_name, bpr, weather_data, date_range, locator,
                               schedules)  # calculate the setpoints for every hour
         tsd = calc_Qhs_Qcs(bpr, tsd,
                            use_dynamic_infiltration_calculation, config)  # end-use demand latent and sensible + ventilation
-        tsd = sensible_loads.calc_Qhs_Qcs_loss(bpr, tsd)  # losses
-        tsd = sensible_loads.calc_Qhs_sys_Qcs_sys(tsd)  # system (incl. losses)
-        tsd = sensible_loads.calc_temperatures_emission_systems(bpr, tsd)  # calculate temperatures
-        tsd = electrical_loads.calc_Eve(tsd)  # calc auxiliary loads ventilation
-        tsd = electrical_loads.calc_Eaux_Qhs_Qcs(tsd, bpr)  # calc auxiliary loads heating and cooling
-        tsd = calc_Qcs_sys(bpr, tsd)  # final : including fuels and renewables
-        tsd = calc_Qhs_sys(bpr, tsd)  # final : including fuels and renewables
-
-        # Positive loads
-        tsd['Qcs_lat_sys'] = abs(tsd['Qcs_lat_sys'])
-        tsd['DC_cs'] = abs(tsd['DC_cs'])
-        tsd['Qcs_sys'] = abs(tsd['Qcs_sys'])
-        tsd['Qcre_sys'] = abs(tsd['Qcre_sys'])  # inverting sign of cooling loads for reporting and graphs
-        tsd['Qcdata_sys'] = abs(tsd['Qcdata_sys'])  # inverting sign of cooling loads for reporting and graphs
+        tsd = calc_space_conditioning_system_loads(bpr, tsd)
 
     # CALCULATE HOT WATER LOADS
     if hotwater_loads.has_hot_water_technical_system(bpr):
         tsd = electrical_loads.calc_Eaux_fw(tsd, bpr, schedules)
         tsd = hotwater_loads.calc_Qww(bpr, tsd, schedules)  # end-use
-        tsd = hotwater_loads.calc_Qww_sys(bpr, tsd)  # system (incl. losses)
-        tsd = electrical_loads.calc_Eaux_ww(tsd, bpr)  # calc auxiliary loads
-        tsd = hotwater_loads.calc_Qwwf(bpr, tsd)  # final
+        tsd = calc_hot_water_system_loads(bpr, tsd)
     else:
         tsd = electrical_loads.calc_Eaux_fw(tsd, bpr, schedules)
-        tsd['Qww'] = tsd['DH_ww'] = tsd['Qww_sys'] = np.zeros(HOURS_IN_YEAR)
-        tsd['mcpww_sys'] = tsd['Tww_sys_re'] = tsd['Tww_sys_sup'] = np.zeros(HOURS_IN_YEAR)
-        tsd['Eaux_ww'] = np.zeros(HOURS_IN_YEAR)
-        tsd['NG_ww'] = tsd['COAL_ww'] = tsd['OIL_ww'] = tsd['WOOD_ww'] = np.zeros(HOURS_IN_YEAR)
-        tsd['E_ww'] = np.zeros(HOURS_IN_YEAR)
+        tsd = calc_no_hot_water_loads(tsd)
 
+    # CALCULATE SUM OF HEATING AND COOLING LOADS AND ELECTRICITY LOADS PART 2/2
+    tsd = calc_final_loads(bpr, tsd)
+
+    # WRITE SOLAR RESULTS
+    write_results(bpr, building_name, date_range, loads_output, locator, massflows_output,
+                  resolution_outputs, temperatures_output, tsd, debug, config.demand.output_format)
+
+    return
+
+
+def calc_refrigeration_process_and_data_center_loads(bpr, tsd, schedules, locator):
+    # CALCULATE REFRIGERATION LOADS
+    if refrigeration_loads.has_refrigeration_load(bpr):
+        tsd = refrigeration_loads.calc_Qcre_sys(bpr, tsd, schedules)
+        tsd = refrigeration_loads.calc_Qref(locator, bpr, tsd)
+    else:
+        tsd['DC_cre'] = tsd['Qcre_sys'] = tsd['Qcre'] = np.zeros(HOURS_IN_YEAR)
+        tsd['mcpcre_sys'] = tsd['Tcre_sys_re'] = tsd['Tcre_sys_sup'] = np.zeros(HOURS_IN_YEAR)
+        tsd['E_cre'] = np.zeros(HOURS_IN_YEAR)
+
+    # CALCULATE PROCESS HEATING
+    tsd['Qhpro_sys'] = schedules['Qhpro_W']  # in Wh
+
+    # CALCULATE PROCESS COOLING
+    tsd['Qcpro_sys'] = schedules['Qcpro_W']  # in Wh
+
+    # CALCULATE DATA CENTER LOADS
+    if datacenter_loads.has_data_load(bpr):
+        tsd = datacenter_loads.calc_Edata(tsd, schedules)  # end-use electricity
+        tsd = datacenter_loads.calc_Qcdata_sys(bpr, tsd)  # system need for cooling
+        tsd = datacenter_loads.calc_Qcdataf(locator, bpr, tsd)  # final need for cooling
+    else:
+        tsd['DC_cdata'] = tsd['Qcdata_sys'] = tsd['Qcdata'] = np.zeros(HOURS_IN_YEAR)
+        tsd['mcpcdata_sys'] = tsd['Tcdata_sys_re'] = tsd['Tcdata_sys_sup'] = np.zeros(HOURS_IN_YEAR)
+        tsd['Edata'] = tsd['E_cdata'] = np.zeros(HOURS_IN_YEAR)
+
+    return tsd
+
+
+def calc_space_conditioning_system_loads(bpr, tsd):
+    tsd = sensible_loads.calc_Qhs_Qcs_loss(bpr, tsd)  # losses
+    tsd = sensible_loads.calc_Qhs_sys_Qcs_sys(tsd)  # system (incl. losses)
+    tsd = sensible_loads.calc_temperatures_emission_systems(bpr, tsd)  # calculate temperatures
+    tsd = electrical_loads.calc_Eve(tsd)  # calc auxiliary loads ventilation
+    tsd = electrical_loads.calc_Eaux_Qhs_Qcs(tsd, bpr)  # calc auxiliary loads heating and cooling
+    tsd = calc_Qcs_sys(bpr, tsd)  # final : including fuels and renewables
+    tsd = calc_Qhs_sys(bpr, tsd)  # final : including fuels and renewables
+
+    # Positive loads
+    tsd['Qcs_lat_sys'] = abs(tsd['Qcs_lat_sys'])
+    tsd['DC_cs'] = abs(tsd['DC_cs'])
+    tsd['Qcs_sys'] = abs(tsd['Qcs_sys'])
+    tsd['Qcre_sys'] = abs(tsd['Qcre_sys'])  # inverting sign of cooling loads for reporting and graphs
+    tsd['Qcdata_sys'] = abs(tsd['Qcdata_sys'])  # inverting sign of cooling loads for reporting and graphs
+    return tsd
+
+
+def calc_hot_water_system_loads(bpr, tsd):
+    tsd = hotwater_loads.calc_Qww_sys(bpr, tsd)  # system (incl. losses)
+    tsd = electrical_loads.calc_Eaux_ww(tsd, bpr)  # calc auxiliary loads
+    tsd = hotwater_loads.calc_Qwwf(bpr, tsd)  # final
+    return tsd
+
+
+def calc_no_hot_water_loads(tsd):
+    tsd['Qww'] = tsd['DH_ww'] = tsd['Qww_sys'] = np.zeros(HOURS_IN_YEAR)
+    tsd['mcpww_sys'] = tsd['Tww_sys_re'] = tsd['Tww_sys_sup'] = np.zeros(HOURS_IN_YEAR)
+    tsd['Eaux_ww'] = np.zeros(HOURS_IN_YEAR)
+    tsd['NG_ww'] = tsd['COAL_ww'] = tsd['OIL_ww'] = tsd['WOOD_ww'] = np.zeros(HOURS_IN_YEAR)
+    tsd['E_ww'] = np.zeros(HOURS_IN_YEAR)
+    return tsd
+
+
+def calc_final_loads(bpr, tsd):
     # CALCULATE SUM OF HEATING AND COOLING LOADS
     tsd = calc_QH_sys_QC_sys(tsd)  # aggregated cooling and heating loads
 
@@ -157,12 +190,7 @@ def calc_thermal_loads(building_name, bpr, weather_data, date_range, locator,
     tsd = electrical_loads.calc_Eaux(tsd)  # auxiliary totals
     tsd = electrical_loads.calc_E_sys(tsd)  # system (incl. losses)
     tsd = electrical_loads.calc_Ef(bpr, tsd)  # final (incl. self. generated)
-
-    # WRITE SOLAR RESULTS
-    write_results(bpr, building_name, date_range, loads_output, locator, massflows_output,
-                  resolution_outputs, temperatures_output, tsd, debug)
-
-    return
+    return tsd
 
 
 def calc_QH_sys_QC_sys(tsd):
@@ -173,11 +201,13 @@ def calc_QH_sys_QC_sys(tsd):
 
 
 def write_results(bpr, building_name, date, loads_output, locator, massflows_output,
-                  resolution_outputs, temperatures_output, tsd, debug):
+                  resolution_outputs, temperatures_output, tsd, debug, output_format='csv'):
     if resolution_outputs == 'hourly':
-        writer = demand_writers.HourlyDemandWriter(loads_output, massflows_output, temperatures_output)
+        writer = demand_writers.HourlyDemandWriter(loads_output, massflows_output, temperatures_output,
+                                                   output_format)
     elif resolution_outputs == 'monthly':
-        writer = demand_writers.MonthlyDemandWriter(loads_output, massflows_output, temperatures_output)
+        writer = demand_writers.MonthlyDemandWriter(loads_output, massflows_output, temperatures_output,
+                                                    output_format)
     else:
         raise Exception('error')
 
@@ -314,6 +344,11 @@ def calc_Qhs_Qcs(bpr, tsd, use_dynamic_infiltration_calculation, config):
     ventilation_air_flows_simple.calc_m_ve_required(tsd)
     ventilation_air_flows_simple.calc_m_ve_leakage_simple(bpr, tsd)
 
+    if config.demand.engine == 'compiled' \
+            and rc_model_kernel.can_run_kernel(bpr, use_dynamic_infiltration_calculation):
+        # end-use demand calculation of all hours in one compiled kernel
+        return rc_model_kernel.calc_heating_cooling_loads_all_hours(bpr, tsd, get_hours(bpr), config)
+
     # end-use demand calculation
     for t in get_hours(bpr):
 
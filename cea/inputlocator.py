@@ -542,8 +542,8 @@ class InputLocator(object):
         """Return the list of thermal storage tanks"""
         if not os.path.exists(self.get_database_conversion_systems()):
             return []
-        import pandas as pd
-        data = pd.read_excel(self.get_database_conversion_systems(), sheet_name="THERMAL_ENERGY_STORAGES")
+        from cea.utilities.database_cache import read_database
+        data = read_database(self.get_database_conversion_systems(), sheet_name="THERMAL_ENERGY_STORAGES")
         data = data[data["type"] == "COOLING"]
         names = sorted(data["code"])
         return names
@@ -1047,6 +1047,14 @@ class InputLocator(object):
         """scenario/outputs/data/solar-radiation"""
         return self._ensure_folder(self.scenario, 'outputs', 'data', 'solar-radiation')
 
+    def get_radiation_chunks_folder(self):
+        """scenario/outputs/data/solar-radiation/daysim-chunks (see cea.resources.radiation.daysim_scheduler)"""
+        return self._ensure_folder(self.get_solar_radiation_folder(), 'daysim-chunks')
+
+    def get_radiation_surrogate_folder(self):
+        """scenario/outputs/data/solar-radiation/surrogate-model (see cea.resources.radiation.simplified.surrogate)"""
+        return self._ensure_folder(self.get_solar_radiation_folder(), 'surrogate-model')
+
     def get_radiation_building(self, building):
         """scenario/outputs/data/solar-radiation/${building}_radiation.csv"""
         return os.path.join(self.get_solar_radiation_folder(), '%s_radiation.csv' % building)
@@ -1066,9 +1074,17 @@ class InputLocator(object):
     def solar_potential_folder(self):
         return self._ensure_folder(self.scenario, 'outputs', 'data', 'potentials', 'solar')
 
-    def PV_results(self, building):
-        """scenario/outputs/data/potentials/solar/{building}_PV.csv"""
-        return os.path.join(self.solar_potential_folder(), "{building}_PV.csv".format(building=building))
+    def get_sun_properties_folder(self):
+        """scenario/outputs/data/potentials/solar/sun-properties (see cea.utilities.sun_properties_cache)"""
+        return self._ensure_folder(self.solar_potential_folder(), 'sun-properties')
+
+    def PV_results(self, building, panel_type=None):
+        """scenario/outputs/data/potentials/solar/{building}_PV.csv (or {building}_PV_{panel_type}.csv for the types of
+        PV panels compared to solar:type-pvpanel)"""
+        if panel_type is None:
+            return os.path.join(self.solar_potential_folder(), "{building}_PV.csv".format(building=building))
+        return os.path.join(self.solar_potential_folder(),
+                            "{building}_PV_{panel_type}.csv".format(building=building, panel_type=panel_type))
 
     def PV_totals(self, panel_type):
         """scenario/outputs/data/potentials/solar/{building}_PV_{panel_type}_total.csv.csv"""
@@ -1125,8 +1141,12 @@ class InputLocator(object):
         """scenario/outputs/data/demand/Total_demand.csv"""
         return os.path.join(self.get_demand_results_folder(), 'Total_demand.%(format)s' % locals())
 
+    def get_demand_store_folder(self):
+        """scenario/outputs/data/demand/store (see cea.demand.demand_store)"""
+        return os.path.join(self.get_demand_results_folder(), 'store')
+
     def get_demand_results_file(self, building, format='csv'):
-        """scenario/outputs/data/demand/{building}.csv"""
+        """scenario/outputs/data/demand/{building}.{format} (format: csv, parquet or feather)"""
         return os.path.join(self.get_demand_results_folder(), '%(building)s.%(format)s' % locals())
 
     # EMISSIONS
@@ -0,0 +1,190 @@
+"""
+The hourly demand of all buildings of a scenario, loaded once per optimization run.
+
+Every individual of every generation needs the hourly demand of most buildings (electricity, fuels and the data center
+loads of the networks) and the operation of the decentralized supply systems of the buildings it leaves disconnected.
+Instead of reading the results file of each building again for every individual, the ``optimization`` script loads
+them once into a :py:class:`DemandMatrix`: one ``(buildings x hours)`` array per column. The DEAP worker pool receives
+it once through its initializer (see :py:func:`install_demand_matrix`) and the slave functions sum up the rows of the
+buildings they need (see :py:meth:`HourlyMatrix.sum`).
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from cea.constants import HOURS_IN_YEAR
+from cea.demand.demand_writers import read_demand_results
+
+__author__ = "Daren Thomas"
+__copyright__ = "Copyright 2024, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+# the columns of the demand results used by the optimization, the columns that are only ever used together are summed
+# up when loading
+DEMAND_COLUMNS = {
+    'Eal_kWh': ['Eal_kWh'],
+    'Edata_kWh': ['Edata_kWh'],
+    'Epro_kWh': ['Epro_kWh'],
+    'Eaux_kWh': ['Eaux_kWh'],
+    'E_cs_cre_kWh': ['E_cs_kWh', 'E_cre_kWh'],
+    'E_cdata_kWh': ['E_cdata_kWh'],
+    'E_hs_ww_kWh': ['E_hs_kWh', 'E_ww_kWh'],
+    'NG_hs_ww_kWh': ['NG_hs_kWh', 'NG_ww_kWh'],
+    'Qcdata_sys_kWh': ['Qcdata_sys_kWh'],
+    'mcpcdata_sys_kWperC': ['mcpcdata_sys_kWperC'],
+}
+
+# the columns of the operation of the decentralized supply systems (see cea.optimization.preprocessing)
+HEATING_ACTIVATION_COLUMNS = ['E_hs_ww_req_W', 'NG_BackupBoiler_req_W', 'NG_Boiler_req_W']
+COOLING_ACTIVATION_COLUMNS = ['E_cs_cre_cdata_req_W']
+
+_demand_matrix = None
+
+
+class HourlyMatrix(object):
+    """
+    Hourly values of a set of buildings, one ``(buildings x hours)`` array per column. The buildings with a column that
+    is zero all year have no row in its array.
+    """
+
+    def __init__(self, hourly_values):
+        """
+        :param hourly_values: the hourly values of each column, by building
+        :type hourly_values: dict[str, dict[str, np.ndarray]]
+        """
+        self.buildings = set(hourly_values)
+        columns = set(column for values in hourly_values.values() for column in values)
+        self._rows = {}
+        self._values = {}
+        for column in columns:
+            buildings = [building for building, values in hourly_values.items() if values[column].any()]
+            self._rows[column] = {building: row for row, building in enumerate(buildings)}
+            self._values[column] = (np.vstack([hourly_values[building][column] for building in buildings])
+                                    if buildings else np.zeros((0, HOURS_IN_YEAR)))
+
+    def sum(self, column, buildings):
+        """
+        The sum of the hourly values of ``buildings``.
+
+        :raises KeyError: if a building is not in the matrix
+        :rtype: np.ndarray
+        """
+        missing = [building for building in buildings if building not in self.buildings]
+        if missing:
+            raise KeyError("No hourly values of {column} for the buildings {buildings}".format(column=column,
+                                                                                              buildings=missing))
+        rows = self._rows[column]
+        selected = [rows[building] for building in buildings if building in rows]
+        if not selected:
+            return np.zeros(self._values[column].shape[1])
+        return self._values[column][selected].sum(axis=0)
+
+
+class DemandMatrix(object):
+    """
+    The hourly demand of all buildings and the results of the decentralized supply systems of a scenario.
+
+    :ivar str scenario: the scenario the results were loaded from
+    :ivar np.ndarray date: the ``DATE`` column of the demand results
+    :ivar HourlyMatrix demand: the `DEMAND_COLUMNS` of the buildings
+    :ivar HourlyMatrix heating_activation: the `HEATING_ACTIVATION_COLUMNS` of the buildings with a decentralized
+                                           heating system
+    :ivar HourlyMatrix cooling_activation: the `COOLING_ACTIVATION_COLUMNS` of the buildings with a decentralized
+                                           cooling system
+    :ivar pd.DataFrame best_heating_configurations: the best decentralized heating configuration, by building
+    :ivar pd.DataFrame best_cooling_configurations: the best decentralized cooling configuration, by building
+    """
+
+    def __init__(self, scenario, date, demand, heating_activation, cooling_activation, best_heating_configurations,
+                 best_cooling_configurations):
+        self.scenario = scenario
+        self.date = date
+        self.demand = demand
+        self.heating_activation = heating_activation
+        self.cooling_activation = cooling_activation
+        self.best_heating_configurations = best_heating_configurations
+        self.best_cooling_configurations = best_cooling_configurations
+
+    @classmethod
+    def load(cls, locator, building_names):
+        """
+        Read the demand results of ``building_names`` and the results of their decentralized supply systems (if the
+        preprocessing of the optimization already created them).
+
+        :type locator: cea.inputlocator.InputLocator
+        :param list[str] building_names: the buildings of the scenario
+        :rtype: DemandMatrix
+        """
+        raw_columns = sorted(set(column for columns in DEMAND_COLUMNS.values() for column in columns))
+        demand = {}
+        date = None
+        for building in building_names:
+            building_demand = read_demand_results(locator, building, columns=['DATE'] + raw_columns)
+            if date is None:
+                date = building_demand['DATE'].values
+            demand[building] = {column: sum(building_demand[raw_column].values for raw_column in columns)
+                                for column, columns in DEMAND_COLUMNS.items()}
+
+        heating_activation = {}
+        cooling_activation = {}
+        best_heating_configurations = []
+        best_cooling_configurations = []
+        for building in building_names:
+            path = locator.get_optimization_decentralized_folder_building_result_heating_activation(building)
+            if os.path.exists(path):
+                activation = pd.read_csv(path, usecols=HEATING_ACTIVATION_COLUMNS)
+                heating_activation[building] = {column: activation[column].values
+                                                for column in HEATING_ACTIVATION_COLUMNS}
+            path = locator.get_optimization_decentralized_folder_building_result_cooling_activation(building)
+            if os.path.exists(path):
+                activation = pd.read_csv(path, usecols=COOLING_ACTIVATION_COLUMNS)
+                cooling_activation[building] = {column: activation[column].values
+                                                for column in COOLING_ACTIVATION_COLUMNS}
+            path = locator.get_optimization_decentralized_folder_building_result_heating(building)
+            if os.path.exists(path):
+                best_heating_configurations.append(read_best_configuration(path, building))
+            path = locator.get_optimization_decentralized_folder_building_result_cooling(building)
+            if os.path.exists(path):
+                best_cooling_configurations.append(read_best_configuration(path, building))
+
+        return cls(locator.scenario, date, HourlyMatrix(demand), HourlyMatrix(heating_activation),
+                   HourlyMatrix(cooling_activation), pd.DataFrame(best_heating_configurations),
+                   pd.DataFrame(best_cooling_configurations))
+
+
+def read_best_configuration(path, building):
+    """The row of the best configuration in the results of a decentralized supply system, named after the building"""
+    configurations = pd.read_csv(path)
+    best_configuration = configurations[configurations["Best configuration"] == 1].iloc[0]
+    best_configuration.name = building
+    return best_configuration
+
+
+def install_demand_matrix(demand_matrix):
+    """
+    Make ``demand_matrix`` the demand matrix of this process (see :py:func:`get_demand_matrix`). Used as the
+    initializer of the worker pool of the optimization, so each worker receives the matrix once.
+    """
+    global _demand_matrix
+    _demand_matrix = demand_matrix
+
+
+def get_demand_matrix(locator):
+    """
+    The demand matrix installed for the scenario of ``locator``. Without one (e.g. when a slave function is used on its
+    own), the results of all buildings in ``Total_demand.csv`` are loaded and installed.
+
+    :type locator: cea.inputlocator.InputLocator
+    :rtype: DemandMatrix
+    """
+    if _demand_matrix is None or _demand_matrix.scenario != locator.scenario:
+        building_names = list(pd.read_csv(locator.get_total_demand(), usecols=['Name'])['Name'].values)
+        install_demand_matrix(DemandMatrix.load(locator, building_names))
+    return _demand_matrix
@@ -6,6 +6,7 @@ Network optimization
 
 
 import pandas as pd
+from cea.utilities.database_cache import read_database
 
 __author__ = "Sreepathi Bhargava Krishna"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -55,7 +56,7 @@ class NetworkOptimizationFeatures(object):
 
     def pipe_costs(self, locator, network_name, network_type):
         edges_file = pd.read_csv(locator.get_thermal_network_edge_list_file(network_type, network_name))
-        piping_cost_data = pd.read_excel(locator.get_database_distribution_systems(), sheet_name="THERMAL_GRID")
+        piping_cost_data = read_database(locator.get_database_distribution_systems(), sheet_name="THERMAL_GRID")
         merge_df = edges_file.merge(piping_cost_data, left_on='Pipe_DN', right_on='Pipe_DN')
         merge_df['Inv_USD2015'] = merge_df['Inv_USD2015perm'] * merge_df['length_m']
         pipe_costs = merge_df['Inv_USD2015'].sum()
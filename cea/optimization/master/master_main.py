@@ -13,7 +13,9 @@ from deap import tools, base
 
 from cea.optimization.constants import DH_CONVERSION_TECHNOLOGIES_SHARE, DC_CONVERSION_TECHNOLOGIES_SHARE, DH_ACRONYM, \
     DC_ACRONYM
+from cea.optimization.demand_matrix import DemandMatrix, install_demand_matrix
 from cea.optimization.master import evaluation
+from cea.optimization.master import network_summary_cache
 from cea.optimization.master.crossover import crossover_main
 from cea.optimization.master.data_saver import save_results
 from cea.optimization.master.generation import generate_main
@@ -208,6 +210,16 @@ def calc_dictionary_of_all_individuals_tested(dictionary_individuals, gen, inval
     return dictionary_individuals
 
 
+def initialize_worker(demand_matrix, network_summary_statistics, network_inputs_fingerprints):
+    """
+    Install the demand matrix, and the counters and the fingerprints of the inputs of the network summary cache in a
+    worker of the optimization
+    """
+    install_demand_matrix(demand_matrix)
+    network_summary_cache.install_statistics(network_summary_statistics)
+    network_summary_cache.install_inputs_fingerprints(network_inputs_fingerprints)
+
+
 def non_dominated_sorting_genetic_algorithm(locator,
                                             building_names_all,
                                             district_heating_network,
@@ -324,9 +336,25 @@ def non_dominated_sorting_genetic_algorithm(locator,
     toolbox.register("select",
                      tools.selNSGA3WithMemory(ref_points))
 
+    # load the hourly demand of all buildings once, the workers receive it when they start
+    demand_matrix = DemandMatrix.load(locator, building_names_all)
+    install_demand_matrix(demand_matrix)
+    network_summary_statistics = network_summary_cache.create_statistics()
+    # the inputs of the networks do not change during the run, so their fingerprints are calculated once
+    connectable_buildings = {}
+    if district_heating_network:
+        connectable_buildings['DH'] = building_names_heating
+    if district_cooling_network:
+        connectable_buildings['DC'] = building_names_cooling
+    network_inputs_fingerprints = network_summary_cache.calc_network_inputs_fingerprints(
+        locator, connectable_buildings, weather_features.ground_temp)
+    network_summary_cache.install_inputs_fingerprints(network_inputs_fingerprints)
+
     # configure multiprocessing
     if config.multiprocessing:
-        pool = multiprocessing.Pool(processes=multiprocessing.cpu_count())
+        pool = multiprocessing.Pool(processes=multiprocessing.cpu_count(),
+                                    initializer=initialize_worker,
+                                    initargs=(demand_matrix, network_summary_statistics, network_inputs_fingerprints))
         toolbox.register("map", pool.map)
 
     # Initialize statistics object
@@ -390,6 +418,7 @@ def non_dominated_sorting_genetic_algorithm(locator,
     record_individuals_tested = calc_dictionary_of_all_individuals_tested(record_individuals_tested, gen=0,
                                                                           invalid_ind=invalid_ind)
     print(logbook.stream)
+    network_summary_cache.report_statistics()
 
     # Begin the generational process
     # Initialization of variables
@@ -445,6 +474,7 @@ def non_dominated_sorting_genetic_algorithm(locator,
         difference_generational_distances.append(performance_metrics[1])
         logbook.record(gen=gen, evals=len(invalid_ind), **record)
         print(logbook.stream)
+        network_summary_cache.report_statistics()
 
         DHN_network_list_tested = []
         DCN_network_list_tested = []
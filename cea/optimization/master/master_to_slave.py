@@ -3,13 +3,12 @@ Evaluation function of an individual
 
 """
 
-import os
-
 import pandas as pd
 
 from cea.optimization import slave_data
 from cea.optimization.constants import DH_CONVERSION_TECHNOLOGIES_SHARE, DC_CONVERSION_TECHNOLOGIES_SHARE, \
     Q_MARGIN_FOR_NETWORK
+from cea.optimization.master import network_summary_cache
 from cea.optimization.master import summarize_network
 from cea.technologies import substation
 
@@ -170,7 +169,8 @@ def thermal_networks_in_individual(locator,
     connected buildings as specified by DHN_barcode/DHN_barcode.
     If the thermal network properties for this combination of buildings have not previously been calculated, this
     function calls the substation_main and network_main functions to calculate these properties and saves them for
-    future individuals with the same combination of thermally connected buildings.
+    future individuals with the same combination of thermally connected buildings (see
+    :py:mod:`cea.optimization.master.network_summary_cache`).
 
     :return: Thermal network operation properties (mass flow rate, heating/cooling energy provided, supply & return
              temperatures,  network losses) for each hour of the year.
@@ -182,7 +182,7 @@ def thermal_networks_in_individual(locator,
 
     # EVALUATE CASES TO CREATE A NETWORK OR NOT
     if district_heating_network:  # network exists
-        if not os.path.exists(locator.get_optimization_network_results_summary('DH', DHN_barcode)):
+        def calc_DH_network_summary():
             total_demand = createTotalNtwCsv(DHN_barcode, locator, column_names_buildings_heating)
             num_total_buildings = len(column_names_buildings_heating)
             buildings_in_heating_network = total_demand.Name.values
@@ -191,19 +191,23 @@ def thermal_networks_in_individual(locator,
                                                total_demand,
                                                buildings_in_heating_network,
                                                DHN_barcode=DHN_barcode)
-            DH_network_summary_individual = summarize_network.network_main(locator,
-                                                                           buildings_in_heating_network,
-                                                                           ground_temp,
-                                                                           num_total_buildings,
-                                                                           "DH", DHN_barcode)
-        else:
-            DH_network_summary_individual = pd.read_csv(
-                locator.get_optimization_network_results_summary('DH', DHN_barcode))
+            return summarize_network.network_main(locator,
+                                                  buildings_in_heating_network,
+                                                  ground_temp,
+                                                  num_total_buildings,
+                                                  "DH", DHN_barcode)
+
+        inputs_fingerprint = network_summary_cache.get_network_inputs_fingerprint(locator, 'DH',
+                                                                                  column_names_buildings_heating,
+                                                                                  ground_temp)
+        DH_network_summary_individual = network_summary_cache.get_network_summary(locator, 'DH', DHN_barcode,
+                                                                                  inputs_fingerprint,
+                                                                                  calc_DH_network_summary)
     else:
         DH_network_summary_individual = None
 
     if district_cooling_network:  # network exists
-        if not os.path.exists(locator.get_optimization_network_results_summary('DC', DCN_barcode)):
+        def calc_DC_network_summary():
             total_demand = createTotalNtwCsv(DCN_barcode, locator, column_names_buildings_cooling)
             num_total_buildings = len(column_names_buildings_cooling)
             buildings_in_cooling_network = total_demand.Name.values
@@ -211,13 +215,17 @@ def thermal_networks_in_individual(locator,
             # Run the substation and distribution routines
             substation.substation_main_cooling(locator, total_demand, buildings_in_cooling_network,
                                                DCN_barcode=DCN_barcode)
-            DC_network_summary_individual = summarize_network.network_main(locator, buildings_in_cooling_network,
-                                                                           ground_temp,
-                                                                           num_total_buildings,
-                                                                           'DC', DCN_barcode)
-        else:
-            DC_network_summary_individual = pd.read_csv(
-                locator.get_optimization_network_results_summary('DC', DCN_barcode))
+            return summarize_network.network_main(locator, buildings_in_cooling_network,
+                                                  ground_temp,
+                                                  num_total_buildings,
+                                                  'DC', DCN_barcode)
+
+        inputs_fingerprint = network_summary_cache.get_network_inputs_fingerprint(locator, 'DC',
+                                                                                  column_names_buildings_cooling,
+                                                                                  ground_temp)
+        DC_network_summary_individual = network_summary_cache.get_network_summary(locator, 'DC', DCN_barcode,
+                                                                                  inputs_fingerprint,
+                                                                                  calc_DC_network_summary)
     else:
         DC_network_summary_individual = None
 
@@ -0,0 +1,261 @@
+"""
+Cache of the network summaries of the optimization (see :py:func:`cea.optimization.master.summarize_network.network_main`),
+keyed by the barcode of the connected buildings and a fingerprint of the inputs of the networks.
+
+Many individuals share the barcode of their networks, so the summary of a barcode is calculated once and then read from
+an in-memory LRU cache (per process) or from the summary file written by the process that calculated it. A fingerprint
+file next to the summary marks it as complete and records the inputs it was calculated with. The workers of the
+optimization evaluating the same barcode at the same time take turns through a lock file: the first one calculates the
+summary, the others wait and read its results.
+
+The inputs of the networks do not change during a run of the optimization, so their fingerprints are calculated once
+by the master and installed in its workers (see :py:func:`install_inputs_fingerprints`).
+
+The number of summaries taken from each tier is counted in an array shared by the workers of the optimization (see
+:py:func:`create_statistics`) and reported after every generation.
+"""
+
+import collections
+import contextlib
+import multiprocessing
+import os
+import socket
+import tempfile
+import time
+
+import pandas as pd
+import psutil
+
+from cea.utilities.fingerprints import calc_fingerprint, calc_file_fingerprint
+
+__author__ = "Daren Thomas"
+__copyright__ = "Copyright 2024, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+# number of network summaries kept in memory by each process
+NETWORK_SUMMARY_CACHE_SIZE = 64
+
+# seconds between two attempts to take the lock of a network summary
+LOCK_POLL_INTERVAL = 0.1
+
+# lock files of other hosts older than this (seconds) were left behind by a worker that was killed
+STALE_LOCK_TIMEOUT = 3600
+
+# the counters of the statistics, in the order of the shared array
+STATISTICS = ['misses', 'memory_hits', 'disk_hits', 'in_flight_hits']
+
+_summaries = collections.OrderedDict()
+_statistics = None
+_inputs_fingerprints = {}
+
+
+def calc_network_inputs_fingerprint(locator, network_type, building_names, ground_temp):
+    """
+    The fingerprint of the inputs of the networks of one type: the buildings that can be connected, the ground
+    temperature, the total demand of the buildings (which changes with their hourly demand) and the edges of the
+    network.
+
+    :type locator: cea.inputlocator.InputLocator
+    :param str network_type: 'DH' or 'DC'
+    :param list[str] building_names: the buildings that can be connected to the network, in the order of the barcode
+    :param ground_temp: the hourly ground temperature [K]
+    :rtype: str
+    """
+    return calc_fingerprint(network_type, list(building_names), ground_temp,
+                            calc_file_fingerprint(locator.get_total_demand()),
+                            calc_file_fingerprint(locator.get_thermal_network_edge_list_file(network_type)))
+
+
+def calc_network_inputs_fingerprints(locator, building_names, ground_temp):
+    """
+    The fingerprints of the inputs of the networks of each type, to install in the workers of the optimization with
+    :py:func:`install_inputs_fingerprints`.
+
+    :type locator: cea.inputlocator.InputLocator
+    :param building_names: the buildings that can be connected to the networks of each type ('DH' or 'DC')
+    :type building_names: dict[str, list[str]]
+    :param ground_temp: the hourly ground temperature [K]
+    :rtype: dict
+    """
+    return {(locator.scenario, network_type, tuple(names)): calc_network_inputs_fingerprint(locator, network_type,
+                                                                                           names, ground_temp)
+            for network_type, names in building_names.items()}
+
+
+def install_inputs_fingerprints(inputs_fingerprints):
+    """Use the fingerprints of ``inputs_fingerprints`` (see :py:func:`calc_network_inputs_fingerprints`) in this
+    process"""
+    global _inputs_fingerprints
+    _inputs_fingerprints = dict(inputs_fingerprints)
+
+
+def get_network_inputs_fingerprint(locator, network_type, building_names, ground_temp):
+    """
+    The fingerprint of the inputs of the networks of one type installed in this process (see
+    :py:func:`install_inputs_fingerprints`). Without one (e.g. when the slave functions are used on their own), it is
+    calculated once and kept for the next individuals.
+
+    :type locator: cea.inputlocator.InputLocator
+    :param str network_type: 'DH' or 'DC'
+    :param list[str] building_names: the buildings that can be connected to the network, in the order of the barcode
+    :param ground_temp: the hourly ground temperature [K]
+    :rtype: str
+    """
+    key = (locator.scenario, network_type, tuple(building_names))
+    if key not in _inputs_fingerprints:
+        _inputs_fingerprints[key] = calc_network_inputs_fingerprint(locator, network_type, building_names, ground_temp)
+    return _inputs_fingerprints[key]
+
+
+def get_network_summary(locator, network_type, barcode, inputs_fingerprint, calc_network_summary):
+    """
+    Return the summary of the network of ``barcode``, calculating it with ``calc_network_summary`` only if neither this
+    process nor another one calculated it for the same inputs before.
+
+    :type locator: cea.inputlocator.InputLocator
+    :param str network_type: 'DH' or 'DC'
+    :param str barcode: the barcode of the buildings connected to the network
+    :param str inputs_fingerprint: the fingerprint of the inputs (see :py:func:`calc_network_inputs_fingerprint`)
+    :param calc_network_summary: function without arguments returning the summary and writing it to
+                                 ``locator.get_optimization_network_results_summary(network_type, barcode)``
+    :rtype: pd.DataFrame
+    """
+    key = (locator.scenario, network_type, barcode, inputs_fingerprint)
+    if key in _summaries:
+        _summaries.move_to_end(key)
+        count('memory_hits')
+        return _summaries[key]
+
+    summary_file = locator.get_optimization_network_results_summary(network_type, barcode)
+    network_summary = read_network_summary(summary_file, inputs_fingerprint)
+    if network_summary is not None:
+        count('disk_hits')
+    else:
+        with network_summary_lock(summary_file):
+            # another worker may have calculated it while this one was waiting for the lock
+            network_summary = read_network_summary(summary_file, inputs_fingerprint)
+            if network_summary is not None:
+                count('in_flight_hits')
+            else:
+                network_summary = calc_network_summary()
+                write_fingerprint_file(summary_file, inputs_fingerprint)
+                count('misses')
+
+    _summaries[key] = network_summary
+    while len(_summaries) > NETWORK_SUMMARY_CACHE_SIZE:
+        _summaries.popitem(last=False)
+    return network_summary
+
+
+def read_network_summary(summary_file, inputs_fingerprint):
+    """The summary in ``summary_file``, or None if it is missing, incomplete or calculated with other inputs"""
+    fingerprint_file = get_fingerprint_file(summary_file)
+    if not os.path.exists(fingerprint_file) or not os.path.exists(summary_file):
+        return None
+    with open(fingerprint_file, 'r') as f:
+        if f.read().strip() != inputs_fingerprint:
+            return None
+    return pd.read_csv(summary_file)
+
+
+def write_fingerprint_file(summary_file, inputs_fingerprint):
+    """Mark ``summary_file`` as complete, for the inputs with ``inputs_fingerprint``"""
+    folder = os.path.dirname(summary_file)
+    # write to a temporary file first, so other workers never read a partial fingerprint
+    fd, temporary_file = tempfile.mkstemp(dir=folder, suffix='.fingerprint')
+    with os.fdopen(fd, 'w') as f:
+        f.write(inputs_fingerprint)
+    os.replace(temporary_file, get_fingerprint_file(summary_file))
+
+
+def get_fingerprint_file(summary_file):
+    return os.path.splitext(summary_file)[0] + '.fingerprint'
+
+
+@contextlib.contextmanager
+def network_summary_lock(summary_file):
+    """
+    Hold the lock of ``summary_file`` (a lock file next to it) while calculating it. Works across processes and on all
+    platforms, a lock file left behind by a killed worker is removed (see :py:func:`is_stale_lock`).
+    """
+    lock_file = os.path.splitext(summary_file)[0] + '.lock'
+    while True:
+        try:
+            fd = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if is_stale_lock(lock_file):
+                    print('Removing stale lock file {lock_file}'.format(lock_file=lock_file))
+                    os.remove(lock_file)
+                    continue
+            except OSError:
+                # released in the meantime
+                continue
+            time.sleep(LOCK_POLL_INTERVAL)
+    try:
+        os.write(fd, '{host} {pid}'.format(host=socket.gethostname(), pid=os.getpid()).encode())
+        os.close(fd)
+        yield
+    finally:
+        os.remove(lock_file)
+
+
+def is_stale_lock(lock_file):
+    """
+    A lock file is stale if the worker that wrote it (its host and process id) is no longer running. The processes of
+    other hosts (e.g. sharing the scenario over a network drive) cannot be checked, their lock files are stale after
+    `STALE_LOCK_TIMEOUT`, as are lock files whose owner has not been written yet.
+    """
+    with open(lock_file, 'r') as f:
+        owner = f.read().split()
+    if len(owner) == 2 and owner[0] == socket.gethostname() and owner[1].isdigit():
+        return not psutil.pid_exists(int(owner[1]))
+    return time.time() - os.path.getmtime(lock_file) > STALE_LOCK_TIMEOUT
+
+
+def create_statistics():
+    """
+    Create the counters of the cache, shared with the worker processes through :py:func:`install_statistics`, and
+    install them in this process.
+
+    :rtype: multiprocessing.Array
+    """
+    statistics = multiprocessing.Array('l', len(STATISTICS))
+    install_statistics(statistics)
+    return statistics
+
+
+def install_statistics(statistics):
+    """Count the use of the cache in this process in ``statistics`` (see :py:func:`create_statistics`)"""
+    global _statistics
+    _statistics = statistics
+
+
+def count(counter):
+    if _statistics is None:
+        return
+    with _statistics.get_lock():
+        _statistics[STATISTICS.index(counter)] += 1
+
+
+def report_statistics():
+    """
+    Print the use of the cache since the last report and reset the counters.
+
+    :return: the value of each counter
+    :rtype: dict[str, int]
+    """
+    if _statistics is None:
+        return {}
+    with _statistics.get_lock():
+        statistics = dict(zip(STATISTICS, _statistics[:]))
+        _statistics[:] = [0] * len(STATISTICS)
+    print("Network summaries: {misses} calculated, {memory_hits} from memory, {disk_hits} from disk, "
+          "{in_flight_hits} calculated by another worker".format(**statistics))
+    return statistics
@@ -27,10 +27,12 @@ import cea.technologies.solar.solar_collector as stc
 import cea.technologies.thermal_storage as thermal_storage
 from cea.optimization.constants import N_PVT, ACH_TYPE_DOUBLE, N_SC_ET, N_SC_FP
 from cea.optimization.constants import VCC_CODE_CENTRALIZED
+from cea.optimization.demand_matrix import get_demand_matrix
 from cea.optimization.master.emissions_model import calc_emissions_Whyr_to_tonCO2yr
 from cea.technologies.pumps import calc_Cinv_pump
 from cea.technologies.supply_systems_database import SupplySystemsDatabase
 from cea.analysis.costs.equations import calc_capex_annualized
+from cea.utilities.database_cache import read_database
 
 __author__ = "Tim Vollrath"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -201,7 +203,7 @@ def calc_substations_costs_heating(building_names, district_network_barcode, loc
 
             subsArray = np.array(df)
             Q_max_W = np.amax(subsArray[:, 0] + subsArray[:, 1])
-            HEX_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="HEAT_EXCHANGERS")
+            HEX_cost_data = read_database(locator.get_database_conversion_systems(), sheet_name="HEAT_EXCHANGERS")
             HEX_cost_data = HEX_cost_data[HEX_cost_data['code'] == 'HEX1']
             # if the Q_design is below the lowest capacity available for the technology, then it is replaced by the least
             # capacity for the corresponding technology from the database
@@ -502,7 +504,7 @@ def calc_substations_costs_cooling(building_names, master_to_slave_vars, distric
 
             subsArray = np.array(df)
             Q_max_W = np.amax(subsArray)
-            HEX_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="HEAT_EXCHANGERS")
+            HEX_cost_data = read_database(locator.get_database_conversion_systems(), sheet_name="HEAT_EXCHANGERS")
             HEX_cost_data = HEX_cost_data[HEX_cost_data['code'] == 'HEX1']
             # if the Q_design is below the lowest capacity available for the technology, then it is replaced by the least
             # capacity for the corresponding technology from the database
@@ -1139,25 +1141,23 @@ def calc_objective_functions_decentralized_DC(DCN_barcode, buildings_names_with_
     capacity_installed_df = pd.DataFrame()
     for (index, building_name) in zip(DCN_barcode, buildings_names_with_cooling_load):
         if index == "0":  # choose the best decentralized configuration
-            df = pd.read_csv(locator.get_optimization_decentralized_folder_building_result_cooling(building_name,
-                                                                                                   configuration='AHU_ARU_SCU'))
-            dfBest = df[df["Best configuration"] == 1]
-            GHG_sys_building_scale_tonCO2yr += dfBest["GHG_tonCO2"].iloc[0]  # [ton CO2]
-            Capex_total_sys_building_scale_USD += dfBest["Capex_total_USD"].iloc[0]
-            Capex_a_sys_building_scale_USD += dfBest["Capex_a_USD"].iloc[0]
-            Opex_var_sys_disconnected += dfBest["Opex_var_USD"].iloc[0]
-            Opex_fixed_sys_building_scale_USD += dfBest["Opex_fixed_USD"].iloc[0]
-            Qh_sys_release_Wh += dfBest["Qh_sys_release_Wh"].iloc[0]
-            NG_sys_req_Wh += dfBest["NG_sys_req_Wh"].iloc[0]
-            E_sys_req_Wh += dfBest["E_sys_req_Wh"].iloc[0]
+            dfBest = get_demand_matrix(locator).best_cooling_configurations.loc[building_name]
+            GHG_sys_building_scale_tonCO2yr += dfBest["GHG_tonCO2"]  # [ton CO2]
+            Capex_total_sys_building_scale_USD += dfBest["Capex_total_USD"]
+            Capex_a_sys_building_scale_USD += dfBest["Capex_a_USD"]
+            Opex_var_sys_disconnected += dfBest["Opex_var_USD"]
+            Opex_fixed_sys_building_scale_USD += dfBest["Opex_fixed_USD"]
+            Qh_sys_release_Wh += dfBest["Qh_sys_release_Wh"]
+            NG_sys_req_Wh += dfBest["NG_sys_req_Wh"]
+            E_sys_req_Wh += dfBest["E_sys_req_Wh"]
 
             data = pd.DataFrame({'Name': building_name,
-                                 'Capacity_DX_AS_cool_building_scale_W': dfBest["Capacity_DX_AS_W"].iloc[0],
-                                 'Capacity_BaseVCC_AS_cool_building_scale_W': dfBest["Capacity_BaseVCC_AS_W"].iloc[0],
-                                 'Capacity_VCCHT_AS_cool_building_scale_W': dfBest["Capacity_VCCHT_AS_W"].iloc[0],
-                                 'Capacity_ACH_SC_FP_cool_building_scale_W': dfBest["Capacity_ACH_SC_FP_W"].iloc[0],
-                                 'Capaticy_ACH_SC_ET_cool_building_scale_W': dfBest["Capaticy_ACH_SC_ET_W"].iloc[0],
-                                 'Capacity_ACHHT_FP_cool_building_scale_W': dfBest["Capacity_ACHHT_FP_W"].iloc[0]},
+                                 'Capacity_DX_AS_cool_building_scale_W': dfBest["Capacity_DX_AS_W"],
+                                 'Capacity_BaseVCC_AS_cool_building_scale_W': dfBest["Capacity_BaseVCC_AS_W"],
+                                 'Capacity_VCCHT_AS_cool_building_scale_W': dfBest["Capacity_VCCHT_AS_W"],
+                                 'Capacity_ACH_SC_FP_cool_building_scale_W': dfBest["Capacity_ACH_SC_FP_W"],
+                                 'Capaticy_ACH_SC_ET_cool_building_scale_W': dfBest["Capaticy_ACH_SC_ET_W"],
+                                 'Capacity_ACHHT_FP_cool_building_scale_W': dfBest["Capacity_ACHHT_FP_W"]},
                                 index=[0])
             capacity_installed_df = pd.concat([capacity_installed_df, data], ignore_index=True)
 
@@ -1182,20 +1182,18 @@ def calc_costs_emissions_decentralized_DH(DHN_barcode, buildings_names_with_heat
     capacity_installed_df = pd.DataFrame()
     for (index, building_name) in zip(DHN_barcode, buildings_names_with_heating_load):
         if index == "0":
-            df = pd.read_csv(locator.get_optimization_decentralized_folder_building_result_heating(building_name))
-            dfBest = df[df["Best configuration"] == 1]
-            CostDiscBuild += dfBest["TAC_USD"].iloc[0]  # [USD]
-            GHG_sys_building_scale_tonCO2yr += dfBest["GHG_tonCO2"].iloc[0]  # [ton CO2]
-            Capex_total_sys_building_scale_USD += dfBest["Capex_total_USD"].iloc[0]
-            Capex_a_sys_building_scale_USD += dfBest["Capex_a_USD"].iloc[0]
-            Opex_var_sys_disconnected += dfBest["Opex_var_USD"].iloc[0]
-            Opex_fixed_sys_building_scale_USD += dfBest["Opex_fixed_USD"].iloc[0]
+            dfBest = get_demand_matrix(locator).best_heating_configurations.loc[building_name]
+            CostDiscBuild += dfBest["TAC_USD"]  # [USD]
+            GHG_sys_building_scale_tonCO2yr += dfBest["GHG_tonCO2"]  # [ton CO2]
+            Capex_total_sys_building_scale_USD += dfBest["Capex_total_USD"]
+            Capex_a_sys_building_scale_USD += dfBest["Capex_a_USD"]
+            Opex_var_sys_disconnected += dfBest["Opex_var_USD"]
+            Opex_fixed_sys_building_scale_USD += dfBest["Opex_fixed_USD"]
 
             data = pd.DataFrame({'Name': building_name,
-                                 'Capacity_BaseBoiler_NG_heat_building_scale_W': dfBest["Capacity_BaseBoiler_NG_W"].iloc[
-                                     0],
-                                 'Capacity_FC_NG_heat_building_scale_W': dfBest["Capacity_FC_NG_W"].iloc[0],
-                                 'Capacity_GS_HP_heat_building_scale_W': dfBest["Capacity_GS_HP_W"].iloc[0]}, index=[0])
+                                 'Capacity_BaseBoiler_NG_heat_building_scale_W': dfBest["Capacity_BaseBoiler_NG_W"],
+                                 'Capacity_FC_NG_heat_building_scale_W': dfBest["Capacity_FC_NG_W"],
+                                 'Capacity_GS_HP_heat_building_scale_W': dfBest["Capacity_GS_HP_W"]}, index=[0])
             capacity_installed_df = pd.concat([capacity_installed_df, data], ignore_index=True)
 
     return GHG_sys_building_scale_tonCO2yr, \
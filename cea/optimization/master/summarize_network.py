@@ -15,6 +15,7 @@ import pandas as pd
 from cea.optimization.constants import K_DH, ZERO_DEGREES_CELSIUS_IN_KELVIN
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
 from cea.constants import HOURS_IN_YEAR
+from cea.optimization.demand_matrix import get_demand_matrix
 import warnings
 warnings.filterwarnings("ignore")
 
@@ -51,18 +52,20 @@ def network_main(locator, buildings_in_this_network, ground_temp, num_tot_buildi
     # local variables
     t0 = time.perf_counter()
     num_buildings_network = len(buildings_in_this_network)
-    date = pd.read_csv(locator.get_demand_results_file(buildings_in_this_network[0])).DATE.values
+    demand_matrix = get_demand_matrix(locator)
+    date = demand_matrix.date
 
     # CALCULATE RELATIVE LENGTH OF THIS NETWORK
     data_network = pd.read_csv(locator.get_thermal_network_edge_list_file(network_type))
     pipes_tot_length = data_network['length_m'].sum() * 2  # this considers return and supply
     ntwk_length = pipes_tot_length * num_buildings_network / num_tot_buildings
 
+    # demand of the servers
+    Qcdata_netw_total_kWh = demand_matrix.demand.sum('Qcdata_sys_kWh', buildings_in_this_network)
+    mcpdata_netw_total_kWperC = demand_matrix.demand.sum('mcpcdata_sys_kWperC', buildings_in_this_network)
+
     # empty vectors
-    demand_df = []
     substation_df = []
-    Qcdata_netw_total_kWh = np.zeros(HOURS_IN_YEAR)
-    mcpdata_netw_total_kWperC = np.zeros(HOURS_IN_YEAR)
     mdot_heat_netw_all_kgpers = np.zeros(HOURS_IN_YEAR)
     mdot_cool_space_cooling_and_refrigeration_netw_all_kgpers = np.zeros(HOURS_IN_YEAR)
     mdot_cool_space_cooling_data_center_and_refrigeration_netw_all_kgpers = np.zeros(HOURS_IN_YEAR)
@@ -80,7 +83,6 @@ def network_main(locator, buildings_in_this_network, ground_temp, num_tot_buildi
     if network_type == "DH":
         iteration = 0
         for building_name in buildings_in_this_network:
-            demand_df.append(pd.read_csv(locator.get_demand_results_file(building_name)))
             substation_df.append(pd.read_csv(locator.get_optimization_substations_results_file(building_name, network_type, key)))
             mdot_heat_netw_all_kgpers += substation_df[iteration].mdot_DH_result_kgpers.values
 
@@ -90,9 +92,6 @@ def network_main(locator, buildings_in_this_network, ground_temp, num_tot_buildi
             sum_tret_mdot_heat += substation_df[iteration].T_return_DH_result_K.values * substation_df[
                 iteration].mdot_DH_result_kgpers.values
 
-            Qcdata_netw_total_kWh += demand_df[iteration].Qcdata_sys_kWh.values
-            mcpdata_netw_total_kWperC += demand_df[iteration].mcpcdata_sys_kWperC.values
-
             # evaluate minimum flows
             mdot_heat_netw_min_kgpers = np.vectorize(calc_min_flow)(mdot_heat_netw_min_kgpers,
                                                                     substation_df[iteration].mdot_DH_result_kgpers.values)
@@ -142,14 +141,9 @@ def network_main(locator, buildings_in_this_network, ground_temp, num_tot_buildi
     if network_type == "DC":
         iteration = 0
         for building_name in buildings_in_this_network:
-            #get demand and substation file of buildings in this network
-            demand_df = pd.read_csv(locator.get_demand_results_file(building_name))
+            #get substation file of buildings in this network
             substation_df = pd.read_csv(locator.get_optimization_substations_results_file(building_name, network_type, key))
 
-            #add to demand of servers
-            Qcdata_netw_total_kWh += demand_df['Qcdata_sys_kWh'].values
-            mcpdata_netw_total_kWperC += demand_df['mcpcdata_sys_kWperC'].values
-
             mdot_cool_space_cooling_and_refrigeration_netw_all_kgpers += substation_df['mdot_space_cooling_and_refrigeration_result_kgpers'].values
             mdot_cool_space_cooling_data_center_and_refrigeration_netw_all_kgpers += substation_df['mdot_space_cooling_data_center_and_refrigeration_result_kgpers'].values
 
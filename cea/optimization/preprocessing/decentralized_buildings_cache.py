@@ -0,0 +1,111 @@
+"""
+Reuse the results of the decentralized supply system configurations of a building (see
+:py:mod:`cea.optimization.preprocessing.decentralized_buildings_heating` and
+:py:mod:`cea.optimization.preprocessing.decentralized_buildings_cooling`) when the optimization is run again.
+
+The results of a building are only recalculated if its inputs changed since they were written: its demand results, its
+row of the total demand file, the conversion systems database, the weather file, the prices and emission factors, and
+the inputs specific to the heating or cooling configurations. The fingerprints are stored in the ``fingerprints.json``
+file of the decentralized folder (see :py:mod:`cea.utilities.fingerprints`), keyed by the name of the result file of
+the building, so the heating and cooling results of a building are tracked separately.
+"""
+
+import os
+
+import cea
+from cea.demand.demand_writers import calc_demand_results_fingerprint
+from cea.utilities.fingerprints import (calc_fingerprint, calc_file_fingerprint, unchanged_buildings,
+                                        remove_fingerprints, write_fingerprints)
+
+__author__ = "Daren Thomas"
+__copyright__ = "Copyright 2024, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+
+def calc_decentralized_fingerprints(locator, building_names, total_demand, prices, lca, building_inputs):
+    """
+    Calculate the fingerprint of the inputs of the decentralized supply system configurations of each building.
+
+    :param locator: the input locator
+    :type locator: cea.inputlocator.InputLocator
+    :param list[str] building_names: the buildings to calculate
+    :param pd.DataFrame total_demand: the total demand of all buildings
+    :param prices: the prices of the energy carriers
+    :type prices: cea.optimization.prices.Prices
+    :param lca: the emission factors of the energy carriers
+    :type lca: cea.optimization.lca_calculations.LcaCalculations
+    :param building_inputs: returns the other inputs of a building (e.g. the results of its solar collectors), called
+        with the name of the building
+    :return: the fingerprint of each building
+    :rtype: dict[str, str]
+    """
+    common_inputs = calc_fingerprint(cea.__version__,
+                                     calc_file_fingerprint(locator.get_database_conversion_systems()),
+                                     calc_file_fingerprint(locator.get_weather_file()),
+                                     prices, lca)
+    total_demand = total_demand.set_index('Name')
+    return {building: calc_fingerprint(common_inputs,
+                                       calc_demand_results_fingerprint(locator, building),
+                                       total_demand.loc[building],
+                                       building_inputs(building))
+            for building in building_names}
+
+
+def get_changed_buildings(locator, fingerprints, get_result_files, incremental=True):
+    """
+    Return the buildings whose results need to be (re)calculated: their results are missing or their inputs changed.
+    The stored fingerprints of these buildings are removed, so an interrupted run does not leave stale results marked
+    as up to date.
+
+    :param locator: the input locator
+    :type locator: cea.inputlocator.InputLocator
+    :param fingerprints: the current fingerprint of each building (see :py:func:`calc_decentralized_fingerprints`)
+    :type fingerprints: dict[str, str]
+    :param get_result_files: returns the paths of the result files of a building, called with the locator and the name
+        of the building
+    :param bool incremental: if False, all buildings are recalculated
+    :rtype: list[str]
+    """
+    folder = locator.get_optimization_decentralized_folder()
+    keys = {building: get_fingerprint_key(get_result_files(locator, building)) for building in fingerprints}
+    if incremental:
+        unchanged_keys = set(unchanged_buildings(folder, {keys[b]: fingerprints[b] for b in fingerprints}))
+        unchanged = set(b for b in fingerprints if keys[b] in unchanged_keys
+                        and all(os.path.exists(path) for path in get_result_files(locator, b)))
+    else:
+        unchanged = set()
+    changed = [building for building in fingerprints if building not in unchanged]
+    if unchanged:
+        print('Inputs unchanged since the last run, skipping {n} buildings: {buildings}'.format(
+            n=len(unchanged), buildings=', '.join(sorted(unchanged))))
+    remove_fingerprints(folder, [keys[building] for building in changed])
+    return changed
+
+
+def store_fingerprints(locator, fingerprints, get_result_files, building_names):
+    """
+    Store the fingerprints of the buildings whose results were written.
+
+    :param locator: the input locator
+    :type locator: cea.inputlocator.InputLocator
+    :param fingerprints: the current fingerprint of each building (see :py:func:`calc_decentralized_fingerprints`)
+    :type fingerprints: dict[str, str]
+    :param get_result_files: returns the paths of the result files of a building, called with the locator and the name
+        of the building
+    :param list[str] building_names: the buildings whose results were written
+    """
+    if not building_names:
+        return
+    write_fingerprints(locator.get_optimization_decentralized_folder(),
+                       {get_fingerprint_key(get_result_files(locator, building)): fingerprints[building]
+                        for building in building_names})
+
+
+def get_fingerprint_key(result_files):
+    """The results of a building are stored under the name of its (first) result file"""
+    return os.path.basename(result_files[0])
@@ -20,6 +20,8 @@ import cea.technologies.substation as substation
 import cea.utilities.parallel
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
 from cea.optimization.constants import GHP_A, GHP_HMAX_SIZE
+from cea.optimization.preprocessing.decentralized_buildings_cache import (calc_decentralized_fingerprints,
+                                                                           get_changed_buildings, store_fingerprints)
 from cea.resources.geothermal import calc_ground_temperature
 from cea.utilities import dbf
 from cea.utilities import epwreader
@@ -40,6 +42,7 @@ def disconnected_buildings_heating_main(locator, total_demand, building_names, c
     :rtype: Nonetype
     """
     t0 = time.perf_counter()
+    building_names = list(building_names)
     prop_geometry = Gdf.from_file(locator.get_zone_geometry())
     geometry = pd.DataFrame({'Name': prop_geometry.Name, 'Area': prop_geometry.area})
     geothermal_potential_data = dbf.dbf_to_dataframe(locator.get_building_supply())
@@ -52,22 +55,36 @@ def disconnected_buildings_heating_main(locator, total_demand, building_names, c
     T_ground_K = calc_ground_temperature(weather_data['drybulb_C'], depth_m=10)
     supply_systems = SupplySystemsDatabase(locator)
 
-    # This will calculate the substation state if all buildings where connected(this is how we study this)
-    substation.substation_main_heating(locator, total_demand, building_names)
-
-    n = len(building_names)
-    cea.utilities.parallel.vectorize(disconnected_heating_for_building, config.get_number_of_processes())(
-        building_names,
-        repeat(supply_systems, n),
-        repeat(T_ground_K, n),
-        repeat(geothermal_potential_data, n),
-        repeat(lca, n),
-        repeat(locator, n),
-        repeat(prices, n))
+    # only simulate the buildings whose inputs changed since their results were written
+    geothermal_potential = geothermal_potential_data.set_index('Name')
+    fingerprints = calc_decentralized_fingerprints(locator, building_names, total_demand, prices, lca,
+                                                   lambda building: geothermal_potential.loc[building, 'Area_geo'])
+    building_names = get_changed_buildings(locator, fingerprints, get_result_files, config.decentralized.incremental)
+
+    if building_names:
+        # This will calculate the substation state if all buildings where connected(this is how we study this)
+        substation.substation_main_heating(locator, total_demand, building_names)
+
+        n = len(building_names)
+        cea.utilities.parallel.vectorize(disconnected_heating_for_building, config.get_number_of_processes())(
+            building_names,
+            repeat(supply_systems, n),
+            repeat(T_ground_K, n),
+            repeat(geothermal_potential_data, n),
+            repeat(lca, n),
+            repeat(locator, n),
+            repeat(prices, n))
+        store_fingerprints(locator, fingerprints, get_result_files, building_names)
 
     print(time.perf_counter() - t0, "seconds process time for the Disconnected Building Routine \n")
 
 
+def get_result_files(locator, building_name):
+    """The performance of the supply system configurations of a building and the activation of the best one"""
+    return [locator.get_optimization_decentralized_folder_building_result_heating(building_name),
+            locator.get_optimization_decentralized_folder_building_result_heating_activation(building_name)]
+
+
 def disconnected_heating_for_building(building_name, supply_systems, T_ground_K, geothermal_potential_data, lca,
                                       locator, prices):
     print('{building_name} disconnected heating supply system simulations...'.format(building_name=building_name))
@@ -77,9 +94,9 @@ def disconnected_heating_for_building(building_name, supply_systems, T_ground_K,
 
     # run substation model to derive temperatures of the building
     substation_results = pd.read_csv(locator.get_optimization_substations_results_file(building_name, "DH", ""))
-    q_load_Wh = np.vectorize(calc_new_load)(substation_results["mdot_DH_result_kgpers"],
-                                            substation_results["T_supply_DH_result_K"],
-                                            substation_results["T_return_DH_result_K"])
+    q_load_Wh = calc_new_load(substation_results["mdot_DH_result_kgpers"].values,
+                              substation_results["T_supply_DH_result_K"].values,
+                              substation_results["T_return_DH_result_K"].values)
     Qnom_W = q_load_Wh.max()
     # Create empty matrices
     Opex_a_var_USD = np.zeros((13, 7))
@@ -105,7 +122,7 @@ def disconnected_heating_for_building(building_name, supply_systems, T_ground_K,
     ## Start Hourly calculation
     Tret_K = np.where(Tret_K > 0.0, Tret_K, Tsup_K)
     ## 0: Boiler NG
-    BoilerEff = np.vectorize(Boiler.calc_Cop_boiler)(q_load_Wh, Qnom_W, Tret_K)
+    BoilerEff = Boiler.calc_Cop_boiler_array(q_load_Wh, Qnom_W, Tret_K)
     Qgas_to_Boiler_Wh = np.divide(q_load_Wh, BoilerEff, out=np.zeros_like(q_load_Wh), where=BoilerEff != 0.0)
     Boiler_Status = np.where(Qgas_to_Boiler_Wh > 0.0, 1, 0)
     # add costs
@@ -128,7 +145,7 @@ def disconnected_heating_for_building(building_name, supply_systems, T_ground_K,
                            'BG_Boiler_req_W': Qgas_to_Boiler_Wh,
                            'E_hs_ww_req_W': np.zeros(len(q_load_Wh))}
     ## 2: Fuel Cell
-    (FC_Effel, FC_Effth) = np.vectorize(FC.calc_eta_FC)(q_load_Wh, Qnom_W, 1, "B")
+    (FC_Effel, FC_Effth) = FC.calc_eta_FC_array(q_load_Wh, Qnom_W)
     Qgas_to_FC_Wh = q_load_Wh / (FC_Effth + FC_Effel)  # FIXME: should be q_load_Wh/FC_Effth?
     el_from_FC_Wh = Qgas_to_FC_Wh * FC_Effel
     FC_Status = np.where(Qgas_to_FC_Wh > 0.0, 1, 0)
@@ -149,17 +166,18 @@ def disconnected_heating_for_building(building_name, supply_systems, T_ground_K,
                            'E_Fuelcell_gen_export_W': el_from_FC_Wh,
                            'E_hs_ww_req_W': np.zeros(len(q_load_Wh))}
     # 3-13: Boiler NG + GHP
+    # GHP operation of all the configurations at once, one row per nominal size of the GHP
+    QnomGHP_W = (Qnom_W - np.arange(10) / 10.0 * Qnom_W)[:, None]
+    with np.errstate(divide='ignore'):
+        Texit_GHP_nom_K = QnomGHP_W / (mdot_kgpers * HEAT_CAPACITY_OF_WATER_JPERKGK) + Tret_K
+    GHP_operation = list(zip(*calc_GHP_operation(QnomGHP_W, T_ground_K, Texit_GHP_nom_K, Tret_K, Tsup_K, mdot_kgpers,
+                                                 q_load_Wh)))
     for i in range(10):
-        # set nominal size for Boiler and GHP
+        # set nominal size for Boiler
         QnomBoiler_W = i / 10.0 * Qnom_W
-        QnomGHP_W = Qnom_W - QnomBoiler_W
 
         # GHP operation
-        Texit_GHP_nom_K = QnomGHP_W / (mdot_kgpers * HEAT_CAPACITY_OF_WATER_JPERKGK) + Tret_K
-        el_GHP_Wh, q_load_NG_Boiler_Wh, \
-        qhot_missing_Wh, \
-        Texit_GHP_K, q_from_GHP_Wh = np.vectorize(calc_GHP_operation)(QnomGHP_W, T_ground_K, Texit_GHP_nom_K,
-                                                                      Tret_K, Tsup_K, mdot_kgpers, q_load_Wh)
+        el_GHP_Wh, q_load_NG_Boiler_Wh, qhot_missing_Wh, Texit_GHP_K, q_from_GHP_Wh = GHP_operation[i]
         GHP_el_size_W[i][0] = max(el_GHP_Wh)
         GHP_Status = np.where(q_from_GHP_Wh > 0.0, 1, 0)
 
@@ -167,7 +185,7 @@ def disconnected_heating_for_building(building_name, supply_systems, T_ground_K,
         if max(qhot_missing_Wh) > 0.0:
             print("GHP unable to cover the whole demand, boiler activated!")
             Qnom_GHP_Backup_Boiler_W = max(qhot_missing_Wh)
-            BoilerEff = np.vectorize(Boiler.calc_Cop_boiler)(qhot_missing_Wh, Qnom_GHP_Backup_Boiler_W, Texit_GHP_K)
+            BoilerEff = Boiler.calc_Cop_boiler_array(qhot_missing_Wh, Qnom_GHP_Backup_Boiler_W, Texit_GHP_K)
             Qgas_to_GHPBoiler_Wh = np.divide(qhot_missing_Wh, BoilerEff,
                                              out=np.zeros_like(qhot_missing_Wh), where=BoilerEff != 0.0)
         else:
@@ -177,7 +195,7 @@ def disconnected_heating_for_building(building_name, supply_systems, T_ground_K,
         GHPbackupBoiler_Status = np.where(qhot_missing_Wh > 0.0, 1, 0)
 
         # NG Boiler operation
-        BoilerEff = np.vectorize(Boiler.calc_Cop_boiler)(q_load_NG_Boiler_Wh, QnomBoiler_W, Texit_GHP_K)
+        BoilerEff = Boiler.calc_Cop_boiler_array(q_load_NG_Boiler_Wh, QnomBoiler_W, Texit_GHP_K)
         Qgas_to_Boiler_Wh = np.divide(q_load_NG_Boiler_Wh, BoilerEff,
                                       out=np.zeros_like(q_load_NG_Boiler_Wh), where=BoilerEff != 0.0)
         Boiler_Status = np.where(q_load_NG_Boiler_Wh > 0.0, 1, 0)
@@ -357,19 +375,20 @@ def get_unique_keys_from_dicts(heating_dispatch):
 
 
 def calc_GHP_operation(QnomGHP_W, T_ground_K, Texit_GHP_nom_K, Tret_K, Tsup_K, mdot_kgpers, q_load_Wh):
-    if q_load_Wh <= QnomGHP_W:
-        q_load_NG_Boiler_Wh = 0.0
-        (el_GHP_Wh, qcolddot_Wh, qhot_missing_Wh, tsup2_K) = HP.calc_Cop_GHP(T_ground_K,
-                                                                             mdot_kgpers,
-                                                                             Tsup_K, Tret_K)
-        q_from_GHP_Wh = q_load_Wh - qhot_missing_Wh
+    """
+    Operation of a GHP of nominal size ``QnomGHP_W``, the load above its nominal size is left to a boiler. The
+    arguments are hourly arrays, ``QnomGHP_W`` and ``Texit_GHP_nom_K`` can have one row per nominal size of the GHP
+    to calculate the operation of several sizes at once.
 
-    else:
-        (el_GHP_Wh, qcolddot_Wh, qhot_missing_Wh, tsup2_K) = HP.calc_Cop_GHP(T_ground_K,
-                                                                             mdot_kgpers,
-                                                                             Texit_GHP_nom_K, Tret_K)
-        q_from_GHP_Wh = QnomGHP_W - qhot_missing_Wh
-        q_load_NG_Boiler_Wh = q_load_Wh - QnomGHP_W
+    :return: el_GHP_Wh, q_load_NG_Boiler_Wh, qhot_missing_Wh, tsup2_K, q_from_GHP_Wh (one row per nominal size)
+    :rtype: tuple[np.ndarray]
+    """
+    above_nominal = ~(q_load_Wh <= QnomGHP_W)
+    T_GHP_sup_K = np.where(above_nominal, Texit_GHP_nom_K, Tsup_K)
+    (el_GHP_Wh, qcolddot_Wh, qhot_missing_Wh, tsup2_K) = HP.calc_Cop_GHP_array(T_ground_K, mdot_kgpers, T_GHP_sup_K,
+                                                                               Tret_K)
+    q_from_GHP_Wh = np.where(above_nominal, QnomGHP_W, q_load_Wh) - qhot_missing_Wh
+    q_load_NG_Boiler_Wh = np.where(above_nominal, q_load_Wh - QnomGHP_W, 0.0)
 
     return el_GHP_Wh, q_load_NG_Boiler_Wh, qhot_missing_Wh, tsup2_K, q_from_GHP_Wh
 
@@ -380,13 +399,11 @@ def calc_new_load(mdot_kgpers, Tsup_K, Tret_K):
     :param mdot_kgpers: mass flow
     :param Tsup_K: supply temperature
     :param Tret_K: return temperature
-    :type mdot_kgpers: float
-    :type Tsup_K: float
-    :type Tret_K: float
+    :type mdot_kgpers: np.ndarray
+    :type Tsup_K: np.ndarray
+    :type Tret_K: np.ndarray
     :return: Qload_W: load of the distribution
-    :rtype: float
+    :rtype: np.ndarray
     """
     Qload_W = mdot_kgpers * HEAT_CAPACITY_OF_WATER_JPERKGK * (Tsup_K - Tret_K)
-    if Qload_W < 0:
-        Qload_W = 0
-    return Qload_W
+    return np.maximum(Qload_W, 0.0)
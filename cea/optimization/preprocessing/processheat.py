@@ -9,10 +9,11 @@ It is considered that whenever the case, the most competitive alternative is to
 
 
 
-import pandas as pd
 from cea.technologies import boiler
 from cea.technologies.constants import BOILER_ETA_HP
 from cea.constants import HOURS_IN_YEAR, WH_TO_J
+from cea.demand.demand_writers import read_demand_results
+from cea.utilities.database_cache import read_database
 
 
 def calc_pareto_Qhp(locator, total_demand, prices, lca):
@@ -30,14 +31,14 @@ def calc_pareto_Qhp(locator, total_demand, prices, lca):
     hpCO2 = 0
     hpPrim = 0
 
-    boiler_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="BOILERS")
+    boiler_cost_data = read_database(locator.get_database_conversion_systems(), sheet_name="BOILERS")
 
     if total_demand["Qhpro_sys_MWhyr"].sum()>0:
         df = total_demand[total_demand.Qhpro_sys_MWhyr != 0]
 
         for name in df.Name :
             # Extract process heat needs
-            Qhpro_sys_kWh = pd.read_csv(locator.get_demand_results_file(name), usecols=["Qhpro_sys_kWh"]).Qhpro_sys_kWh.values
+            Qhpro_sys_kWh = read_demand_results(locator, name, columns=["Qhpro_sys_kWh"]).Qhpro_sys_kWh.values
 
             Qnom_Wh = 0
             Qannual_Wh = 0
@@ -17,6 +17,7 @@ from cea.technologies.chiller_vapor_compression import VaporCompressionChiller
 from cea.technologies.cogeneration import calc_cop_CCGT
 from cea.technologies.chiller_absorption import AbsorptionChiller
 from cea.technologies.supply_systems_database import SupplySystemsDatabase
+from cea.utilities.database_cache import read_database
 
 __author__ = "Sreepathi Bhargava Krishna"
 __copyright__ = "Copyright 2021, Architecture and Building Systems - ETH Zurich"
@@ -131,7 +132,7 @@ def district_cooling_network(locator,
         T_ground_K = weather_features.ground_temp
         daily_storage = Storage_tank_PCM(activation=master_to_slave_variables.Storage_cooling_on,
                                          size_Wh=master_to_slave_variables.Storage_cooling_size_W,
-                                         database_model_parameters= pd.read_excel(locator.get_database_conversion_systems(),
+                                         database_model_parameters= read_database(locator.get_database_conversion_systems(),
                                                                                   sheet_name="THERMAL_ENERGY_STORAGES"),
                                          T_ambient_K = np.average(T_ground_K),
                                          type_storage = config.optimization.cold_storage_type,
@@ -156,64 +157,59 @@ def district_cooling_network(locator,
 
         # get properties of technology used in this script
         absorption_chiller = AbsorptionChiller(
-            pd.read_excel(locator.get_database_conversion_systems(), sheet_name="ABSORPTION_CHILLERS"), 'double')
+            read_database(locator.get_database_conversion_systems(), sheet_name="ABSORPTION_CHILLERS"), 'double')
         CCGT_prop = calc_cop_CCGT(master_to_slave_variables.NG_Trigen_ACH_size_W, ACH_T_IN_FROM_CHP_K, "NG")
         VC_chiller = VaporCompressionChiller(locator, scale='DISTRICT')
 
-        for hour in range(HOURS_IN_YEAR):  # cooling supply for all buildings excluding cooling loads from data centers
-            daily_storage.hour = hour
-            if master_to_slave_variables.debug is True:
-                print("\nHour {:.0f}".format(hour))
-            if Q_thermal_req_W[hour] > 0.0:
-                # only if there is a cooling load!
-                daily_storage, \
-                thermal_output, \
-                electricity_output, \
-                gas_output = cooling_resource_activator(Q_thermal_req_W[hour],
-                                                        T_district_cooling_supply_K[hour],
-                                                        T_district_cooling_return_K[hour],
-                                                        Q_therm_water_body_W[hour],
-                                                        T_source_average_water_body_K[hour],
-                                                        T_ground_K[hour],
-                                                        daily_storage,
-                                                        absorption_chiller,
-                                                        VC_chiller,
-                                                        CCGT_prop,
-                                                        master_to_slave_variables)
-
-                Q_DailyStorage_content_W[hour] = thermal_output['Qc_DailyStorage_content_W']
-                Q_DailyStorage_to_storage_W[hour] = thermal_output['Qc_DailyStorage_to_storage_W']
-                Q_DailyStorage_from_storage_W[hour] = thermal_output['Qc_DailyStorage_from_storage_W']
-
-                Q_Trigen_NG_gen_directload_W[hour] = thermal_output['Qc_Trigen_NG_gen_directload_W']
-                Q_BaseVCC_WS_gen_directload_W[hour] = thermal_output['Qc_BaseVCC_WS_gen_directload_W']
-                Q_PeakVCC_WS_gen_directload_W[hour] = thermal_output['Qc_PeakVCC_WS_gen_directload_W']
-                Q_BaseVCC_AS_gen_directload_W[hour] = thermal_output['Qc_BaseVCC_AS_gen_directload_W']
-                Q_PeakVCC_AS_gen_directload_W[hour] = thermal_output['Qc_PeakVCC_AS_gen_directload_W']
-                Q_BackupVCC_AS_directload_W[hour] = thermal_output['Qc_BackupVCC_AS_directload_W']
-
-                Q_Trigen_NG_gen_W[hour] = thermal_output['Qc_Trigen_NG_gen_W']
-                Q_BaseVCC_WS_gen_W[hour] = thermal_output['Qc_BaseVCC_WS_gen_W']
-                Q_PeakVCC_WS_gen_W[hour] = thermal_output['Qc_PeakVCC_WS_gen_W']
-                Q_BaseVCC_AS_gen_W[hour] = thermal_output['Qc_BaseVCC_AS_gen_W']
-                Q_PeakVCC_AS_gen_W[hour] = thermal_output['Qc_PeakVCC_AS_gen_W']
-                Q_BackupVCC_AS_gen_W[hour] = thermal_output['Qc_BackupVCC_AS_gen_W']
-
-                E_ACH_req_W[hour] = electricity_output['E_ACH_req_W']
-                E_BaseVCC_WS_req_W[hour] = electricity_output['E_BaseVCC_WS_req_W']
-                E_PeakVCC_WS_req_W[hour] = electricity_output['E_PeakVCC_WS_req_W']
-                E_BaseVCC_AS_req_W[hour] = electricity_output['E_BaseVCC_AS_req_W']
-                E_PeakVCC_AS_req_W[hour] = electricity_output['E_PeakVCC_AS_req_W']
-                E_Trigen_NG_gen_W[hour] = electricity_output['E_Trigen_NG_gen_W']
-
-                NG_Trigen_req_W[hour] = gas_output['NG_Trigen_req_W']
-
-                Q_release_Trigen_NG_W[hour] = thermal_output["Q_release_Trigen_W"]
-                Q_release_BaseVCC_WS_W[hour] = thermal_output["Q_release_BaseVCC_WS_W"]
-                Q_release_PeakVCC_WS_W[hour] = thermal_output["Q_release_PeakVCC_WS_W"]
-                Q_release_FreeCooling_W[hour] = thermal_output["Q_release_FreeCooling_W"]
-                Q_release_BaseVCC_AS_W[hour] = thermal_output["Q_release_BaseVCC_CT_W"]
-                Q_release_PeakVCC_AS_W[hour] = thermal_output["Q_release_PeakVCC_CT_W"]
+        # cooling supply for all buildings excluding cooling loads from data centers
+        daily_storage, \
+        thermal_output, \
+        electricity_output, \
+        gas_output = cooling_resource_activator(Q_thermal_req_W,
+                                                T_district_cooling_supply_K,
+                                                T_district_cooling_return_K,
+                                                Q_therm_water_body_W,
+                                                T_source_average_water_body_K,
+                                                T_ground_K,
+                                                daily_storage,
+                                                absorption_chiller,
+                                                VC_chiller,
+                                                CCGT_prop,
+                                                master_to_slave_variables)
+
+        Q_DailyStorage_content_W = thermal_output['Qc_DailyStorage_content_W']
+        Q_DailyStorage_to_storage_W = thermal_output['Qc_DailyStorage_to_storage_W']
+        Q_DailyStorage_from_storage_W = thermal_output['Qc_DailyStorage_from_storage_W']
+
+        Q_Trigen_NG_gen_directload_W = thermal_output['Qc_Trigen_NG_gen_directload_W']
+        Q_BaseVCC_WS_gen_directload_W = thermal_output['Qc_BaseVCC_WS_gen_directload_W']
+        Q_PeakVCC_WS_gen_directload_W = thermal_output['Qc_PeakVCC_WS_gen_directload_W']
+        Q_BaseVCC_AS_gen_directload_W = thermal_output['Qc_BaseVCC_AS_gen_directload_W']
+        Q_PeakVCC_AS_gen_directload_W = thermal_output['Qc_PeakVCC_AS_gen_directload_W']
+        Q_BackupVCC_AS_directload_W = thermal_output['Qc_BackupVCC_AS_directload_W']
+
+        Q_Trigen_NG_gen_W = thermal_output['Qc_Trigen_NG_gen_W']
+        Q_BaseVCC_WS_gen_W = thermal_output['Qc_BaseVCC_WS_gen_W']
+        Q_PeakVCC_WS_gen_W = thermal_output['Qc_PeakVCC_WS_gen_W']
+        Q_BaseVCC_AS_gen_W = thermal_output['Qc_BaseVCC_AS_gen_W']
+        Q_PeakVCC_AS_gen_W = thermal_output['Qc_PeakVCC_AS_gen_W']
+        Q_BackupVCC_AS_gen_W = thermal_output['Qc_BackupVCC_AS_gen_W']
+
+        E_ACH_req_W = electricity_output['E_ACH_req_W']
+        E_BaseVCC_WS_req_W = electricity_output['E_BaseVCC_WS_req_W']
+        E_PeakVCC_WS_req_W = electricity_output['E_PeakVCC_WS_req_W']
+        E_BaseVCC_AS_req_W = electricity_output['E_BaseVCC_AS_req_W']
+        E_PeakVCC_AS_req_W = electricity_output['E_PeakVCC_AS_req_W']
+        E_Trigen_NG_gen_W = electricity_output['E_Trigen_NG_gen_W']
+
+        NG_Trigen_req_W = gas_output['NG_Trigen_req_W']
+
+        Q_release_Trigen_NG_W = thermal_output["Q_release_Trigen_W"]
+        Q_release_BaseVCC_WS_W = thermal_output["Q_release_BaseVCC_WS_W"]
+        Q_release_PeakVCC_WS_W = thermal_output["Q_release_PeakVCC_WS_W"]
+        Q_release_FreeCooling_W = thermal_output["Q_release_FreeCooling_W"]
+        Q_release_BaseVCC_AS_W = thermal_output["Q_release_BaseVCC_CT_W"]
+        Q_release_PeakVCC_AS_W = thermal_output["Q_release_PeakVCC_CT_W"]
 
         # calculate the electrical capacity as a function of the peak produced by the turbine
         master_to_slave_variables.NG_Trigen_CCGT_size_electrical_W = E_Trigen_NG_gen_W.max()
@@ -224,12 +220,12 @@ def district_cooling_network(locator,
         if master_to_slave_variables.AS_BackupVCC_size_W != 0.0:
             master_to_slave_variables.AS_BackupVCC_on = 1
             Q_BackupVCC_AS_gen_W, \
-            E_BackupVCC_AS_req_W = np.vectorize(calc_vcc_CT_operation)(Q_BackupVCC_AS_gen_W,
-                                                                       T_district_cooling_return_K,
-                                                                       T_district_cooling_supply_K,
-                                                                       VCC_T_COOL_IN,
-                                                                       size_chiller_CT,
-                                                                       VC_chiller)
+            E_BackupVCC_AS_req_W = calc_vcc_CT_operation(Q_BackupVCC_AS_gen_W,
+                                                         T_district_cooling_return_K,
+                                                         T_district_cooling_supply_K,
+                                                         VCC_T_COOL_IN,
+                                                         size_chiller_CT,
+                                                         VC_chiller)
             Q_release_BackupVCC_AS_W = Q_BackupVCC_AS_gen_W + E_BackupVCC_AS_req_W
         else:
             E_BackupVCC_AS_req_W = np.zeros(HOURS_IN_YEAR)
@@ -11,6 +11,7 @@ import cea.technologies.chiller_vapor_compression as chiller_vapor_compression
 import cea.technologies.cooling_tower as ct_model
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
 from cea.optimization.constants import VCC_T_COOL_IN, DT_COOL, ACH_T_IN_FROM_CHP_K
+from cea.optimization.slave.hourly_dispatch import calc_hourly_operation, as_hourly
 from cea.technologies.pumps import calc_water_body_uptake_pumping
 
 __author__ = "Sreepathi Bhargava Krishna"
@@ -23,7 +24,11 @@ __email__ = "cea@arch.ethz.ch"
 __status__ = "Production"
 
 
-def cooling_resource_activator(Q_thermal_req,
+# the units of the loading order of the district cooling plant, the keys of the results of the loading order
+COOLING_UNITS = ['Trigen_NG', 'BaseVCC_WS', 'PeakVCC_WS', 'BaseVCC_AS', 'PeakVCC_AS']
+
+
+def cooling_resource_activator(Q_thermal_req_W,
                                T_district_cooling_supply_K,
                                T_district_cooling_return_K,
                                Qc_water_body_potential_W,
@@ -35,8 +40,8 @@ def cooling_resource_activator(Q_thermal_req,
                                CCGT_operation_data,
                                master_to_slave_variables):
     """
-    This function checks which cooling technologies need to be activated to meet the energy demand for a given hour.
-    The technology activation chain is set to be the following:
+    This function checks which cooling technologies need to be activated to meet the energy demand of each hour of the
+    year. The technology activation chain is set to be the following:
         1. Trigeneration plant (combined cycle gas turbine [heat + electricity] & absorption chiller [cooling])
         2. Base vapour compression chiller water source or free cooling using water body
         3. Peak vapour compression chiller water source or free cooling using water body
@@ -49,12 +54,16 @@ def cooling_resource_activator(Q_thermal_req,
     if the storage is empty and another technology needs to be activated, the technology will be run at maximum
     capacity and the storage will be filled using the available cooling capacity.
 
-    :param Q_thermal_req: cooling demand of DCN (in hour x)
-    :param T_district_cooling_supply_K: supply temperature of DCN (in hour x)
-    :param T_district_cooling_return_K: return temperature of DCN (in hour x)
-    :param Qc_water_body_potential_W: free cooling capacity of water body (in hour x)
-    :param T_source_average_water_body_K: temperature of water drawn from the water body (in hour x)
-    :param T_ground_K: temperature of ground (in hour x)
+    The loading order is evaluated for all hours at once (see :py:func:`calc_loading_order`), only the state of charge
+    of an activated storage is followed hour by hour (see :py:func:`calc_loading_order_with_storage`). The operation of
+    each technology is then calculated for the hours it is activated.
+
+    :param Q_thermal_req_W: hourly cooling demand of DCN
+    :param T_district_cooling_supply_K: hourly supply temperature of DCN
+    :param T_district_cooling_return_K: hourly return temperature of DCN
+    :param Qc_water_body_potential_W: hourly free cooling capacity of water body
+    :param T_source_average_water_body_K: hourly temperature of water drawn from the water body
+    :param T_ground_K: hourly temperature of ground
     :param daily_storage_class: characteristics of selected thermal energy storage tank (including state of charge)
     :param absorption_chiller: eligible absorption chiller types
     :param VC_chiller: eligible vapor compression chiller types
@@ -65,87 +74,94 @@ def cooling_resource_activator(Q_thermal_req,
     :param master_to_slave_variables: all the important information on the energy system configuration of an individual
                                       (buildings [connected, non-connected], heating technologies, cooling technologies,
                                       storage etc.)
-    :type Q_thermal_req: float
-    :type T_district_cooling_supply_K: float
-    :type T_district_cooling_return_K: float
-    :type Qc_water_body_potential_W: float
-    :type T_source_average_water_body_K: float
-    :type T_ground_K: float
-    :type daily_storage_class: cea.optimization.slave.daily_storage.load_leveling.LoadLevelingDailyStorage class object
-    :type absorption_chiller: cea.technologies.chiller_vapor_compression.VaporCompressionChiller class object
+    :type Q_thermal_req_W: np.ndarray
+    :type T_district_cooling_supply_K: np.ndarray
+    :type T_district_cooling_return_K: np.ndarray
+    :type Qc_water_body_potential_W: np.ndarray
+    :type T_source_average_water_body_K: np.ndarray
+    :type T_ground_K: np.ndarray
+    :type daily_storage_class: cea.technologies.storage_tank_pcm.Storage_tank_PCM class object
+    :type absorption_chiller: cea.technologies.chiller_absorption.AbsorptionChiller class object
     :type VC_chiller: cea.technologies.chiller_vapor_compression.VaporCompressionChiller class object
     :type master_to_slave_variables: cea.optimization.slave_data.SlaveDate class object
 
     :return daily_storage_class: characteristics of selected thermal energy storage tank (including state of charge)
-    :return thermal_output: thermal energy supply by each of the eligible cooling technologies
-    :return electricity_output: electrical power demand and supply (trigen-plant) of each cooling technology
-    :return gas_output: natural gas demand of the trigeneration plant
-    :rtype daily_storage_class: cea.optimization.slave.daily_storage.load_leveling.LoadLevelingDailyStorage class object
-    :rtype thermal_output: dict (5 x float)
-    :rtype electricity_output: dict (13 x float)
-    :rtype gas_output: dict (1 x float)
+    :return thermal_output: hourly thermal energy supply by each of the eligible cooling technologies
+    :return electricity_output: hourly electrical power demand and supply (trigen-plant) of each cooling technology
+    :return gas_output: hourly natural gas demand of the trigeneration plant
+    :rtype daily_storage_class: cea.technologies.storage_tank_pcm.Storage_tank_PCM class object
+    :rtype thermal_output: dict (27 x ndarray)
+    :rtype electricity_output: dict (7 x ndarray)
+    :rtype gas_output: dict (1 x ndarray)
     """
-
-    # initializing unmet cooling load and requirements from daily storage for this hour
-    Q_cooling_unmet_W = Q_thermal_req
-    Qc_DailyStorage_from_storage_W = 0.0
-    Qc_DailyStorage_to_storage_W = 0.0
-    Qc_water_body_remaining_W = Qc_water_body_potential_W
-
-    # ACTIVATE THE TRIGEN
+    Q_thermal_req_W = np.asarray(Q_thermal_req_W, dtype=float)
+    hours = len(Q_thermal_req_W)
+    T_district_cooling_supply_K = as_hourly(T_district_cooling_supply_K, hours)
+    T_district_cooling_return_K = as_hourly(T_district_cooling_return_K, hours)
+    Qc_water_body_potential_W = as_hourly(Qc_water_body_potential_W, hours)
+    T_source_average_water_body_K = as_hourly(T_source_average_water_body_K, hours)
+    T_ground_K = as_hourly(T_ground_K, hours)
+
+    # LOADING ORDER
+    if daily_storage_class.activated:
+        calc_loading_order_of_units = calc_loading_order_with_storage
+    else:
+        calc_loading_order_of_units = calc_loading_order
+    loading_order, \
     Q_cooling_unmet_W, \
-    Qc_DailyStorage_content_W, Qc_DailyStorage_to_storage_W, Qc_DailyStorage_from_storage_W, \
-    Qc_Trigen_gen_W, Qc_Trigen_NG_gen_directload_W, \
-    E_Trigen_NG_gen_W, E_ACH_req_W, NG_Trigen_req_W, \
-    Q_release_CC_W, Q_release_ACH_CT_W, Q_release_Trigen_W = activate_CCandACH_trigen(Q_cooling_unmet_W,
-                                                                                      Qc_DailyStorage_to_storage_W,
-                                                                                      Qc_DailyStorage_from_storage_W,
-                                                                                      T_district_cooling_supply_K,
-                                                                                      T_district_cooling_return_K,
-                                                                                      T_ground_K,
-                                                                                      CCGT_operation_data,
-                                                                                      absorption_chiller,
-                                                                                      daily_storage_class,
-                                                                                      master_to_slave_variables)
-
-    # ACTIVATE WATER SOURCE COOLING TECHNOLOGIES
+    Qc_DailyStorage_content_W = calc_loading_order_of_units(Q_thermal_req_W,
+                                                            T_district_cooling_supply_K,
+                                                            T_district_cooling_return_K,
+                                                            Qc_water_body_potential_W,
+                                                            T_source_average_water_body_K,
+                                                            T_ground_K,
+                                                            daily_storage_class,
+                                                            absorption_chiller,
+                                                            VC_chiller,
+                                                            CCGT_operation_data,
+                                                            master_to_slave_variables)
+
+    Qc_DailyStorage_to_storage_W = np.zeros(hours)
+    Qc_DailyStorage_from_storage_W = np.zeros(hours)
+    for unit in COOLING_UNITS:
+        Qc_DailyStorage_to_storage_W += loading_order[unit]['Qc_to_storage_W']
+        Qc_DailyStorage_from_storage_W += loading_order[unit]['Qc_from_storage_W']
+
+    # OPERATION OF THE TRIGEN
+    trigen = loading_order['Trigen_NG']
+    Qc_Trigen_gen_W, \
+    Qc_Trigen_NG_gen_directload_W, \
+    E_Trigen_NG_gen_W, \
+    NG_Trigen_req_W, \
+    Q_release_CC_W = calc_CCandACH_trigen_operation(trigen, CCGT_operation_data)
+    E_ACH_req_W = trigen['E_ACH_req_W']
+    Q_release_ACH_CT_W = trigen['Qc_CT_ACH_W']
+    Q_release_Trigen_W = Q_release_CC_W + Q_release_ACH_CT_W
+
+    # OPERATION OF THE WATER SOURCE COOLING TECHNOLOGIES
     # Base VCC water-source OR first activation of free cooling using water body
-    Q_cooling_unmet_W, Qc_water_body_remaining_W, \
-    Qc_DailyStorage_content_W, Qc_DailyStorage_to_storage_W, Qc_DailyStorage_from_storage_W, \
     Qc_BaseVCC_WS_gen_W, Qc_BaseVCC_WS_gen_directload_W, \
     Qc_1st_FreeCooling_and_DirectStorage_WS_W, Qc_1st_FreeCooling_WS_directload_W, \
     E_BaseVCC_WS_req_W, E_1st_FreeCooling_req_W, \
     Q_release_BaseVCC_WS_W, Q_release_1st_FreeCooling_W, Q_release_1st_to_water_body_W = \
-        activate_WS_VCC(master_to_slave_variables.WS_BaseVCC_on,
-                        Q_cooling_unmet_W,
-                        Qc_water_body_remaining_W,
-                        Qc_DailyStorage_to_storage_W,
-                        Qc_DailyStorage_from_storage_W,
-                        T_district_cooling_supply_K,
-                        T_district_cooling_return_K,
-                        T_source_average_water_body_K,
-                        VC_chiller,
-                        master_to_slave_variables.WS_BaseVCC_size_W,
-                        daily_storage_class)
+        calc_WS_VCC_operation(loading_order['BaseVCC_WS'],
+                              T_district_cooling_supply_K,
+                              T_district_cooling_return_K,
+                              T_source_average_water_body_K,
+                              VC_chiller,
+                              master_to_slave_variables.WS_BaseVCC_size_W)
 
     # Peak VCC water-source OR second activation of free cooling using water body
-    Q_cooling_unmet_W, Qc_water_body_remaining_W, \
-    Qc_DailyStorage_content_W, Qc_DailyStorage_to_storage_W, Qc_DailyStorage_from_storage_W, \
     Qc_PeakVCC_WS_gen_W, Qc_PeakVCC_WS_gen_directload_W, \
     Qc_2nd_FreeCooling_and_DirectStorage_WS_W, Qc_2nd_FreeCooling_WS_directload_W, \
     E_PeakVCC_WS_req_W, E_2nd_FreeCooling_req_W, \
     Q_release_PeakVCC_WS_W, Q_release_2nd_FreeCooling_W, Q_release_2nd_to_water_body_W = \
-        activate_WS_VCC(master_to_slave_variables.WS_PeakVCC_on,
-                        Q_cooling_unmet_W,
-                        Qc_water_body_remaining_W,
-                        Qc_DailyStorage_to_storage_W,
-                        Qc_DailyStorage_from_storage_W,
-                        T_district_cooling_supply_K,
-                        T_district_cooling_return_K,
-                        T_source_average_water_body_K,
-                        VC_chiller,
-                        master_to_slave_variables.WS_PeakVCC_size_W,
-                        daily_storage_class)
+        calc_WS_VCC_operation(loading_order['PeakVCC_WS'],
+                              T_district_cooling_supply_K,
+                              T_district_cooling_return_K,
+                              T_source_average_water_body_K,
+                              VC_chiller,
+                              master_to_slave_variables.WS_PeakVCC_size_W)
 
     # Sum up first and second activation of free cooling
     Qc_FreeCooling_WS_directload_W = Qc_1st_FreeCooling_WS_directload_W + Qc_2nd_FreeCooling_WS_directload_W
@@ -154,44 +170,31 @@ def cooling_resource_activator(Q_thermal_req,
     Q_release_FreeCooling_W = Q_release_1st_FreeCooling_W + Q_release_2nd_FreeCooling_W
     Q_release_to_water_body_W = Q_release_1st_to_water_body_W + Q_release_2nd_to_water_body_W
 
-    # ACTIVATE AIR SOURCE COOLING TECHNOLOGIES
+    # OPERATION OF THE AIR SOURCE COOLING TECHNOLOGIES
     # Base VCC air-source with a cooling tower
-    Q_cooling_unmet_W, \
-    Qc_DailyStorage_content_W, Qc_DailyStorage_to_storage_W, Qc_DailyStorage_from_storage_W, \
-    Qc_BaseVCC_AS_gen_W, Qc_BaseVCC_AS_gen_directload_W, \
+    Qc_BaseVCC_AS_gen_W, \
+    Qc_BaseVCC_AS_gen_directload_W, \
     E_BaseVCC_AS_req_W, \
-    Q_release_BaseVCC_CT_W = activate_AS_VCC(master_to_slave_variables.AS_BaseVCC_on,
-                                             Q_cooling_unmet_W,
-                                             Qc_DailyStorage_to_storage_W,
-                                             Qc_DailyStorage_from_storage_W,
-                                             T_district_cooling_supply_K,
-                                             T_district_cooling_return_K,
-                                             VC_chiller,
-                                             master_to_slave_variables.AS_BaseVCC_size_W,
-                                             daily_storage_class)
+    Q_release_BaseVCC_CT_W = calc_AS_VCC_operation(loading_order['BaseVCC_AS'],
+                                                   T_district_cooling_supply_K,
+                                                   T_district_cooling_return_K,
+                                                   VC_chiller,
+                                                   master_to_slave_variables.AS_BaseVCC_size_W)
 
     # Peak VCC air-source with a cooling tower
-    Q_cooling_unmet_W, \
-    Qc_DailyStorage_content_W, Qc_DailyStorage_to_storage_W, Qc_DailyStorage_from_storage_W, \
-    Qc_PeakVCC_AS_gen_W, Qc_PeakVCC_AS_gen_directload_W, \
+    Qc_PeakVCC_AS_gen_W, \
+    Qc_PeakVCC_AS_gen_directload_W, \
     E_PeakVCC_AS_req_W, \
-    Q_release_PeakVCC_CT_W = activate_AS_VCC(master_to_slave_variables.AS_PeakVCC_on,
-                                             Q_cooling_unmet_W,
-                                             Qc_DailyStorage_to_storage_W,
-                                             Qc_DailyStorage_from_storage_W,
-                                             T_district_cooling_supply_K,
-                                             T_district_cooling_return_K,
-                                             VC_chiller,
-                                             master_to_slave_variables.AS_PeakVCC_size_W,
-                                             daily_storage_class)
+    Q_release_PeakVCC_CT_W = calc_AS_VCC_operation(loading_order['PeakVCC_AS'],
+                                                   T_district_cooling_supply_K,
+                                                   T_district_cooling_return_K,
+                                                   VC_chiller,
+                                                   master_to_slave_variables.AS_PeakVCC_size_W)
 
     # IN CASE COOLING DEMAND IS STILL NOT FULLY MET: ACTIVATE BACKUP-VCC
-    if Q_cooling_unmet_W > 1.0E-3:
-        Qc_BackupVCC_AS_gen_W = Q_cooling_unmet_W  # this will become the back-up chiller
-        Qc_BackupVCC_AS_directload_W = Q_cooling_unmet_W
-    else:
-        Qc_BackupVCC_AS_gen_W = 0.0
-        Qc_BackupVCC_AS_directload_W = 0.0
+    # this will become the back-up chiller
+    Qc_BackupVCC_AS_gen_W = np.where(Q_cooling_unmet_W > 1.0E-3, Q_cooling_unmet_W, 0.0)
+    Qc_BackupVCC_AS_directload_W = Qc_BackupVCC_AS_gen_W.copy()
 
     # WRITE OUTPUTS
     electricity_output = {
@@ -247,364 +250,487 @@ def cooling_resource_activator(Q_thermal_req,
     return daily_storage_class, thermal_output, electricity_output, gas_output
 
 
-def activate_CCandACH_trigen(Q_cooling_unmet_W,
-                             Qc_DailyStorage_to_storage_W,
-                             Qc_DailyStorage_from_storage_W,
-                             T_district_cooling_supply_K,
-                             T_district_cooling_return_K,
-                             T_ground_K,
-                             CCGT_operation_data,
-                             absorption_chiller,
-                             daily_storage_class,
-                             master_to_slave_variables):
+def calc_loading_order(Q_thermal_req_W,
+                       T_district_cooling_supply_K,
+                       T_district_cooling_return_K,
+                       Qc_water_body_potential_W,
+                       T_source_average_water_body_K,
+                       T_ground_K,
+                       daily_storage_class,
+                       absorption_chiller,
+                       VC_chiller,
+                       CCGT_operation_data,
+                       master_to_slave_variables):
     """
-    This function activates a tri-generation plant composed of a combined cycle (CC) power plant (i.e. gas + steam
-    turbine) and an absorption chiller powered by the heat generated in the CC. In the activation of the technology,
-    this function:
-        1. assesses the cooling demand that can be met according to maximum capacity of the tri-generation
-            plant (for the investigated DCN configuration) and the available storage capacity.
-        2. calculates the necessary heat (from CC), electricity (from grid) and cold water (from cooling tower CT) to
-            provide the required amount of chilled water (i.e. cooling energy).
-        3. calculates the amount of natural gas (NG) needed to provide the necessary heat in the CC and the electricity
-            that is produced as a result.
-            TODO: Handle the scenario where the CC dimensions don't allow for this heat to be produced.
-    For the tri-generation plant to produce cooling energy certain conditions need to be met:
-        - cooling demand must not be fully met yet in the current timestep
-        - tri-generation needs to be among the eligible technologies for the investigated DCN configuration
-        - the district cooling network's supply and return temperatures must not be equal
-    """
-    # initialise variables for tri-generation activation
-    Qc_DailyStorage_content_W = daily_storage_class.current_storage_capacity_Wh
-    Qc_Trigen_gen_W = 0.0
-    Qc_Trigen_NG_gen_directload_W = 0.0
-
-    E_Trigen_NG_gen_W = 0.0
-    E_ACH_req_W = 0.0
-    NG_Trigen_req_W = 0.0
+    The loading order of the cooling technologies (see :py:func:`cooling_resource_activator`) without a cold storage.
+    The hours do not depend on each other, so each technology is activated for all hours of the year at once and covers
+    what the technologies before it left unmet (up to its capacity).
 
-    Q_release_CC_W = 0.0
-    Q_release_ACH_CT_W = 0.0
-    Q_release_Trigen_W = 0.0
-
-    if master_to_slave_variables.NG_Trigen_on == 1 and Q_cooling_unmet_W > 0.0 \
-            and not np.isclose(T_district_cooling_supply_K, T_district_cooling_return_K):
+    :return: the activation of each technology in `COOLING_UNITS` (see :py:func:`initialize_loading_order`), the
+             cooling demand that is still unmet and the content of the storage, by hour
+    """
+    loading_order = initialize_loading_order(len(Q_thermal_req_W))
+    Q_cooling_unmet_W = Q_thermal_req_W
+    network_in_operation = ~np.isclose(T_district_cooling_supply_K, T_district_cooling_return_K)
 
-        # Check what the maximum cooling capacity of the trigeneration plant can be for this individual
+    # ACTIVATE THE TRIGEN
+    if master_to_slave_variables.NG_Trigen_on == 1:
+        trigen = loading_order['Trigen_NG']
         size_trigen_W = master_to_slave_variables.NG_Trigen_ACH_size_W
-
-        # If the unmet cooling load exceeds the trigen-plant's maximum capacity,
-        #   try meeting the remaining cooling demand using the cold storage
-        if Q_cooling_unmet_W > size_trigen_W:
-            Qc_Trigen_NG_gen_directload_W = size_trigen_W
-            Qc_to_storage_W = 0.0
-            Qc_from_storage_W, Qc_DailyStorage_content_W = \
-                daily_storage_class.discharge_storage(Q_cooling_unmet_W - size_trigen_W)
-            Qc_Trigen_gen_W = Qc_Trigen_NG_gen_directload_W + Qc_to_storage_W
-
-        # If the unmet cooling load is smaller than the trigen-plant's maximum capacity,
-        #   use the available capacity to fill the cold storage
-        else:
-            Qc_Trigen_NG_gen_directload_W = Q_cooling_unmet_W
-            Qc_to_storage_W, Qc_DailyStorage_content_W = \
-                daily_storage_class.charge_storage(size_trigen_W - Q_cooling_unmet_W)
-            Qc_from_storage_W = 0.0
-            Qc_Trigen_gen_W = Qc_Trigen_NG_gen_directload_W + Qc_to_storage_W
+        activated = (Q_cooling_unmet_W > 0.0) & network_in_operation
+        Qc_Trigen_NG_gen_directload_W = np.where(activated, np.minimum(Q_cooling_unmet_W, size_trigen_W), 0.0)
 
         # GET THE ABSORPTION CHILLER PERFORMANCE
-        T_ACH_in_C = ACH_T_IN_FROM_CHP_K - 273
         Qc_CT_ACH_W, \
         Qh_CCGT_req_W, \
-        E_ACH_req_W = calc_chiller_absorption_operation(Qc_Trigen_gen_W,
+        E_ACH_req_W = calc_chiller_absorption_operation(Qc_Trigen_NG_gen_directload_W,
                                                         T_district_cooling_return_K,
                                                         T_district_cooling_supply_K,
-                                                        T_ACH_in_C,
+                                                        ACH_T_IN_FROM_CHP_K - 273,
                                                         T_ground_K,
                                                         absorption_chiller,
                                                         size_trigen_W)
 
-        # operation of the CCGT
-        Q_used_prim_CC_fn_W = CCGT_operation_data['q_input_fn_q_output_W']
-        Q_output_CC_min_W = CCGT_operation_data['q_output_min_W']
-        Q_output_CC_max_W = CCGT_operation_data['q_output_max_W']
-        eta_elec_interpol = CCGT_operation_data['eta_el_fn_q_input']
-
-        # operation of combined cycle (gas + steam turbine) possible if above minimum capacity
-        if Qh_CCGT_req_W >= Q_output_CC_min_W:
-
-            if Qh_CCGT_req_W <= Q_output_CC_max_W:  # Normal operation possible within part load regime
-                Q_CHP_gen_W = float(Qh_CCGT_req_W)
-                NG_Trigen_req_W = Q_used_prim_CC_fn_W(Q_CHP_gen_W)
-                E_Trigen_NG_gen_W = float(eta_elec_interpol(NG_Trigen_req_W)) * NG_Trigen_req_W
-
-            else:  # Only part of the demand can be delivered as 100% load achieved
-                # This case should never occur, since it means that another heat source would be required to run
-                # the absorption chiller at the required capacity.
-                print("WARNING: Gas turbine can not output enough heat to power the absorption chiller!")
-                Q_CHP_gen_W = Q_output_CC_max_W
-                NG_Trigen_req_W = Q_used_prim_CC_fn_W(Q_CHP_gen_W)
-                E_Trigen_NG_gen_W = float(eta_elec_interpol(NG_Trigen_req_W)) * NG_Trigen_req_W
-
-        # if the operation of the combined cycle is not possible due to its limited capacity, the absorption chiller
-        # (i.e. the cooling technology of the tri-generation plant) can not be powered either
-        else:
-            Qc_Trigen_gen_W = 0.0
-            Qc_Trigen_NG_gen_directload_W = 0.0
-            Q_CHP_gen_W = 0.0
-            NG_Trigen_req_W = 0.0
-            E_Trigen_NG_gen_W = 0.0
-
-            E_ACH_req_W = 0.0
-            Qc_CT_ACH_W = 0.0
-
-            if Qc_from_storage_W > 0.0:
-                Qc_storage_correction, Qc_DailyStorage_content_W = \
-                    daily_storage_class.discharge_storage(Qc_from_storage_W)
-                Qc_from_storage_W -= Qc_storage_correction
-            if Qc_to_storage_W > 0.0:
-                Qc_storage_correction, Qc_DailyStorage_content_W = \
-                    daily_storage_class.discharge_storage(Qc_to_storage_W)
-                Qc_to_storage_W -= Qc_storage_correction
-
-        # calculate heat released (i.e. anthropogenic heat emissions) from Trigen
-        Q_release_CC_W = NG_Trigen_req_W - Q_CHP_gen_W - E_Trigen_NG_gen_W
-        Q_release_ACH_CT_W = Qc_CT_ACH_W
-        Q_release_Trigen_W = Q_release_CC_W + Q_release_ACH_CT_W
-
-        # update unmet cooling load
-        Q_cooling_unmet_W = Q_cooling_unmet_W - Qc_Trigen_NG_gen_directload_W - Qc_from_storage_W
-        Qc_DailyStorage_to_storage_W += Qc_to_storage_W
-        Qc_DailyStorage_from_storage_W += Qc_from_storage_W
-
-    return Q_cooling_unmet_W, \
-           Qc_DailyStorage_content_W, Qc_DailyStorage_to_storage_W, Qc_DailyStorage_from_storage_W, \
-           Qc_Trigen_gen_W, Qc_Trigen_NG_gen_directload_W, \
-           E_Trigen_NG_gen_W, E_ACH_req_W, NG_Trigen_req_W,\
-           Q_release_CC_W, Q_release_ACH_CT_W, Q_release_Trigen_W
-
-
-def activate_WS_VCC(activation,
-                    Q_cooling_unmet_W,
-                    Qc_water_body_remaining_W,
-                    Qc_DailyStorage_to_storage_W,
-                    Qc_DailyStorage_from_storage_W,
-                    T_district_cooling_supply_K,
-                    T_district_cooling_return_K,
-                    T_source_average_water_body_K,
-                    VC_chiller,
-                    capacity_VCC_WS_W,
-                    daily_storage_class):
+        # the absorption chiller can only be powered if the combined cycle is above its minimum capacity
+        running = activated & (Qh_CCGT_req_W >= CCGT_operation_data['q_output_min_W'])
+        trigen['running'] = running
+        trigen['Qc_directload_W'] = np.where(running, Qc_Trigen_NG_gen_directload_W, 0.0)
+        trigen['Qc_CT_ACH_W'] = np.where(running, Qc_CT_ACH_W, 0.0)
+        trigen['Qh_CCGT_req_W'] = np.where(running, Qh_CCGT_req_W, 0.0)
+        trigen['E_ACH_req_W'] = np.where(running, E_ACH_req_W, 0.0)
+        Q_cooling_unmet_W = Q_cooling_unmet_W - trigen['Qc_directload_W']
+
+    # ACTIVATE WATER SOURCE COOLING TECHNOLOGIES
+    Qc_water_body_remaining_W = Qc_water_body_potential_W
+    for unit, activation, capacity_VCC_WS_W in [('BaseVCC_WS', master_to_slave_variables.WS_BaseVCC_on,
+                                                 master_to_slave_variables.WS_BaseVCC_size_W),
+                                                ('PeakVCC_WS', master_to_slave_variables.WS_PeakVCC_on,
+                                                 master_to_slave_variables.WS_PeakVCC_size_W)]:
+        if activation != 1:
+            continue
+        WS_VCC = loading_order[unit]
+        running = (Q_cooling_unmet_W > 0.0) & (Qc_water_body_remaining_W > 0.0) \
+                  & (T_source_average_water_body_K < VCC_T_COOL_IN) & network_in_operation
+        free_cooling = T_district_cooling_supply_K - T_source_average_water_body_K >= DT_COOL
+        Qc_output_WS_max_W = calc_WS_VCC_capacity(running,
+                                                  free_cooling,
+                                                  Q_cooling_unmet_W,
+                                                  Qc_water_body_remaining_W,
+                                                  T_district_cooling_supply_K,
+                                                  T_source_average_water_body_K,
+                                                  VC_chiller,
+                                                  capacity_VCC_WS_W)
+        WS_VCC['running'] = running
+        WS_VCC['free_cooling'] = running & free_cooling
+        WS_VCC['Qc_directload_W'] = np.where(running, np.minimum(Q_cooling_unmet_W, Qc_output_WS_max_W), 0.0)
+        Q_cooling_unmet_W = Q_cooling_unmet_W - WS_VCC['Qc_directload_W']
+
+        if unit == 'BaseVCC_WS' and master_to_slave_variables.WS_PeakVCC_on == 1:
+            Qc_from_water_body_W = calc_hourly_operation(calc_water_body_use, running, 1,
+                                                         WS_VCC['Qc_directload_W'],
+                                                         free_cooling,
+                                                         T_district_cooling_supply_K,
+                                                         T_district_cooling_return_K,
+                                                         T_source_average_water_body_K,
+                                                         VC_chiller,
+                                                         capacity_VCC_WS_W)
+            Qc_water_body_remaining_W = Qc_water_body_remaining_W - Qc_from_water_body_W
+
+    # ACTIVATE AIR SOURCE COOLING TECHNOLOGIES
+    for unit, activation, capacity_VCC_AS_W in [('BaseVCC_AS', master_to_slave_variables.AS_BaseVCC_on,
+                                                 master_to_slave_variables.AS_BaseVCC_size_W),
+                                                ('PeakVCC_AS', master_to_slave_variables.AS_PeakVCC_on,
+                                                 master_to_slave_variables.AS_PeakVCC_size_W)]:
+        if activation != 1:
+            continue
+        AS_VCC = loading_order[unit]
+        AS_VCC['running'] = (Q_cooling_unmet_W > 0.0) & network_in_operation
+        AS_VCC['Qc_directload_W'] = np.where(AS_VCC['running'], np.minimum(Q_cooling_unmet_W, capacity_VCC_AS_W), 0.0)
+        Q_cooling_unmet_W = Q_cooling_unmet_W - AS_VCC['Qc_directload_W']
+
+    Qc_DailyStorage_content_W = np.where(Q_thermal_req_W > 0.0, daily_storage_class.current_storage_capacity_Wh, 0.0)
+    return loading_order, Q_cooling_unmet_W, Qc_DailyStorage_content_W
+
+
+def calc_loading_order_with_storage(Q_thermal_req_W,
+                                    T_district_cooling_supply_K,
+                                    T_district_cooling_return_K,
+                                    Qc_water_body_potential_W,
+                                    T_source_average_water_body_K,
+                                    T_ground_K,
+                                    daily_storage_class,
+                                    absorption_chiller,
+                                    VC_chiller,
+                                    CCGT_operation_data,
+                                    master_to_slave_variables):
+    """
+    The loading order of the cooling technologies (see :py:func:`cooling_resource_activator`) with a cold storage. The
+    state of charge of the storage carries over from one hour to the next, so the hours with a cooling demand are
+    dispatched in order. Only the activation of the technologies and the exchanges with the storage are calculated
+    here, their operation is calculated for all hours afterwards.
+
+    :return: the activation of each technology in `COOLING_UNITS` (see :py:func:`initialize_loading_order`), the
+             cooling demand that is still unmet and the content of the storage, by hour
     """
-    This function activates water source cooling technologies. In case the temperature of the water body is low enough
-    (i.e. T_district_cooling_supply_K - DeltaT) the water is used directly for free cooling. If the temperature of the
-    water body is higher a water source vapour compression chiller is activated.
-    In both cases the available cooling potential is compared with the demand. If the cooling potential is higher than
-    the demand the thermal storage is charged, otherwise the storage is discharged.
+    hours = len(Q_thermal_req_W)
+    loading_order = initialize_loading_order(hours)
+    trigen = loading_order['Trigen_NG']
+    Q_cooling_unmet_after_W = np.zeros(hours)
+    Qc_DailyStorage_content_W = np.zeros(hours)
+    network_in_operation = ~np.isclose(T_district_cooling_supply_K, T_district_cooling_return_K)
+    free_cooling = T_district_cooling_supply_K - T_source_average_water_body_K >= DT_COOL
+    WS_units = [('BaseVCC_WS', master_to_slave_variables.WS_BaseVCC_on, master_to_slave_variables.WS_BaseVCC_size_W),
+                ('PeakVCC_WS', master_to_slave_variables.WS_PeakVCC_on, master_to_slave_variables.WS_PeakVCC_size_W)]
+    AS_units = [('BaseVCC_AS', master_to_slave_variables.AS_BaseVCC_on, master_to_slave_variables.AS_BaseVCC_size_W),
+                ('PeakVCC_AS', master_to_slave_variables.AS_PeakVCC_on, master_to_slave_variables.AS_PeakVCC_size_W)]
+
+    # only the hours with a cooling load are dispatched, the storage accounts for the thermal gains in between
+    for hour in np.flatnonzero(Q_thermal_req_W > 0.0):
+        daily_storage_class.hour = hour
+        if master_to_slave_variables.debug is True:
+            print("\nHour {:.0f}".format(hour))
+        Q_cooling_unmet_W = Q_thermal_req_W[hour]
+
+        # ACTIVATE THE TRIGEN
+        if master_to_slave_variables.NG_Trigen_on == 1 and Q_cooling_unmet_W > 0.0 and network_in_operation[hour]:
+            size_trigen_W = master_to_slave_variables.NG_Trigen_ACH_size_W
+            Qc_directload_W, \
+            Qc_to_storage_W, \
+            Qc_from_storage_W = exchange_with_storage(daily_storage_class,
+                                                      Q_cooling_unmet_W,
+                                                      size_trigen_W,
+                                                      Q_cooling_unmet_W > size_trigen_W)
+
+            # GET THE ABSORPTION CHILLER PERFORMANCE
+            Qc_CT_ACH_W, \
+            Qh_CCGT_req_W, \
+            E_ACH_req_W = calc_chiller_absorption_operation(Qc_directload_W + Qc_to_storage_W,
+                                                            T_district_cooling_return_K[hour],
+                                                            T_district_cooling_supply_K[hour],
+                                                            ACH_T_IN_FROM_CHP_K - 273,
+                                                            T_ground_K[hour],
+                                                            absorption_chiller,
+                                                            size_trigen_W)
+
+            if Qh_CCGT_req_W >= CCGT_operation_data['q_output_min_W']:
+                trigen['running'][hour] = True
+                trigen['Qc_CT_ACH_W'][hour] = Qc_CT_ACH_W
+                trigen['Qh_CCGT_req_W'][hour] = Qh_CCGT_req_W
+                trigen['E_ACH_req_W'][hour] = E_ACH_req_W
+
+            # if the operation of the combined cycle is not possible due to its limited capacity, the absorption
+            # chiller (i.e. the cooling technology of the tri-generation plant) can not be powered either
+            else:
+                Qc_directload_W = 0.0
+                if Qc_from_storage_W > 0.0:
+                    Qc_storage_correction, _ = daily_storage_class.discharge_storage(Qc_from_storage_W)
+                    Qc_from_storage_W -= Qc_storage_correction
+                if Qc_to_storage_W > 0.0:
+                    Qc_storage_correction, _ = daily_storage_class.discharge_storage(Qc_to_storage_W)
+                    Qc_to_storage_W -= Qc_storage_correction
+
+            trigen['Qc_directload_W'][hour] = Qc_directload_W
+            trigen['Qc_to_storage_W'][hour] = Qc_to_storage_W
+            trigen['Qc_from_storage_W'][hour] = Qc_from_storage_W
+            Q_cooling_unmet_W = Q_cooling_unmet_W - Qc_directload_W - Qc_from_storage_W
+
+        # ACTIVATE WATER SOURCE COOLING TECHNOLOGIES
+        Qc_water_body_remaining_W = Qc_water_body_potential_W[hour]
+        for unit, activation, capacity_VCC_WS_W in WS_units:
+            if activation == 1 and Q_cooling_unmet_W > 0.0 and Qc_water_body_remaining_W > 0.0 \
+                    and T_source_average_water_body_K[hour] < VCC_T_COOL_IN and network_in_operation[hour]:
+                Qc_output_WS_max_W = float(calc_WS_VCC_capacity(True,
+                                                                free_cooling[hour],
+                                                                Q_cooling_unmet_W,
+                                                                Qc_water_body_remaining_W,
+                                                                T_district_cooling_supply_K[hour],
+                                                                T_source_average_water_body_K[hour],
+                                                                VC_chiller,
+                                                                capacity_VCC_WS_W))
+                Qc_directload_W, \
+                Qc_to_storage_W, \
+                Qc_from_storage_W = exchange_with_storage(daily_storage_class,
+                                                          Q_cooling_unmet_W,
+                                                          Qc_output_WS_max_W,
+                                                          Q_cooling_unmet_W >= Qc_output_WS_max_W)
+                Qc_WS_gen_W = Qc_directload_W + Qc_to_storage_W
+                if not free_cooling[hour]:
+                    # the chiller can not supply more cooling than the installed capacity allows
+                    Qc_WS_gen_W = min(Qc_WS_gen_W, capacity_VCC_WS_W)
+
+                WS_VCC = loading_order[unit]
+                WS_VCC['running'][hour] = True
+                WS_VCC['free_cooling'][hour] = free_cooling[hour]
+                WS_VCC['Qc_directload_W'][hour] = Qc_directload_W
+                WS_VCC['Qc_to_storage_W'][hour] = Qc_to_storage_W
+                WS_VCC['Qc_from_storage_W'][hour] = Qc_from_storage_W
+                Q_cooling_unmet_W = Q_cooling_unmet_W - (Qc_WS_gen_W - Qc_to_storage_W) - Qc_from_storage_W
+
+                if unit == 'BaseVCC_WS' and master_to_slave_variables.WS_PeakVCC_on == 1:
+                    Qc_water_body_remaining_W -= calc_water_body_use(Qc_directload_W + Qc_to_storage_W,
+                                                                     free_cooling[hour],
+                                                                     T_district_cooling_supply_K[hour],
+                                                                     T_district_cooling_return_K[hour],
+                                                                     T_source_average_water_body_K[hour],
+                                                                     VC_chiller,
+                                                                     capacity_VCC_WS_W)
+
+        # ACTIVATE AIR SOURCE COOLING TECHNOLOGIES
+        for unit, activation, capacity_VCC_AS_W in AS_units:
+            if activation == 1 and Q_cooling_unmet_W > 0.0 and network_in_operation[hour]:
+                Qc_directload_W, \
+                Qc_to_storage_W, \
+                Qc_from_storage_W = exchange_with_storage(daily_storage_class,
+                                                          Q_cooling_unmet_W,
+                                                          capacity_VCC_AS_W,
+                                                          Q_cooling_unmet_W > capacity_VCC_AS_W)
+                AS_VCC = loading_order[unit]
+                AS_VCC['running'][hour] = True
+                AS_VCC['Qc_directload_W'][hour] = Qc_directload_W
+                AS_VCC['Qc_to_storage_W'][hour] = Qc_to_storage_W
+                AS_VCC['Qc_from_storage_W'][hour] = Qc_from_storage_W
+                Q_cooling_unmet_W = Q_cooling_unmet_W - Qc_directload_W - Qc_from_storage_W
+
+        Q_cooling_unmet_after_W[hour] = Q_cooling_unmet_W
+        Qc_DailyStorage_content_W[hour] = daily_storage_class.current_storage_capacity_Wh
+
+    return loading_order, Q_cooling_unmet_after_W, Qc_DailyStorage_content_W
+
+
+def initialize_loading_order(hours):
     """
+    The activation of the cooling technologies, by hour: for each of the `COOLING_UNITS` whether it is ``running``, the
+    cooling it supplies to the network (``Qc_directload_W``) and its exchanges with the storage. The water source units
+    also record if they run on ``free_cooling``, the trigen the performance of its absorption chiller.
 
-    # Initialise variables for water source cooling (VCC or FreeCooling) activation
-    Qc_from_water_body_W = 0.0
-    Qc_from_activated_cooling_system_W = 0.0
-    Qc_water_body_to_storage_W = 0.0
+    :rtype: dict[str, dict[str, np.ndarray]]
+    """
+    loading_order = {}
+    for unit in COOLING_UNITS:
+        loading_order[unit] = {'running': np.zeros(hours, dtype=bool),
+                               'Qc_directload_W': np.zeros(hours),
+                               'Qc_to_storage_W': np.zeros(hours),
+                               'Qc_from_storage_W': np.zeros(hours)}
+        if unit.endswith('_WS'):
+            loading_order[unit]['free_cooling'] = np.zeros(hours, dtype=bool)
+    loading_order['Trigen_NG'].update({'Qc_CT_ACH_W': np.zeros(hours),
+                                       'Qh_CCGT_req_W': np.zeros(hours),
+                                       'E_ACH_req_W': np.zeros(hours)})
+    return loading_order
+
+
+def exchange_with_storage(daily_storage_class, Q_cooling_unmet_W, Qc_output_max_W, discharge):
+    """
+    If the unmet cooling load exceeds the maximum output of a technology (``discharge``), try meeting the rest using the
+    cold storage, otherwise use the remaining capacity of the technology to fill the cold storage.
 
-    Qc_DailyStorage_content_W = daily_storage_class.current_storage_capacity_Wh
-    Qc_to_storage_W = 0.0
-    Qc_from_storage_W = 0.0
+    :return: the cooling supplied to the network, to the storage and from the storage
+    """
+    if discharge:
+        Qc_from_storage_W, _ = daily_storage_class.discharge_storage(Q_cooling_unmet_W - Qc_output_max_W)
+        return Qc_output_max_W, 0.0, Qc_from_storage_W
+    else:
+        Qc_to_storage_W, _ = daily_storage_class.charge_storage(Qc_output_max_W - Q_cooling_unmet_W)
+        return Q_cooling_unmet_W, Qc_to_storage_W, 0.0
+
+
+def calc_WS_VCC_capacity(running,
+                         free_cooling,
+                         Q_cooling_unmet_W,
+                         Qc_water_body_remaining_W,
+                         T_district_cooling_supply_K,
+                         T_source_average_water_body_K,
+                         VC_chiller,
+                         capacity_VCC_WS_W):
+    """
+    The maximum cooling output of a water source technology: the remaining cooling potential of the water body when
+    running on free cooling, else what the vapour compression chiller can supply with it. Works on single hours and on
+    hourly arrays.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        thermal_efficiency_VCC = chiller_vapor_compression.eta_th_vcc_g(T_district_cooling_supply_K,
+                                                                        T_source_average_water_body_K,
+                                                                        VC_chiller)
+    Qc_output_VCC_WS_max_W = np.minimum(capacity_VCC_WS_W, thermal_efficiency_VCC * Qc_water_body_remaining_W)
 
-    Qc_FreeCooling_WS_directload_W = 0.0
-    Qc_FreeCooling_and_DirectStorage_WS_W = 0.0
-    E_FreeCooling_req_W = 0.0
+    for hour in np.flatnonzero(running & ((Qc_output_VCC_WS_max_W < 0) | (Q_cooling_unmet_W < 0))):
+        print(f"Cooling unmet: {np.take(Q_cooling_unmet_W, hour)} W,\n"
+              f"max. VCC output: {np.take(Qc_output_VCC_WS_max_W, hour)} W")
+        print(f"Remaining water body potential: {np.take(Qc_water_body_remaining_W, hour)} W,\n"
+              f"thermal efficiency of VCC: {np.take(thermal_efficiency_VCC, hour)}")
 
-    Qc_VCC_WS_gen_directload_W = 0.0
-    Qc_VCC_WS_gen_W = 0.0
-    Qc_VCC_WS_gen_storage_W = 0.0
-    E_VCC_WS_req_W = 0.0
+    return np.where(free_cooling, Qc_water_body_remaining_W, Qc_output_VCC_WS_max_W)
 
-    Q_release_VCC_WS_W = 0.0
-    Q_release_FreeCooling_W = 0.0
-    Q_release_to_water_body_W = 0.0
 
-    # VCC water-source OR free cooling using water body
-    if activation == 1 and Q_cooling_unmet_W > 0.0 and Qc_water_body_remaining_W > 0.0 \
-            and T_source_average_water_body_K < VCC_T_COOL_IN \
-            and not np.isclose(T_district_cooling_supply_K, T_district_cooling_return_K):
+def calc_water_body_use(Qc_WS_gen_W,
+                        free_cooling,
+                        T_district_cooling_supply_K,
+                        T_district_cooling_return_K,
+                        T_source_average_water_body_K,
+                        VC_chiller,
+                        capacity_VCC_WS_W):
+    """
+    The cooling potential of the water body used by a water source technology supplying ``Qc_WS_gen_W`` in one hour
+    (see :py:func:`calc_WS_operation`).
+    """
+    return calc_WS_operation(Qc_WS_gen_W,
+                             free_cooling,
+                             T_district_cooling_supply_K,
+                             T_district_cooling_return_K,
+                             T_source_average_water_body_K,
+                             VC_chiller,
+                             capacity_VCC_WS_W)[2]
 
-        # initialise variables for the water source vapour compression chiller and free cooling calculation
-        VCC_WS_activated = False
-        FreeCooling_WS_activated = False
-        thermal_efficiency_VCC = chiller_vapor_compression.eta_th_vcc_g(T_district_cooling_supply_K,
-                                                                        T_source_average_water_body_K,
-                                                                        VC_chiller)
-        Qc_output_VCC_WS_max_W = min(capacity_VCC_WS_W, thermal_efficiency_VCC * Qc_water_body_remaining_W)
-
-        if Qc_output_VCC_WS_max_W < 0 or Q_cooling_unmet_W < 0:
-            print(f"Cooling unmet: {Q_cooling_unmet_W} W,\nmax. VCC output: {Qc_output_VCC_WS_max_W} W")
-            print(f"Remaining water body potential: {Qc_water_body_remaining_W} W,\nthermal efficiency of VCC: {thermal_efficiency_VCC}")
-
-        # Activation Case 1: The water temperature doesn't allow for free cooling, therefore the VCC is activated.
-        # The unmet cooling demand is larger than the maximum VCC output, therefore the storage is discharged.
-        if T_district_cooling_supply_K - T_source_average_water_body_K < DT_COOL \
-                and Q_cooling_unmet_W >= Qc_output_VCC_WS_max_W:
-            VCC_WS_activated = True
-            Qc_VCC_WS_gen_directload_W = Qc_output_VCC_WS_max_W
-            Qc_VCC_WS_gen_storage_W = 0.0
-            Qc_from_storage_W, Qc_DailyStorage_content_W = \
-                daily_storage_class.discharge_storage(Q_cooling_unmet_W - Qc_output_VCC_WS_max_W)
-            Qc_VCC_WS_gen_W = Qc_VCC_WS_gen_directload_W + Qc_VCC_WS_gen_storage_W
-
-        # Activation Case 2: The water temperature doesn't allow for free cooling, therefore the VCC is activated.
-        # The maximum VCC output is larger than the unmet cooling demand, therefore the storage is charged.
-        elif T_district_cooling_supply_K - T_source_average_water_body_K < DT_COOL \
-                and Q_cooling_unmet_W < Qc_output_VCC_WS_max_W:
-            VCC_WS_activated = True
-            Qc_VCC_WS_gen_directload_W = Q_cooling_unmet_W
-            Qc_VCC_WS_gen_storage_W, Qc_DailyStorage_content_W = \
-                daily_storage_class.charge_storage(Qc_output_VCC_WS_max_W - Q_cooling_unmet_W)
-            Qc_from_storage_W = 0.0
-            Qc_VCC_WS_gen_W = Qc_VCC_WS_gen_directload_W + Qc_VCC_WS_gen_storage_W
-
-        # Activation Case 3: The water temperature allows for free cooling, therefore the VCC is bypassed.
-        # The unmet cooling demand is larger than the water body's cooling potential, hence the storage is discharged.
-        elif T_district_cooling_supply_K - T_source_average_water_body_K >= DT_COOL \
-                and Q_cooling_unmet_W >= Qc_water_body_remaining_W:
-            FreeCooling_WS_activated = True
-            Qc_FreeCooling_WS_directload_W = Qc_water_body_remaining_W
-            Qc_water_body_to_storage_W = 0.0
-            Qc_from_storage_W, Qc_DailyStorage_content_W = \
-                daily_storage_class.discharge_storage(Q_cooling_unmet_W - Qc_water_body_remaining_W)
-            Qc_FreeCooling_and_DirectStorage_WS_W = Qc_FreeCooling_WS_directload_W + Qc_water_body_to_storage_W
-
-        # Activation Case 4: The water temperature allows for free cooling, therefore the VCC is bypassed.
-        # The water body's cooling potential is larger than the unmet cooling demand, therefore the storage is charged.
-        elif T_district_cooling_supply_K - T_source_average_water_body_K >= DT_COOL \
-                and Q_cooling_unmet_W < Qc_water_body_remaining_W:
-            FreeCooling_WS_activated = True
-            Qc_FreeCooling_WS_directload_W = Q_cooling_unmet_W
-            Qc_water_body_to_storage_W, Qc_DailyStorage_content_W = \
-                daily_storage_class.charge_storage(Qc_water_body_remaining_W - Q_cooling_unmet_W)
-            Qc_from_storage_W = 0.0
-            Qc_FreeCooling_and_DirectStorage_WS_W = Qc_FreeCooling_WS_directload_W + Qc_water_body_to_storage_W
-
-        # Determine the electricity needed for the hydraulic pumps and the VCC if the latter is activated...
-        if VCC_WS_activated:
-            Qc_VCC_WS_gen_W, \
-            E_VCC_WS_req_W = calc_vcc_operation(Qc_VCC_WS_gen_W,
-                                                T_district_cooling_return_K,
-                                                T_district_cooling_supply_K,
-                                                T_source_average_water_body_K,
-                                                capacity_VCC_WS_W,
-                                                VC_chiller)
-
-            # Delta P from linearization after distribution optimization
-            E_pump_WS_req_W = calc_water_body_uptake_pumping(Qc_VCC_WS_gen_W,
-                                                             T_district_cooling_return_K,
-                                                             T_district_cooling_supply_K)
-
-            E_VCC_WS_req_W += E_pump_WS_req_W
-
-            # Calculate metrics for energy balancing
-            # The first expression below corresponds to the second law of thermodynamics, assuming that there are no
-            # losses to the air (i.e. the water in the VCC absorbs and evacuates all heat generated in the VCC incl. losses)
-            Qc_from_water_body_W = Qc_VCC_WS_gen_W + E_VCC_WS_req_W
-            Qc_from_activated_cooling_system_W = Qc_VCC_WS_gen_W - Qc_VCC_WS_gen_storage_W
-            Qc_to_storage_W = Qc_VCC_WS_gen_storage_W
-
-        # ...determine the electricity needed for only the pumps if the systems runs on free cooling.
-        elif FreeCooling_WS_activated:
-            E_pump_WS_req_W = calc_water_body_uptake_pumping(Qc_FreeCooling_and_DirectStorage_WS_W,
-                                                             T_district_cooling_return_K,
-                                                             T_district_cooling_supply_K)
-            E_FreeCooling_req_W = E_pump_WS_req_W
-            E_VCC_WS_req_W = E_pump_WS_req_W  # TODO: Check if direct water body cooling can be displayed separately
-
-            # Calculate metrics for energy balancing
-            Qc_from_water_body_W = Qc_FreeCooling_and_DirectStorage_WS_W
-            Qc_from_activated_cooling_system_W = Qc_FreeCooling_and_DirectStorage_WS_W - Qc_water_body_to_storage_W
-            Qc_to_storage_W = Qc_water_body_to_storage_W
-
-        else:
-            print("no water body source peak load VCC was used")
-        # energy balance: calculate the remaining cooling potential of the water body, the remaining unmet cooling 
-        # demand (after contributions from VCC and storage) of the DCN and the cooling provided by the storage
-        Qc_water_body_remaining_W -= Qc_from_water_body_W
-        Q_cooling_unmet_W = Q_cooling_unmet_W - Qc_from_activated_cooling_system_W - Qc_from_storage_W
-        Qc_DailyStorage_to_storage_W += Qc_to_storage_W
-        Qc_DailyStorage_from_storage_W += Qc_from_storage_W
-
-        # calculate heat released (i.e. anthropogenic heat emissions) from VCC-system back to the water source
-        Q_release_VCC_WS_W = Qc_VCC_WS_gen_W + E_VCC_WS_req_W
-        Q_release_FreeCooling_W = Qc_FreeCooling_and_DirectStorage_WS_W
-        Q_release_to_water_body_W = Qc_from_water_body_W
-
-    return Q_cooling_unmet_W, Qc_water_body_remaining_W, \
-           Qc_DailyStorage_content_W, Qc_DailyStorage_to_storage_W, Qc_DailyStorage_from_storage_W, \
-           Qc_VCC_WS_gen_W, Qc_VCC_WS_gen_directload_W, \
+
+def calc_CCandACH_trigen_operation(trigen, CCGT_operation_data):
+    """
+    Calculate the operation of the combined cycle (CC) power plant (i.e. gas + steam turbine) powering the absorption
+    chiller of the tri-generation plant in the hours it is running: the amount of natural gas (NG) needed to provide the
+    heat of the absorption chiller and the electricity that is produced as a result.
+    TODO: Handle the scenario where the CC dimensions don't allow for this heat to be produced.
+
+    :param trigen: the activation of the tri-generation plant (see :py:func:`initialize_loading_order`)
+    :return: the hourly cooling generated (to the network and to the storage), cooling supplied to the network,
+             electricity generated, natural gas required and heat released by the CC
+    """
+    running = trigen['running']
+    Qc_Trigen_gen_W = np.where(running, trigen['Qc_directload_W'] + trigen['Qc_to_storage_W'], 0.0)
+    Qh_CCGT_req_W = trigen['Qh_CCGT_req_W']
+
+    # operation of the CCGT
+    Q_used_prim_CC_fn_W = CCGT_operation_data['q_input_fn_q_output_W']
+    Q_output_CC_max_W = CCGT_operation_data['q_output_max_W']
+    eta_elec_interpol = CCGT_operation_data['eta_el_fn_q_input']
+
+    # Only part of the demand can be delivered above 100% load. This case should never occur, since it means that
+    # another heat source would be required to run the absorption chiller at the required capacity.
+    if np.any(running & (Qh_CCGT_req_W > Q_output_CC_max_W)):
+        print("WARNING: Gas turbine can not output enough heat to power the absorption chiller!")
+    Q_CHP_gen_W = np.where(running, np.minimum(Qh_CCGT_req_W, Q_output_CC_max_W), 0.0)
+
+    NG_Trigen_req_W = np.zeros(len(running))
+    E_Trigen_NG_gen_W = np.zeros(len(running))
+    NG_Trigen_req_W[running] = Q_used_prim_CC_fn_W(Q_CHP_gen_W[running])
+    E_Trigen_NG_gen_W[running] = eta_elec_interpol(NG_Trigen_req_W[running]) * NG_Trigen_req_W[running]
+
+    # calculate heat released (i.e. anthropogenic heat emissions) from the CC
+    Q_release_CC_W = NG_Trigen_req_W - Q_CHP_gen_W - E_Trigen_NG_gen_W
+
+    return Qc_Trigen_gen_W, trigen['Qc_directload_W'], E_Trigen_NG_gen_W, NG_Trigen_req_W, Q_release_CC_W
+
+
+def calc_WS_VCC_operation(WS_VCC,
+                          T_district_cooling_supply_K,
+                          T_district_cooling_return_K,
+                          T_source_average_water_body_K,
+                          VC_chiller,
+                          capacity_VCC_WS_W):
+    """
+    Calculate the operation of a water source cooling technology in the hours it is running. In case the temperature of
+    the water body is low enough (i.e. T_district_cooling_supply_K - DeltaT) the water is used directly for free
+    cooling. If the temperature of the water body is higher a water source vapour compression chiller is activated.
+
+    :param WS_VCC: the activation of the technology (see :py:func:`initialize_loading_order`)
+    :return: the hourly cooling generated by the VCC and supplied to the network, the cooling generated by free cooling
+             and supplied to the network, the electricity required by the VCC (incl. pumps) and by free cooling, the
+             heat released by the VCC and by free cooling and the heat released to the water body
+    """
+    running = WS_VCC['running']
+    free_cooling = WS_VCC['free_cooling']
+    VCC_WS_activated = running & ~free_cooling
+    Qc_WS_gen_W = np.where(running, WS_VCC['Qc_directload_W'] + WS_VCC['Qc_to_storage_W'], 0.0)
+
+    Qc_VCC_WS_gen_W, \
+    E_VCC_WS_req_W, \
+    Qc_from_water_body_W = calc_hourly_operation(calc_WS_operation, running, 3,
+                                                 Qc_WS_gen_W,
+                                                 free_cooling,
+                                                 T_district_cooling_supply_K,
+                                                 T_district_cooling_return_K,
+                                                 T_source_average_water_body_K,
+                                                 VC_chiller,
+                                                 capacity_VCC_WS_W)
+
+    Qc_VCC_WS_gen_directload_W = np.where(VCC_WS_activated, WS_VCC['Qc_directload_W'], 0.0)
+    Qc_FreeCooling_and_DirectStorage_WS_W = np.where(free_cooling, Qc_WS_gen_W, 0.0)
+    Qc_FreeCooling_WS_directload_W = np.where(free_cooling, WS_VCC['Qc_directload_W'], 0.0)
+    E_FreeCooling_req_W = np.where(free_cooling, E_VCC_WS_req_W, 0.0)
+
+    # calculate heat released (i.e. anthropogenic heat emissions) from VCC-system back to the water source
+    Q_release_VCC_WS_W = Qc_VCC_WS_gen_W + E_VCC_WS_req_W
+    Q_release_FreeCooling_W = Qc_FreeCooling_and_DirectStorage_WS_W
+    Q_release_to_water_body_W = Qc_from_water_body_W
+
+    return Qc_VCC_WS_gen_W, Qc_VCC_WS_gen_directload_W, \
            Qc_FreeCooling_and_DirectStorage_WS_W, Qc_FreeCooling_WS_directload_W, \
            E_VCC_WS_req_W, E_FreeCooling_req_W, \
            Q_release_VCC_WS_W, Q_release_FreeCooling_W, Q_release_to_water_body_W
 
 
-def activate_AS_VCC(activation,
-                    Q_cooling_unmet_W,
-                    Qc_DailyStorage_to_storage_W,
-                    Qc_DailyStorage_from_storage_W,
-                    T_district_cooling_supply_K,
-                    T_district_cooling_return_K,
-                    VC_chiller,
-                    capacity_VCC_AS_W,
-                    daily_storage_class):
+def calc_WS_operation(Qc_WS_gen_W,
+                      free_cooling,
+                      T_district_cooling_supply_K,
+                      T_district_cooling_return_K,
+                      T_source_average_water_body_K,
+                      VC_chiller,
+                      capacity_VCC_WS_W):
+    """
+    The operation of a water source cooling technology supplying ``Qc_WS_gen_W`` in one hour.
+
+    :return: the cooling generated by the vapour compression chiller (zero on free cooling), the electricity needed for
+             the hydraulic pumps and the VCC and the cooling potential of the water body used
     """
-    This function activates air source vapour compression chillers (i.e. VCC connected to cooling towers in the cold
-    water loop). In case the cooling capacity of the VCC is insufficient the cold storage is discharged to try to
-    cover the unmet cooling demand. If the capacity of the VCC is greater than the unmet cooling demand, the remaining
-    capacity is used to charge the thermal storage.
+    if free_cooling:
+        # only the pumps are needed if the system runs on free cooling
+        E_pump_WS_req_W = calc_water_body_uptake_pumping(Qc_WS_gen_W,
+                                                         T_district_cooling_return_K,
+                                                         T_district_cooling_supply_K)
+        return 0.0, E_pump_WS_req_W, Qc_WS_gen_W
+
+    Qc_VCC_WS_gen_W, \
+    E_VCC_WS_req_W = calc_vcc_operation(Qc_WS_gen_W,
+                                        T_district_cooling_return_K,
+                                        T_district_cooling_supply_K,
+                                        T_source_average_water_body_K,
+                                        capacity_VCC_WS_W,
+                                        VC_chiller)
+
+    # Delta P from linearization after distribution optimization
+    E_pump_WS_req_W = calc_water_body_uptake_pumping(Qc_VCC_WS_gen_W,
+                                                     T_district_cooling_return_K,
+                                                     T_district_cooling_supply_K)
+    E_VCC_WS_req_W += E_pump_WS_req_W
+
+    # The water used corresponds to the second law of thermodynamics, assuming that there are no losses to the air
+    # (i.e. the water in the VCC absorbs and evacuates all heat generated in the VCC incl. losses)
+    return Qc_VCC_WS_gen_W, E_VCC_WS_req_W, Qc_VCC_WS_gen_W + E_VCC_WS_req_W
+
+
+def calc_AS_VCC_operation(AS_VCC,
+                          T_district_cooling_supply_K,
+                          T_district_cooling_return_K,
+                          VC_chiller,
+                          capacity_VCC_AS_W):
     """
-    Qc_VCC_AS_gen_W = 0.0
-    Qc_VCC_AS_gen_directload_W = 0.0
-    E_VCC_AS_req_W = 0.0
-
-    Qc_DailyStorage_content_W = daily_storage_class.current_storage_capacity_Wh
-    Qc_to_storage_W = 0.0
-    Qc_from_storage_W = 0.0
-
-    if activation == 1 and Q_cooling_unmet_W > 0.0 \
-            and not np.isclose(T_district_cooling_supply_K, T_district_cooling_return_K):
-
-        # Activation Case 1: The cooling demand exceeds the maximum capacity of the air-source VCC, therefore the cold
-        # storage is discharged to try to cover the unmet demand.
-        if Q_cooling_unmet_W > capacity_VCC_AS_W:
-            Qc_VCC_AS_gen_directload_W = capacity_VCC_AS_W
-            Qc_to_storage_W = 0.0
-            Qc_from_storage_W, Qc_DailyStorage_content_W = \
-                daily_storage_class.discharge_storage(Q_cooling_unmet_W - capacity_VCC_AS_W)
-            Qc_VCC_AS_gen_W = Qc_VCC_AS_gen_directload_W + Qc_to_storage_W
-        # Activation Case 2: The VCC's capacity exceeds the demand, therefore the storage is charged using the excess
-        # cooling supply.
-        else:
-            Qc_VCC_AS_gen_directload_W = Q_cooling_unmet_W
-            Qc_to_storage_W, Qc_DailyStorage_content_W = \
-                daily_storage_class.charge_storage(capacity_VCC_AS_W - Q_cooling_unmet_W)
-            Qc_from_storage_W = 0.0
-            Qc_VCC_AS_gen_W = Qc_VCC_AS_gen_directload_W + Qc_to_storage_W
-
-        # Determine the electricity demand needed to operate the VCC and cooling tower (CT)
-        Qc_VCC_AS_gen_W, \
-        E_VCC_AS_req_W = calc_vcc_CT_operation(Qc_VCC_AS_gen_W,
-                                               T_district_cooling_return_K,
-                                               T_district_cooling_supply_K,
-                                               VCC_T_COOL_IN,
-                                               capacity_VCC_AS_W,
-                                               VC_chiller)
-
-    Q_cooling_unmet_W = Q_cooling_unmet_W - Qc_VCC_AS_gen_directload_W - Qc_from_storage_W
-    Qc_DailyStorage_to_storage_W += Qc_to_storage_W
-    Qc_DailyStorage_from_storage_W += Qc_from_storage_W
+    Calculate the operation of an air source vapour compression chiller (i.e. VCC connected to cooling towers in the
+    cold water loop) in the hours it is running: the electricity demand needed to operate the VCC and cooling tower
+    (CT).
+
+    :param AS_VCC: the activation of the technology (see :py:func:`initialize_loading_order`)
+    :return: the hourly cooling generated, cooling supplied to the network, electricity required and heat released
+    """
+    running = AS_VCC['running']
+    Qc_VCC_AS_gen_W = np.where(running, AS_VCC['Qc_directload_W'] + AS_VCC['Qc_to_storage_W'], 0.0)
+    Qc_VCC_AS_gen_W, \
+    E_VCC_AS_req_W = calc_vcc_CT_operation(Qc_VCC_AS_gen_W,
+                                           T_district_cooling_return_K,
+                                           T_district_cooling_supply_K,
+                                           VCC_T_COOL_IN,
+                                           capacity_VCC_AS_W,
+                                           VC_chiller)
     Q_release_VCC_CT_W = Qc_VCC_AS_gen_W + E_VCC_AS_req_W
 
-    return Q_cooling_unmet_W, \
-           Qc_DailyStorage_content_W, Qc_DailyStorage_to_storage_W, Qc_DailyStorage_from_storage_W, \
-           Qc_VCC_AS_gen_W, Qc_VCC_AS_gen_directload_W, \
-           E_VCC_AS_req_W, \
-           Q_release_VCC_CT_W
+    return Qc_VCC_AS_gen_W, AS_VCC['Qc_directload_W'], E_VCC_AS_req_W, Q_release_VCC_CT_W
 
 
 def calc_vcc_operation(Qc_from_VCC_W, T_DCN_re_K, T_DCN_sup_K, T_source_K, chiller_size, VC_chiller):
@@ -639,14 +765,20 @@ def calc_vcc_CT_operation(Qc_from_VCC_W,
                           T_source_K,
                           size_chiller_CT,
                           VC_chiller):
-    VCC_operation = chiller_vapor_compression.calc_VCC(Qc_from_VCC_W, T_DCN_sup_K, T_DCN_re_K, T_source_K, VC_chiller)
+    """
+    Calculate the hourly operation of a vapour compression chiller connected to a cooling tower (arrays of all hours).
+
+    :return: the cooling supplied by the chiller and the electricity required by the chiller and the cooling tower
+    """
+    VCC_operation = chiller_vapor_compression.calc_VCC_array(Qc_from_VCC_W, T_DCN_sup_K, T_DCN_re_K, T_source_K,
+                                                             VC_chiller)
 
     # unpack outputs
     Qc_CT_VCC_W = VCC_operation['q_cw_W']
     Qc_VCC_W = VCC_operation['q_chw_W']
 
     # calculate cooling tower
-    wdot_CT_Wh = ct_model.calc_CT(Qc_CT_VCC_W, size_chiller_CT)
+    wdot_CT_Wh = ct_model.calc_CT_array(Qc_CT_VCC_W, size_chiller_CT)
 
     # calculate energy consumption and variable costs
     E_used_VCC_W = (VCC_operation['wdot_W'] + wdot_CT_Wh)
@@ -656,23 +788,30 @@ def calc_vcc_CT_operation(Qc_from_VCC_W,
 
 def calc_chiller_absorption_operation(Qc_ACH_req_W, T_DCN_re_K, T_DCN_sup_K, T_ACH_in_C, T_ground_K, chiller_prop,
                                       size_ACH_W):
-    if T_DCN_re_K == T_DCN_sup_K:
-        mdot_ACH_kgpers = 0
-    else:
-        mdot_ACH_kgpers = Qc_ACH_req_W / (
-                (T_DCN_re_K - T_DCN_sup_K) * HEAT_CAPACITY_OF_WATER_JPERKGK)  # required chw flow rate from ACH
+    """
+    Calculate the operation of the absorption chiller of the tri-generation plant and its cooling tower, either for
+    one hour or for the arrays of all hours.
 
-    ACH_operation = chiller_absorption.calc_chiller_main(mdot_ACH_kgpers,
-                                                         T_DCN_sup_K,
-                                                         T_DCN_re_K,
-                                                         T_ACH_in_C,
-                                                         T_ground_K,
-                                                         chiller_prop)
+    :return: the heat rejected to the cooling tower, the heat required from the combined cycle and the electricity
+             required by the chiller and the cooling tower
+    """
+    Qc_ACH_req_W = np.asarray(Qc_ACH_req_W, dtype=float)
+    dT_DCN_K = np.asarray(T_DCN_re_K) - T_DCN_sup_K
+    # required chw flow rate from ACH
+    mdot_ACH_kgpers = np.divide(Qc_ACH_req_W, dT_DCN_K * HEAT_CAPACITY_OF_WATER_JPERKGK,
+                                out=np.zeros(np.broadcast(Qc_ACH_req_W, dT_DCN_K).shape), where=dT_DCN_K != 0.0)
+
+    ACH_operation = chiller_absorption.calc_chiller_main_array(mdot_ACH_kgpers,
+                                                               T_DCN_sup_K,
+                                                               T_DCN_re_K,
+                                                               T_ACH_in_C,
+                                                               T_ground_K,
+                                                               chiller_prop)
 
     Qc_CT_ACH_W = ACH_operation['q_cw_W']
 
     # calculate cooling tower
-    wdot_CT_Wh = ct_model.calc_CT(Qc_CT_ACH_W, size_ACH_W)
+    wdot_CT_Wh = ct_model.calc_CT_array(Qc_CT_ACH_W, size_ACH_W)
 
     # calculate energy consumption and variable costs
     Qh_CHP_ACH_W = ACH_operation['q_hw_W']
@@ -16,6 +16,7 @@ import pandas as pd
 import cea.technologies.solar.photovoltaic as pv
 from cea.constants import HOURS_IN_YEAR
 from cea.optimization.master.emissions_model import calc_emissions_Whyr_to_tonCO2yr
+from cea.optimization.demand_matrix import get_demand_matrix
 
 __author__ = "Sreepathi Bhargava Krishna"
 __copyright__ = "Copyright 2018, Architecture and Building Systems - ETH Zurich"
@@ -78,13 +79,13 @@ def electricity_calculations_of_all_buildings(locator, master_to_slave_vars,
     E_PV_gen_export_W, \
     E_PVT_gen_directload_W, \
     E_PVT_gen_export_W, \
-    E_GRID_directload_W = np.vectorize(electricity_activation_curve)(E_CHP_gen_W,
-                                                                     E_PVT_gen_W,
-                                                                     E_Furnace_dry_gen_W,
-                                                                     E_Furnace_wet_gen_W,
-                                                                     E_Trigen_NG_gen_W,
-                                                                     E_PV_gen_W,
-                                                                     E_sys_req_W)
+    E_GRID_directload_W = electricity_activation_curve(E_CHP_gen_W,
+                                                     E_PVT_gen_W,
+                                                     E_Furnace_dry_gen_W,
+                                                     E_Furnace_wet_gen_W,
+                                                     E_Trigen_NG_gen_W,
+                                                     E_PV_gen_W,
+                                                     E_sys_req_W)
 
     district_electricity_dispatch = {'E_CHP_gen_directload_W': E_CHP_gen_directload_W,
                                      'E_CHP_gen_export_W': E_CHP_gen_export_W,
@@ -173,107 +174,34 @@ def electricity_activation_curve(E_CHP_gen_W,
                                  E_Trigen_NG_gen_W,
                                  E_PV_gen_W,
                                  E_req_hour_W):
-    # CHP
-    if E_CHP_gen_W > 0.0 and E_req_hour_W > 0.0:
-        delta_E = E_CHP_gen_W - E_req_hour_W
-        if delta_E >= 0.0:
-            E_CHP_gen_export_W = delta_E
-            E_CHP_gen_directload_W = E_req_hour_W
-            E_req_hour_W = 0.0
-        else:
-            E_CHP_gen_export_W = 0.0
-            E_CHP_gen_directload_W = E_CHP_gen_W
-            E_req_hour_W = E_req_hour_W - E_CHP_gen_directload_W
-    else:
-        # since we cannot store it is then exported
-        E_CHP_gen_export_W = E_CHP_gen_W
-        E_CHP_gen_directload_W = 0.0
+    """
+    Cover the electricity requirement with the generation units in their loading order (CHP, furnace dry, furnace wet,
+    trigeneration, PV, PVT), the rest is imported from the grid. The generation that is not used on site is exported.
+    Works on the hourly arrays of a whole year at once.
+    """
+    E_req_hour_W = np.asarray(E_req_hour_W, dtype=float)
 
+    # CHP
+    E_CHP_gen_directload_W, E_CHP_gen_export_W, E_req_hour_W = dispatch_to_electricity_requirement(E_CHP_gen_W,
+                                                                                                   E_req_hour_W)
     # FURNACE DRY
-    if E_Furnace_dry_gen_W > 0.0 and E_req_hour_W > 0.0:
-        delta_E = E_Furnace_dry_gen_W - E_req_hour_W
-        if delta_E >= 0.0:
-            E_Furnace_dry_gen_export_W = delta_E
-            E_Furnace_dry_gen_directload_W = E_req_hour_W
-            E_req_hour_W = 0.0
-        else:
-            E_Furnace_dry_gen_export_W = 0.0
-            E_Furnace_dry_gen_directload_W = E_Furnace_dry_gen_W
-            E_req_hour_W = E_req_hour_W - E_Furnace_dry_gen_directload_W
-    else:
-        # since we cannot store it is then exported
-        E_Furnace_dry_gen_export_W = E_Furnace_dry_gen_W
-        E_Furnace_dry_gen_directload_W = 0.0
-
+    E_Furnace_dry_gen_directload_W, E_Furnace_dry_gen_export_W, E_req_hour_W = dispatch_to_electricity_requirement(
+        E_Furnace_dry_gen_W, E_req_hour_W)
     # FURNACE WET
-    if E_Furnace_wet_gen_W > 0.0 and E_req_hour_W > 0.0:
-        delta_E = E_Furnace_wet_gen_W - E_req_hour_W
-        if delta_E >= 0.0:
-            E_Furnace_wet_gen_export_W = delta_E
-            E_Furnace_wet_gen_directload_W = E_req_hour_W
-            E_req_hour_W = 0.0
-        else:
-            E_Furnace_wet_gen_export_W = 0.0
-            E_Furnace_wet_gen_directload_W = E_Furnace_wet_gen_W
-            E_req_hour_W = E_req_hour_W - E_Furnace_wet_gen_directload_W
-    else:
-        # since we cannot store it is then exported
-        E_Furnace_wet_gen_export_W = E_Furnace_wet_gen_W
-        E_Furnace_wet_gen_directload_W = 0.0
-
+    E_Furnace_wet_gen_directload_W, E_Furnace_wet_gen_export_W, E_req_hour_W = dispatch_to_electricity_requirement(
+        E_Furnace_wet_gen_W, E_req_hour_W)
     # CCGT_cooling
-    if E_Trigen_NG_gen_W > 0.0 and E_req_hour_W > 0.0:
-        delta_E = E_Trigen_NG_gen_W - E_req_hour_W
-        if delta_E >= 0.0:
-            E_Trigen_gen_export_W = delta_E
-            E_Trigen_gen_directload_W = E_req_hour_W
-            E_req_hour_W = 0.0
-        else:
-            E_Trigen_gen_export_W = 0.0
-            E_Trigen_gen_directload_W = E_Trigen_NG_gen_W
-            E_req_hour_W = E_req_hour_W - E_Trigen_gen_directload_W
-    else:
-        # since we cannot store it is then exported
-        E_Trigen_gen_export_W = E_Trigen_NG_gen_W
-        E_Trigen_gen_directload_W = 0.0
-
+    E_Trigen_gen_directload_W, E_Trigen_gen_export_W, E_req_hour_W = dispatch_to_electricity_requirement(
+        E_Trigen_NG_gen_W, E_req_hour_W)
     # PV
-    if E_PV_gen_W > 0.0 and E_req_hour_W > 0.0:
-        delta_E = E_PV_gen_W - E_req_hour_W
-        if delta_E >= 0.0:
-            E_PV_gen_export_W = delta_E
-            E_PV_gen_directload_W = E_req_hour_W
-            E_req_hour_W = 0.0
-        else:
-            E_PV_gen_export_W = 0.0
-            E_PV_gen_directload_W = E_PV_gen_W
-            E_req_hour_W = E_req_hour_W - E_PV_gen_directload_W
-    else:
-        # since we cannot store it is then exported
-        E_PV_gen_export_W = E_PV_gen_W
-        E_PV_gen_directload_W = 0.0
-
+    E_PV_gen_directload_W, E_PV_gen_export_W, E_req_hour_W = dispatch_to_electricity_requirement(E_PV_gen_W,
+                                                                                                 E_req_hour_W)
     # PVT
-    if E_PVT_gen_W > 0.0 and E_req_hour_W > 0.0:
-        delta_E = E_PVT_gen_W - E_req_hour_W
-        if delta_E >= 0.0:
-            E_PVT_gen_export_W = delta_E
-            E_PVT_gen_directload_W = E_req_hour_W
-            E_req_hour_W = 0.0
-        else:
-            E_PVT_gen_export_W = 0.0
-            E_PVT_gen_directload_W = E_PVT_gen_W
-            E_req_hour_W = E_req_hour_W - E_PVT_gen_directload_W
-    else:
-        # since we cannot store it is then exported
-        E_PVT_gen_export_W = E_PVT_gen_W
-        E_PVT_gen_directload_W = 0.0
+    E_PVT_gen_directload_W, E_PVT_gen_export_W, E_req_hour_W = dispatch_to_electricity_requirement(E_PVT_gen_W,
+                                                                                                   E_req_hour_W)
 
     # COVERED BY THE GRID (IMPORTS)
-    if E_req_hour_W > 0.0:
-        E_GRID_directload_W = E_req_hour_W
-    else:
-        E_GRID_directload_W = 0.0
+    E_GRID_directload_W = np.where(E_req_hour_W > 0.0, E_req_hour_W, 0.0)
 
     return E_CHP_gen_directload_W, \
            E_CHP_gen_export_W, \
@@ -290,6 +218,23 @@ def electricity_activation_curve(E_CHP_gen_W,
            E_GRID_directload_W
 
 
+def dispatch_to_electricity_requirement(E_gen_W, E_req_hour_W):
+    """
+    Use the generation of one unit for the electricity requirement in the hours it is running, since it cannot be
+    stored the rest is exported.
+
+    :return: the generation used on site, the generation exported and the requirement still to cover, by hour
+    """
+    E_gen_W = np.asarray(E_gen_W, dtype=float)
+    running = (E_gen_W > 0.0) & (E_req_hour_W > 0.0)
+    delta_E = E_gen_W - E_req_hour_W
+    covered = running & (delta_E >= 0.0)
+    E_gen_directload_W = np.where(running, np.where(covered, E_req_hour_W, E_gen_W), 0.0)
+    E_gen_export_W = np.where(running, np.where(covered, delta_E, 0.0), E_gen_W)
+    E_req_hour_W = np.where(running, np.where(covered, 0.0, E_req_hour_W - E_gen_W), E_req_hour_W)
+    return E_gen_directload_W, E_gen_export_W, E_req_hour_W
+
+
 def calc_district_system_electricity_generated(locator,
                                                master_to_slave_vars):
     # TODO: Handle the case where no PV potential has been calculated (assuming no PV capacity is installed)
@@ -349,109 +294,73 @@ def extract_electricity_demand_buildings(master_to_slave_vars, building_names, l
     building_names_heating = master_to_slave_vars.building_names_heating
     building_names_cooling = master_to_slave_vars.building_names_cooling
 
-    # system requirements
-    E_hs_ww_req_W = np.zeros(HOURS_IN_YEAR)
-    E_cs_cre_cdata_req_W = np.zeros(HOURS_IN_YEAR)
-    E_hs_ww_req_building_scale_W = np.zeros(HOURS_IN_YEAR)
-    E_cs_cre_cdata_req_building_scale_W = np.zeros(HOURS_IN_YEAR)
-
-    # End-use demands
-    Eal_req_W = np.zeros(HOURS_IN_YEAR)
-    Edata_req_W = np.zeros(HOURS_IN_YEAR)
-    Epro_req_W = np.zeros(HOURS_IN_YEAR)
-    Eaux_req_W = np.zeros(HOURS_IN_YEAR)
-
-    # for all buildings with electricity demand
-    for name in building_names:  # adding the electricity demand of
-        building_demand = pd.read_csv(locator.get_demand_results_file(name))
-        # end-use electrical demands
-        Eal_req_W += (building_demand['Eal_kWh'] * 1000).values
-        Edata_req_W += (building_demand['Edata_kWh'] * 1000).values
-        Epro_req_W += (building_demand['Epro_kWh'] * 1000).values
-        Eaux_req_W += (building_demand['Eaux_kWh'] * 1000).values
+    # the hourly demand of all buildings, loaded once per optimization (see cea.optimization.demand_matrix)
+    demand_matrix = get_demand_matrix(locator)
+    demand = demand_matrix.demand
+
+    # the buildings using the electricity of their own heating and cooling systems, or of decentralized units
+    buildings_E_hs_ww = []
+    buildings_E_cs_cre = []
+    buildings_E_cdata = []
+    buildings_heating_building_scale = []
+    buildings_cooling_building_scale = []
 
     # when the two networks are present
     if master_to_slave_vars.DHN_exists and master_to_slave_vars.DCN_exists:
         for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
             if name in buildings_district_scale_to_district_heating and name in buildings_district_scale_to_district_cooling:
                 # if connected to the heating network
-                E_hs_ww_req_W += np.zeros(HOURS_IN_YEAR)
-                E_cs_cre_cdata_req_W += np.zeros(HOURS_IN_YEAR)
+                pass
             elif name in buildings_district_scale_to_district_heating:
                 # if disconnected from the heating network
-                E_hs_ww_req_W += np.zeros(HOURS_IN_YEAR)
-                if master_to_slave_vars.WasteServersHeatRecovery == 1:
-                    E_cs_cre_cdata_req_W += ((building_demand['E_cs_kWh'] +
-                                             building_demand['E_cre_kWh']) * 1000).values  # to W
-                else:
-                    E_cs_cre_cdata_req_W += ((building_demand['E_cs_kWh'] +
-                                             building_demand['E_cre_kWh'] +
-                                             building_demand['E_cdata_kWh']) * 1000).values  # to W
+                buildings_E_cs_cre.append(name)
+                if master_to_slave_vars.WasteServersHeatRecovery != 1:
+                    buildings_E_cdata.append(name)
             elif name in buildings_district_scale_to_district_cooling:
-                E_hs_ww_req_W += ((building_demand['E_hs_kWh'] +
-                                  building_demand['E_ww_kWh']) * 1000).values  # to W
-                E_cs_cre_cdata_req_W += np.zeros(HOURS_IN_YEAR)
+                buildings_E_hs_ww.append(name)
             else:
-                building_dencentralized_system_heating = pd.read_csv(
-                    locator.get_optimization_decentralized_folder_building_result_heating_activation(name))
-                building_dencentralized_system_cooling = pd.read_csv(
-                    locator.get_optimization_decentralized_folder_building_result_cooling_activation(name))
-                E_hs_ww_req_building_scale_W += building_dencentralized_system_heating['E_hs_ww_req_W'].values
-                E_cs_cre_cdata_req_building_scale_W += building_dencentralized_system_cooling['E_cs_cre_cdata_req_W'].values
+                buildings_heating_building_scale.append(name)
+                buildings_cooling_building_scale.append(name)
 
     # if only a district heating network exists.
     elif master_to_slave_vars.DHN_exists:
         for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
             if name in buildings_district_scale_to_district_heating:
                 # if connected to the heating network
-                E_hs_ww_req_W += np.zeros(HOURS_IN_YEAR)  # because it is connected to the heating network
-                if master_to_slave_vars.WasteServersHeatRecovery == 1:
-                    E_cs_cre_cdata_req_W += ((building_demand['E_cs_kWh'] +
-                                             building_demand['E_cre_kWh']) * 1000).values  # to W
-                else:
-                    E_cs_cre_cdata_req_W += ((building_demand['E_cs_kWh'] +
-                                             building_demand['E_cre_kWh'] +
-                                             building_demand['E_cdata_kWh']) * 1000).values  # to W
+                buildings_E_cs_cre.append(name)
+                if master_to_slave_vars.WasteServersHeatRecovery != 1:
+                    buildings_E_cdata.append(name)
             else:
                 # if not then get airconditioning loads of the baseline
-                E_cs_cre_cdata_req_W += ((building_demand['E_cs_kWh'] +
-                                         building_demand['E_cre_kWh'] +
-                                         building_demand['E_cdata_kWh']) * 1000).values  # to W
+                buildings_E_cs_cre.append(name)
+                buildings_E_cdata.append(name)
                 if name in building_names_heating:
                     # if there is a decentralized heating use it.
-                    building_dencentralized_system = pd.read_csv(
-                        locator.get_optimization_decentralized_folder_building_result_heating_activation(name))
-                    E_hs_ww_req_building_scale_W += building_dencentralized_system['E_hs_ww_req_W'].values
+                    buildings_heating_building_scale.append(name)
 
     # if only a district cooling network exists.
     elif master_to_slave_vars.DCN_exists:
         for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
-            E_hs_ww_req_W += ((building_demand['E_hs_kWh'] +
-                               building_demand['E_ww_kWh']) * 1000).values  # to W
-            if name in buildings_district_scale_to_district_cooling:
-                E_cs_cre_cdata_req_W += np.zeros(HOURS_IN_YEAR)
-            else:
-                if name in building_names_cooling:
-                    # if there is a decentralized cooling use it.
-                    building_dencentralized_system = pd.read_csv(
-                        locator.get_optimization_decentralized_folder_building_result_cooling_activation(name))
-                    E_cs_cre_cdata_req_building_scale_W += building_dencentralized_system['E_cs_cre_cdata_req_W'].values
+            buildings_E_hs_ww.append(name)
+            if name not in buildings_district_scale_to_district_cooling and name in building_names_cooling:
+                # if there is a decentralized cooling use it.
+                buildings_cooling_building_scale.append(name)
 
     E_req_buildings = {
         # end-use demands
-        'Eal_req_W': Eal_req_W,
-        'Edata_req_W': Edata_req_W,
-        'Epro_req_W': Epro_req_W,
-        'Eaux_req_W': Eaux_req_W,
+        'Eal_req_W': demand.sum('Eal_kWh', building_names) * 1000,
+        'Edata_req_W': demand.sum('Edata_kWh', building_names) * 1000,
+        'Epro_req_W': demand.sum('Epro_kWh', building_names) * 1000,
+        'Eaux_req_W': demand.sum('Eaux_kWh', building_names) * 1000,
 
         # system requirements (by decentralized units)
-        'E_hs_ww_req_district_scale_W': E_hs_ww_req_W,
-        'E_cs_cre_cdata_req_district_scale_W': E_cs_cre_cdata_req_W,
-        'E_hs_ww_req_building_scale_W': E_hs_ww_req_building_scale_W,
-        'E_cs_cre_cdata_req_building_scale_W': E_cs_cre_cdata_req_building_scale_W
+        'E_hs_ww_req_district_scale_W': demand.sum('E_hs_ww_kWh', buildings_E_hs_ww) * 1000,  # to W
+        'E_cs_cre_cdata_req_district_scale_W': (demand.sum('E_cs_cre_kWh', buildings_E_cs_cre) +
+                                                demand.sum('E_cdata_kWh', buildings_E_cdata)) * 1000,  # to W
+        'E_hs_ww_req_building_scale_W': demand_matrix.heating_activation.sum('E_hs_ww_req_W',
+                                                                             buildings_heating_building_scale),
+        'E_cs_cre_cdata_req_building_scale_W': demand_matrix.cooling_activation.sum('E_cs_cre_cdata_req_W',
+                                                                                    buildings_cooling_building_scale)
     }
 
     return E_req_buildings
@@ -465,51 +374,40 @@ def extract_fuels_demand_buildings(master_to_slave_vars, building_names, locator
     # these are all the buildings with heating and cooling demand
     building_names_heating = master_to_slave_vars.building_names_heating
 
-    # system requirements
-    NG_hs_ww_req_W = np.zeros(HOURS_IN_YEAR)
+    # the hourly demand of all buildings, loaded once per optimization (see cea.optimization.demand_matrix)
+    demand_matrix = get_demand_matrix(locator)
+
+    # the buildings using the natural gas of their own heating systems, or of decentralized boilers
+    buildings_NG_hs_ww = []
+    buildings_heating_building_scale = []
 
     # when the two networks are present
     if master_to_slave_vars.DHN_exists and master_to_slave_vars.DCN_exists:
         for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
-            if name in buildings_district_scale_to_district_heating and name in buildings_district_scale_to_district_cooling:
+            if name in buildings_district_scale_to_district_heating:
                 # if connected to the heating network
-                NG_hs_ww_req_W += 0.0
-            elif name in buildings_district_scale_to_district_heating:
-                # if disconnected from the heating network
-                NG_hs_ww_req_W += 0.0
+                pass
             elif name in buildings_district_scale_to_district_cooling:
-                NG_hs_ww_req_W += (building_demand['NG_hs_kWh'] + building_demand['NG_ww_kWh']) * 1000  # to W
+                buildings_NG_hs_ww.append(name)
             else:
-                building_dencentralized_system_heating = pd.read_csv(
-                    locator.get_optimization_decentralized_folder_building_result_heating_activation(name))
-                NG_hs_ww_req_W += building_dencentralized_system_heating['NG_BackupBoiler_req_W'] + \
-                                  building_dencentralized_system_heating['NG_Boiler_req_W']
+                buildings_heating_building_scale.append(name)
 
     # if only a district heating network exists.
     elif master_to_slave_vars.DHN_exists:
         for name in building_names:
-            if name in buildings_district_scale_to_district_heating:
-                # if connected to the heating network
-                NG_hs_ww_req_W += 0.0
-            else:
-                # if not then get air-conditioning loads of the baseline
-                if name in building_names_heating:
-                    # if there is a decentralized heating use it.
-                    building_dencentralized_system = pd.read_csv(
-                        locator.get_optimization_decentralized_folder_building_result_heating_activation(name))
-                    NG_hs_ww_req_W += building_dencentralized_system['NG_BackupBoiler_req_W'] + \
-                                      building_dencentralized_system['NG_Boiler_req_W']
-                else:
-                    # if not (cae of building with electric load and not heating)
-                    NG_hs_ww_req_W += 0.0
+            if name not in buildings_district_scale_to_district_heating and name in building_names_heating:
+                # if there is a decentralized heating use it.
+                buildings_heating_building_scale.append(name)
 
     # if only a district cooling network exists.
     elif master_to_slave_vars.DCN_exists:
-        for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
-            # if not then get electric boilers etc form baseline.
-            NG_hs_ww_req_W += (building_demand['NG_hs_kWh'] + building_demand['NG_ww_kWh']) * 1000  # to W
+        # if not then get electric boilers etc form baseline.
+        buildings_NG_hs_ww = list(building_names)
+
+    heating_activation = demand_matrix.heating_activation
+    NG_hs_ww_req_W = (demand_matrix.demand.sum('NG_hs_ww_kWh', buildings_NG_hs_ww) * 1000 +  # to W
+                      heating_activation.sum('NG_BackupBoiler_req_W', buildings_heating_building_scale) +
+                      heating_activation.sum('NG_Boiler_req_W', buildings_heating_building_scale))
 
     NG_req_buildings = {
         # system requirements (by decentralized units)
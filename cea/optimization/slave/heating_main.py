@@ -158,17 +158,17 @@ def district_heating_network(locator,
         NG_BaseBoiler_req_W, \
         NG_PeakBoiler_req_W, \
         WetBiomass_Furnace_req_W, \
-        DryBiomass_Furnace_req_W = np.vectorize(heating_source_activator)(Q_thermal_req_W,
-                                                                          master_to_slave_variables,
-                                                                          Q_therm_GHP_W,
-                                                                          T_source_average_GHP_W,
-                                                                          T_source_average_Lake_K,
-                                                                          Q_therm_Lake_W,
-                                                                          Q_therm_Sew_W,
-                                                                          T_source_average_sewage_K,
-                                                                          T_district_heating_supply_K,
-                                                                          T_district_heating_return_K
-                                                                          )
+        DryBiomass_Furnace_req_W = heating_source_activator(Q_thermal_req_W,
+                                                            master_to_slave_variables,
+                                                            Q_therm_GHP_W,
+                                                            T_source_average_GHP_W,
+                                                            T_source_average_Lake_K,
+                                                            Q_therm_Lake_W,
+                                                            Q_therm_Sew_W,
+                                                            T_source_average_sewage_K,
+                                                            T_district_heating_supply_K,
+                                                            T_district_heating_return_K
+                                                            )
 
         # COgen size for electricity production
         master_to_slave_variables.CCGT_SIZE_electrical_W = max(E_CHP_gen_W)
@@ -0,0 +1,47 @@
+"""
+Helpers of the hourly dispatch of the slave (see :py:mod:`cea.optimization.slave.heating_resource_activation`,
+:py:mod:`cea.optimization.slave.cooling_resource_activation` and :py:mod:`cea.optimization.slave.electricity_main`).
+
+The loading order of the supply units is evaluated on the hourly arrays of a whole year at once: each unit covers what
+the units before it left unmet, in the hours it is running. The operation of a unit is only calculated for the hours it
+is running.
+"""
+
+import numpy as np
+
+__author__ = "Daren Thomas"
+__copyright__ = "Copyright 2024, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+
+def calc_hourly_operation(model, running, outputs, *args):
+    """
+    Calculate the operation of a supply unit with ``model`` in the hours it is ``running``. The outputs are zero in
+    the other hours.
+
+    :param model: the model of the unit, called with the values of ``args`` of one hour
+    :param np.ndarray running: boolean array, True in the hours the unit is running
+    :param int outputs: the number of values returned by ``model``
+    :param args: the arguments of ``model``, either hourly arrays or values that are the same in all hours
+    :return: one hourly array per output of ``model`` (a single array if ``outputs`` is 1)
+    """
+    hours = np.flatnonzero(running)
+    results = [np.zeros(len(running)) for _ in range(outputs)]
+    if hours.size:
+        args = [arg[hours] if np.ndim(arg) else arg for arg in args]
+        values = np.vectorize(model, otypes=[float] * outputs)(*args)
+        if outputs == 1:
+            values = [values]
+        for result, value in zip(results, values):
+            result[hours] = value
+    return results[0] if outputs == 1 else tuple(results)
+
+
+def as_hourly(values, hours):
+    """``values`` as a float array of length ``hours``, repeating a value that is the same in all hours"""
+    return np.broadcast_to(np.asarray(values, dtype=float), (hours,))
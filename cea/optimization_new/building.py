@@ -18,18 +18,19 @@ __status__ = "Production"
 
 import pandas as pd
 from cea.utilities import dbf
+from cea.demand.demand_writers import read_demand_results
 from cea.optimization_new.supplySystem import SupplySystem
 from cea.optimization_new.containerclasses.energyFlow import EnergyFlow
 from cea.optimization_new.containerclasses.supplySystemStructure import SupplySystemStructure
+from cea.utilities.database_cache import read_database
 
 
 class Building(object):
     _base_supply_systems = pd.DataFrame()
     _supply_system_database = pd.DataFrame()
 
-    def __init__(self, identifier, demands_file_path):
+    def __init__(self, identifier):
         self.identifier = identifier
-        self.demands_file_path = demands_file_path
         self.stand_alone_supply_system = SupplySystem()
         self.crs = None
         self._demand_flow = EnergyFlow()
@@ -90,12 +91,12 @@ class Building(object):
         else:
             raise ValueError("Please only assign 'stand_alone' or 'network_i' to the base connectivity of the building.")
 
-    def load_demand_profile(self, energy_system_type='DH'):
+    def load_demand_profile(self, file_locator, energy_system_type='DH'):
         """
         Load the buildings relevant demand profile, i.e. 'QC_sys_kWh' for the district heating optimisation &
-        'QC_sys_kWh' for the district cooling optimisation)
+        'QC_sys_kWh' for the district cooling optimisation), in whichever format the demand results were written.
         """
-        demand_dataframe = pd.read_csv(self.demands_file_path)
+        demand_dataframe = read_demand_results(file_locator, self.identifier)
 
         if energy_system_type == 'DC':
             self.demand_flow = EnergyFlow('primary', 'consumer', 'T10W', demand_dataframe['QC_sys_kWh'])
@@ -146,11 +147,11 @@ class Building(object):
 
         # load the 'assemblies'-supply systems database as a class variable
         if Building._supply_system_database.empty:
-            supply_systems_database_file = pd.ExcelFile(file_locator.get_database_supply_assemblies())
+            supply_systems_database_file = file_locator.get_database_supply_assemblies()
             if energy_system_type == 'DH':
-                Building._supply_system_database = pd.read_excel(supply_systems_database_file, 'HEATING')
+                Building._supply_system_database = read_database(supply_systems_database_file, 'HEATING')
             elif energy_system_type == 'DC':
-                Building._supply_system_database = pd.read_excel(supply_systems_database_file, 'COOLING')
+                Building._supply_system_database = read_database(supply_systems_database_file, 'COOLING')
             else:
                 raise ValueError(f"'{energy_system_type}' is not a valid energy system type. No appropriate "
                                  f"'assemblies'-supply system database could therefore be loaded.")
@@ -33,6 +33,7 @@ from cea.technologies.boiler import calc_boiler_const
 from cea.technologies.cogeneration import calc_cogen_const
 from cea.technologies.heatpumps import calc_HP_const
 from cea.technologies.cooling_tower import calc_CT_const
+from cea.utilities.database_cache import read_database
 
 
 class Component(object):
@@ -68,7 +69,7 @@ class Component(object):
     @staticmethod
     def initialize_class_variables(domain):
         """ Fetch components database from file and save it as a class variable (dict of pd.DataFrames)"""
-        Component._components_database = pd.read_excel(domain.locator.get_database_conversion_systems(), None)
+        Component._components_database = read_database(domain.locator.get_database_conversion_systems(), None)
         Component._model_complexity = domain.config.optimization_new.component_efficiency_model_complexity
         Component.code_to_class_mapping = Component.create_code_mapping(Component._components_database)
         AbsorptionChiller.initialize_subclass_variables(Component._components_database)
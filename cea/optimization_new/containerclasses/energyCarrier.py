@@ -22,6 +22,7 @@ __status__ = "Production"
 
 import pandas as pd
 import numpy as np
+from cea.utilities.database_cache import read_database
 
 
 class EnergyCarrier(object):
@@ -150,8 +151,8 @@ class EnergyCarrier(object):
     def _load_energy_carriers(locator):
         """ Fetch a complete description of available energy carriers from the FEEDSTOCKS database """
         # Load the feedstock database
-        feedstock = pd.ExcelFile(locator.get_database_feedstocks())
-        energy_carriers_overview = feedstock.parse('ENERGY_CARRIERS')
+        feedstock = read_database(locator.get_database_feedstocks(), sheet_name=None)
+        energy_carriers_overview = feedstock['ENERGY_CARRIERS']
 
         # Correct potential basic format errors if there are any
         energy_carriers_overview['cost_and_ghg_tab'].fillna('-', inplace=True)
@@ -162,14 +163,14 @@ class EnergyCarrier(object):
         # Check if tab references are valid
         referenced_tabs = [tab_name for tab_name in list(set(energy_carriers_overview['cost_and_ghg_tab']))
                            if tab_name != '-']
-        if not all([tab_name in feedstock.sheet_names for tab_name in referenced_tabs]):
+        if not all([tab_name in feedstock.keys() for tab_name in referenced_tabs]):
             raise ValueError('The energy carriers data base contains references to tabs that do not exist in the '
                              'feedstock data base. Please make sure the tabs are named correctly.')
 
         # Fetch unitary ghg emissions as well as buy and sell prices for each energy carrier from the feedstock database
         energy_carrier_properties = pd.DataFrame(columns=['cost_and_ghg_tab', 'unit_cost_USD.kWh', 'unit_ghg_kgCO2.kWh'])
         for tab_name in referenced_tabs:
-            cost_and_ghg = feedstock.parse(tab_name)
+            cost_and_ghg = feedstock[tab_name]
             EnergyCarrier._daily_ghg_profile[tab_name] = \
                 {hour: ghg_emission * 3.6 for hour, ghg_emission in zip(cost_and_ghg['hour'], cost_and_ghg['GHG_kgCO2MJ'])}
             EnergyCarrier._daily_buy_price_profile[tab_name] = \
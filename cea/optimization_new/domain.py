@@ -15,9 +15,7 @@ __maintainer__ = "NA"
 __email__ = "mathias.niffeler@sec.ethz.ch"
 __status__ = "Production"
 
-from os.path import exists
 import time
-import numpy as np
 import pandas as pd
 import geopandas as gpd
 import multiprocessing
@@ -29,6 +27,7 @@ from deap import base, tools, algorithms
 
 import cea.config
 from cea.inputlocator import InputLocator
+from cea.demand.demand_writers import demand_results_exist
 from cea.utilities import epwreader
 from cea.utilities.date import get_date_range_hours_from_year
 from cea.utilities.standardize_coordinates import get_geographic_coordinate_system
@@ -84,12 +83,11 @@ class Domain(object):
         if buildings_in_domain is None:
             buildings_in_domain = shp_file.Name
 
-        building_demand_files = np.vectorize(self.locator.get_demand_results_file)(buildings_in_domain)
         network_type = self.config.optimization_new.network_type
-        for (building_code, demand_file) in zip(buildings_in_domain.values, building_demand_files):
-            if exists(demand_file):
-                building = Building(building_code, demand_file)
-                building.load_demand_profile(network_type)
+        for building_code in buildings_in_domain.values:
+            if demand_results_exist(self.locator, building_code):
+                building = Building(building_code)
+                building.load_demand_profile(self.locator, network_type)
                 if not max(building.demand_flow.profile) > 0:
                     continue
                 building.load_building_location(shp_file)
@@ -40,6 +40,7 @@ from cea.constants import P_WATER_KGPERM3, FT_WATER_TO_PA, FT_TO_M, M_WATER_TO_P
 from cea.technologies.constants import TYPE_MAT_DEFAULT, PIPE_DIAMETER_DEFAULT
 from cea.optimization.constants import PUMP_ETA
 from cea.optimization_new.building import Building
+from cea.utilities.database_cache import read_database
 
 class Network(object):
     _coordinate_reference_system = None
@@ -395,7 +396,7 @@ class Network(object):
         Network._load_pot_network(domain)
         Network._set_potential_network_terminals(domain)
         Network._set_building_operation_parameters(domain)
-        Network._pipe_catalog = pd.read_excel(Network._domain_locator.get_database_distribution_systems(),
+        Network._pipe_catalog = read_database(Network._domain_locator.get_database_distribution_systems(),
                                               sheet_name='THERMAL_GRID')
 
     @staticmethod
@@ -12,6 +12,8 @@ import cea.inputlocator
 import cea.plots
 import cea.plots.cache
 from cea.plots.base import PlotBase
+from cea.demand.demand_writers import read_demand_results, get_demand_results_format, demand_results_exist
+from cea.demand.demand_writers import DEMAND_STORE
 
 """
 Implements py:class:`cea.plots.DemandPlotBase` as a base class for all plots in the category "demand" and also
@@ -111,7 +113,17 @@ class DemandPlotBase(PlotBase):
         self.input_files = [(self.locator.get_total_demand, [])]  # all these scripts depend on demand
         # Add building to input files if buildings are selected
         if self.buildings:
-            self.input_files += [(self.locator.get_demand_results_file, [building]) for building in self.buildings]
+            # results in the consolidated demand store are written together with the total demand file
+            self.input_files += [(self.locator.get_demand_results_file, [building, results_format])
+                                 for building, results_format in zip(self.buildings,
+                                                                     map(self.demand_results_format, self.buildings))
+                                 if results_format != DEMAND_STORE]
+
+    def demand_results_format(self, building):
+        """The format of the demand results of a building (csv if they don't exist yet, to report them as missing)"""
+        if demand_results_exist(self.locator, building):
+            return get_demand_results_format(self.locator, building)
+        return 'csv'
 
     @property
     def hourly_loads(self):
@@ -128,7 +140,7 @@ class DemandPlotBase(PlotBase):
         return df1
 
     def _calculate_hourly_loads(self):
-        data_demand = functools.reduce(self.add_fields, (pd.read_csv(self.locator.get_demand_results_file(building))
+        data_demand = functools.reduce(self.add_fields, (read_demand_results(self.locator, building)
                                                          for building in self.buildings)).set_index('DATE')
         return data_demand
 
@@ -138,8 +150,7 @@ class DemandPlotBase(PlotBase):
         return data_demand
 
     def calculate_external_temperature(self):
-        data_path = self.locator.get_demand_results_file(self.buildings[0])
-        data = pd.read_csv(data_path)
+        data = read_demand_results(self.locator, self.buildings[0])
         data = self.resample_time_data(data)
         return data
 
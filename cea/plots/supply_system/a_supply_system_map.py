@@ -15,6 +15,7 @@ from cea.plots.variable_naming import get_color_array
 from cea.technologies.network_layout.main import layout_network, NetworkLayout
 from cea.utilities.standardize_coordinates import get_geographic_coordinate_system
 from cea.utilities.dbf import dbf_to_dataframe
+from cea.utilities.database_cache import read_database
 
 __author__ = "Jimeno Fonseca"
 __copyright__ = "Copyright 2019, Architecture and Building Systems - ETH Zurich"
@@ -189,7 +190,7 @@ class SupplySystemMapPlot(cea.plots.supply_system.SupplySystemPlotBase):
 
 def get_building_connectivity(locator):
     supply_systems = dbf_to_dataframe(locator.get_building_supply())
-    data_all_in_one_systems = pd.read_excel(locator.get_database_supply_assemblies(), sheet_name=None)
+    data_all_in_one_systems = read_database(locator.get_database_supply_assemblies(), sheet_name=None)
     heating_infrastructure = data_all_in_one_systems['HEATING']
     heating_infrastructure = heating_infrastructure.set_index('code')['scale']
 
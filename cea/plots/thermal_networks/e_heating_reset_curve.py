@@ -7,6 +7,7 @@ import pandas as pd
 import plotly.graph_objs as go
 from plotly.offline import plot
 import cea.plots.thermal_networks
+from cea.demand.demand_writers import read_demand_results
 from cea.plots.variable_naming import LOGO, NAMING, COLOR
 
 __author__ = "Lennart Rogenhofer"
@@ -89,7 +90,7 @@ class SupplyReturnAmbientCurvePlot(cea.plots.thermal_networks.ThermalNetworksPlo
         This assumes that all buildings are relatively close to each other and have the same ambient temperature.
         """
         building_name = self.locator.get_zone_building_names()[0]  # read in first building name
-        demand_file = pd.read_csv(self.locator.get_demand_results_file(building_name))
+        demand_file = read_demand_results(self.locator, building_name, columns=['T_ext_C'])
         ambient_temp = demand_file["T_ext_C"].values  # read in amb temp
         return pd.DataFrame(ambient_temp)
 
@@ -19,6 +19,7 @@ __maintainer__ = "Daren Thomas"
 __email__ = "cea@arch.ethz.ch"
 __status__ = "Production"
 
+import pyarrow as pa
 from pyarrow import feather
 
 from cea.constants import HOURS_IN_YEAR
@@ -28,6 +29,17 @@ BUILT_IN_BINARIES_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)
 REQUIRED_BINARIES = {"ds_illum", "epw2wea", "gen_dc", "oconv", "radfiles2daysim", "rtrace_dc"}
 REQUIRED_LIBS = {"rayinit.cal", "isotrop_sky.cal"}
 
+# memory used per sensor when streaming the results: the hourly results (float32, up to a leap year) and the
+# transient copies made when aggregating and writing them
+BYTES_PER_SENSOR = 2 * 4 * (HOURS_IN_YEAR + 24)
+
+# number of hours aggregated at a time by write_aggregated_results
+AGGREGATION_BLOCK_HOURS = 730
+
+# the surfaces of the aggregated results of a building (sometimes windows do not exist)
+SURFACES = ['windows_east', 'windows_west', 'windows_south', 'windows_north',
+            'walls_east', 'walls_west', 'walls_south', 'walls_north', 'roofs_top']
+
 
 class GridSize(NamedTuple):
     roof: int
@@ -281,7 +293,13 @@ def calc_sensors_zone(building_names, locator, grid_size: GridSize, geometry_pic
 
 def isolation_daysim(chunk_n, cea_daysim, building_names, locator, radiance_parameters, write_sensor_data,
                      grid_size: GridSize,
-                     max_global, weatherfile, geometry_pickle_dir):
+                     max_global, weatherfile, geometry_pickle_dir, max_memory_mb=0):
+    """
+    Run the Daysim simulation of a chunk of buildings and write their results.
+
+    :return: the number of sensors of the chunk
+    :rtype: int
+    """
     # initialize daysim project
     daysim_project = cea_daysim.initialize_daysim_project('chunk_{n}'.format(n=chunk_n))
     print('Creating daysim project in: {daysim_dir}'.format(daysim_dir=daysim_project.project_path))
@@ -299,6 +317,7 @@ def isolation_daysim(chunk_n, cea_daysim, building_names, locator, radiance_para
 
     print(f"Starting Daysim simulation for buildings: {names_zone}")
     print(f"Total number of sensors: {len(sensors_coords_zone)}")
+    del sensors_coords_zone, sensors_dir_zone
 
     print('Writing radiance parameters')
     daysim_project.write_radiance_parameters(**radiance_parameters)
@@ -307,88 +326,141 @@ def isolation_daysim(chunk_n, cea_daysim, building_names, locator, radiance_para
     daysim_project.execute_gen_dc()
     daysim_project.execute_ds_illum()
 
-    print('Reading results...')
-    solar_res = daysim_project.eval_ill()
+    # read the results once, and hold those of a group of buildings at a time, to keep the memory used below
+    # max_memory_mb
+    building_groups = calc_building_groups(sensors_number_zone, max_memory_mb)
+    first_sensor_building = np.cumsum([0] + list(sensors_number_zone))
+    date = weatherfile["date"]
+    results = daysim_project.eval_ill_sensor_groups([(first_sensor_building[first], first_sensor_building[last])
+                                                     for first, last in building_groups],
+                                                    max_hours=HOURS_IN_YEAR + 24)
+    for solar_res, (first_building, last_building) in zip(results, building_groups):
+        print(f'Reading results of buildings: {names_zone[first_building:last_building]}')
+
+        # check inconsistencies and replace by max value of weather file
+        np.clip(solar_res, a_min=0.0, a_max=max_global, out=solar_res)
+
+        # Check if leap year and remove extra day
+        if solar_res.shape[1] == HOURS_IN_YEAR + 24:
+            print('Removing leap day')
+            solar_res = remove_leap_day(solar_res)
+
+        print("Writing results to disk")
+        index = 0
+        for building in range(first_building, last_building):
+            building_name = names_zone[building]
+            sensors_number = sensors_number_zone[building]
+
+            # select sensors data
+            sensor_data = solar_res[index:index + sensors_number]
+            # set sensors that intersect with buildings to 0
+            sensor_data[np.array(sensor_intersection_zone[building]) == 1] = 0
+            items_sensor_name_and_result = pd.DataFrame(sensor_data, index=sensors_code_zone[building], copy=False)
+
+            # create summary and save to disk
+            write_aggregated_results(building_name, items_sensor_name_and_result, locator, date)
+
+            if write_sensor_data:
+                sensor_data_path = locator.get_radiation_building_sensors(building_name)
+                write_sensor_results(sensor_data_path, items_sensor_name_and_result)
+
+            # Increase sensor index
+            index = index + sensors_number
+        del solar_res, sensor_data, items_sensor_name_and_result
 
-    # check inconsistencies and replace by max value of weather file
-    print('Fixing inconsistencies, if any')
-    solar_res = np.clip(solar_res, a_min=0.0, a_max=max_global)
-
-    # Check if leap year and remove extra day
-    if solar_res.shape[1] == HOURS_IN_YEAR + 24:
-        print('Removing leap day')
-        leap_day_hours = range(1416, 1440)
-        solar_res = np.delete(solar_res, leap_day_hours, axis=1)
-
-    print("Writing results to disk")
-    index = 0
-    for building_name, sensors_number, sensor_code, sensor_intersection \
-            in zip(names_zone, sensors_number_zone, sensors_code_zone, sensor_intersection_zone):
+    # erase daysim folder to avoid conflicts after every iteration
+    print('Removing results folder')
+    daysim_project.cleanup_project()
 
-        # select sensors data
-        sensor_data = solar_res[index:index+sensors_number]
-        # set sensors that intersect with buildings to 0
-        sensor_data[np.array(sensor_intersection) == 1] = 0
-        items_sensor_name_and_result = pd.DataFrame(sensor_data, index=sensor_code)
+    return int(first_sensor_building[-1])
 
-        # create summary and save to disk
-        date = weatherfile["date"]
-        write_aggregated_results(building_name, items_sensor_name_and_result, locator, date)
 
-        if write_sensor_data:
-            sensor_data_path = locator.get_radiation_building_sensors(building_name)
-            write_sensor_results(sensor_data_path, items_sensor_name_and_result)
+def calc_building_groups(sensors_number_zone, max_memory_mb):
+    """
+    Group consecutive buildings so that the results of the sensors of each group fit in ``max_memory_mb``. A building
+    whose results alone exceed ``max_memory_mb`` is a group of its own.
 
-        # Increase sensor index
-        index = index + sensors_number
+    :param list[int] sensors_number_zone: number of sensors of each building
+    :param max_memory_mb: memory available for the results of a group of buildings [MB], 0 (or None) for no limit
+    :return: the position of the first and after the last building of each group
+    :rtype: list[tuple[int, int]]
+    """
+    if not max_memory_mb:
+        return [(0, len(sensors_number_zone))] if len(sensors_number_zone) else []
+    max_sensors = max(int(max_memory_mb * 1024 ** 2 // BYTES_PER_SENSOR), 1)
+    groups = []
+    first_building = 0
+    sensors_group = 0
+    for building, sensors_number in enumerate(sensors_number_zone):
+        if building > first_building and sensors_group + sensors_number > max_sensors:
+            groups.append((first_building, building))
+            first_building = building
+            sensors_group = 0
+        sensors_group += sensors_number
+    if len(sensors_number_zone):
+        groups.append((first_building, len(sensors_number_zone)))
+    return groups
+
+
+def remove_leap_day(solar_res):
+    """
+    Remove the hours of the 29th of February from the results of a leap year (sensors x 8784 hours), in place.
 
-    # erase daysim folder to avoid conflicts after every iteration
-    print('Removing results folder')
-    daysim_project.cleanup_project()
+    :return: a view of the results without the leap day (sensors x 8760 hours)
+    """
+    leap_day_start, leap_day_hours = 1416, 24
+    # shift the hours after the leap day one day at a time, so source and destination never overlap
+    for hour in range(leap_day_start, HOURS_IN_YEAR, leap_day_hours):
+        solar_res[:, hour:hour + leap_day_hours] = solar_res[:, hour + leap_day_hours:hour + 2 * leap_day_hours]
+    return solar_res[:, :HOURS_IN_YEAR]
 
 
 def write_sensor_results(sensor_data_path, sensor_values):
-    feather.write_feather(sensor_values.T, sensor_data_path, compression="zstd")
+    """
+    Write the hourly results of the sensors of a building (sensors x hours) as columns of a feather file. The columns
+    are built from the rows of the results without copying them.
+    """
+    table = pa.Table.from_arrays([pa.array(row) for row in sensor_values.values],
+                                 names=[str(sensor) for sensor in sensor_values.index])
+    feather.write_feather(table, sensor_data_path, compression="zstd")
 
 
 def write_aggregated_results(building_name, sensor_values, locator, date):
     # Get sensor properties
-    geometry = pd.read_csv(locator.get_radiation_metadata(building_name)).set_index('SURFACE')
+    geometry = pd.read_csv(locator.get_radiation_metadata(building_name),
+                           usecols=['SURFACE', 'TYPE', 'orientation', 'AREA_m2']).set_index('SURFACE')
+    geometry = geometry.reindex(sensor_values.index)
 
     # Create map between sensors and building surfaces
     labels = geometry['TYPE'] + '_' + geometry['orientation']
-    group_dict = labels.to_dict()
-
-    # Ensure surface columns (sometimes windows do not exist)
-    surfaces = {'windows_east',
-                'windows_west',
-                'windows_south',
-                'windows_north',
-                'walls_east',
-                'walls_west',
-                'walls_south',
-                'walls_north',
-                'roofs_top'}
-
-    for label in labels.unique():
-        if label not in surfaces:
+    surfaces = sorted(labels.unique())
+    for label in surfaces:
+        if label not in SURFACES:
             raise ValueError(f"Unrecognized surface name {label}")
-        surfaces.remove(label)
 
-    # Transform data
-    sensor_values_kw = sensor_values.multiply(geometry['AREA_m2'], axis="index") / 1000
-    data = sensor_values_kw.groupby(group_dict).sum().T.add_suffix('_kW')
+    # Transform data: the radiation of each surface is the sum of its sensors weighted by their area [kW]
+    area = geometry['AREA_m2'].values
+    weights = np.zeros((len(surfaces), len(area)))
+    for i, surface in enumerate(surfaces):
+        weights[i, (labels == surface).values] = area[(labels == surface).values] / 1000
+    values = sensor_values.values
+    surfaces_kw = np.empty((values.shape[1], len(surfaces)))
+    for hour in range(0, values.shape[1], AGGREGATION_BLOCK_HOURS):
+        block = values[:, hour:hour + AGGREGATION_BLOCK_HOURS].astype(np.float64)
+        surfaces_kw[hour:hour + AGGREGATION_BLOCK_HOURS] = (weights @ block).T
+    data = pd.DataFrame(surfaces_kw, columns=[f"{surface}_kW" for surface in surfaces])
 
     # TODO: Remove total sensor area information from output. Area information is repeated over rows.
     # Add area to data
-    area = geometry['AREA_m2'].groupby(group_dict).sum().add_suffix('_m2')
-    area_cols = pd.concat([area] * len(data), axis=1).T.set_index(data.index)
-    data = pd.concat([data, area_cols], axis=1)
+    area_surfaces = geometry['AREA_m2'].groupby(labels).sum()
+    for surface in surfaces:
+        data[f"{surface}_m2"] = area_surfaces[surface]
 
     # Add missing surfaces to output
-    for surface in surfaces:
-        data[f"{surface}_kW"] = 0.0
-        data[f"{surface}_m2"] = 0.0
+    for surface in SURFACES:
+        if surface not in surfaces:
+            data[f"{surface}_kW"] = 0.0
+            data[f"{surface}_m2"] = 0.0
 
     # Round values and add date index
     data = data.round(2)
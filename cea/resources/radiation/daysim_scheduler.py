@@ -0,0 +1,203 @@
+"""
+Scheduler for the Daysim simulation of the buildings of a zone (see
+:py:func:`cea.resources.radiation.main.run_daysim_simulation`).
+
+The buildings are grouped into chunks by their (estimated) number of sensors instead of a fixed number of buildings, so
+that a cluster of dense high-rise buildings does not end up in a single chunk that keeps one process busy while the
+others are idle. The largest chunks are dispatched first and each free worker takes the next chunk.
+
+Each completed chunk is recorded in the chunks folder, with a fingerprint of the inputs of the simulation and its
+timings. A rerun with the same inputs skips the buildings of the completed chunks, so a crash does not restart the
+whole zone.
+"""
+
+import datetime
+import json
+import math
+import os
+import tempfile
+import time
+
+from py4design import py3dmodel
+
+from cea.resources.radiation import daysim
+from cea.resources.radiation.geometry_generator import BuildingGeometry
+from cea.utilities.fingerprints import calc_fingerprint, calc_file_fingerprint, calc_shapefile_fingerprint
+
+__author__ = "Daren Thomas"
+__copyright__ = "Copyright 2024, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+# change this when the simulation changes, to invalidate the records of completed chunks
+DAYSIM_CHUNKS_VERSION = 1
+
+# the buildings are split in at least this many chunks per process, to balance the load of the processes
+CHUNKS_PER_PROCESS = 4
+
+# smaller chunks are not worth the overhead of a Daysim project
+MIN_SENSORS_IN_CHUNK = 5000
+
+
+def estimate_sensors_building(building_geometry, grid_size):
+    """
+    Estimate the number of sensors of a building (see :py:func:`cea.resources.radiation.daysim.calc_sensors_building`)
+    from the area of its surfaces, without generating the sensors.
+
+    :type building_geometry: cea.resources.radiation.geometry_generator.BuildingGeometry
+    :type grid_size: cea.resources.radiation.daysim.GridSize
+    :rtype: int
+    """
+    sensors = 0
+    for srf_type in ['walls', 'windows', 'roofs']:
+        grid = grid_size.roof if srf_type == 'roofs' else grid_size.walls
+        for face in getattr(building_geometry, srf_type):
+            sensors += max(1, int(math.ceil(py3dmodel.calculate.face_area(face) / grid ** 2)))
+    return sensors
+
+
+def estimate_sensors_zone(building_names, grid_size, geometry_pickle_dir):
+    """
+    :return: the estimated number of sensors of each building
+    :rtype: list[int]
+    """
+    return [estimate_sensors_building(BuildingGeometry.load(os.path.join(geometry_pickle_dir, 'zone', building_name)),
+                                      grid_size)
+            for building_name in building_names]
+
+
+def calc_chunks(building_names, sensors_buildings, num_processes, max_buildings_in_chunk):
+    """
+    Group consecutive buildings into chunks of about the same number of sensors, with at least
+    ``CHUNKS_PER_PROCESS`` chunks per process (unless the chunks become smaller than ``MIN_SENSORS_IN_CHUNK``) and at
+    most ``max_buildings_in_chunk`` buildings per chunk. A building with more sensors than a chunk is a chunk of its
+    own.
+
+    :param list[str] building_names: the buildings to simulate
+    :param list[int] sensors_buildings: the (estimated) number of sensors of each building
+    :param int num_processes: the number of processes running the chunks
+    :param int max_buildings_in_chunk: the maximum number of buildings in a chunk
+    :return: the buildings of each chunk and its number of sensors, the largest chunks first
+    :rtype: list[tuple[list[str], int]]
+    """
+    total_sensors = sum(sensors_buildings)
+    sensors_in_chunk = max(total_sensors / (max(num_processes, 1) * CHUNKS_PER_PROCESS), MIN_SENSORS_IN_CHUNK)
+    max_buildings_in_chunk = max(max_buildings_in_chunk, 1)
+
+    chunks = []
+    chunk, chunk_sensors = [], 0
+    for building_name, sensors in zip(building_names, sensors_buildings):
+        if chunk and (chunk_sensors + sensors > sensors_in_chunk or len(chunk) == max_buildings_in_chunk):
+            chunks.append((chunk, chunk_sensors))
+            chunk, chunk_sensors = [], 0
+        chunk.append(building_name)
+        chunk_sensors += sensors
+    if chunk:
+        chunks.append((chunk, chunk_sensors))
+
+    # dispatch the largest chunks first, the smaller ones fill the gaps at the end
+    return sorted(chunks, key=lambda c: c[1], reverse=True)
+
+
+def calc_run_fingerprint(locator, settings, radiance_parameters):
+    """
+    The fingerprint of the inputs of the simulation: the geometry (including the attributes of the shapefiles, e.g. the
+    heights of the buildings), weather and database files and the radiation settings that change the results.
+
+    :param locator: An InputLocator to locate the input files
+    :param settings: the ``radiation`` section of the configuration
+    :param dict radiance_parameters: the Daysim simulation parameters
+    :rtype: str
+    """
+    shapefiles = [locator.get_zone_geometry(), locator.get_surroundings_geometry(), locator.get_tree_geometry()]
+    input_files = [locator.get_terrain(), locator.get_building_architecture(), locator.get_weather_file(),
+                   locator.get_database_envelope_systems()]
+    return calc_fingerprint(DAYSIM_CHUNKS_VERSION,
+                            [calc_shapefile_fingerprint(path) for path in shapefiles],
+                            [calc_file_fingerprint(path) for path in input_files],
+                            radiance_parameters,
+                            [settings.albedo, settings.roof_grid, settings.walls_grid, settings.zone_geometry,
+                             settings.surrounding_geometry, settings.consider_floors,
+                             settings.neglect_adjacent_buildings, settings.use_latest_daysim_binaries,
+                             settings.write_sensor_data])
+
+
+def read_completed_buildings(locator, run_fingerprint, write_sensor_data):
+    """
+    Read the records of the completed chunks and return the buildings with results for the same inputs. The records of
+    other inputs are removed.
+
+    :rtype: set[str]
+    """
+    folder = locator.get_radiation_chunks_folder()
+    completed = set()
+    for file_name in os.listdir(folder):
+        if not file_name.endswith('.json'):
+            continue
+        path = os.path.join(folder, file_name)
+        try:
+            with open(path, 'r') as f:
+                record = json.load(f)
+        except ValueError:
+            record = {}
+        if record.get('run') != run_fingerprint:
+            os.remove(path)
+            continue
+        for building_name in record['buildings']:
+            results = [locator.get_radiation_building(building_name), locator.get_radiation_metadata(building_name)]
+            if write_sensor_data:
+                results.append(locator.get_radiation_building_sensors(building_name))
+            if all(os.path.exists(result) for result in results):
+                completed.add(building_name)
+    return completed
+
+
+def write_chunk_record(locator, run_fingerprint, building_names, sensors, seconds):
+    """Record a completed chunk (written to a temporary file first, so a crash does not leave a corrupt record)"""
+    folder = locator.get_radiation_chunks_folder()
+    record = {'run': run_fingerprint,
+              'buildings': list(building_names),
+              'sensors': int(sensors),
+              'seconds': round(seconds, 1),
+              'finished': datetime.datetime.now().isoformat(timespec='seconds')}
+    fd, temporary_file = tempfile.mkstemp(dir=folder, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(record, f, indent=2)
+    os.replace(temporary_file, os.path.join(folder, 'chunk_{key}.json'.format(key=calc_fingerprint(building_names))))
+
+
+def run_daysim_chunk(chunk_n, cea_daysim, building_names, locator, radiance_parameters, write_sensor_data, grid_size,
+                     max_global, weatherfile, geometry_pickle_dir, max_memory_mb, run_fingerprint):
+    """
+    Run :py:func:`cea.resources.radiation.daysim.isolation_daysim` for a chunk of buildings and record it as completed.
+
+    :return: the chunk number, number of buildings, number of sensors and duration [s] of the chunk
+    :rtype: tuple[int, int, int, float]
+    """
+    t0 = time.perf_counter()
+    sensors = daysim.isolation_daysim(chunk_n, cea_daysim, building_names, locator, radiance_parameters,
+                                      write_sensor_data, grid_size, max_global, weatherfile, geometry_pickle_dir,
+                                      max_memory_mb)
+    seconds = time.perf_counter() - t0
+    write_chunk_record(locator, run_fingerprint, building_names, sensors, seconds)
+    print('Daysim chunk {chunk_n} finished: {buildings} buildings, {sensors} sensors in {seconds:.1f} s'.format(
+        chunk_n=chunk_n, buildings=len(building_names), sensors=sensors, seconds=seconds))
+    return chunk_n, len(building_names), sensors, seconds
+
+
+def print_chunk_timings(timings):
+    """Print a summary of the timings returned by :py:func:`run_daysim_chunk`"""
+    if not timings:
+        return
+    print('Daysim chunk timings:')
+    print('  chunk  buildings  sensors  seconds  sensors/s')
+    for chunk_n, buildings, sensors, seconds in sorted(timings):
+        print('  {0:>5}  {1:>9}  {2:>7}  {3:>7.1f}  {4:>9.0f}'.format(chunk_n, buildings, sensors, seconds,
+                                                                     sensors / seconds if seconds else 0))
+    durations = [seconds for _, _, _, seconds in timings]
+    print('  slowest chunk: {slowest:.1f} s, fastest chunk: {fastest:.1f} s, total: {total:.1f} s'.format(
+        slowest=max(durations), fastest=min(durations), total=sum(durations)))
@@ -0,0 +1,244 @@
+"""
+Reuse of the building geometry of the radiation script across runs (see
+:py:func:`cea.resources.radiation.geometry_generator.building_2d_to_3d`).
+
+The geometry of a building (its pickle in the geometry pickle folder) only depends on its footprint, height and
+floors, the terrain under it, its window-to-wall ratios and (for the adjacent walls) the solids of its neighbours. A
+fingerprint of these inputs is stored with the pickles, and a rerun only regenerates the buildings whose fingerprint
+changed. The solids of the buildings, the terrain TIN and the Radiance geometry file are stored the same way.
+
+The fingerprints are stored in a ``fingerprints.json`` file in each folder of pickles (see
+:py:mod:`cea.utilities.fingerprints`).
+"""
+
+import os
+import pickle
+import shutil
+import tempfile
+
+import shapely
+
+from cea.utilities.fingerprints import (calc_fingerprint, read_fingerprints, write_fingerprints, remove_fingerprints,
+                                       FINGERPRINTS_FILE)
+
+__author__ = "Daren Thomas"
+__copyright__ = "Copyright 2024, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+# change this when the geometry generation changes, to invalidate the stored geometry
+GEOMETRY_CACHE_VERSION = 1
+
+# the neighbours of a building are found from the footprints before the solids exist, the bounding box of a solid may
+# differ slightly from the bounds of its footprint [m]
+NEIGHBOUR_MARGIN = 1.0
+
+SOLIDS_FOLDER = 'solids'
+TERRAIN_TIN_FILE = 'terrain_tin'
+RADIANCE_GEOMETRY_FILE = 'radiance_geometry.rad'
+
+
+def calc_solid_fingerprints(buildings_df, geometries, elevation_map):
+    """
+    The fingerprints of the inputs of the solids of the buildings (see
+    :py:func:`cea.resources.radiation.geometry_generator.calc_building_solids`): the simplified footprint, the height,
+    the number of floors and the terrain around the footprint.
+
+    :param buildings_df: the buildings, indexed by name
+    :param geometries: the simplified footprints of the buildings
+    :type elevation_map: cea.resources.radiation.geometry_generator.ElevationMap
+    :rtype: list[str]
+    """
+    fingerprints = []
+    for geometry, height, floors in zip(geometries, buildings_df['height_ag'], buildings_df['floors_ag']):
+        terrain = elevation_map.get_elevation_map_from_geometry(geometry)
+        fingerprints.append(calc_fingerprint(GEOMETRY_CACHE_VERSION, shapely.to_wkb(geometry), float(height),
+                                             int(floors), terrain.elevation_map, terrain.x_coords, terrain.y_coords,
+                                             terrain.nodata))
+    return fingerprints
+
+
+def calc_zone_geometry_fingerprint(solid_fingerprint, wwr, neglect_adjacent_buildings, neighbour_fingerprints):
+    """
+    The fingerprint of the inputs of the geometry of a building in the zone (see
+    :py:func:`cea.resources.radiation.geometry_generator.calc_building_geometry_zone`).
+
+    :param str solid_fingerprint: the fingerprint of the solid of the building
+    :param list[float] wwr: the window-to-wall ratios of the building
+    :param bool neglect_adjacent_buildings: True if the adjacent walls are neglected
+    :param list[str] neighbour_fingerprints: the fingerprints of the solids of the (possible) neighbours
+    :rtype: str
+    """
+    return calc_fingerprint(GEOMETRY_CACHE_VERSION, 'zone', solid_fingerprint, [float(x) for x in wwr],
+                            bool(neglect_adjacent_buildings),
+                            [] if neglect_adjacent_buildings else sorted(neighbour_fingerprints))
+
+
+def calc_surroundings_geometry_fingerprint(solid_fingerprint):
+    """The fingerprint of the inputs of the geometry of a surrounding building"""
+    return calc_fingerprint(GEOMETRY_CACHE_VERSION, 'surroundings', solid_fingerprint)
+
+
+def stale_buildings(folder, fingerprints):
+    """
+    Return the buildings whose pickle in ``folder`` is missing or was generated from other inputs.
+
+    :param dict[str, str] fingerprints: the current fingerprint of each building
+    :rtype: list[str]
+    """
+    stored_fingerprints = read_fingerprints(folder)
+    return [building for building, fingerprint in fingerprints.items()
+            if stored_fingerprints.get(building) != fingerprint
+            or not os.path.exists(os.path.join(folder, str(building)))]
+
+
+def forget_buildings(folder, buildings):
+    """
+    Forget the fingerprints of the buildings whose pickles in ``folder`` are about to be overwritten, so that an
+    interrupted run never leaves a new pickle with an old fingerprint.
+    """
+    if buildings and os.path.exists(folder):
+        remove_fingerprints(folder, buildings)
+
+
+def save_fingerprints(folder, fingerprints):
+    """Store the fingerprints of the buildings whose pickles were written to ``folder``"""
+    if fingerprints:
+        os.makedirs(folder, exist_ok=True)
+        write_fingerprints(folder, fingerprints)
+
+
+def load_solids(geometry_pickle_dir, fingerprints):
+    """
+    Load the stored solids of the buildings.
+
+    :param dict[str, str] fingerprints: the current fingerprint of the solid of each building
+    :return: the solids with a matching fingerprint, by building name
+    :rtype: dict
+    """
+    folder = os.path.join(geometry_pickle_dir, SOLIDS_FOLDER)
+    stored_fingerprints = read_fingerprints(folder)
+    solids = {}
+    for building, fingerprint in fingerprints.items():
+        path = os.path.join(folder, str(building))
+        if stored_fingerprints.get(building) != fingerprint or not os.path.exists(path):
+            continue
+        try:
+            with open(path, 'rb') as f:
+                solids[building] = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            # a corrupt solid is calculated again
+            continue
+    return solids
+
+
+def save_solids(geometry_pickle_dir, solids, fingerprints):
+    """
+    Store the solids of the buildings with their fingerprints.
+
+    :param dict solids: the solid of each building
+    :param dict[str, str] fingerprints: the fingerprint of the solid of each building
+    """
+    if not solids:
+        return
+    folder = os.path.join(geometry_pickle_dir, SOLIDS_FOLDER)
+    os.makedirs(folder, exist_ok=True)
+    forget_buildings(folder, list(solids))
+    for building, solid in solids.items():
+        _dump_atomic(os.path.join(folder, str(building)), solid)
+    write_fingerprints(folder, {building: fingerprints[building] for building in solids})
+
+
+def get_terrain_tin(elevation_map, geometry_pickle_dir):
+    """
+    Return the TIN of the terrain (see :py:meth:`cea.resources.radiation.geometry_generator.ElevationMap.generate_tin`),
+    generating and storing it if the terrain changed.
+
+    :return: the faces of the terrain
+    :rtype: list
+    """
+    terrain_fingerprint = calc_fingerprint(GEOMETRY_CACHE_VERSION, elevation_map.elevation_map, elevation_map.x_coords,
+                                           elevation_map.y_coords, elevation_map.nodata)
+    path = os.path.join(geometry_pickle_dir, TERRAIN_TIN_FILE)
+    if read_fingerprints(geometry_pickle_dir).get(TERRAIN_TIN_FILE) == terrain_fingerprint and os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                print("Reusing the terrain geometry of a previous run")
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+
+    terrain_tin = elevation_map.generate_tin()
+    forget_buildings(geometry_pickle_dir, [TERRAIN_TIN_FILE])
+    _dump_atomic(path, terrain_tin)
+    write_fingerprints(geometry_pickle_dir, {TERRAIN_TIN_FILE: terrain_fingerprint})
+    return terrain_tin
+
+
+def calc_radiance_geometry_fingerprint(geometry_pickle_dir, building_surface_properties, zone_building_names,
+                                       surroundings_building_names):
+    """
+    The fingerprint of the Radiance geometry file (see :py:func:`cea.resources.radiation.radiance.create_rad_geometry`)
+    of the stored geometry.
+
+    :return: the fingerprint, or None if some geometry has no stored fingerprint
+    :rtype: str
+    """
+    terrain_fingerprint = read_fingerprints(geometry_pickle_dir).get(TERRAIN_TIN_FILE)
+    zone_fingerprints = read_fingerprints(os.path.join(geometry_pickle_dir, 'zone'))
+    surroundings_fingerprints = read_fingerprints(os.path.join(geometry_pickle_dir, 'surroundings'))
+    fingerprints = ([terrain_fingerprint]
+                    + [zone_fingerprints.get(building) for building in zone_building_names]
+                    + [surroundings_fingerprints.get(building) for building in surroundings_building_names])
+    if any(fingerprint is None for fingerprint in fingerprints):
+        return None
+    materials = building_surface_properties.loc[list(zone_building_names), ['type_win', 'type_wall', 'type_roof']]
+    return calc_fingerprint(GEOMETRY_CACHE_VERSION, list(zone_building_names), list(surroundings_building_names),
+                            fingerprints, materials)
+
+
+def copy_radiance_geometry(geometry_pickle_dir, fingerprint, rad_geometry_path):
+    """
+    Copy the stored Radiance geometry file to ``rad_geometry_path``, if it was created from the same geometry.
+
+    :return: True if the file was copied
+    :rtype: bool
+    """
+    path = os.path.join(geometry_pickle_dir, RADIANCE_GEOMETRY_FILE)
+    if fingerprint is None or read_fingerprints(geometry_pickle_dir).get(RADIANCE_GEOMETRY_FILE) != fingerprint \
+            or not os.path.exists(path):
+        return False
+    shutil.copyfile(path, rad_geometry_path)
+    return True
+
+
+def save_radiance_geometry(geometry_pickle_dir, fingerprint, rad_geometry_path):
+    """Store a copy of the Radiance geometry file at ``rad_geometry_path`` for the next runs"""
+    if fingerprint is None:
+        return
+    forget_buildings(geometry_pickle_dir, [RADIANCE_GEOMETRY_FILE])
+    fd, temporary_file = tempfile.mkstemp(dir=geometry_pickle_dir, suffix='.rad')
+    os.close(fd)
+    shutil.copyfile(rad_geometry_path, temporary_file)
+    os.replace(temporary_file, os.path.join(geometry_pickle_dir, RADIANCE_GEOMETRY_FILE))
+    write_fingerprints(geometry_pickle_dir, {RADIANCE_GEOMETRY_FILE: fingerprint})
+
+
+def clear_fingerprints(geometry_pickle_dir):
+    """Forget the fingerprints of the stored geometry, so that all of it is generated again"""
+    for folder in ['', 'zone', 'surroundings', SOLIDS_FOLDER]:
+        path = os.path.join(geometry_pickle_dir, folder, FINGERPRINTS_FILE)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _dump_atomic(path, obj):
+    """Pickle ``obj`` to a temporary file first, so that an interrupted run does not leave a corrupt pickle"""
+    fd, temporary_file = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        pickle.dump(obj, f)
+    os.replace(temporary_file, path)
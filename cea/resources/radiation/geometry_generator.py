@@ -14,6 +14,7 @@ from itertools import repeat
 
 import numpy as np
 import pandas as pd
+import shapely
 import py4design.py3dmodel.calculate as calculate
 import py4design.py3dmodel.construct as construct
 import py4design.py3dmodel.fetch as fetch
@@ -28,6 +29,7 @@ import cea
 import cea.config
 import cea.inputlocator
 import cea.utilities.parallel
+from cea.resources.radiation import geometry_cache
 
 __author__ = "Jimeno A. Fonseca"
 __copyright__ = "Copyright 2017, Architecture and Building Systems - ETH Zurich"
@@ -41,6 +43,12 @@ __status__ = "Production"
 from cea.utilities.standardize_coordinates import (get_lat_lon_projected_shapefile, get_projected_coordinate_system,
                                                    crs_to_epsg)
 
+# buildings whose bounding boxes start within this distance [m] are checked for adjacent walls
+NEIGHBOUR_DISTANCE = 100
+
+# margin [m] around the bounding box of a solid, outside of which a point is not tested against the solid
+BOUNDING_BOX_TOLERANCE = 1e-3
+
 
 def identify_surfaces_type(occface_list):
     roof_list = []
@@ -169,46 +177,165 @@ def calc_building_geometry_surroundings(name, building_solid, geometry_pickle_di
 
 
 def building_2d_to_3d(zone_df, surroundings_df, architecture_wwr_df, elevation_map, config, geometry_pickle_dir):
+    """
+    Generate the geometry of the buildings and save it in ``geometry_pickle_dir``. The geometry of a previous run is
+    reused for the buildings whose inputs (see :py:mod:`cea.resources.radiation.geometry_cache`) did not change.
+
+    :return: the names of the buildings in the zone and of the surrounding buildings
+    """
     # Config variables
     num_processes = config.get_number_of_processes()
     zone_simplification = config.radiation.zone_geometry
     surroundings_simplification = config.radiation.surrounding_geometry
     neglect_adjacent_buildings = config.radiation.neglect_adjacent_buildings
 
-    print('Calculating terrain intersection of building geometries')
-    zone_buildings_df = zone_df.set_index('Name')
-    zone_building_names = zone_buildings_df.index.values
-    zone_building_solid_list = calc_building_solids(zone_buildings_df, zone_simplification, elevation_map,
-                                                    num_processes)
+    if not config.radiation.reuse_geometry:
+        geometry_cache.clear_fingerprints(geometry_pickle_dir)
 
+    zone_buildings_df = zone_df.set_index('Name')
+    zone_building_names = list(zone_buildings_df.index.values)
     surroundings_buildings_df = surroundings_df.set_index('Name')
-    surroundings_building_names = surroundings_buildings_df.index.values
-    surroundings_building_solid_list = calc_building_solids(surroundings_buildings_df, surroundings_simplification,
-                                                            elevation_map, num_processes)
+    surroundings_building_names = list(surroundings_buildings_df.index.values)
+    all_building_names = zone_building_names + surroundings_building_names
+    n = len(zone_building_names)
+
+    # fingerprint the inputs of the geometry of each building
+    zone_geometries = zone_buildings_df.geometry.simplify(zone_simplification, preserve_topology=True)
+    surroundings_geometries = surroundings_buildings_df.geometry.simplify(surroundings_simplification,
+                                                                          preserve_topology=True)
+    solid_fingerprints = dict(zip(all_building_names,
+                                  geometry_cache.calc_solid_fingerprints(zone_buildings_df, zone_geometries,
+                                                                         elevation_map)
+                                  + geometry_cache.calc_solid_fingerprints(surroundings_buildings_df,
+                                                                           surroundings_geometries, elevation_map)))
+    if not neglect_adjacent_buildings:
+        # the solids don't exist yet, their neighbours are found (with a margin) from the footprints
+        footprint_index = SolidIndex.from_footprints(list(zone_geometries) + list(surroundings_geometries))
+        possible_neighbours = [footprint_index.query_neighbours(i, NEIGHBOUR_DISTANCE
+                                                                + geometry_cache.NEIGHBOUR_MARGIN)
+                               for i in range(n)]
+    else:
+        possible_neighbours = [[] for _ in range(n)]
+    wwr_columns = ['wwr_west', 'wwr_east', 'wwr_north', 'wwr_south']
+    zone_fingerprints = {
+        name: geometry_cache.calc_zone_geometry_fingerprint(
+            solid_fingerprints[name], architecture_wwr_df.loc[name, wwr_columns], neglect_adjacent_buildings,
+            [solid_fingerprints[all_building_names[i]] for i in neighbours])
+        for name, neighbours in zip(zone_building_names, possible_neighbours)}
+    surroundings_fingerprints = {name: geometry_cache.calc_surroundings_geometry_fingerprint(solid_fingerprints[name])
+                                 for name in surroundings_building_names}
+
+    zone_pickle_dir = os.path.join(geometry_pickle_dir, 'zone')
+    surroundings_pickle_dir = os.path.join(geometry_pickle_dir, 'surroundings')
+    stale_zone = set(geometry_cache.stale_buildings(zone_pickle_dir, zone_fingerprints))
+    stale_surroundings = set(geometry_cache.stale_buildings(surroundings_pickle_dir, surroundings_fingerprints))
+    print(f"Reusing the geometry of {n - len(stale_zone)} of {n} buildings in the zone and "
+          f"{len(surroundings_building_names) - len(stale_surroundings)} of {len(surroundings_building_names)} "
+          f"surrounding buildings")
+    if not stale_zone and not stale_surroundings:
+        return zone_building_names, surroundings_building_names
+
+    # the solids of the stale buildings and of their neighbours, in the order of all_building_names
+    needed = set(stale_surroundings)
+    for name, neighbours in zip(zone_building_names, possible_neighbours):
+        if name in stale_zone:
+            needed.add(name)
+            needed.update(all_building_names[i] for i in neighbours)
+    needed_building_names = [name for name in all_building_names if name in needed]
+    solids = geometry_cache.load_solids(geometry_pickle_dir,
+                                        {name: solid_fingerprints[name] for name in needed_building_names})
+
+    print('Calculating terrain intersection of building geometries')
+    calculated_solids = {}
+    for buildings_df, simplification in [(zone_buildings_df, zone_simplification),
+                                         (surroundings_buildings_df, surroundings_simplification)]:
+        missing = [name for name in buildings_df.index if name in needed and name not in solids]
+        if missing:
+            calculated_solids.update(zip(missing, calc_building_solids(buildings_df.loc[missing], simplification,
+                                                                       elevation_map, num_processes)))
+    geometry_cache.save_solids(geometry_pickle_dir, calculated_solids, solid_fingerprints)
+    solids.update(calculated_solids)
 
     # calculate geometry for the surroundings
     print('Generating geometry for surrounding buildings')
-    geometry_3D_surroundings = [calc_building_geometry_surroundings(x, y, geometry_pickle_dir) for x, y in
-                                zip(surroundings_building_names, surroundings_building_solid_list)]
+    stale_surroundings_names = [name for name in surroundings_building_names if name in stale_surroundings]
+    geometry_cache.forget_buildings(surroundings_pickle_dir, stale_surroundings_names)
+    for name in stale_surroundings_names:
+        calc_building_geometry_surroundings(name, solids[name], geometry_pickle_dir)
+    geometry_cache.save_fingerprints(surroundings_pickle_dir,
+                                     {name: surroundings_fingerprints[name] for name in stale_surroundings_names})
 
     # calculate geometry for the zone of analysis
     print('Generating geometry for buildings in the zone of analysis')
-    n = len(zone_building_names)
-    calc_zone_geometry_multiprocessing = cea.utilities.parallel.vectorize(calc_building_geometry_zone,
-                                                                          num_processes,
-                                                                          on_complete=print_progress)
+    stale_zone_names = [name for name in zone_building_names if name in stale_zone]
+    if stale_zone_names:
+        n_stale = len(stale_zone_names)
+        calc_zone_geometry_multiprocessing = cea.utilities.parallel.vectorize(calc_building_geometry_zone,
+                                                                              num_processes,
+                                                                              on_complete=print_progress)
+
+        if not neglect_adjacent_buildings:
+            all_building_solid_list = [solids[name] for name in needed_building_names]
+            # index the solids once, each building only checks its neighbours for adjacent walls
+            solid_index = SolidIndex.from_solids(all_building_solid_list)
+            position = {name: i for i, name in enumerate(needed_building_names)}
+            neighbours = [solid_index.query_neighbours(position[name]) for name in stale_zone_names]
+            all_building_boxes = solid_index.boxes
+        else:
+            all_building_solid_list = []
+            neighbours = repeat(None, n_stale)
+            all_building_boxes = None
+        geometry_cache.forget_buildings(zone_pickle_dir, stale_zone_names)
+        calc_zone_geometry_multiprocessing(stale_zone_names,
+                                           [solids[name] for name in stale_zone_names],
+                                           repeat(all_building_solid_list, n_stale),
+                                           repeat(architecture_wwr_df, n_stale),
+                                           repeat(geometry_pickle_dir, n_stale),
+                                           repeat(neglect_adjacent_buildings, n_stale),
+                                           neighbours,
+                                           repeat(all_building_boxes, n_stale))
+        geometry_cache.save_fingerprints(zone_pickle_dir, {name: zone_fingerprints[name] for name in stale_zone_names})
+    return zone_building_names, surroundings_building_names
+
+
+class SolidIndex(object):
+    """
+    STR-tree index of the bounding boxes of the building solids, to find the neighbours of a building without
+    comparing it to every other building.
 
-    if not neglect_adjacent_buildings:
-        all_building_solid_list = np.append(zone_building_solid_list, surroundings_building_solid_list)
-    else:
-        all_building_solid_list = []
-    geometry_3D_zone = calc_zone_geometry_multiprocessing(zone_building_names,
-                                                          zone_building_solid_list,
-                                                          repeat(all_building_solid_list, n),
-                                                          repeat(architecture_wwr_df, n),
-                                                          repeat(geometry_pickle_dir, n),
-                                                          repeat(neglect_adjacent_buildings, n))
-    return geometry_3D_zone, geometry_3D_surroundings
+    :ivar np.ndarray boxes: bounding box of each solid (xmin, ymin, zmin, xmax, ymax, zmax)
+    """
+
+    def __init__(self, boxes):
+        self.boxes = np.asarray(boxes, dtype=float).reshape(-1, 6)
+        self.corners = shapely.points(self.boxes[:, 0], self.boxes[:, 1])
+        self.tree = shapely.STRtree(self.corners)
+
+    @classmethod
+    def from_solids(cls, solids):
+        return cls([calculate.get_bounding_box(solid) for solid in solids])
+
+    @classmethod
+    def from_footprints(cls, footprints):
+        """Index the (2D) bounds of the footprints of the buildings, before their solids are generated"""
+        bounds = np.asarray(shapely.bounds(np.asarray(list(footprints), dtype=object)), dtype=float).reshape(-1, 4)
+        zeros = np.zeros(len(bounds))
+        return cls(np.column_stack([bounds[:, 0], bounds[:, 1], zeros, bounds[:, 2], bounds[:, 3], zeros]))
+
+    def query_neighbours(self, i, distance=NEIGHBOUR_DISTANCE):
+        """
+        Return the solids close to solid ``i`` (including itself), the same as testing
+        :py:func:`are_buildings_close_to_eachother` against all the solids.
+
+        :return: the positions of the neighbouring solids, in ascending order
+        :rtype: np.ndarray
+        """
+        # query a slightly larger distance, the exact distance is checked below
+        candidates = self.tree.query(self.corners[i], predicate='dwithin', distance=distance * 1.001 + 1e-6)
+        candidates = np.sort(candidates)
+        x, y = self.boxes[i, 0], self.boxes[i, 1]
+        delta = np.sqrt((self.boxes[candidates, 1] - y) ** 2 + (self.boxes[candidates, 0] - x) ** 2)
+        return candidates[delta <= distance]
 
 
 def print_progress(i, n, _, __):
@@ -264,7 +391,13 @@ class BuildingGeometry(object):
 
 
 def calc_building_geometry_zone(name, building_solid, all_building_solid_list, architecture_wwr_df,
-                                geometry_pickle_dir, neglect_adjacent_buildings):
+                                geometry_pickle_dir, neglect_adjacent_buildings, neighbours=None,
+                                all_building_boxes=None):
+    """
+    :param neighbours: positions of the solids close to the building in ``all_building_solid_list`` (see
+        :py:meth:`SolidIndex.query_neighbours`), None to test all the solids
+    :param all_building_boxes: bounding boxes of ``all_building_solid_list`` (see :py:class:`SolidIndex`)
+    """
     # now get all surfaces and create windows only if the buildings are in the area of study
     window_list = []
     wall_list = []
@@ -276,12 +409,18 @@ def calc_building_geometry_zone(name, building_solid, all_building_solid_list, a
 
     # check if buildings are close together and it merits to check the intersection
     potentially_intersecting_solids = []
+    potentially_intersecting_boxes = None
     if not neglect_adjacent_buildings:
-        box = calculate.get_bounding_box(building_solid)
-        x, y = box[0], box[1]
-        for solid in all_building_solid_list:
-            if are_buildings_close_to_eachother(x, y, solid):
-                potentially_intersecting_solids.append(solid)
+        if neighbours is not None:
+            potentially_intersecting_solids = [all_building_solid_list[i] for i in neighbours]
+            if all_building_boxes is not None:
+                potentially_intersecting_boxes = all_building_boxes[neighbours]
+        else:
+            box = calculate.get_bounding_box(building_solid)
+            x, y = box[0], box[1]
+            for solid in all_building_solid_list:
+                if are_buildings_close_to_eachother(x, y, solid):
+                    potentially_intersecting_solids.append(solid)
 
     # identify building surfaces according to angle:
     face_list = fetch.faces_frm_solid(building_solid)
@@ -298,7 +437,8 @@ def calc_building_geometry_zone(name, building_solid, all_building_solid_list, a
     wall_west, \
     normals_windows_west, \
     normals_walls_west, \
-    wall_intersects_west = calc_windows_walls(facade_list_west, wwr_west, potentially_intersecting_solids)
+    wall_intersects_west = calc_windows_walls(facade_list_west, wwr_west, potentially_intersecting_solids,
+                                                          potentially_intersecting_boxes)
     if len(window_west) != 0:
         window_list.extend(window_west)
         orientation_win.extend(['west'] * len(window_west))
@@ -312,7 +452,8 @@ def calc_building_geometry_zone(name, building_solid, all_building_solid_list, a
     wall_east, \
     normals_windows_east, \
     normals_walls_east, \
-    wall_intersects_east = calc_windows_walls(facade_list_east, wwr_east, potentially_intersecting_solids)
+    wall_intersects_east = calc_windows_walls(facade_list_east, wwr_east, potentially_intersecting_solids,
+                                                          potentially_intersecting_boxes)
     if len(window_east) != 0:
         window_list.extend(window_east)
         orientation_win.extend(['east'] * len(window_east))
@@ -326,7 +467,8 @@ def calc_building_geometry_zone(name, building_solid, all_building_solid_list, a
     wall_north, \
     normals_windows_north, \
     normals_walls_north, \
-    wall_intersects_north = calc_windows_walls(facade_list_north, wwr_north, potentially_intersecting_solids)
+    wall_intersects_north = calc_windows_walls(facade_list_north, wwr_north, potentially_intersecting_solids,
+                                                          potentially_intersecting_boxes)
     if len(window_north) != 0:
         window_list.extend(window_north)
         orientation_win.extend(['north'] * len(window_north))
@@ -340,7 +482,8 @@ def calc_building_geometry_zone(name, building_solid, all_building_solid_list, a
     wall_south, \
     normals_windows_south, \
     normals_walls_south, \
-    wall_intersects_south = calc_windows_walls(facade_list_south, wwr_south, potentially_intersecting_solids)
+    wall_intersects_south = calc_windows_walls(facade_list_south, wwr_south, potentially_intersecting_solids,
+                                                          potentially_intersecting_boxes)
     if len(window_south) != 0:
         window_list.extend(window_south)
         orientation_win.extend(['south'] * len(window_south))
@@ -430,7 +573,11 @@ class Points(object):
         self.point_to_evaluate = point_to_evaluate
 
 
-def calc_windows_walls(facade_list, wwr, potentially_intersecting_solids):
+def calc_windows_walls(facade_list, wwr, potentially_intersecting_solids, potentially_intersecting_boxes=None):
+    """
+    :param potentially_intersecting_boxes: bounding boxes of ``potentially_intersecting_solids``, to only test the
+        solids whose bounding box contains a facade point. None to test all the solids.
+    """
     window_list = []
     wall_list = []
     normals_win = []
@@ -446,7 +593,14 @@ def calc_windows_walls(facade_list, wwr, potentially_intersecting_solids):
         # simulation model)
         data_point = Points(modify.move_pt(ref_pypt, standard_normal, 0.1))
 
-        if number_intersecting_solids:
+        if number_intersecting_solids and potentially_intersecting_boxes is not None:
+            # flag weather it intersects a surrounding geometry, only testing the solids around the point
+            point = np.array(data_point.point_to_evaluate)
+            in_box = np.all((potentially_intersecting_boxes[:, :3] - BOUNDING_BOX_TOLERANCE <= point)
+                            & (point <= potentially_intersecting_boxes[:, 3:] + BOUNDING_BOX_TOLERANCE), axis=1)
+            intersects = sum(calc_intersection_face_solid(potentially_intersecting_solids[i], data_point)
+                             for i in np.flatnonzero(in_box))
+        elif number_intersecting_solids:
             # flag weather it intersects a surrounding geometry
             intersects = np.vectorize(calc_intersection_face_solid)(potentially_intersecting_solids, data_point)
             intersects = sum(intersects)
@@ -634,11 +788,11 @@ def geometry_main(config, zone_df, surroundings_df, trees_df, terrain_raster, ar
     # Create a triangulated irregular network of terrain from raster
     print("Reading terrain geometry")
     elevation_map = ElevationMap.read_raster(terrain_raster)
-    terrain_tin = elevation_map.generate_tin()
+    os.makedirs(geometry_pickle_dir, exist_ok=True)
+    terrain_tin = geometry_cache.get_terrain_tin(elevation_map, geometry_pickle_dir)
 
     # transform buildings 2D to 3D and add windows
     print("Creating 3D building surfaces")
-    os.makedirs(geometry_pickle_dir, exist_ok=True)
     geometry_3D_zone, geometry_3D_surroundings = building_2d_to_3d(zone_df, surroundings_df, architecture_wwr_df,
                                                                    elevation_map, config, geometry_pickle_dir)
 
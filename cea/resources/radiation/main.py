@@ -14,11 +14,12 @@ from osgeo import gdal
 import cea.config
 import cea.inputlocator
 from cea.datamanagement.databases_verification import verify_input_geometry_zone, verify_input_geometry_surroundings
-from cea.resources.radiation import daysim, geometry_generator
+from cea.resources.radiation import daysim, daysim_scheduler, geometry_generator
 from cea.resources.radiation.daysim import GridSize
 from cea.resources.radiation.radiance import CEADaySim
 from cea.utilities import epwreader
 from cea.utilities.parallel import vectorize
+from cea.utilities.database_cache import read_database
 
 __author__ = "Paul Neitzel, Kian Wee Chen"
 __copyright__ = "Copyright 2016, Architecture and Building Systems - ETH Zurich"
@@ -41,9 +42,9 @@ def read_surface_properties(locator) -> pd.DataFrame:
 
     # local variables
     architectural_properties = gpd.GeoDataFrame.from_file(locator.get_building_architecture())
-    surface_database_windows = pd.read_excel(locator.get_database_envelope_systems(), "WINDOW").set_index("code")
-    surface_database_roof = pd.read_excel(locator.get_database_envelope_systems(), "ROOF").set_index("code")
-    surface_database_walls = pd.read_excel(locator.get_database_envelope_systems(), "WALL").set_index("code")
+    surface_database_windows = read_database(locator.get_database_envelope_systems(), "WINDOW").set_index("code")
+    surface_database_roof = read_database(locator.get_database_envelope_systems(), "ROOF").set_index("code")
+    surface_database_walls = read_database(locator.get_database_envelope_systems(), "WALL").set_index("code")
 
     def match_code(property_code_column: str, code_value_df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -71,10 +72,6 @@ def run_daysim_simulation(cea_daysim: CEADaySim, zone_building_names, locator, s
 
     list_of_building_names = [building_name for building_name in settings.buildings
                               if building_name in zone_building_names]
-    # get chunks of buildings to iterate
-    chunks = [list_of_building_names[i:i + settings.n_buildings_in_chunk] for i in
-              range(0, len(list_of_building_names),
-                    settings.n_buildings_in_chunk)]
 
     write_sensor_data = settings.write_sensor_data
     radiance_parameters = {"rad_ab": settings.rad_ab, "rad_ad": settings.rad_ad, "rad_as": settings.rad_as,
@@ -85,25 +82,42 @@ def run_daysim_simulation(cea_daysim: CEADaySim, zone_building_names, locator, s
 
     grid_size = GridSize(walls=settings.walls_grid, roof=settings.roof_grid)
 
+    # skip the buildings completed by a previous run with the same inputs
+    run_fingerprint = daysim_scheduler.calc_run_fingerprint(locator, settings, radiance_parameters)
+    if settings.resume:
+        completed_buildings = daysim_scheduler.read_completed_buildings(locator, run_fingerprint, write_sensor_data)
+        if completed_buildings:
+            print(f"Resuming: skipping {len(completed_buildings)} buildings completed by a previous run")
+        list_of_building_names = [building_name for building_name in list_of_building_names
+                                  if building_name not in completed_buildings]
+    if not list_of_building_names:
+        print("All buildings are completed")
+        return
+
+    # get chunks of buildings with about the same number of sensors, the largest first
+    sensors_buildings = daysim_scheduler.estimate_sensors_zone(list_of_building_names, grid_size, geometry_pickle_dir)
+    chunks = [chunk for chunk, _ in daysim_scheduler.calc_chunks(list_of_building_names, sensors_buildings,
+                                                                  num_processes, settings.n_buildings_in_chunk)]
     num_chunks = len(chunks)
-
-    if num_chunks == 1:
-        daysim.isolation_daysim(
-            0, cea_daysim, chunks[0], locator, radiance_parameters, write_sensor_data, grid_size,
-            max_global, weatherfile, geometry_pickle_dir)
-    else:
-        vectorize(daysim.isolation_daysim, num_processes)(
-            range(0, num_chunks),
-            repeat(cea_daysim, num_chunks),
-            chunks,
-            repeat(locator, num_chunks),
-            repeat(radiance_parameters, num_chunks),
-            repeat(write_sensor_data, num_chunks),
-            repeat(grid_size, num_chunks),
-            repeat(max_global, num_chunks),
-            repeat(weatherfile, num_chunks),
-            repeat(geometry_pickle_dir, num_chunks)
-        )
+    print(f"Simulating {len(list_of_building_names)} buildings ({sum(sensors_buildings)} sensors, estimated) "
+          f"in {num_chunks} chunks")
+
+    # each chunk is sent to the next free process
+    timings = vectorize(daysim_scheduler.run_daysim_chunk, min(num_processes, num_chunks), chunksize=1)(
+        range(0, num_chunks),
+        repeat(cea_daysim, num_chunks),
+        chunks,
+        repeat(locator, num_chunks),
+        repeat(radiance_parameters, num_chunks),
+        repeat(write_sensor_data, num_chunks),
+        repeat(grid_size, num_chunks),
+        repeat(max_global, num_chunks),
+        repeat(weatherfile, num_chunks),
+        repeat(geometry_pickle_dir, num_chunks),
+        repeat(settings.max_memory_per_chunk, num_chunks),
+        repeat(run_fingerprint, num_chunks)
+    )
+    daysim_scheduler.print_chunk_timings(timings)
 
 
 def main(config):
@@ -9,6 +9,7 @@ from enum import Enum
 
 import numpy as np
 
+from cea.resources.radiation import geometry_cache
 from cea.resources.radiation.geometry_generator import BuildingGeometry
 from py4design.py3dmodel.fetch import points_frm_occface
 
@@ -75,8 +76,20 @@ class CEADaySim:
 
     def create_radiance_geometry(self, geometry_terrain, building_surface_properties, zone_building_names,
                                  surroundings_building_names, geometry_pickle_dir):
+        """
+        Create the Radiance geometry file, or copy the one of a previous run if it was created from the same
+        geometry (see :py:mod:`cea.resources.radiation.geometry_cache`).
+        """
+        fingerprint = geometry_cache.calc_radiance_geometry_fingerprint(geometry_pickle_dir,
+                                                                        building_surface_properties,
+                                                                        zone_building_names,
+                                                                        surroundings_building_names)
+        if geometry_cache.copy_radiance_geometry(geometry_pickle_dir, fingerprint, self.rad_geometry_path):
+            print("Reusing the radiance geometry file of a previous run")
+            return
         create_rad_geometry(self.rad_geometry_path, geometry_terrain, building_surface_properties, zone_building_names,
                             surroundings_building_names, geometry_pickle_dir)
+        geometry_cache.save_radiance_geometry(geometry_pickle_dir, fingerprint, self.rad_geometry_path)
 
     def create_radiance_shading(self, tree_surfaces, leaf_area_densities):
         def tree_to_radiance(tree_id, tree_surface_list):
@@ -450,6 +463,19 @@ class DaySimProject(object):
 
         return data
 
+    def eval_ill_sensor_groups(self, sensor_groups, max_hours):
+        """
+        Reads the results of groups of sensors from the output file of `ds_illum` in a single pass, so that only the
+        results of one group are held in memory at a time (see :py:func:`read_ill_sensor_groups`).
+
+        :param sensor_groups: the position of the first and after the last sensor of each group
+        :type sensor_groups: list[tuple[int, int]]
+        :param int max_hours: maximum number of hours (lines) in the output file
+        :return: Numpy arrays of hourly irradiance results of the sensor points of each group (rows are sensors)
+        """
+        ill_path = os.path.join(self.project_path, f"{self.project_name}.ill")
+        return read_ill_sensor_groups(ill_path, sensor_groups, max_hours, self.tmp_directory)
+
 
 class RadSurface(object):
     """
@@ -497,6 +523,48 @@ class RadSurface(object):
         return surface
 
 
+def read_ill_sensor_groups(ill_path, sensor_groups, max_hours, temporary_folder):
+    """
+    Reads the output file of `ds_illum` once, one line (hour) at a time, and yields the results of each group of
+    sensors in turn. With several groups, the results of each group are written to a memory-mapped file in
+    `temporary_folder` (one row per hour, so every line is written contiguously) and only loaded when the group is
+    yielded.
+
+    :param str ill_path: path to the output file of `ds_illum`
+    :param sensor_groups: the position of the first and after the last sensor of each group
+    :type sensor_groups: list[tuple[int, int]]
+    :param int max_hours: maximum number of hours (lines) in the output file
+    :param str temporary_folder: folder of the memory-mapped results of the groups
+    :return: Numpy arrays of hourly irradiance results of the sensor points of each group (rows are sensors)
+    """
+    in_memory = [len(sensor_groups) == 1 or last == first for first, last in sensor_groups]
+    paths = [os.path.join(temporary_folder, f"sensor_group_{i}.dat") for i in range(len(sensor_groups))]
+    # hours x sensors, the results held in memory are a view of a sensors x hours array
+    results = [np.empty((last - first, max_hours), dtype=np.float32).T if in_memory[i]
+               else np.memmap(paths[i], dtype=np.float32, mode='w+', shape=(max_hours, last - first))
+               for i, (first, last) in enumerate(sensor_groups)]
+    try:
+        hours = 0
+        with open(ill_path) as f:
+            for line in f:
+                if hours == max_hours:
+                    raise ValueError(f"More than {max_hours} hours of results in {ill_path}")
+                values = line.rstrip('\r\n').split(' ')[4:]
+                for group_results, (first, last) in zip(results, sensor_groups):
+                    group_results[hours] = values[first:last]
+                hours += 1
+
+        for i in range(len(sensor_groups)):
+            group_results = results[i][:hours].T
+            results[i] = None
+            yield group_results if in_memory[i] else np.ascontiguousarray(group_results)
+    finally:
+        del results
+        for i, path in enumerate(paths):
+            if not in_memory[i] and os.path.exists(path):
+                os.remove(path)
+
+
 def calc_transmissivity(G_value):
     """
     Calculate window transmissivity from its transmittance using an empirical equation from Radiance.
@@ -14,6 +14,7 @@ from cea.resources.radiation import daysim, geometry_generator
 from cea.resources.radiation.daysim import calc_sensors_zone, GridSize, write_aggregated_results, write_sensor_results
 from cea.resources.radiation.main import read_surface_properties, run_daysim_simulation
 from cea.resources.radiation.radiance import CEADaySim
+from cea.resources.radiation.simplified import surrogate
 from cea.utilities import epwreader
 
 
@@ -134,34 +135,63 @@ def main(config):
     # Fetch simulation buildings based on proximity to sample buildings
     simulation_buildings = fetch_simulation_buildings(sample_buildings, zone_df, buffer_m)
 
-    daysim_staging_location = os.path.join(locator.get_temporary_folder(), 'cea_radiation')
-    cea_daysim = CEADaySim(daysim_staging_location, daysim_bin_path, daysim_lib_path)
-
-    # create radiance input files
-    print("Creating radiance material file")
-    cea_daysim.create_radiance_material(building_surface_properties)
-    print("Creating radiance geometry file")
-    cea_daysim.create_radiance_geometry(geometry_terrain, building_surface_properties, simulation_buildings,
-                                        surroundings_building_names, geometry_staging_location)
-
-    if len(tree_surfaces) > 0:
-        print("Creating radiance shading file")
-        tree_lad = trees_df["density_tc"]
-        cea_daysim.create_radiance_shading(tree_surfaces, tree_lad)
-
-    print("Converting files for DAYSIM")
+    method = config.radiation_simplified.method
+    reuse_model = (method == 'regression' and config.radiation_simplified.reuse_model
+                   and surrogate.SurrogateModel.load(locator.get_radiation_surrogate_folder()) is not None)
     weather_file = locator.get_weather_file()
-    print('Transforming weather files to daysim format')
-    cea_daysim.execute_epw2wea(weather_file)
-    print('Transforming radiance files to daysim format')
-    cea_daysim.execute_radfiles2daysim()
 
     time1 = time.time()
-    run_daysim_simulation(cea_daysim, simulation_buildings, locator, config.radiation, geometry_staging_location,
-                          num_processes=config.get_number_of_processes())
+    if reuse_model:
+        print("Skipping the Daysim simulation of the sample buildings, using the radiation model of a previous run")
+    else:
+        daysim_staging_location = os.path.join(locator.get_temporary_folder(), 'cea_radiation')
+        cea_daysim = CEADaySim(daysim_staging_location, daysim_bin_path, daysim_lib_path)
+
+        # create radiance input files
+        print("Creating radiance material file")
+        cea_daysim.create_radiance_material(building_surface_properties)
+        print("Creating radiance geometry file")
+        cea_daysim.create_radiance_geometry(geometry_terrain, building_surface_properties, simulation_buildings,
+                                            surroundings_building_names, geometry_staging_location)
+
+        if len(tree_surfaces) > 0:
+            print("Creating radiance shading file")
+            tree_lad = trees_df["density_tc"]
+            cea_daysim.create_radiance_shading(tree_surfaces, tree_lad)
+
+        print("Converting files for DAYSIM")
+        print('Transforming weather files to daysim format')
+        cea_daysim.execute_epw2wea(weather_file)
+        print('Transforming radiance files to daysim format')
+        cea_daysim.execute_radfiles2daysim()
+
+        # the regression model is trained on the results of the sensors of the sample buildings
+        write_sensor_data = config.radiation.write_sensor_data
+        if method == 'regression':
+            config.radiation.write_sensor_data = True
+        try:
+            run_daysim_simulation(cea_daysim, simulation_buildings, locator, config.radiation,
+                                  geometry_staging_location, num_processes=config.get_number_of_processes())
+        finally:
+            config.radiation.write_sensor_data = write_sensor_data
+
+        # Remove staging location after everything is successful
+        shutil.rmtree(daysim_staging_location)
 
-    # Remove staging location after everything is successful
-    shutil.rmtree(daysim_staging_location)
+    weatherfile = epwreader.epw_reader(weather_file)
+    date = weatherfile["date"]
+
+    if method == 'regression':
+        estimated_buildings = [building_name for building_name in zone_building_names
+                               if building_name not in sample_buildings]
+        calc_sensors_zone(estimated_buildings + [building_name for building_name in sample_buildings
+                                                 if not os.path.exists(locator.get_radiation_metadata(building_name))],
+                          locator, GridSize(walls=config.radiation.walls_grid, roof=config.radiation.roof_grid),
+                          geometry_staging_location)
+        surrogate.run_surrogate_model(locator, zone_df, sample_buildings, estimated_buildings, date, buffer_m,
+                                      reuse_model, config.radiation.write_sensor_data)
+        print("Radiation estimated in %.2f mins" % ((time.time() - time1) / 60.0))
+        return
 
     # Generate sample values
     sample_values = generate_sample_data(locator, sample_buildings)
@@ -175,8 +205,6 @@ def main(config):
                                                      GridSize(walls=200, roof=200),
                                                      geometry_staging_location)
 
-    weatherfile = epwreader.epw_reader(weather_file)
-    date = weatherfile["date"]
     for building_name, sensors_number, sensor_code, sensor_intersection \
             in zip(names_zone, sensors_number_zone, sensors_code_zone, sensor_intersection_zone):
 
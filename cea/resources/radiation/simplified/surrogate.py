@@ -0,0 +1,458 @@
+"""
+Regression (surrogate) model of the radiation of the sensors of a building, trained on the Daysim results of the sample
+buildings of the simplified radiation script (see :py:mod:`cea.resources.radiation.simplified.main`).
+
+Each sensor is described by a few features: its height above the ground, the direction of its surface (tilt and
+orientation) and the elevation angle of the neighbouring buildings in each sector of the horizon (the obstruction). A
+linear model per surface type and orientation (e.g. ``walls_east``) maps the features to the hourly radiation of the
+sensor, with a coefficient per feature and hour, so that the obstruction towards the sun matters at the hours the sun
+is in that sector.
+
+The model is fitted by ridge regression from the sums of the products of the features and results of each sample
+building (the normal equations), so the results of the sample buildings are read one building at a time. The accuracy of
+the model is estimated by cross-validation: the sample buildings are split in folds, and the results of each fold are
+predicted by a model trained on the other folds and compared to their Daysim results.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import shapely
+from pyarrow import feather
+
+from cea.resources.radiation.daysim import SURFACES, write_aggregated_results, write_sensor_results
+from cea.utilities.fingerprints import calc_fingerprint, remove_fingerprints, unchanged_buildings, write_fingerprints
+from cea.utilities.standardize_coordinates import get_lat_lon_projected_shapefile, get_projected_coordinate_system
+
+__author__ = "Daren Thomas"
+__copyright__ = "Copyright 2024, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+# change this when the features or the model change, to invalidate the stored models
+SURROGATE_MODEL_VERSION = 1
+
+MODEL_FILE = 'surrogate_model.npz'
+ACCURACY_REPORT_FILE = 'accuracy_report.csv'
+
+# number of sectors of the horizon for the obstruction angles
+N_SECTORS = 8
+
+# features of a sensor: intercept, height, tilt and orientation of its surface and the obstruction of each sector
+FEATURES = (['intercept', 'height', 'normal_z', 'normal_x', 'normal_y']
+            + ['obstruction_{k}'.format(k=k) for k in range(N_SECTORS)])
+
+# the height feature is scaled by this height [m], to be of the same order as the other features
+HEIGHT_SCALE = 10.0
+
+# distance [m] between the points sampled on the outlines of the neighbouring buildings
+OUTLINE_SPACING = 5.0
+
+# number of sensors whose obstruction is calculated at once (limits the memory used)
+SENSOR_BLOCK = 1000
+
+# regularization of the ridge regression, relative to the mean variance of the features
+RIDGE_ALPHA = 1e-3
+
+# surface groups with fewer training sensors use the model of the orientation (or of all sensors)
+MIN_TRAINING_SENSORS = 20
+
+# number of folds of the cross-validation of the model
+CROSS_VALIDATION_FOLDS = 5
+
+
+class BuildingOutlines(object):
+    """
+    The footprints of the buildings of the zone with the elevation of their roofs, to calculate the obstruction of the
+    sensors by the neighbouring buildings.
+    """
+
+    def __init__(self, names, footprints, tops):
+        self.names = list(names)
+        self.footprints = np.asarray(footprints, dtype=object)
+        self.tree = shapely.STRtree(self.footprints)
+        self.position = {name: i for i, name in enumerate(self.names)}
+        self.points = []
+        for footprint, top in zip(self.footprints, tops):
+            xy = shapely.get_coordinates(shapely.segmentize(shapely.boundary(footprint), OUTLINE_SPACING))
+            self.points.append(np.column_stack([xy, np.full(len(xy), top)]))
+
+    def neighbour_points(self, building_name, radius):
+        """
+        :return: the points (x, y, top) on the outlines of the other buildings within ``radius`` of the building
+        :rtype: np.ndarray
+        """
+        i = self.position[building_name]
+        neighbours = self.tree.query(self.footprints[i], predicate='dwithin', distance=radius)
+        points = [self.points[j] for j in np.sort(neighbours) if j != i]
+        return np.concatenate(points) if points else np.empty((0, 3))
+
+
+def read_building_outlines(zone_df, metadata):
+    """
+    Read the outlines of the buildings of the zone, in the projected coordinate system of the sensors (see
+    :py:func:`cea.resources.radiation.geometry_generator.standardize_coordinate_systems`).
+
+    :param zone_df: the zone geometry
+    :param dict[str, pd.DataFrame] metadata: the sensors of each building (see :py:func:`read_sensors_metadata`)
+    :return: the outlines and the elevation of the ground of each building
+    :rtype: tuple[BuildingOutlines, dict[str, float]]
+    """
+    lat, lon = get_lat_lon_projected_shapefile(zone_df)
+    zone_df = zone_df.to_crs(get_projected_coordinate_system(lat, lon)).set_index('Name')
+    zone_df = zone_df.loc[[name for name in zone_df.index if name in metadata]]
+
+    tops, base_elevations = [], {}
+    for name, height in zone_df['height_ag'].items():
+        sensors = metadata[name]
+        roofs = sensors[sensors['TYPE'] == 'roofs']
+        top = (roofs if len(roofs) else sensors)['Zcoor'].max()
+        tops.append(top)
+        base_elevations[name] = top - float(height)
+    return BuildingOutlines(zone_df.index, zone_df.geometry.values, tops), base_elevations
+
+
+def read_sensors_metadata(locator, building_name):
+    """The sensors of a building (see :py:func:`cea.resources.radiation.daysim.calc_sensors_zone`)"""
+    return pd.read_csv(locator.get_radiation_metadata(building_name))
+
+
+def calc_features(sensors, base_elevation, neighbour_points, radius):
+    """
+    Calculate the features of the sensors of a building.
+
+    :param pd.DataFrame sensors: the sensors of the building (see :py:func:`read_sensors_metadata`)
+    :param float base_elevation: the elevation of the ground of the building [m]
+    :param np.ndarray neighbour_points: the points on the outlines of the neighbouring buildings (see
+        :py:meth:`BuildingOutlines.neighbour_points`)
+    :param float radius: only the points within this distance of a sensor obstruct it [m]
+    :return: the features of each sensor (sensors x features)
+    :rtype: np.ndarray
+    """
+    x, y, z = sensors[['Xcoor', 'Ycoor', 'Zcoor']].values.T
+    normal_x, normal_y, normal_z = sensors[['Xdir', 'Ydir', 'Zdir']].values.T
+
+    obstruction = np.zeros((len(sensors), N_SECTORS))
+    if len(neighbour_points):
+        px, py, pz = neighbour_points.T
+        for start in range(0, len(sensors), SENSOR_BLOCK):
+            block = slice(start, start + SENSOR_BLOCK)
+            dx = px - x[block, None]
+            dy = py - y[block, None]
+            distance = np.hypot(dx, dy)
+            angle = np.arctan2(pz - z[block, None], distance)
+            # only the points within the radius and in front of the surface obstruct the sensor
+            visible = ((distance > 0) & (distance <= radius)
+                       & (dx * normal_x[block, None] + dy * normal_y[block, None] >= 0))
+            angle = np.where(visible, np.maximum(angle, 0.0), 0.0)
+            # sectors clockwise from the north
+            sector = (np.mod(np.arctan2(dx, dy), 2 * np.pi) // (2 * np.pi / N_SECTORS)).astype(int) % N_SECTORS
+            for k in range(N_SECTORS):
+                obstruction[block, k] = np.max(np.where(sector == k, angle, 0.0), axis=1, initial=0.0)
+
+    return np.column_stack([np.ones(len(sensors)), (z - base_elevation) / HEIGHT_SCALE, normal_z, normal_x, normal_y,
+                            np.sin(obstruction)])
+
+
+def calc_surface_labels(sensors):
+    """The surface of each sensor, e.g. ``walls_east`` (see :py:data:`cea.resources.radiation.daysim.SURFACES`)"""
+    return (sensors['TYPE'] + '_' + sensors['orientation']).values
+
+
+def model_keys(label):
+    """The models that can predict a surface: its own, the one of its orientation and the one of all the sensors"""
+    return [label, label.split('_')[-1], 'all']
+
+
+class TrainingStatistics(object):
+    """
+    The sums of the products of the features and the hourly results of the training sensors (the normal equations of
+    the regression), by model key (see :py:func:`model_keys`).
+    """
+
+    def __init__(self):
+        self.xtx = {}
+        self.xty = {}
+        self.n = {}
+
+    def add(self, labels, features, values):
+        """
+        :param np.ndarray labels: the surface of each sensor
+        :param np.ndarray features: the features of each sensor (sensors x features)
+        :param np.ndarray values: the hourly results of each sensor (sensors x hours) [W/m2]
+        """
+        for label in np.unique(labels):
+            mask = labels == label
+            xtx = features[mask].T @ features[mask]
+            xty = features[mask].T @ values[mask]
+            for key in model_keys(label):
+                if key not in self.n:
+                    self.xtx[key] = np.zeros_like(xtx)
+                    self.xty[key] = np.zeros_like(xty)
+                    self.n[key] = 0
+                self.xtx[key] += xtx
+                self.xty[key] += xty
+                self.n[key] += int(mask.sum())
+
+    def __add__(self, other):
+        result = TrainingStatistics()
+        for statistics in [self, other]:
+            for key, n in statistics.n.items():
+                if key not in result.n:
+                    result.xtx[key] = np.zeros_like(statistics.xtx[key])
+                    result.xty[key] = np.zeros_like(statistics.xty[key])
+                    result.n[key] = 0
+                result.xtx[key] += statistics.xtx[key]
+                result.xty[key] += statistics.xty[key]
+                result.n[key] += n
+        return result
+
+
+class SurrogateModel(object):
+    """
+    The coefficients of the features of the sensors, for each hour and surface (see
+    :py:data:`cea.resources.radiation.daysim.SURFACES`).
+
+    :ivar np.ndarray coefficients: the coefficients of each surface (surfaces x features x hours)
+    """
+
+    def __init__(self, coefficients, radius):
+        self.coefficients = np.asarray(coefficients, dtype=np.float32)
+        self.radius = float(radius)
+        self.fingerprint = calc_fingerprint(SURROGATE_MODEL_VERSION, self.coefficients, self.radius)
+
+    @classmethod
+    def fit(cls, statistics, radius):
+        """
+        Solve the ridge regression of each surface. The surfaces with too few training sensors use the model of their
+        orientation, or of all the training sensors.
+
+        :type statistics: TrainingStatistics
+        :param float radius: the radius of the obstruction features [m]
+        :rtype: SurrogateModel
+        """
+        if statistics.n.get('all', 0) == 0:
+            raise ValueError('There are no Daysim results of sample buildings to train the radiation model.')
+        coefficients = {}
+        for key, n in statistics.n.items():
+            if n < MIN_TRAINING_SENSORS and key != 'all':
+                continue
+            xtx = statistics.xtx[key]
+            # the intercept is not regularized
+            ridge = RIDGE_ALPHA * np.trace(xtx) / len(xtx) * np.diag([0.0] + [1.0] * (len(xtx) - 1))
+            coefficients[key] = np.linalg.solve(xtx + ridge, statistics.xty[key])
+        return cls([coefficients[next(key for key in model_keys(surface) if key in coefficients)]
+                    for surface in SURFACES], radius)
+
+    def predict(self, labels, features):
+        """
+        :param np.ndarray labels: the surface of each sensor
+        :param np.ndarray features: the features of each sensor (sensors x features)
+        :return: the hourly radiation of each sensor (sensors x hours) [W/m2]
+        :rtype: np.ndarray
+        """
+        values = np.zeros((len(labels), self.coefficients.shape[2]), dtype=np.float32)
+        for i, surface in enumerate(SURFACES):
+            mask = labels == surface
+            if mask.any():
+                values[mask] = np.maximum(features[mask] @ self.coefficients[i], 0.0)
+        return values
+
+    def save(self, folder):
+        """Store the model (written to a temporary file first, so a crash does not leave a corrupt model)"""
+        fd, temporary_file = tempfile.mkstemp(dir=folder, suffix='.npz')
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, version=SURROGATE_MODEL_VERSION, surfaces=np.array(SURFACES), features=np.array(FEATURES),
+                     coefficients=self.coefficients, radius=self.radius)
+        os.replace(temporary_file, os.path.join(folder, MODEL_FILE))
+
+    @classmethod
+    def load(cls, folder):
+        """
+        :return: the model stored in ``folder``, or None if there is no model of the current version
+        :rtype: SurrogateModel
+        """
+        path = os.path.join(folder, MODEL_FILE)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            if (int(data['version']) != SURROGATE_MODEL_VERSION or list(data['surfaces']) != SURFACES
+                    or list(data['features']) != FEATURES):
+                return None
+            return cls(data['coefficients'], float(data['radius']))
+
+
+def read_training_data(locator, building_name, outlines, base_elevations, radius):
+    """
+    Read the sensors of a sample building and their Daysim results, without the sensors inside other buildings.
+
+    :return: the surface labels, features and hourly results (sensors x hours) [W/m2] of the sensors
+    :rtype: tuple[np.ndarray, np.ndarray, np.ndarray]
+    """
+    sensors = read_sensors_metadata(locator, building_name)
+    sensors = sensors[sensors['intersection'] == 0]
+    features = calc_features(sensors, base_elevations[building_name],
+                             outlines.neighbour_points(building_name, radius), radius)
+    results = feather.read_feather(locator.get_radiation_building_sensors(building_name))
+    values = results[sensors['SURFACE']].values.T.astype(np.float64)
+    return calc_surface_labels(sensors), features, values
+
+
+def predict_building(model, sensors, features):
+    """
+    :return: the hourly radiation of each sensor of the building, sensors inside other buildings are 0 [W/m2]
+    :rtype: pd.DataFrame
+    """
+    values = model.predict(calc_surface_labels(sensors), features)
+    values[sensors['intersection'].values == 1] = 0
+    return pd.DataFrame(values, index=sensors['SURFACE'].values)
+
+
+def calc_surfaces_kw(sensors, values):
+    """The radiation of each surface of a building, the sum of its sensors weighted by their area [kW]"""
+    labels = calc_surface_labels(sensors)
+    area = sensors['AREA_m2'].values
+    return pd.DataFrame({surface: (area[labels == surface] @ values[labels == surface]) / 1000
+                         for surface in SURFACES})
+
+
+def train_surrogate_model(locator, sample_buildings, outlines, base_elevations, radius):
+    """
+    Train the model on the Daysim results of the sample buildings and estimate its accuracy by cross-validation.
+
+    :return: the model and the accuracy report (see :py:func:`calc_accuracy_report`)
+    :rtype: tuple[SurrogateModel, pd.DataFrame]
+    """
+    sample_buildings = list(sample_buildings)
+    n_folds = min(CROSS_VALIDATION_FOLDS, len(sample_buildings))
+    folds = [sample_buildings[k::n_folds] for k in range(n_folds)]
+
+    fold_statistics = []
+    for fold in folds:
+        statistics = TrainingStatistics()
+        for building_name in fold:
+            statistics.add(*read_training_data(locator, building_name, outlines, base_elevations, radius))
+        fold_statistics.append(statistics)
+    model = SurrogateModel.fit(sum(fold_statistics, TrainingStatistics()), radius)
+
+    report = []
+    if n_folds > 1:
+        for k, fold in enumerate(folds):
+            other_folds = [statistics for j, statistics in enumerate(fold_statistics) if j != k]
+            try:
+                fold_model = SurrogateModel.fit(sum(other_folds, TrainingStatistics()), radius)
+            except ValueError:
+                continue
+            for building_name in fold:
+                sensors = read_sensors_metadata(locator, building_name)
+                features = calc_features(sensors, base_elevations[building_name],
+                                         outlines.neighbour_points(building_name, radius), radius)
+                predicted = calc_surfaces_kw(sensors, predict_building(fold_model, sensors, features).values)
+                daysim = pd.read_csv(locator.get_radiation_building(building_name))
+                report.append(calc_accuracy_report(building_name, predicted, daysim))
+    else:
+        print('The accuracy of the radiation model can only be estimated with at least 2 sample buildings')
+    return model, pd.concat(report, ignore_index=True) if report else pd.DataFrame()
+
+
+def calc_accuracy_report(building_name, predicted, daysim):
+    """
+    Compare the predicted radiation of the surfaces of a building to its Daysim results.
+
+    :param pd.DataFrame predicted: the predicted radiation of each surface [kW] (see :py:func:`calc_surfaces_kw`)
+    :param pd.DataFrame daysim: the Daysim results of the building (see ``locator.get_radiation_building``)
+    :return: the annual radiation [MWh], its error [%] and the hourly RMSE [kW] and normalized RMSE [%] (relative to
+        the mean hourly radiation) of each surface
+    :rtype: pd.DataFrame
+    """
+    rows = []
+    for surface in SURFACES:
+        if daysim[f"{surface}_m2"].iloc[0] == 0:
+            continue
+        expected = daysim[f"{surface}_kW"].values
+        result = predicted[surface].values
+        rmse = float(np.sqrt(np.mean((result - expected) ** 2)))
+        mean = float(np.mean(expected))
+        rows.append({'building': building_name,
+                     'surface': surface,
+                     'daysim_MWhyr': expected.sum() / 1000,
+                     'predicted_MWhyr': result.sum() / 1000,
+                     'error_annual_%': (result.sum() - expected.sum()) / expected.sum() * 100 if mean else 0.0,
+                     'rmse_hourly_kW': rmse,
+                     'nrmse_hourly_%': rmse / mean * 100 if mean else 0.0})
+    return pd.DataFrame(rows)
+
+
+def print_accuracy_report(report):
+    """Print the accuracy of the model for each surface, over all the sample buildings"""
+    if report.empty:
+        return
+    print('Accuracy of the radiation model against Daysim (cross-validation on the sample buildings):')
+    print('  surface         annual error [%]  hourly nRMSE [%]')
+    for surface, rows in report.groupby('surface', sort=False):
+        daysim, predicted = rows['daysim_MWhyr'].sum(), rows['predicted_MWhyr'].sum()
+        error = (predicted - daysim) / daysim * 100 if daysim else 0.0
+        print('  {0:<14}  {1:>16.1f}  {2:>16.1f}'.format(surface, error, rows['nrmse_hourly_%'].median()))
+
+
+def run_surrogate_model(locator, zone_df, sample_buildings, building_names, date, radius, reuse_model,
+                        write_sensor_data):
+    """
+    Estimate the radiation of ``building_names`` with the model trained on the sample buildings (or the stored model
+    if ``reuse_model``). The sensors of all the buildings must be calculated (see
+    :py:func:`cea.resources.radiation.daysim.calc_sensors_zone`) and the sample buildings simulated with Daysim.
+
+    :param zone_df: the zone geometry
+    :param list[str] sample_buildings: the buildings simulated with Daysim
+    :param list[str] building_names: the buildings to estimate
+    :param date: the hours of the year
+    :param float radius: the buildings within this distance of a sensor obstruct it [m]
+    :param bool reuse_model: use the model of a previous run instead of training a new model
+    :param bool write_sensor_data: also write the results of each sensor
+    """
+    folder = locator.get_radiation_surrogate_folder()
+    metadata = {building_name: read_sensors_metadata(locator, building_name)
+                for building_name in zone_df['Name'] if os.path.exists(locator.get_radiation_metadata(building_name))}
+    outlines, base_elevations = read_building_outlines(zone_df, metadata)
+
+    model = SurrogateModel.load(folder) if reuse_model else None
+    if model is not None and model.radius != radius:
+        print('The stored radiation model was trained with another buffer, training a new model')
+        model = None
+    if model is None:
+        print('Training the radiation model on {n} sample buildings'.format(n=len(sample_buildings)))
+        model, report = train_surrogate_model(locator, sample_buildings, outlines, base_elevations, radius)
+        model.save(folder)
+        report.to_csv(os.path.join(folder, ACCURACY_REPORT_FILE), index=False)
+        print_accuracy_report(report)
+    else:
+        print('Using the radiation model of a previous run')
+
+    # only estimate the buildings whose sensors or model changed since their results were written
+    features = {}
+    fingerprints = {}
+    for building_name in building_names:
+        sensors = metadata[building_name]
+        features[building_name] = calc_features(sensors, base_elevations[building_name],
+                                                outlines.neighbour_points(building_name, radius), radius)
+        fingerprints[building_name] = calc_fingerprint(model.fingerprint, sensors, features[building_name],
+                                                       bool(write_sensor_data))
+    unchanged = set(building_name for building_name in unchanged_buildings(folder, fingerprints)
+                    if os.path.exists(locator.get_radiation_building(building_name)))
+    changed = [building_name for building_name in building_names if building_name not in unchanged]
+    print('Estimating the radiation of {n} buildings ({unchanged} unchanged)'.format(n=len(changed),
+                                                                                    unchanged=len(unchanged)))
+
+    remove_fingerprints(folder, changed)
+    for building_name in changed:
+        sensor_values = predict_building(model, metadata[building_name], features[building_name])
+        write_aggregated_results(building_name, sensor_values, locator, date)
+        if write_sensor_data:
+            write_sensor_results(locator.get_radiation_building_sensors(building_name), sensor_values)
+    write_fingerprints(folder, {building_name: fingerprints[building_name] for building_name in changed})
@@ -10,6 +10,7 @@ import numpy as np
 from cea.constants import HEX_WIDTH_M,VEL_FLOW_MPERS, HEAT_CAPACITY_OF_WATER_JPERKGK, H0_KWPERM2K, MIN_FLOW_LPERS, T_MIN, AT_MIN_K, P_SEWAGEWATER_KGPERM3
 import cea.config
 import cea.inputlocator
+from cea.demand.demand_writers import read_demand_results
 
 __author__ = "Jimeno A. Fonseca"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -43,7 +44,7 @@ def calc_sewage_heat_exchanger(locator, config):
     V_lps_external = config.sewage.sewage_water_district
 
     for building_name in names:
-        building = pd.read_csv(locator.get_demand_results_file(building_name))
+        building = read_demand_results(locator, building_name)
         mcp_combi, t_to_sewage = np.vectorize(calc_Sewagetemperature)(building.Qww_sys_kWh, building.Qww_kWh, building.Tww_sys_sup_C,
                                                      building.Tww_sys_re_C, building.mcptw_kWperC, building.mcpww_sys_kWperC, sewage_water_ratio)
         mcpwaste.append(mcp_combi)
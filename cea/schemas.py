@@ -4,6 +4,7 @@ Maintain access to the schemas (input- and output file descriptions) used by the
 parameter allows reading in schemas from ``schemas.yml`` files defined in plugins.
 """
 
+import inspect
 import os
 from typing import List, Optional, Dict
 
@@ -136,11 +137,9 @@ def create_schema_io(locator, lm, schema, original_function=None):
         original_function = create_locator_method(lm, schema)
 
     file_type = schema["file_type"]
-    file_type_to_schema_io = {
-        "csv": CsvSchemaIo,
-        "dbf": DbfSchemaIo,
-        "shp": ShapefileSchemaIo,
-    }
+    if len(schema.get("file_formats", [])) > 1:
+        # the locator method takes a ``format`` argument
+        return MultiFormatSchemaIo(locator, lm, schema, original_function)
     if file_type not in file_type_to_schema_io:
         # just return the default - no read() and write() possible
         return SchemaIo(locator, lm, schema, original_function)
@@ -356,3 +355,90 @@ class ShapefileSchemaIo(SchemaIo):
         df = df.to_crs(get_projected_coordinate_system(lat, lon))
 
         df.to_file(path_to_shp)
+
+
+class ParquetSchemaIo(CsvSchemaIo):
+    """Read and write .parquet files (columnar binary format) - and attempt to validate them."""
+
+    def read(self, *args, **kwargs):
+        """
+        Open the file indicated by the locator method and return it as a Dataframe.
+        args and kwargs are passed to the original (undecorated) locator method to figure out the location of the
+        file.
+
+        :rtype: pd.DataFrame
+        """
+        df = pd.read_parquet(self(*args, **kwargs))
+        self.validate(df)
+        return df
+
+    def write(self, df, *args, **kwargs):
+        """
+        :type df: pd.Dataframe
+        """
+        self.validate(df)
+        path_to_parquet = self(*args, **kwargs)
+        parent_folder = os.path.dirname(path_to_parquet)
+        if not os.path.exists(parent_folder):
+            os.makedirs(parent_folder)
+        df.to_parquet(path_to_parquet, index=False)
+
+
+class FeatherSchemaIo(CsvSchemaIo):
+    """Read and write .feather files (columnar binary format) - and attempt to validate them."""
+
+    def read(self, *args, **kwargs):
+        """
+        Open the file indicated by the locator method and return it as a Dataframe.
+        args and kwargs are passed to the original (undecorated) locator method to figure out the location of the
+        file.
+
+        :rtype: pd.DataFrame
+        """
+        df = pd.read_feather(self(*args, **kwargs))
+        self.validate(df)
+        return df
+
+    def write(self, df, *args, **kwargs):
+        """
+        :type df: pd.Dataframe
+        """
+        self.validate(df)
+        path_to_feather = self(*args, **kwargs)
+        parent_folder = os.path.dirname(path_to_feather)
+        if not os.path.exists(parent_folder):
+            os.makedirs(parent_folder)
+        df.reset_index(drop=True).to_feather(path_to_feather)
+
+
+file_type_to_schema_io = {
+    "csv": CsvSchemaIo,
+    "dbf": DbfSchemaIo,
+    "shp": ShapefileSchemaIo,
+    "parquet": ParquetSchemaIo,
+    "feather": FeatherSchemaIo,
+}
+
+
+class MultiFormatSchemaIo(SchemaIo):
+    """
+    Read and write files that can be stored in several formats (``file_formats`` in schemas.yml). The locator method
+    takes the format as ``format`` argument (positional or keyword), the first of ``file_formats`` being the default.
+    """
+
+    def _schema_io(self, args, kwargs):
+        arguments = inspect.signature(self.original_function).bind(self.locator, *args, **kwargs).arguments
+        file_format = arguments.get("format", self.schema["file_formats"][0])
+        if file_format not in self.schema["file_formats"]:
+            raise ValueError("{lm}: unknown format {file_format}, expected one of {file_formats}".format(
+                lm=self.lm, file_format=file_format, file_formats=self.schema["file_formats"]))
+        return file_type_to_schema_io[file_format](self.locator, self.lm, self.schema, self.original_function)
+
+    def read(self, *args, **kwargs):
+        return self._schema_io(args, kwargs).read(*args, **kwargs)
+
+    def write(self, df, *args, **kwargs):
+        return self._schema_io(args, kwargs).write(df, *args, **kwargs)
+
+    def new(self):
+        return pd.DataFrame(columns=(self.schema["schema"]["columns"].keys()))
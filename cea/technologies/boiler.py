@@ -6,6 +6,7 @@ condensing boilers
 
 
 
+import numpy as np
 from scipy.interpolate import interp1d
 from math import log, ceil
 from cea.technologies.constants import BOILER_P_AUX
@@ -169,6 +170,39 @@ def calc_Cop_boiler(q_load_Wh, Q_nom_W, T_return_to_boiler_K):
     return boiler_eff
 
 
+def calc_Cop_boiler_array(q_load_Wh, Q_nom_W, T_return_to_boiler_K):
+    """
+    Array version of :py:func:`calc_Cop_boiler`: the efficiency of a condensing boiler for all time steps at once.
+
+    :param q_load_Wh: Load per time step
+    :type q_load_Wh: np.ndarray
+
+    :type Q_nom_W: float
+    :param Q_nom_W: Design Load of Boiler
+
+    :type T_return_to_boiler_K : np.ndarray
+    :param T_return_to_boiler_K: Return Temperature of the network to the boiler [K] per time step (or the same value
+                                 for all time steps)
+
+    :retype boiler_eff: np.ndarray
+    :returns boiler_eff: efficiency of Boiler (Lower Heating Value), in abs. numbers, zero when not in operation
+    """
+    q_load_Wh = np.asarray(q_load_Wh, dtype=float)
+    Q_nom_W = np.broadcast_to(Q_nom_W, q_load_Wh.shape)
+    operating = (Q_nom_W > 0.0) & (q_load_Wh > 0.0)
+
+    # calculate efficiency according to partload
+    phi = q_load_Wh[operating] / Q_nom_W[operating]
+    phi[phi >= 1.0] = 0.98  # avoid rounding error
+    T_return_C = np.broadcast_to(T_return_to_boiler_K, q_load_Wh.shape)[operating] - 273.15
+    eff_score = eff_of_phi(phi) / eff_of_phi(1)
+
+    boiler_eff = np.zeros_like(q_load_Wh)
+    boiler_eff[operating] = (eff_score * eff_of_T_return(T_return_C)) / 100.0
+
+    return boiler_eff
+
+
 # investment and maintenance costs
 
 def calc_Cinv_boiler(Q_design_W, technology_type, boiler_cost_data):
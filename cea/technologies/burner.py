@@ -9,6 +9,8 @@ gas burners
 
 from math import log, ceil
 
+import numpy as np
+
 from cea.analysis.costs.equations import calc_capex_annualized
 from cea.technologies.constants import BOILER_P_AUX
 
@@ -43,6 +45,18 @@ def calc_cop_burner(Q_load_W, Q_design_W):
     return burner_eff
 
 
+def calc_cop_burner_array(Q_load_W, Q_design_W):
+    """
+    Array version of :py:func:`calc_cop_burner`: the efficiency of gas burners for all time steps at once.
+    :type Q_load_W: np.ndarray
+    :param Q_load_W: Load per time step
+    :type Q_design_W: float
+    :param Q_design_W: Design Load of Boiler
+    :retype burner_eff: np.ndarray
+    """
+    return np.full(np.shape(Q_load_W), calc_cop_burner(Q_load_W, Q_design_W))
+
+
 def burner_op_cost(Q_load_W, Q_design_W, FuelType, lca, prices):
     """
     This function calculates the operation cost of gas burners supplying heat directly to the high temperature generators
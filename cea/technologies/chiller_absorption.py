@@ -1,14 +1,16 @@
 """
 Absorption chillers
 """
+import copy
+
 import cea.config
 import cea.inputlocator
-import pandas as pd
 import numpy as np
 from math import log, ceil
 # import sympy
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
 from cea.analysis.costs.equations import calc_capex_annualized
+from cea.utilities.database_cache import read_database
 
 __author__ = "Shanshan Hsieh"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -133,6 +135,83 @@ def calc_chiller_main(mdot_chw_kgpers, T_chw_sup_K, T_chw_re_K, T_hw_in_C, T_gro
     return chiller_operation
 
 
+def calc_chiller_main_array(mdot_chw_kgpers, T_chw_sup_K, T_chw_re_K, T_hw_in_C, T_ground_K, absorption_chiller):
+    """
+    Array version of :py:func:`calc_chiller_main`: the operation conditions of the absorption chiller for all time
+    steps at once. The size category of the chiller (and with it the parameters of the characteristic equations) is
+    selected for each time step according to its load, as in :py:func:`calc_chiller_main`. The temperatures are either
+    arrays of the same length as ``mdot_chw_kgpers`` or values that are the same in all time steps.
+
+    :param mdot_chw_kgpers: required chilled water flow rate per time step
+    :type mdot_chw_kgpers: np.ndarray
+    :param T_chw_sup_K: required chilled water supply temperature (outlet from the evaporator)
+    :param T_chw_re_K: required chilled water return temperature (inlet to the evaporator)
+    :param T_hw_in_C: hot water inlet temperature to the generator
+    :param T_ground_K: ground temperature
+    :param AbsorptionChiller absorption_chiller: the properties of the eligible absorption chillers
+    :return: a dict with an array per output of :py:func:`calc_chiller_main`
+    """
+    chiller_prop = absorption_chiller.chiller_prop
+    mdot_chw_kgpers = np.asarray(mdot_chw_kgpers, dtype=float)
+    T_chw_sup_K, T_chw_re_K, T_hw_in_C, T_ground_K = (np.broadcast_to(T, mdot_chw_kgpers.shape) for T in
+                                                      (T_chw_sup_K, T_chw_re_K, T_hw_in_C, T_ground_K))
+    mcp_chw_WperK = mdot_chw_kgpers * HEAT_CAPACITY_OF_WATER_JPERKGK
+    q_chw_total_W = mcp_chw_WperK * (T_chw_re_K - T_chw_sup_K)
+
+    wdot_W = np.zeros_like(q_chw_total_W)
+    q_cw_W = np.zeros_like(q_chw_total_W)
+    q_hw_W = np.zeros_like(q_chw_total_W)
+    T_hw_out_C = np.full_like(q_chw_total_W, np.nan)
+    EER = np.zeros_like(q_chw_total_W)
+
+    operating = ~np.isclose(q_chw_total_W, 0.0)
+    q_load_W = q_chw_total_W[operating]
+
+    # get chiller properties and input conditions according to load
+    cap_min = chiller_prop['cap_min'].values
+    cap_max = chiller_prop['cap_max'].values
+    min_chiller_size_W = min(cap_min)
+    max_chiller_size_W = max(cap_max)
+    size_category = np.full(q_load_W.shape, -1)
+    for row in reversed(range(len(chiller_prop))):
+        # the first size category covering the load
+        size_category[(cap_min[row] <= q_load_W) & (cap_max[row] >= q_load_W)] = row
+    # operate one chiller at minimum load
+    below_min = q_load_W < min_chiller_size_W
+    size_category[below_min] = np.flatnonzero(cap_min == min_chiller_size_W)[0]
+    # distribute loads to multiple chillers operating at maximum load
+    above_max = q_load_W > max_chiller_size_W
+    size_category[above_max] = np.flatnonzero(cap_max == max_chiller_size_W)[0]
+    if np.any(size_category < 0):
+        raise ValueError('No absorption chiller size category for the loads: ', q_load_W[size_category < 0])
+    number_of_chillers_activated = np.where(above_max, q_load_W / max_chiller_size_W, 1.0)
+    q_chw_W = np.where(below_min, min_chiller_size_W, np.where(above_max, max_chiller_size_W, q_load_W))
+
+    input_conditions = {'T_chw_sup_K': T_chw_sup_K[operating],
+                        'T_chw_re_K': T_chw_re_K[operating],
+                        'T_hw_in_C': T_hw_in_C[operating],
+                        'T_ground_K': T_ground_K[operating],
+                        'q_chw_W': q_chw_W}
+    operating_conditions = calc_operating_conditions(absorption_chiller.select_size_categories(size_category),
+                                                     input_conditions)
+
+    # calculate chiller outputs
+    wdot_W[operating] = calc_power_demand(q_chw_W, chiller_prop) * number_of_chillers_activated
+    q_cw_W[operating] = operating_conditions['q_cw_W'] * number_of_chillers_activated
+    q_hw_W[operating] = operating_conditions['q_hw_W'] * number_of_chillers_activated
+    T_hw_out_C[operating] = operating_conditions['T_hw_out_C']
+    EER[operating] = q_load_W / (q_hw_W[operating] + wdot_W[operating])
+
+    if np.any(T_hw_out_C < 0.0):
+        print('T_hw_out_C = ', np.nanmin(T_hw_out_C), ' incorrect condition in ', np.count_nonzero(T_hw_out_C < 0.0),
+              ' time steps, check absorption chiller script.')
+
+    chiller_operation = {'wdot_W': wdot_W, 'q_cw_W': q_cw_W, 'q_hw_W': q_hw_W, 'T_hw_out_C': T_hw_out_C,
+                         'q_chw_W': q_chw_total_W, 'EER': EER}
+
+    return chiller_operation
+
+
 def calc_operating_conditions(absorption_chiller, input_conditions):
     """
     Calculates chiller operating conditions at given input conditions by solving the characteristic equations and the
@@ -393,6 +472,25 @@ class AbsorptionChiller(object):
             self.a_g = chiller_prop['a_g'].values[0]
             self.e_g = chiller_prop['e_g'].values[0]
 
+    def select_size_categories(self, rows):
+        """
+        A copy of the chiller with the properties of the size categories ``rows`` (positions in ``chiller_prop``) as
+        arrays, e.g. the size category operating in each time step, for :py:func:`calc_operating_conditions`.
+        """
+        chiller = copy.copy(self)
+        chiller.code = self.chiller_prop['code'].values[rows]
+        chiller.m_cw_kgpers = self.chiller_prop['m_cw'].values[rows]
+        chiller.m_hw_kgpers = self.chiller_prop['m_hw'].values[rows]
+        chiller.s_e = self.chiller_prop['s_e'].values[rows]
+        chiller.r_e = self.chiller_prop['r_e'].values[rows]
+        chiller.s_g = self.chiller_prop['s_g'].values[rows]
+        chiller.r_g = self.chiller_prop['r_g'].values[rows]
+        chiller.a_e = self.chiller_prop['a_e'].values[rows]
+        chiller.e_e = self.chiller_prop['e_e'].values[rows]
+        chiller.a_g = self.chiller_prop['a_g'].values[rows]
+        chiller.e_g = self.chiller_prop['e_g'].values[rows]
+        return chiller
+
 
 def main(config):
     """
@@ -426,7 +524,7 @@ def main(config):
     T_ground_K = 300
     ach_type = case_dict['ACH_type']
 
-    chiller_prop = AbsorptionChiller(pd.read_excel(locator.get_database_conversion_systems(), sheet_name="ABSORPTION_CHILLERS"), ach_type)
+    chiller_prop = AbsorptionChiller(read_database(locator.get_database_conversion_systems(), sheet_name="ABSORPTION_CHILLERS"), ach_type)
 
     chiller_operation = calc_chiller_main(mdot_chw_kgpers, T_chw_sup_K, T_chw_re_K, T_hw_in_C, T_ground_K, chiller_prop)
     print(chiller_operation)
@@ -2,7 +2,6 @@
 Vapor-compressor chiller
 """
 
-import pandas as pd
 from math import log, ceil
 import numpy as np
 
@@ -12,6 +11,7 @@ from cea.technologies.constants import G_VALUE_CENTRALIZED, G_VALUE_DECENTRALIZE
 
 from cea.optimization.constants import VCC_CODE_CENTRALIZED, VCC_CODE_DECENTRALIZED
 from cea.analysis.costs.equations import calc_capex_annualized
+from cea.utilities.database_cache import read_database
 
 __author__ = "Thuy-An Nguyen"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -88,6 +88,39 @@ def calc_VCC(q_chw_load_Wh, T_chw_sup_K, T_chw_re_K, T_cw_in_K, VC_chiller):
     return chiller_operation
 
 
+def calc_VCC_array(q_chw_load_Wh, T_chw_sup_K, T_chw_re_K, T_cw_in_K, VC_chiller):
+    """
+    Array version of :py:func:`calc_VCC`: the operation of a vapor compression chiller for all time steps at once.
+    The temperatures are either arrays of the same length as ``q_chw_load_Wh`` or values that are the same in all time
+    steps.
+
+    :type q_chw_load_Wh : np.ndarray
+    :param q_chw_load_Wh: cooling demand of building or DCN (i.e. chilled water load) per time step
+    :type VC_chiller : cea.technologies.chiller_vapor_compression.VaporCompressionChiller class object
+    :param VC_chiller: object containing properties of eligible vapor compression chillers
+    :rtype chiller_operation : dict (3 x np.ndarray)
+    :return chiller_operation: electrical energy input, cooling energy input and cooling energy output of VCC
+    """
+    q_chw_load_Wh = np.asarray(q_chw_load_Wh, dtype=float)
+    if not np.all(q_chw_load_Wh >= 0.0):
+        raise ValueError('negative cooling load to VCC: ', q_chw_load_Wh[~(q_chw_load_Wh >= 0.0)])
+
+    operating = q_chw_load_Wh > 0.0
+    T_chw_sup_K = np.broadcast_to(T_chw_sup_K, q_chw_load_Wh.shape)[operating]
+    T_cw_in_K = np.broadcast_to(T_cw_in_K, q_chw_load_Wh.shape)[operating]
+    COP = calc_COP_g(T_chw_sup_K, T_cw_in_K, VC_chiller)
+    if np.any(COP < 0.0):
+        print(f'Negative COP in {np.count_nonzero(COP < 0.0)} time steps: {COP.min()}')
+
+    wdot_W = np.zeros_like(q_chw_load_Wh)
+    wdot_W[operating] = q_chw_load_Wh[operating] / COP
+    q_cw_W = wdot_W + q_chw_load_Wh  # heat rejected to the cold water (cw) loop
+
+    chiller_operation = {'wdot_W': wdot_W, 'q_cw_W': q_cw_W, 'q_chw_W': q_chw_load_Wh}
+
+    return chiller_operation
+
+
 def calc_COP_g(T_evap_K, T_cond_K, VC_chiller):
     """
     Calculate the approximate COP at rated operating conditions using the g-value (sometimes also called
@@ -134,7 +167,7 @@ def calc_Cinv_VCC(Q_nom_W, locator, technology_type):
     Capex_VCC_USD = 0
 
     if Q_nom_W > 0:
-        VCC_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="VAPOR_COMPRESSION_CHILLERS")
+        VCC_cost_data = read_database(locator.get_database_conversion_systems(), sheet_name="VAPOR_COMPRESSION_CHILLERS")
         VCC_cost_data = VCC_cost_data[VCC_cost_data['code'] == technology_type]
         max_chiller_size = max(VCC_cost_data['cap_max'].values)
         # if the Q_design is below the lowest capacity available for the technology, then it is replaced by the least
@@ -233,7 +266,7 @@ class VaporCompressionChiller(object):
         self.setup()
 
     def setup(self):
-        VCC_database = pd.read_excel(self.locator.get_database_conversion_systems(), sheet_name="VAPOR_COMPRESSION_CHILLERS")
+        VCC_database = read_database(self.locator.get_database_conversion_systems(), sheet_name="VAPOR_COMPRESSION_CHILLERS")
         if self.scale == 'DISTRICT':
             technology_type = VCC_CODE_CENTRALIZED
         elif self.scale == 'BUILDING':
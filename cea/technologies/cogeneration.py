@@ -447,6 +447,34 @@ def calc_eta_FC(Q_load_W, Q_design_W, phi_threshold, approach_call):
     return eta_el, eta_therm
 
 
+def calc_eta_FC_array(Q_load_W, Q_design_W):
+    """
+    Array version of the empiric approach (approach "B") of :py:func:`calc_eta_FC`, for the hourly loads of a year.
+
+    :type Q_load_W : np.ndarray
+    :param Q_load_W: Load at each time step
+    :type Q_design_W : float
+    :param Q_design_W: Design Load of FC
+    :rtype: tuple[np.ndarray, np.ndarray]
+    :returns: electric and thermal efficiency of the FC at each time step (Lower Heating Value), in abs. numbers
+    """
+    Q_load_W = np.asarray(Q_load_W, dtype=float)
+    if Q_design_W > 0:
+        phi = Q_load_W / float(Q_design_W)
+    else:
+        phi = np.zeros_like(Q_load_W)
+
+    eta_el_max = 0.39
+    eta_therm_max = 0.58  # * 1.11 as this source gives eff. of HHV
+    eta_el_score = -0.220 + 5.277 * phi - 9.127 * phi ** 2 + 7.172 * phi ** 3 - 2.103 * phi ** 4
+    eta_therm_score = 0.9 - 0.07 * phi + 0.17 * phi ** 2
+
+    eta_el = np.where(phi < 0.2, 0.0, eta_el_max * eta_el_score)
+    eta_therm = eta_therm_max * eta_therm_score
+
+    return eta_el, eta_therm
+
+
 # investment and maintenance costs
 
 def calc_Cinv_CCGT(CC_size_W, CCGT_cost_data):
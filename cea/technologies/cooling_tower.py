@@ -4,10 +4,11 @@ System Modeling: Cooling tower
 
 
 
-import pandas as pd
+import numpy as np
 from math import ceil, log
 from cea.technologies.constants import CT_MIN_PARTLOAD_RATIO
 from cea.analysis.costs.equations import calc_capex_annualized
+from cea.utilities.database_cache import read_database
 __author__ = "Thuy-An Nguyen"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
 __credits__ = ["Thuy-An Nguyen", "Tim Vollrath", "Jimeno A. Fonseca"]
@@ -69,6 +70,31 @@ def calc_CT(q_hot_Wh, Q_nom_W):
     return el_W
 
 
+def calc_CT_array(q_hot_Wh, Q_nom_W):
+    """
+    Array version of :py:func:`calc_CT`: the electricity consumption of a cooling tower for all time steps at once.
+
+    :type q_hot_Wh : np.ndarray
+    :param q_hot_Wh: heat rejected from chiller condensers per time step
+    :type Q_nom_W : float or np.ndarray
+    :param Q_nom_W: installed CT size
+    :rtype: np.ndarray
+    """
+    q_hot_Wh = np.asarray(q_hot_Wh, dtype=float)
+    Q_nom_W = np.broadcast_to(Q_nom_W, q_hot_Wh.shape)
+    operating = (Q_nom_W > 0.0) & (q_hot_Wh > 0.0)
+
+    # calculate CT operation at part load
+    q_partload_ratio = np.maximum(q_hot_Wh[operating] / Q_nom_W[operating], CT_MIN_PARTLOAD_RATIO)
+    w_partload_factor = (0.8603 * q_partload_ratio ** 3 + 0.2045 * q_partload_ratio ** 2
+                         - 0.0623 * q_partload_ratio + 0.0026)
+
+    el_W = np.zeros_like(q_hot_Wh)
+    el_W[operating] = w_partload_factor * (0.011 * Q_nom_W[operating])  # _[B. Stephane, 2012]
+
+    return el_W
+
+
 def calc_CT_partload_factor(q_part_load_ratio):
     """
     Calculate the partload factor according to partload ratio.
@@ -119,7 +145,7 @@ def calc_Cinv_CT(Q_nom_CT_W, locator, technology_type):
     Capex_CT_USD = 0.0
 
     if Q_nom_CT_W > 0:
-        CT_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="COOLING_TOWERS")
+        CT_cost_data = read_database(locator.get_database_conversion_systems(), sheet_name="COOLING_TOWERS")
         CT_cost_data = CT_cost_data[CT_cost_data['code'] == technology_type]
         max_chiller_size = max(CT_cost_data['cap_max'].values)
 
@@ -171,10 +197,9 @@ def calc_Cinv_CT(Q_nom_CT_W, locator, technology_type):
 
 
 def main():
-    import numpy as np
     q_hot_Wh = np.arange(0.0, 1E3, 100)
     Q_nom_W = 1E3
-    wdot_W = np.vectorize(calc_CT)(q_hot_Wh, Q_nom_W)
+    wdot_W = calc_CT_array(q_hot_Wh, Q_nom_W)
     print(wdot_W)
 
 
@@ -62,6 +62,25 @@ def calc_DX(mdot_kgpers, T_sup_K, T_re_K):
     return wdot_W, q_chw_W
 
 
+def calc_DX_array(mdot_kgpers, T_sup_K, T_re_K):
+    """
+    Array version of :py:func:`calc_DX`: the electricity consumption and cooling of direct expansion units for all time
+    steps at once.
+
+    :param np.ndarray mdot_kgpers: chilled water flow rate per time step
+    :param np.ndarray T_sup_K: chilled water supply temperature per time step
+    :param np.ndarray T_re_K: chilled water return temperature per time step
+    :return: electricity consumption and cooling per time step
+    :rtype: (np.ndarray, np.ndarray)
+    """
+    mdot_kgpers = np.asarray(mdot_kgpers, dtype=float)
+    q_chw_W = np.where(np.isclose(mdot_kgpers, 0.0), 0.0,
+                       mdot_kgpers * HEAT_CAPACITY_OF_WATER_JPERKGK * (np.asarray(T_re_K) - T_sup_K))
+    wdot_W = q_chw_W / calc_cop_DX(q_chw_W)
+
+    return wdot_W, q_chw_W
+
+
 # investment and maintenance costs
 
 def calc_Cinv_DX(Q_design_W):
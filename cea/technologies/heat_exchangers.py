@@ -11,6 +11,7 @@ import numpy as np
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
 from cea.technologies.constants import MAX_NODE_FLOW
 from cea.analysis.costs.equations import calc_capex_annualized
+from cea.utilities.database_cache import read_database
 
 __author__ = "Thuy-An Nguyen"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -39,7 +40,7 @@ def calc_Cinv_HEX(Q_design_W, locator, config, technology_type):
 
     """
     if Q_design_W > 0:
-        HEX_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="HEAT_EXCHANGERS")
+        HEX_cost_data = read_database(locator.get_database_conversion_systems(), sheet_name="HEAT_EXCHANGERS")
         HEX_cost_data = HEX_cost_data[HEX_cost_data['code'] == technology_type]
         # if the Q_design is below the lowest capacity available for the technology, then it is replaced by the least
         # capacity for the corresponding technology from the database
@@ -76,8 +77,8 @@ def calc_Cinv_HEX_hisaka(network_info):
     Used in thermal_network_optimization.
     """
     ## read in cost values from database
-    HEX_prices = pd.read_excel(network_info.locator.get_database_conversion_systems(),
-                               sheet_name="HEAT_EXCHANGERS", index_col=0)
+    HEX_prices = read_database(network_info.locator.get_database_conversion_systems(), sheet_name="HEAT_EXCHANGERS")
+    HEX_prices = HEX_prices.set_index(HEX_prices.columns[0])
     a = HEX_prices['a']['District substation heat exchanger']
     b = HEX_prices['b']['District substation heat exchanger']
     c = HEX_prices['c']['District substation heat exchanger']
@@ -7,12 +7,12 @@ heatpumps
 
 
 from math import log, ceil
-import pandas as pd
 from cea.optimization.constants import HP_DELTA_T_COND, HP_DELTA_T_EVAP, HP_ETA_EX, HP_ETA_EX_COOL, HP_AUXRATIO, \
     GHP_AUXRATIO, HP_MAX_T_COND, GHP_ETA_EX, HP_MAX_SIZE, HP_COP_MAX, HP_COP_MIN
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
 import numpy as np
 from cea.analysis.costs.equations import calc_capex_annualized
+from cea.utilities.database_cache import read_database
 
 __author__ = "Thuy-An Nguyen"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -147,6 +147,35 @@ def calc_Cop_GHP(ground_temp_K, mdot_kgpers, T_DH_sup_K, T_re_K):
 
     return wdot_el_W, qcolddot_W, qhotdot_missing_W, tsup2_K
 
+
+def calc_Cop_GHP_array(ground_temp_K, mdot_kgpers, T_DH_sup_K, T_re_K):
+    """
+    Array version of :py:func:`calc_Cop_GHP`: the arguments are hourly arrays (or arrays that broadcast against each
+    other, e.g. one row per size of the heat pump), the outputs are arrays of the same shape.
+
+    :rtype: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+    :returns: wdot_el_W, qcolddot_W, qhotdot_missing_W, tsup2_K (see :py:func:`calc_Cop_GHP`)
+    """
+    ground_temp_K = np.asarray(ground_temp_K, dtype=float)
+    T_DH_sup_K = np.asarray(T_DH_sup_K, dtype=float)
+    # lower the supply temperature if the condenser temperature is above the maximum of the heat pump
+    above_max_T_cond = T_DH_sup_K + HP_DELTA_T_COND > HP_MAX_T_COND
+    tcond_K = np.where(above_max_T_cond, HP_MAX_T_COND, T_DH_sup_K + HP_DELTA_T_COND)
+    tsup2_K = np.where(above_max_T_cond, HP_MAX_T_COND - HP_DELTA_T_COND, T_DH_sup_K)
+
+    tevap_K = ground_temp_K - HP_DELTA_T_EVAP
+    COP = GHP_ETA_EX / (1 - tevap_K / tcond_K)  # [O. Ozgener et al., 2005]_
+
+    qhotdot_W = mdot_kgpers * HEAT_CAPACITY_OF_WATER_JPERKGK * (tsup2_K - T_re_K)
+    qhotdot_missing_W = mdot_kgpers * HEAT_CAPACITY_OF_WATER_JPERKGK * (T_DH_sup_K - tsup2_K)
+
+    wdot_W = qhotdot_W / COP
+    wdot_el_W = wdot_W / GHP_AUXRATIO  # compressor power [C. Montagud et al., 2014]_
+
+    qcolddot_W = qhotdot_W - wdot_W
+
+    return wdot_el_W, qcolddot_W, qhotdot_missing_W, tsup2_K
+
 # ============================
 # operation cost
 # ============================
@@ -375,7 +404,7 @@ def calc_Cinv_HP(HP_Size, locator, technology_type):
     Capex_HP_USD = 0.0
 
     if HP_Size > 0.0:
-        HP_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="HEAT_PUMPS")
+        HP_cost_data = read_database(locator.get_database_conversion_systems(), sheet_name="HEAT_PUMPS")
         HP_cost_data = HP_cost_data[HP_cost_data['code'] == technology_type]
         # if the Q_design is below the lowest capacity available for the technology, then it is replaced by the least
         # capacity for the corresponding technology from the database
@@ -23,6 +23,8 @@ from cea.technologies.solar import constants
 from cea.utilities import epwreader
 from cea.utilities import solar_equations
 from cea.utilities.standardize_coordinates import get_lat_lon_projected_shapefile
+from cea.utilities.database_cache import read_database
+from cea.utilities.sun_properties_cache import get_sun_properties
 
 __author__ = "Jimeno A. Fonseca"
 __copyright__ = "Copyright 2016, Architecture and Building Systems - ETH Zurich"
@@ -58,11 +60,15 @@ def calc_PV(locator, config, latitude, longitude, weather_data, datetime_local,
     metadata_csv_path = locator.get_radiation_metadata(building_name)
 
     # solar properties
-    solar_properties = solar_equations.calc_sun_properties(latitude, longitude, weather_data, datetime_local, config)
+    solar_properties = get_sun_properties(locator, latitude, longitude, weather_data, datetime_local, config)
     print('calculating solar properties done')
 
     # calculate properties of PV panel
     panel_properties_PV = calc_properties_PV_db(locator.get_database_conversion_systems(), config)
+    compared_panel_types = get_compared_panel_types_PV(locator.get_database_conversion_systems(), config)
+    list_panel_properties_PV = [panel_properties_PV] + [
+        calc_properties_PV_db(locator.get_database_conversion_systems(), config, panel_type)
+        for panel_type in compared_panel_types]
     print('gathering properties of PV panel')
 
     # select sensor point with sufficient solar radiation
@@ -95,11 +101,12 @@ def calc_PV(locator, config, latitude, longitude, weather_data, datetime_local,
 
         print('generating groups of sensor points done')
 
-        final = calc_pv_generation(sensor_groups, weather_data, datetime_local, solar_properties, latitude,
-                                   panel_properties_PV)
+        list_final = calc_pv_generation_panel_types(sensor_groups, weather_data, datetime_local, solar_properties,
+                                                    latitude, list_panel_properties_PV)
 
-        final.to_csv(locator.PV_results(building=building_name), index=True,
-                     float_format='%.2f')  # print PV generation potential
+        for panel_type, final in zip([None] + compared_panel_types, list_final):
+            final.to_csv(locator.PV_results(building=building_name, panel_type=panel_type), index=True,
+                         float_format='%.2f')  # print PV generation potential
         sensors_metadata_cat.to_csv(locator.PV_metadata_results(building=building_name), index=True,
                                     index_label='SURFACE',
                                     float_format='%.2f',
@@ -113,7 +120,9 @@ def calc_PV(locator, config, latitude, longitude, weather_data, datetime_local,
              'PV_walls_east_E_kWh': 0, 'PV_walls_east_m2': 0, 'PV_walls_west_E_kWh': 0, 'PV_walls_west_m2': 0,
              'PV_roofs_top_E_kWh': 0, 'PV_roofs_top_m2': 0,
              'E_PV_gen_kWh': 0, 'Area_PV_m2': 0, 'radiation_kWh': 0}, index=range(HOURS_IN_YEAR))
-        final.to_csv(locator.PV_results(building=building_name), index=False, float_format='%.2f', na_rep='nan')
+        for panel_type in [None] + compared_panel_types:
+            final.to_csv(locator.PV_results(building=building_name, panel_type=panel_type), index=False,
+                         float_format='%.2f', na_rep='nan')
         sensors_metadata_cat = pd.DataFrame(
             {'SURFACE': 0, 'AREA_m2': 0, 'BUILDING': 0, 'TYPE': 0, 'Xcoor': 0, 'Xdir': 0, 'Ycoor': 0, 'Ydir': 0,
              'Zcoor': 0, 'Zdir': 0, 'orientation': 0, 'total_rad_Whm2': 0, 'tilt_deg': 0, 'B_deg': 0,
@@ -131,89 +140,83 @@ def calc_pv_generation(sensor_groups, weather_data, date_local, solar_properties
     """
     To calculate the electricity generated from PV panels.
     """
+    return calc_pv_generation_panel_types(sensor_groups, weather_data, date_local, solar_properties, latitude,
+                                          [panel_properties_PV])[0]
+
+
+def calc_pv_generation_panel_types(sensor_groups, weather_data, date_local, solar_properties, latitude,
+                                   list_panel_properties_PV):
+    """
+    To calculate the electricity generated from PV panels of one or more types installed on the same sensor groups.
+    The radiation and the incidence angles are calculated once for all groups as ``(number of groups x hours)`` arrays,
+    the absorbed radiation and the electricity generation once per type of panel.
+
+    :param sensor_groups: properties of sensors in each group
+    :type sensor_groups: dict
+    :param weather_data: weather data read from the epw file
+    :type weather_data: dataframe
+    :param solar_properties: solar properties
+    :param latitude: latitude of the case study location
+    :type latitude: float
+    :param list_panel_properties_PV: properties of each type of PV panel
+    :type list_panel_properties_PV: list[dict]
+    :return: the hourly electricity generation potential of each type of PV panel
+    :rtype: list[dataframe]
+    """
 
     # local variables
-    number_groups = sensor_groups['number_groups']  # number of groups of sensor points
     prop_observers = sensor_groups['prop_observers']  # mean values of sensor properties of each group of sensors
     hourly_radiation = sensor_groups['hourlydata_groups']  # mean hourly radiation of sensors in each group [Wh/m2]
-
-    # convert degree to radians
-    lat = radians(latitude)
-    g_rad = np.radians(solar_properties.g)
-    ha_rad = np.radians(solar_properties.ha)
+    groups = prop_observers.index.values
+
+    # calculate radiation types (direct/diffuse) of each group (groups x hours)
+    I_sol_Wperm2 = hourly_radiation[groups].values.T
+    I_diffuse_Wperm2 = weather_data.ratio_diffhout.values * I_sol_Wperm2  # calculate diffuse radiation
+    I_direct_Wperm2 = I_sol_Wperm2 - I_diffuse_Wperm2  # calculate direct radiation
+    I_sol_Wperm2, I_diffuse_Wperm2, I_direct_Wperm2 = [np.where(np.isnan(I), 0.0, I) for I in
+                                                       [I_sol_Wperm2, I_diffuse_Wperm2, I_direct_Wperm2]]
+
+    # read panel properties of each group (groups x 1)
+    tot_module_area_m2 = prop_observers['area_installed_module_m2'].values.astype(float)[:, np.newaxis]
+    tilt_angle_deg = prop_observers['B_deg'].values.astype(float)[:, np.newaxis]  # tilt angle of panels
+    teta_z_deg = np.radians(prop_observers['surface_azimuth_deg'].values.astype(float))[:, np.newaxis]
+    tilt_rad = np.radians(tilt_angle_deg)  # tilt angle
     Sz_rad = np.radians(solar_properties.Sz)
-    Az_rad = np.radians(solar_properties.Az)
 
-    # empty list to store results
-    list_groups_area = [0 for i in range(number_groups)]
-    total_el_output_PV_kWh = [0 for i in range(number_groups)]
-    total_radiation_kWh = [0 for i in range(number_groups)]
+    # calculate effective incident angles necessary
+    teta_deg = pvlib.irradiance.aoi(tilt_angle_deg, teta_z_deg, np.asarray(solar_properties.Sz),
+                                    np.asarray(solar_properties.Az))
+    teta_rad = np.radians(teta_deg)
+    teta_ed_rad, teta_eg_rad = calc_diffuseground_comp(tilt_rad)
 
-    potential = pd.DataFrame(index=range(HOURS_IN_YEAR))
     panel_orientations = ['walls_south', 'walls_north', 'roofs_top', 'walls_east', 'walls_west']
-    for panel_orientation in panel_orientations:
-        potential['PV_' + panel_orientation + '_E_kWh'] = 0
-        potential['PV_' + panel_orientation + '_m2'] = 0
-
-    eff_nom = panel_properties_PV['PV_n']
-
-    Bref = panel_properties_PV['PV_Bref']
-
-    misc_losses = panel_properties_PV['misc_losses']  # cabling, resistances etc..
-    for group in prop_observers.index.values:
-        # calculate radiation types (direct/diffuse) in group
-        radiation_Wperm2 = solar_equations.cal_radiation_type(group, hourly_radiation, weather_data)
-
-        # read panel properties of each group
-        teta_z_deg = prop_observers.loc[group, 'surface_azimuth_deg']
-        tot_module_area_m2 = prop_observers.loc[group, 'area_installed_module_m2']
-        tilt_angle_deg = prop_observers.loc[group, 'B_deg']  # tilt angle of panels
-        # degree to radians
-        tilt_rad = radians(tilt_angle_deg)  # tilt angle
-        teta_z_deg = radians(teta_z_deg)  # surface azimuth
-
-        # calculate effective incident angles necessary
-        teta_deg = pvlib.irradiance.aoi(tilt_angle_deg, teta_z_deg, solar_properties.Sz, solar_properties.Az)
-        teta_rad = teta_rad = [radians(x) for x in teta_deg]
-        teta_ed_rad, teta_eg_rad = calc_diffuseground_comp(tilt_rad)
-
-        absorbed_radiation_Wperm2 = np.vectorize(calc_absorbed_radiation_PV)(radiation_Wperm2.I_sol,
-                                                                             radiation_Wperm2.I_direct,
-                                                                             radiation_Wperm2.I_diffuse, tilt_rad,
-                                                                             Sz_rad, teta_rad, teta_ed_rad,
-                                                                             teta_eg_rad, panel_properties_PV)
-
-        T_cell_C = np.vectorize(calc_cell_temperature)(absorbed_radiation_Wperm2, weather_data.drybulb_C,
-                                                       panel_properties_PV)
-
-        el_output_PV_kW = np.vectorize(calc_PV_power)(absorbed_radiation_Wperm2, T_cell_C, eff_nom, tot_module_area_m2,
-                                                      Bref, misc_losses)
-
-        # write results from each group
-        panel_orientation = prop_observers.loc[group, 'type_orientation']
-        potential['PV_' + panel_orientation + '_E_kWh'] = potential[
-                                                              'PV_' + panel_orientation + '_E_kWh'] + el_output_PV_kW
-        potential['PV_' + panel_orientation + '_m2'] = potential['PV_' + panel_orientation + '_m2'] + tot_module_area_m2
+    type_orientation = prop_observers['type_orientation'].values
+    list_potentials = []
+    for panel_properties_PV in list_panel_properties_PV:
+        absorbed_radiation_Wperm2 = calc_absorbed_radiation_PV(I_sol_Wperm2, I_direct_Wperm2, I_diffuse_Wperm2,
+                                                               tilt_rad, Sz_rad, teta_rad, teta_ed_rad, teta_eg_rad,
+                                                               panel_properties_PV)
+        T_cell_C = calc_cell_temperature(absorbed_radiation_Wperm2, weather_data.drybulb_C.values,
+                                         panel_properties_PV)
+        el_output_PV_kW = calc_PV_power(absorbed_radiation_Wperm2, T_cell_C, panel_properties_PV['PV_n'],
+                                        tot_module_area_m2, panel_properties_PV['PV_Bref'],
+                                        panel_properties_PV['misc_losses'])  # cabling, resistances etc..
+
+        # write results of the groups of each orientation
+        potential = pd.DataFrame(index=range(HOURS_IN_YEAR))
+        for panel_orientation in panel_orientations:
+            in_orientation = type_orientation == panel_orientation
+            potential['PV_' + panel_orientation + '_E_kWh'] = el_output_PV_kW[in_orientation].sum(axis=0)
+            potential['PV_' + panel_orientation + '_m2'] = tot_module_area_m2[in_orientation].sum()
 
         # aggregate results from all modules
-        list_groups_area[group] = tot_module_area_m2
-        total_el_output_PV_kWh[group] = el_output_PV_kW
-        total_radiation_kWh[group] = (radiation_Wperm2['I_sol'] * tot_module_area_m2 / 1000)  # kWh
-
-    # check for missing groups and assign 0 as el_output_PV_kW
-    # panel_orientations = ['walls_south', 'walls_north', 'roofs_top', 'walls_east', 'walls_west']
-    # for panel_orientation in panel_orientations:
-    #     if panel_orientation not in prop_observers['type_orientation'].values:
-    #         potential['PV_' + panel_orientation + '_E_kWh'] = 0
-    #         potential['PV_' + panel_orientation + '_m2'] = 0
+        potential['E_PV_gen_kWh'] = el_output_PV_kW.sum(axis=0)
+        potential['radiation_kWh'] = (I_sol_Wperm2 * tot_module_area_m2 / 1000).sum(axis=0)  # kWh
+        potential['Area_PV_m2'] = tot_module_area_m2.sum()
+        potential['Date'] = date_local
+        list_potentials.append(potential.set_index('Date'))
 
-    potential['E_PV_gen_kWh'] = sum(total_el_output_PV_kWh)
-    potential['radiation_kWh'] = sum(total_radiation_kWh).values
-    potential['Area_PV_m2'] = sum(list_groups_area)
-    potential['Date'] = date_local
-    potential = potential.set_index('Date')
-
-    return potential
+    return list_potentials
 
 
 def calc_cell_temperature(absorbed_radiation_Wperm2, T_external_C, panel_properties_PV):
@@ -277,25 +280,28 @@ def calc_diffuseground_comp(tilt_radians):
     """
     To calculate reflected radiation and diffuse radiation.
     :param tilt_radians:  surface tilt angle [rad]
-    :type tilt_radians: float
+    :type tilt_radians: float | ndarray
     :return teta_ed: effective incidence angle from diffuse radiation [rad]
     :return teta_eg: effective incidence angle from ground-reflected radiation [rad]
-    :rtype teta_ed: float
-    :rtype teta_eg: float
+    :rtype teta_ed: float | ndarray
+    :rtype teta_eg: float | ndarray
 
     :References: Duffie, J. A. and Beckman, W. A. (2013) Radiation Transmission through Glazing: Absorbed Radiation, in
                  Solar Engineering of Thermal Processes, Fourth Edition, John Wiley & Sons, Inc., Hoboken, NJ, USA.
                  doi: 10.1002/9781118671603.ch5
 
     """
-    tilt = degrees(tilt_radians)
+    tilt = np.degrees(tilt_radians)
     teta_ed = 59.68 - 0.1388 * tilt + 0.001497 * tilt ** 2  # [degrees] (5.4.2)
     teta_eG = 90 - 0.5788 * tilt + 0.002693 * tilt ** 2  # [degrees] (5.4.1)
-    return radians(teta_ed), radians(teta_eG)
+    return np.radians(teta_ed), np.radians(teta_eG)
 
 
 def calc_absorbed_radiation_PV(I_sol, I_direct, I_diffuse, tilt, Sz, teta, tetaed, tetaeg, panel_properties_PV):
     """
+    To calculate the radiation absorbed by PV panels. The radiation and the angles can be floats or arrays that
+    broadcast against each other, e.g. ``(groups x hours)`` arrays of radiation with ``(groups x 1)`` tilt angles.
+
     :param I_sol: total solar radiation [Wh/m2]
     :param I_direct: direct solar radiation [Wh/m2]
     :param I_diffuse: diffuse solar radiation [Wh/m2]
@@ -304,17 +310,18 @@ def calc_absorbed_radiation_PV(I_sol, I_direct, I_diffuse, tilt, Sz, teta, tetae
     :param teta: angle of incidence [rad]
     :param tetaed: effective incidence angle from diffuse radiation [rad]
     :param tetaeg: effective incidence angle from ground-reflected radiation [rad]
-    :type I_sol: float
-    :type I_direct: float
-    :type I_diffuse: float
-    :type tilt: float
-    :type Sz: float
-    :type teta: float
-    :type tetaed: float
-    :type tetaeg: float
+    :type I_sol: float | ndarray
+    :type I_direct: float | ndarray
+    :type I_diffuse: float | ndarray
+    :type tilt: float | ndarray
+    :type Sz: float | ndarray
+    :type teta: float | ndarray
+    :type tetaed: float | ndarray
+    :type tetaeg: float | ndarray
     :param panel_properties_PV: properties of the PV panel
     :type panel_properties_PV: dataframe
-    :return:
+    :return: absorbed radiation [W/m2]
+    :rtype: ndarray
 
     :References: Duffie, J. A. and Beckman, W. A. (2013) Radiation Transmission through Glazing: Absorbed Radiation, in
                  Solar Engineering of Thermal Processes, Fourth Edition, John Wiley & Sons, Inc., Hoboken, NJ, USA.
@@ -339,66 +346,60 @@ def calc_absorbed_radiation_PV(I_sol, I_direct, I_diffuse, tilt, Sz, teta, tetae
     lim2 = radians(90)
     lim3 = radians(89.999)
 
-    if teta < lim1:
-        teta = min(lim3, abs(teta))
-    if teta >= lim2:
-        teta = lim3
+    teta = np.where(teta < lim1, np.minimum(lim3, np.abs(teta)), teta)
+    teta = np.where(teta >= lim2, lim3, teta)
 
-    if Sz < lim1:
-        Sz = min(lim3, abs(Sz))
-    if Sz >= lim2:
-        Sz = lim3
+    Sz = np.where(Sz < lim1, np.minimum(lim3, np.abs(Sz)), Sz)
+    Sz = np.where(Sz >= lim2, lim3, Sz)
 
-    # Rb: ratio of beam radiation of tilted surface to that on horizontal surface
-    if Sz <= radians(85):  # Sz is Zenith angle   # TODO: FIND REFERENCE
-        Rb = cos(teta) / cos(Sz)
-    else:
-        Rb = 0  # Assume there is no direct radiation when the sun is close to the horizon.
-
-    # calculate air mass modifier
-    m = 1 / cos(Sz)  # air mass
-    M = a0 + a1 * m + a2 * m ** 2 + a3 * m ** 3 + a4 * m ** 4  # air mass modifier
-    M = np.clip(M, 0.001, 1.1)  # De Soto et al., 2006
-
-    # incidence angle modifier for direct (beam) radiation
-    teta_r = asin(sin(teta) / n)  # refraction angle in radians(approximation according to Soteris A.) (5.1.4)
-    Ta_n = exp(-K * L) * (1 - ((n - 1) / (n + 1)) ** 2)
-    if teta < radians(90):  # 90 degrees in radians
-        part1 = teta_r + teta
-        part2 = teta_r - teta
-        Ta_B = exp((-K * L) / cos(teta_r)) * (
-                1 - 0.5 * ((sin(part2) ** 2) / (sin(part1) ** 2) + (tan(part2) ** 2) / (tan(part1) ** 2)))
-        kteta_B = Ta_B / Ta_n
-    else:
-        kteta_B = 0
-
-    # incidence angle modifier for diffuse radiation
-    teta_r = asin(sin(tetaed) / n)  # refraction angle for diffuse radiation [rad]
-    part1 = teta_r + tetaed
-    part2 = teta_r - tetaed
-    Ta_D = exp((-K * L) / cos(teta_r)) * (
-            1 - 0.5 * ((sin(part2) ** 2) / (sin(part1) ** 2) + (tan(part2) ** 2) / (tan(part1) ** 2)))
-    kteta_D = Ta_D / Ta_n
-
-    # incidence angle modifier for ground-reflected radiation
-    teta_r = asin(sin(tetaeg) / n)  # refraction angle for ground-reflected radiation [rad]
-    part1 = teta_r + tetaeg
-    part2 = teta_r - tetaeg
-    Ta_eG = exp((-K * L) / cos(teta_r)) * (
-            1 - 0.5 * ((sin(part2) ** 2) / (sin(part1) ** 2) + (tan(part2) ** 2) / (tan(part1) ** 2)))
-    kteta_eG = Ta_eG / Ta_n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Rb: ratio of beam radiation of tilted surface to that on horizontal surface
+        # Sz is Zenith angle, assume there is no direct radiation when the sun is close to the horizon.
+        Rb = np.where(Sz <= radians(85), np.cos(teta) / np.cos(Sz), 0)  # TODO: FIND REFERENCE
+
+        # calculate air mass modifier
+        m = 1 / np.cos(Sz)  # air mass
+        M = a0 + a1 * m + a2 * m ** 2 + a3 * m ** 3 + a4 * m ** 4  # air mass modifier
+        M = np.clip(M, 0.001, 1.1)  # De Soto et al., 2006
+
+        # incidence angle modifier for direct (beam) radiation
+        Ta_n = exp(-K * L) * (1 - ((n - 1) / (n + 1)) ** 2)
+        kteta_B = np.where(teta < radians(90), calc_transmittance_glazing(teta, n, K, L) / Ta_n, 0)
+
+        # incidence angle modifier for diffuse radiation
+        kteta_D = calc_transmittance_glazing(tetaed, n, K, L) / Ta_n
+
+        # incidence angle modifier for ground-reflected radiation
+        kteta_eG = calc_transmittance_glazing(tetaeg, n, K, L) / Ta_n
 
     # absorbed solar radiation
     absorbed_radiation_Wperm2 = M * Ta_n * (
-            kteta_B * I_direct * Rb + kteta_D * I_diffuse * (1 + cos(tilt)) / 2 + kteta_eG * I_sol * Pg * (
-            1 - cos(tilt)) / 2)  # [W/m2] (5.12.1)
-    if absorbed_radiation_Wperm2 < 0.0:  # when points are 0 and too much losses
-        # print ('the absorbed radiation', absorbed_radiation_Wperm2 ,'is negative, please check calc_absorbed_radiation_PVT')
-        absorbed_radiation_Wperm2 = 0.0
+            kteta_B * I_direct * Rb + kteta_D * I_diffuse * (1 + np.cos(tilt)) / 2 + kteta_eG * I_sol * Pg * (
+            1 - np.cos(tilt)) / 2)  # [W/m2] (5.12.1)
+    # when points are 0 and too much losses
+    absorbed_radiation_Wperm2 = np.where(absorbed_radiation_Wperm2 < 0.0, 0.0, absorbed_radiation_Wperm2)
 
     return absorbed_radiation_Wperm2
 
 
+def calc_transmittance_glazing(teta, n, K, L):
+    """
+    To calculate the transmittance of the glazing of the panel for an angle of incidence.
+
+    :param teta: angle of incidence [rad]
+    :param n: refractive index of glass [-]
+    :param K: glazing extinction coefficient [1/m]
+    :param L: glazing thickness [m]
+    :return: transmittance of the glazing [-]
+    """
+    teta_r = np.arcsin(np.sin(teta) / n)  # refraction angle in radians(approximation according to Soteris A.) (5.1.4)
+    part1 = teta_r + teta
+    part2 = teta_r - teta
+    Ta = np.exp((-K * L) / np.cos(teta_r)) * (
+            1 - 0.5 * ((np.sin(part2) ** 2) / (np.sin(part1) ** 2) + (np.tan(part2) ** 2) / (np.tan(part1) ** 2)))
+    return Ta
+
+
 def calc_PV_power(absorbed_radiation_Wperm2, T_cell_C, eff_nom, tot_module_area_m2, Bref_perC, misc_losses):
     """
     To calculate the power production of PV panels.
@@ -658,21 +659,35 @@ def calc_surface_azimuth(xdir, ydir, B):
 # TODO: Delete when done
 
 
-def calc_properties_PV_db(database_path, config):
+def calc_properties_PV_db(database_path, config, type_PVpanel=None):
     """
     To assign PV module properties according to panel types.
 
-    :param type_PVpanel: type of PV panel used
+    :param type_PVpanel: type of PV panel used (default: ``solar:type-pvpanel``)
     :type type_PVpanel: string
     :return: dict with Properties of the panel taken form the database
     """
-    type_PVpanel = config.solar.type_PVpanel
-    data = pd.read_excel(database_path, sheet_name="PHOTOVOLTAIC_PANELS")
+    if type_PVpanel is None:
+        type_PVpanel = config.solar.type_PVpanel
+    data = read_database(database_path, sheet_name="PHOTOVOLTAIC_PANELS")
     panel_properties = data[data['code'] == type_PVpanel].reset_index().T.to_dict()[0]
 
     return panel_properties
 
 
+def get_compared_panel_types_PV(database_path, config):
+    """
+    The types of PV panels calculated in addition to ``solar:type-pvpanel`` (see ``solar:compare-pvpanels``).
+
+    :return: the other types of PV panels in the database, if they are compared, else an empty list
+    :rtype: list[str]
+    """
+    if not config.solar.compare_pvpanels:
+        return []
+    data = read_database(database_path, sheet_name="PHOTOVOLTAIC_PANELS")
+    return [panel_type for panel_type in data['code'].drop_duplicates() if panel_type != config.solar.type_PVpanel]
+
+
 # investment and maintenance costs
 # FIXME: it looks like this function is never used!!! (REMOVE)
 def calc_Cinv_pv(total_module_area_m2, locator, technology=0):
@@ -681,7 +696,7 @@ def calc_Cinv_pv(total_module_area_m2, locator, technology=0):
     :param P_peak: installed capacity of PV module [kW]
     :return InvCa: capital cost of the installed PV module [CHF/Y]
     """
-    PV_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="PHOTOVOLTAIC_PANELS")
+    PV_cost_data = read_database(locator.get_database_conversion_systems(), sheet_name="PHOTOVOLTAIC_PANELS")
     technology_code = list(set(PV_cost_data['code']))
     PV_cost_data = PV_cost_data[PV_cost_data['code'] == technology_code[technology]]
     nominal_efficiency = PV_cost_data[PV_cost_data['code'] == technology_code[technology]]['PV_n'].max()
@@ -738,12 +753,12 @@ def calc_Crem_pv(E_nom):
     return KEV_obtained_in_RpPerkWh
 
 
-def aggregate_results(locator, building_names):
+def aggregate_results(locator, building_names, panel_type=None):
     aggregated_hourly_results_df = pd.DataFrame()
     aggregated_annual_results = pd.DataFrame()
 
     for i, building in enumerate(building_names):
-        hourly_results_per_building = pd.read_csv(locator.PV_results(building)).set_index('Date')
+        hourly_results_per_building = pd.read_csv(locator.PV_results(building, panel_type)).set_index('Date')
         if i == 0:
             aggregated_hourly_results_df = hourly_results_per_building
         else:
@@ -758,17 +773,21 @@ def aggregate_results(locator, building_names):
 
 
 def aggregate_results_func(args):
-    return aggregate_results(args[0], args[1])
+    return aggregate_results(args[0], args[1], args[2])
 
 
-def write_aggregate_results(config, locator, building_names):
+def write_aggregate_results(config, locator, building_names, compared_panel_type=None):
+    """
+    Write the hourly and annual results of all buildings, for ``solar:type-pvpanel`` or for one of the compared types
+    of PV panels (``compared_panel_type``).
+    """
     aggregated_hourly_results_df = pd.DataFrame()
     aggregated_annual_results = pd.DataFrame()
-    panel_type = config.solar.type_PVpanel
+    panel_type = compared_panel_type or config.solar.type_PVpanel
 
     num_process = 4
     with Pool(processes=num_process) as pool:
-        args = [(locator, x) for x in np.array_split(building_names, num_process) if x.size != 0]
+        args = [(locator, x, compared_panel_type) for x in np.array_split(building_names, num_process) if x.size != 0]
         for i, x in enumerate(pool.map(aggregate_results_func, args)):
             hourly_results_df, annual_results = x
             if i == 0:
@@ -796,6 +815,7 @@ def main(config):
     print('Running photovoltaic with panel-on-wall = %s' % config.solar.panel_on_wall)
     print('Running photovoltaic with solar-window-solstice = %s' % config.solar.solar_window_solstice)
     print('Running photovoltaic with type-pvpanel = %s' % config.solar.type_pvpanel)
+    print('Running photovoltaic with compare-pvpanels = %s' % config.solar.compare_pvpanels)
     if config.solar.custom_tilt_angle:
         print('Running photovoltaic with custom-tilt-angle = %s and panel-tilt-angle = %s' %
               (config.solar.custom_tilt_angle, config.solar.panel_tilt_angle))
@@ -811,6 +831,9 @@ def main(config):
     weather_data = epwreader.epw_reader(locator.get_weather_file())
     date_local = solar_equations.calc_datetime_local_from_weather_file(weather_data, latitude, longitude)
 
+    # calculate the sun properties once, the buildings read them from the scenario-level cache
+    get_sun_properties(locator, latitude, longitude, weather_data, date_local, config)
+
     num_process = config.get_number_of_processes()
     n = len(building_names)
     cea.utilities.parallel.vectorize(calc_PV, num_process)(repeat(locator, n),
@@ -823,6 +846,8 @@ def main(config):
 
     # aggregate results from all buildings
     write_aggregate_results(config, locator, building_names)
+    for panel_type in get_compared_panel_types_PV(locator.get_database_conversion_systems(), config):
+        write_aggregate_results(config, locator, building_names, panel_type)
 
 
 if __name__ == '__main__':
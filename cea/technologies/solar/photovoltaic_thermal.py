@@ -23,11 +23,14 @@ from cea.technologies.solar.photovoltaic import (calc_properties_PV_db, calc_PV_
                                                  calc_absorbed_radiation_PV, calc_cell_temperature)
 from cea.technologies.solar.solar_collector import (calc_properties_SC_db, calc_IAM_beam_SC, calc_q_rad, calc_q_gain,
                                                     vectorize_calc_Eaux_SC, calc_optimal_mass_flow,
-                                                    calc_optimal_mass_flow_2, calc_qloss_network)
+                                                    calc_optimal_mass_flow_2, calc_qloss_network,
+                                                    get_hourly_calculation)
 from cea.utilities import epwreader
 from cea.utilities import solar_equations
 from cea.utilities.standardize_coordinates import get_lat_lon_projected_shapefile
 from cea.analysis.costs.equations import calc_capex_annualized
+from cea.utilities.database_cache import read_database
+from cea.utilities.sun_properties_cache import get_sun_properties
 
 __author__ = "Jimeno A. Fonseca"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -69,7 +72,7 @@ def calc_PVT(locator, config, latitude, longitude, weather_data, date_local, bui
     metadata_csv_path = locator.get_radiation_metadata(building_name)
 
     # solar properties
-    solar_properties = solar_equations.calc_sun_properties(latitude, longitude, weather_data, date_local, config)
+    solar_properties = get_sun_properties(locator, latitude, longitude, weather_data, date_local, config)
     print('calculating solar properties done for building %s' % building_name)
 
     # get properties of the panel to evaluate # TODO: find a PVT module reference
@@ -228,14 +231,14 @@ def calc_PVT_generation(sensor_groups, weather_data, date_local, solar_propertie
         teta_ed_rad, teta_eg_rad = calc_diffuseground_comp(tilt_rad)
 
         # absorbed radiation and Tcell
-        absorbed_radiation_PV_Wperm2 = np.vectorize(calc_absorbed_radiation_PV)(radiation_Wperm2.I_sol,
-                                                                                radiation_Wperm2.I_direct,
-                                                                                radiation_Wperm2.I_diffuse, tilt_rad,
-                                                                                Sz_rad, teta_rad, teta_ed_rad,
-                                                                                teta_eg_rad, panel_properties_PV)
+        absorbed_radiation_PV_Wperm2 = calc_absorbed_radiation_PV(radiation_Wperm2.I_sol.values,
+                                                                  radiation_Wperm2.I_direct.values,
+                                                                  radiation_Wperm2.I_diffuse.values, tilt_rad,
+                                                                  np.asarray(Sz_rad), teta_rad, teta_ed_rad,
+                                                                  teta_eg_rad, panel_properties_PV)
 
-        T_cell_C = np.vectorize(calc_cell_temperature)(absorbed_radiation_PV_Wperm2, weather_data.drybulb_C,
-                                                       panel_properties_PV)
+        T_cell_C = calc_cell_temperature(absorbed_radiation_PV_Wperm2, weather_data.drybulb_C.values,
+                                         panel_properties_PV)
 
         ## SC heat generation
         # calculate incidence angle modifier for beam radiation
@@ -393,76 +396,20 @@ def calc_PVT_module(config, radiation_Wperm2, panel_properties_SC, panel_propert
     tilt_rad = radians(tilt_angle_deg)
     q_rad_vector = np.vectorize(calc_q_rad)(n0, IAM_b, IAM_d, radiation_Wperm2.I_direct, radiation_Wperm2.I_diffuse,
                                             tilt_rad)  # absorbed solar radiation in W/m2 is a mean of the group
-    counter = 0
-    Flag = False
-    Flag2 = False
+    q_rad_vector = np.asarray(q_rad_vector, dtype=np.float64)
+    Tamb_vector_C = np.asarray(Tamb_vector_C, dtype=np.float64)
+    hourly_calculation = get_hourly_calculation(config, do_hourly_calculation)
     for flow in range(6):
-        Mo_seg = 1  # mode of segmented heat loss calculation. only one mode is implemented.
-        TIME0 = 0
-        DELT = 1  # timestep 1 hour
-        delts = DELT * 3600  # convert time step in seconds
-        Tfl = np.zeros(3)  # create vector to store value at previous [1] and present [2] time-steps
-        DT = np.zeros(3)
-        Tabs = np.zeros(3)
-        STORED = np.zeros(600)
-        TflA = np.zeros(600)
-        TflB = np.zeros(600)
-        TabsB = np.zeros(600)
-        TabsA = np.zeros(600)
-        q_gain_Seg = np.zeros(101)  # maximum Iseg = maximum Nseg + 1 = 101
-
-        for t in range(HOURS_IN_YEAR):
-            # c1_pvt = c1 - eff_nom * Bref * absorbed_radiation_PV_Wperm2[time] #todo: to delete
-            c1_pvt = calc_cl_pvt(Bref, absorbed_radiation_PV_Wperm2, c1, eff_nom, t)
-            Mfl_kgpers = calc_Mfl_kgpers(DELT, Nseg, STORED, TIME0, Tin_C, specific_flows_kgpers[flow], t,
-                                         Cp_fluid_JperkgK, C_eff_Jperm2K, aperture_area_m2)
-
-            # calculate average fluid temperature and average absorber temperature at the beginning of the time-step
-            Tamb_C = Tamb_vector_C[t]
-            q_rad_Wperm2 = q_rad_vector[t]
-            Tout_C = calc_Tout_C(Cp_fluid_JperkgK, DT, Mfl_kgpers, Nseg, STORED, Tabs, Tamb_C, Tfl, Tin_C,
-                                 aperture_area_m2, c1_pvt, q_rad_Wperm2)
-
-            # calculate q_gain with the guess for DT[1]
-            q_gain_Wperm2 = calc_q_gain(Tfl, q_rad_Wperm2, DT, Tin_C, aperture_area_m2, c1_pvt, c2,
-                                        Mfl_kgpers, delts, Cp_fluid_JperkgK, C_eff_Jperm2K, Tamb_C)
-
-            Aseg_m2 = aperture_area_m2 / Nseg  # aperture area per segment
-
-            # multi-segment calculation to avoid temperature jump at times of flow rate changes
-            Tout_Seg_C = do_multi_segment_calculation(Aseg_m2, C_eff_Jperm2K, Cp_fluid_JperkgK, DT, Mfl_kgpers, Mo_seg,
-                                                      Nseg, STORED, Tabs, TabsA, Tamb_C, Tfl, TflA, TflB, Tin_C, Tout_C,
-                                                      c1_pvt, c2, delts, q_gain_Seg, q_gain_Wperm2, q_rad_Wperm2)
-
-            # resulting energy output
-            q_out_kW = Mfl_kgpers * Cp_fluid_JperkgK * (Tout_Seg_C - Tin_C) / 1000  # [kW]
-            Tabs[2] = 0
-            # storage of the mean temperature
-            for Iseg in range(1, Nseg + 1):
-                STORED[200 + Iseg] = TflB[Iseg]
-                STORED[400 + Iseg] = TabsB[Iseg]
-                Tabs[2] = Tabs[2] + TabsB[Iseg] / Nseg
-
-            # outputs
-            temperature_out[flow][t] = Tout_Seg_C
-            temperature_in[flow][t] = Tin_C
-            supply_out_kW[flow][t] = q_out_kW
-            temperature_mean[flow][t] = (Tin_C + Tout_Seg_C) / 2  # Mean absorber temperature at present
-
-            q_gain_Wperm2 = 0
-            TavgB = 0
-            TavgA = 0
-            for Iseg in range(1, Nseg + 1):
-                q_gain_Wperm2 = q_gain_Wperm2 + q_gain_Seg * Aseg_m2  # W
-                TavgA = TavgA + TflA[Iseg] / Nseg
-                TavgB = TavgB + TflB[Iseg] / Nseg
-
-                # # OUT[9] = qgain/Area_a # in W/m2
-                # q_mtherm_Wperm2 = (TavgB - TavgA) * C_eff_Jperm2K * aperture_area_m2 / delts
-                # q_balance_error = q_gain_Wperm2 - q_mtherm_Wperm2 - q_out_kW
-
-                # OUT[11] = q_mtherm
-                # OUT[12] = q_balance_error
+        temperature_out[flow], supply_out_kW[flow] = hourly_calculation(float(Bref), float(C_eff_Jperm2K),
+                                                                        float(Cp_fluid_JperkgK), int(Nseg),
+                                                                        float(Tin_C), Tamb_vector_C,
+                                                                        np.asarray(absorbed_radiation_PV_Wperm2,
+                                                                                   dtype=np.float64),
+                                                                        float(aperture_area_m2), float(c1),
+                                                                        float(c2), float(eff_nom), q_rad_vector,
+                                                                        specific_flows_kgpers[flow])
+        temperature_in[flow][:] = Tin_C
+        temperature_mean[flow] = (Tin_C + temperature_out[flow]) / 2  # Mean absorber temperature at present
         if flow < 4:
             auxiliary_electricity_kW[flow] = vectorize_calc_Eaux_SC(specific_flows_kgpers[flow],
                                                                     specific_pressure_losses_Pa[flow], pipe_lengths,
@@ -519,6 +466,88 @@ def calc_PVT_module(config, radiation_Wperm2, panel_properties_SC, panel_propert
     return result
 
 
+@jit(nopython=True, cache=True)
+def do_hourly_calculation(Bref, C_eff_Jperm2K, Cp_fluid_JperkgK, Nseg, Tin_C, Tamb_vector_C,
+                          absorbed_radiation_PV_Wperm2, aperture_area_m2, c1, c2, eff_nom, q_rad_vector,
+                          specific_flows_kgpers):
+    """
+    Calculate the outlet temperature and the heat output of a PVT module for every hour of the year at one flow
+    condition (see :py:func:`cea.technologies.solar.solar_collector.do_hourly_calculation`).
+
+    :param absorbed_radiation_PV_Wperm2: absorbed solar radiation of PV module [Wh/m2]
+    :param q_rad_vector: absorbed radiation of the collector [W/m2]
+    :param Tamb_vector_C: ambient temperatures [C]
+    :param specific_flows_kgpers: mass flow through the module [kg/s]
+    :return: outlet temperature [C] and heat output [kW] of the module
+    :rtype: tuple[ndarray, ndarray]
+    """
+    Mo_seg = 1  # mode of segmented heat loss calculation. only one mode is implemented.
+    TIME0 = 0
+    DELT = 1  # timestep 1 hour
+    delts = DELT * 3600  # convert time step in seconds
+    Tfl = np.zeros(3)  # create vector to store value at previous [1] and present [2] time-steps
+    DT = np.zeros(3)
+    Tabs = np.zeros(3)
+    STORED = np.zeros(600)
+    TflA = np.zeros(600)
+    TflB = np.zeros(600)
+    TabsB = np.zeros(600)
+    TabsA = np.zeros(600)
+    q_gain_Seg = np.zeros(101)  # maximum Iseg = maximum Nseg + 1 = 101
+    temperature_out = np.zeros(len(q_rad_vector))
+    supply_out_kW = np.zeros(len(q_rad_vector))
+
+    for t in range(len(q_rad_vector)):
+        c1_pvt = calc_cl_pvt(Bref, absorbed_radiation_PV_Wperm2, c1, eff_nom, t)
+        Mfl_kgpers = calc_Mfl_kgpers(DELT, Nseg, STORED, TIME0, Tin_C, specific_flows_kgpers, t,
+                                     Cp_fluid_JperkgK, C_eff_Jperm2K, aperture_area_m2)
+
+        # calculate average fluid temperature and average absorber temperature at the beginning of the time-step
+        Tamb_C = Tamb_vector_C[t]
+        q_rad_Wperm2 = q_rad_vector[t]
+        Tout_C = calc_Tout_C(Cp_fluid_JperkgK, DT, Mfl_kgpers, Nseg, STORED, Tabs, Tamb_C, Tfl, Tin_C,
+                             aperture_area_m2, c1_pvt, q_rad_Wperm2)
+
+        # calculate q_gain with the guess for DT[1]
+        q_gain_Wperm2 = calc_q_gain(Tfl, q_rad_Wperm2, DT, Tin_C, aperture_area_m2, c1_pvt, c2,
+                                    Mfl_kgpers, delts, Cp_fluid_JperkgK, C_eff_Jperm2K, Tamb_C)
+
+        Aseg_m2 = aperture_area_m2 / Nseg  # aperture area per segment
+
+        # multi-segment calculation to avoid temperature jump at times of flow rate changes
+        Tout_Seg_C = do_multi_segment_calculation(Aseg_m2, C_eff_Jperm2K, Cp_fluid_JperkgK, DT, Mfl_kgpers, Mo_seg,
+                                                  Nseg, STORED, Tabs, TabsA, Tamb_C, Tfl, TflA, TflB, Tin_C, Tout_C,
+                                                  c1_pvt, c2, delts, q_gain_Seg, q_gain_Wperm2, q_rad_Wperm2)
+
+        # resulting energy output
+        q_out_kW = Mfl_kgpers * Cp_fluid_JperkgK * (Tout_Seg_C - Tin_C) / 1000  # [kW]
+        Tabs[2] = 0
+        # storage of the mean temperature
+        for Iseg in range(1, Nseg + 1):
+            STORED[200 + Iseg] = TflB[Iseg]
+            STORED[400 + Iseg] = TabsB[Iseg]
+            Tabs[2] = Tabs[2] + TabsB[Iseg] / Nseg
+
+        # outputs
+        temperature_out[t] = Tout_Seg_C
+        supply_out_kW[t] = q_out_kW
+
+        # the heat balance of the segments is not evaluated, these lines are kept as a reference to the original model
+        # q_gain_Wperm2 = 0
+        # TavgB = 0
+        # TavgA = 0
+        # for Iseg in range(1, Nseg + 1):
+        #     q_gain_Wperm2 = q_gain_Wperm2 + q_gain_Seg[Iseg] * Aseg_m2  # W
+        #     TavgA = TavgA + TflA[Iseg] / Nseg
+        #     TavgB = TavgB + TflB[Iseg] / Nseg
+        # # OUT[9] = qgain/Area_a # in W/m2
+        # q_mtherm_Wperm2 = (TavgB - TavgA) * C_eff_Jperm2K * aperture_area_m2 / delts
+        # q_balance_error = q_gain_Wperm2 - q_mtherm_Wperm2 - q_out_kW
+        # OUT[11] = q_mtherm
+        # OUT[12] = q_balance_error
+    return temperature_out, supply_out_kW
+
+
 @jit(nopython=True)
 def calc_cl_pvt(Bref, absorbed_radiation_PV_Wperm2, c1, eff_nom, time):
     c1_pvt = max(0, c1 - eff_nom * Bref * absorbed_radiation_PV_Wperm2[time])  # _[J. Allan et al., 2015] eq.(18)
@@ -641,7 +670,7 @@ def calc_Cinv_PVT(PVT_peak_W, locator, technology=0):
     FIXME: handle multiple technologies when cost calculations are done
     """
     if PVT_peak_W > 0.0:
-        PVT_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="PHOTOVOLTAIC_THERMAL_PANELS")
+        PVT_cost_data = read_database(locator.get_database_conversion_systems(), sheet_name="PHOTOVOLTAIC_THERMAL_PANELS")
         technology_code = list(set(PVT_cost_data['code']))
         PVT_cost_data = PVT_cost_data[PVT_cost_data['code'] == technology_code[technology]]
         # if the Q_design is below the lowest capacity available for the technology, then it is replaced by the least
@@ -699,6 +728,9 @@ def main(config):
     date_local = solar_equations.calc_datetime_local_from_weather_file(weather_data, latitude, longitude)
     print('reading weather hourly_results_per_building done.')
 
+    # calculate the sun properties once, the buildings read them from the scenario-level cache
+    get_sun_properties(locator, latitude, longitude, weather_data, date_local, config)
+
     n = len(building_names)
     cea.utilities.parallel.vectorize(calc_PVT, config.get_number_of_processes())(repeat(locator, n),
                                                                                  repeat(config, n),
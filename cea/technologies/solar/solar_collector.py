@@ -23,6 +23,8 @@ from cea.utilities import epwreader
 from cea.utilities import solar_equations
 from cea.utilities.standardize_coordinates import get_lat_lon_projected_shapefile
 from cea.analysis.costs.equations import calc_capex_annualized
+from cea.utilities.database_cache import read_database
+from cea.utilities.sun_properties_cache import get_sun_properties
 __author__ = "Jimeno A. Fonseca"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
 __credits__ = ["Jimeno A. Fonseca", "Shanshan Hsieh", "Daren Thomas"]
@@ -64,7 +66,7 @@ def calc_SC(locator, config, latitude, longitude, weather_data, date_local, buil
     metadata_csv = locator.get_radiation_metadata(building=building_name)
 
     # solar properties
-    solar_properties = solar_equations.calc_sun_properties(latitude, longitude, weather_data, date_local, config)
+    solar_properties = get_sun_properties(locator, latitude, longitude, weather_data, date_local, config)
     print('calculating solar properties done for building %s' % building_name)
 
     # get properties of the panel to evaluate
@@ -374,67 +376,18 @@ def calc_SC_module(config, radiation_Wperm2, panel_properties, Tamb_vector_C, IA
     tilt_rad = radians(tilt_angle_deg)
     q_rad_vector = np.vectorize(calc_q_rad)(n0, IAM_b, IAM_d, radiation_Wperm2.I_direct, radiation_Wperm2.I_diffuse,
                                             tilt_rad)  # absorbed solar radiation in W/m2 is a mean of the group
+    q_rad_vector = np.asarray(q_rad_vector, dtype=np.float64)
+    Tamb_vector_C = np.asarray(Tamb_vector_C, dtype=np.float64)
+    hourly_calculation = get_hourly_calculation(config, do_hourly_calculation)
     for flow in range(6):
-        mode_seg = 1  # mode of segmented heat loss calculation. only one mode is implemented.
-        TIME0 = 0
-        DELT = 1  # timestep 1 hour
-        delts = DELT * 3600  # convert time step in seconds
-        Tfl = np.zeros(3)  # create vector to store value at previous [1] and present [2] time-steps
-        DT = np.zeros(3)
-        Tabs = np.zeros(3)
-        STORED = np.zeros(600)
-        TflA = np.zeros(600)
-        TflB = np.zeros(600)
-        TabsB = np.zeros(600)
-        TabsA = np.zeros(600)
-        q_gain_Seg = np.zeros(101)  # maximum Iseg = maximum Nseg + 1 = 101
-
-        for t in range(HOURS_IN_YEAR):
-            Mfl_kgpers = calc_Mfl_kgpers(C_eff_Jperm2K, Cp_fluid_JperkgK, DELT, Nseg, STORED, TIME0, Tin_C,
-                                         aperture_area_m2, specific_flows_kgpers[flow], t)
-
-            Tamb_C = Tamb_vector_C[t]
-            q_rad_Wperm2 = q_rad_vector[t]
-            Tout_C = calc_Tout_C(Cp_fluid_JperkgK, DT, Nseg, STORED, Tabs, Tamb_C, Tfl, Tin_C, aperture_area_m2, c1,
-                                 q_rad_Wperm2, Mfl_kgpers)
-            # calculate q_gain with the guess for DT[1]
-            q_gain_Wperm2 = calc_q_gain(Tfl, q_rad_Wperm2, DT, Tin_C, aperture_area_m2, c1, c2,
-                                        Mfl_kgpers, delts, Cp_fluid_JperkgK, C_eff_Jperm2K, Tamb_C)
-
-            A_seg_m2 = aperture_area_m2 / Nseg  # aperture area per segment
-
-            # multi-segment calculation to avoid temperature jump at times of flow rate changes.
-            Tout_Seg_C = do_multi_segment_calculation(A_seg_m2, C_eff_Jperm2K, Cp_fluid_JperkgK, DT, Mfl_kgpers, Nseg,
-                                                      STORED, Tabs, TabsA, Tamb_C, Tfl, TflA, TflB, Tin_C, Tout_C, c1,
-                                                      c2, delts, mode_seg, q_gain_Seg, q_gain_Wperm2, q_rad_Wperm2)
-
-            # resulting net energy output
-            q_out_kW = (Mfl_kgpers * Cp_fluid_JperkgK * (Tout_Seg_C - Tin_C)) / 1000  # [kW]
-            Tabs[2] = 0
-            # storage of the mean temperature
-            for Iseg in range(1, Nseg + 1):
-                STORED[200 + Iseg] = TflB[Iseg]
-                STORED[400 + Iseg] = TabsB[Iseg]
-                Tabs[2] = Tabs[2] + TabsB[Iseg] / Nseg
-
-            # outputs
-            temperature_out_C[flow][t] = Tout_Seg_C
-            temperature_in_C[flow][t] = Tin_C
-            supply_out_kW[flow][t] = q_out_kW
-            temperature_mean_C[flow][t] = (Tin_C + Tout_Seg_C) / 2  # Mean absorber temperature at present
-
-            # the following lines do not perform meaningful operation, the iteration on DT are performed in calc_q_gain
-            # these lines are kept here as a reference to the original model in FORTRAN
-            # q_gain = 0
-            # TavgB = 0
-            # TavgA = 0
-            # for Iseg in range(1, Nseg + 1):
-            #     q_gain = q_gain + q_gain_Seg[Iseg] * A_seg_m2  # [W]
-            #     TavgA = TavgA + TflA[Iseg] / Nseg
-            #     TavgB = TavgB + TflB[Iseg] / Nseg
-            # # OUT[9] = q_gain/Area_a # in W/m2
-            # OUT[11] = q_mtherm
-            # OUT[12] = q_balance_error
+        temperature_out_C[flow], supply_out_kW[flow] = hourly_calculation(float(C_eff_Jperm2K),
+                                                                          float(Cp_fluid_JperkgK), int(Nseg),
+                                                                          float(Tin_C), Tamb_vector_C,
+                                                                          float(aperture_area_m2), float(c1),
+                                                                          float(c2), q_rad_vector,
+                                                                          specific_flows_kgpers[flow])
+        temperature_in_C[flow][:] = Tin_C
+        temperature_mean_C[flow] = (Tin_C + temperature_out_C[flow]) / 2  # Mean absorber temperature at present
         if flow < 4:
             auxiliary_electricity_kW[flow] = vectorize_calc_Eaux_SC(specific_flows_kgpers[flow],
                                                                     specific_pressure_losses_Pa[flow], pipe_lengths,
@@ -489,6 +442,96 @@ def calc_SC_module(config, radiation_Wperm2, panel_properties, Tamb_vector_C, IA
     return result
 
 
+def get_hourly_calculation(config, hourly_calculation):
+    """
+    Select the implementation of the hourly energy balance of the collectors (``solar:collector-engine``).
+
+    :param config: user settings in cea.config
+    :param hourly_calculation: the compiled hourly calculation (e.g. :py:func:`do_hourly_calculation`)
+    :return: the compiled function, or the same code interpreted by python for the ``python`` engine (reference)
+    """
+    if config.solar.collector_engine == 'python':
+        return hourly_calculation.py_func
+    return hourly_calculation
+
+
+@jit(nopython=True, cache=True)
+def do_hourly_calculation(C_eff_Jperm2K, Cp_fluid_JperkgK, Nseg, Tin_C, Tamb_vector_C, aperture_area_m2, c1, c2,
+                          q_rad_vector, specific_flows_kgpers):
+    """
+    Calculate the outlet temperature and the heat output of a collector module for every hour of the year at one flow
+    condition. The hours are calculated in sequence, as the temperatures of the segments at the end of an hour are the
+    initial temperatures of the next one.
+
+    :param q_rad_vector: absorbed radiation [W/m2]
+    :param Tamb_vector_C: ambient temperatures [C]
+    :param specific_flows_kgpers: mass flow through the module [kg/s]
+    :return: outlet temperature [C] and heat output [kW] of the module
+    :rtype: tuple[ndarray, ndarray]
+    """
+    mode_seg = 1  # mode of segmented heat loss calculation. only one mode is implemented.
+    TIME0 = 0
+    DELT = 1  # timestep 1 hour
+    delts = DELT * 3600  # convert time step in seconds
+    Tfl = np.zeros(3)  # create vector to store value at previous [1] and present [2] time-steps
+    DT = np.zeros(3)
+    Tabs = np.zeros(3)
+    STORED = np.zeros(600)
+    TflA = np.zeros(600)
+    TflB = np.zeros(600)
+    TabsB = np.zeros(600)
+    TabsA = np.zeros(600)
+    q_gain_Seg = np.zeros(101)  # maximum Iseg = maximum Nseg + 1 = 101
+    temperature_out_C = np.zeros(len(q_rad_vector))
+    supply_out_kW = np.zeros(len(q_rad_vector))
+
+    for t in range(len(q_rad_vector)):
+        Mfl_kgpers = calc_Mfl_kgpers(C_eff_Jperm2K, Cp_fluid_JperkgK, DELT, Nseg, STORED, TIME0, Tin_C,
+                                     aperture_area_m2, specific_flows_kgpers, t)
+
+        Tamb_C = Tamb_vector_C[t]
+        q_rad_Wperm2 = q_rad_vector[t]
+        Tout_C = calc_Tout_C(Cp_fluid_JperkgK, DT, Nseg, STORED, Tabs, Tamb_C, Tfl, Tin_C, aperture_area_m2, c1,
+                             q_rad_Wperm2, Mfl_kgpers)
+        # calculate q_gain with the guess for DT[1]
+        q_gain_Wperm2 = calc_q_gain(Tfl, q_rad_Wperm2, DT, Tin_C, aperture_area_m2, c1, c2,
+                                    Mfl_kgpers, delts, Cp_fluid_JperkgK, C_eff_Jperm2K, Tamb_C)
+
+        A_seg_m2 = aperture_area_m2 / Nseg  # aperture area per segment
+
+        # multi-segment calculation to avoid temperature jump at times of flow rate changes.
+        Tout_Seg_C = do_multi_segment_calculation(A_seg_m2, C_eff_Jperm2K, Cp_fluid_JperkgK, DT, Mfl_kgpers, Nseg,
+                                                  STORED, Tabs, TabsA, Tamb_C, Tfl, TflA, TflB, Tin_C, Tout_C, c1,
+                                                  c2, delts, mode_seg, q_gain_Seg, q_gain_Wperm2, q_rad_Wperm2)
+
+        # resulting net energy output
+        q_out_kW = (Mfl_kgpers * Cp_fluid_JperkgK * (Tout_Seg_C - Tin_C)) / 1000  # [kW]
+        Tabs[2] = 0
+        # storage of the mean temperature
+        for Iseg in range(1, Nseg + 1):
+            STORED[200 + Iseg] = TflB[Iseg]
+            STORED[400 + Iseg] = TabsB[Iseg]
+            Tabs[2] = Tabs[2] + TabsB[Iseg] / Nseg
+
+        # outputs
+        temperature_out_C[t] = Tout_Seg_C
+        supply_out_kW[t] = q_out_kW
+
+        # the following lines do not perform meaningful operation, the iteration on DT are performed in calc_q_gain
+        # these lines are kept here as a reference to the original model in FORTRAN
+        # q_gain = 0
+        # TavgB = 0
+        # TavgA = 0
+        # for Iseg in range(1, Nseg + 1):
+        #     q_gain = q_gain + q_gain_Seg[Iseg] * A_seg_m2  # [W]
+        #     TavgA = TavgA + TflA[Iseg] / Nseg
+        #     TavgB = TavgB + TflB[Iseg] / Nseg
+        # # OUT[9] = q_gain/Area_a # in W/m2
+        # OUT[11] = q_mtherm
+        # OUT[12] = q_balance_error
+    return temperature_out_C, supply_out_kW
+
+
 @jit(nopython=True)
 def do_multi_segment_calculation(A_seg_m2, C_eff_Jperm2K, Cp_fluid_JperkgK, DT, Mfl_kgpers, Nseg, STORED,
                                  Tabs, TabsA, Tamb_C, Tfl, TflA, TflB, Tin_C, Tout_C, c1, c2, delts,
@@ -800,7 +843,7 @@ def calc_properties_SC_db(database_path, config):
         type_SCpanel = 'SC2'
     else:
         raise ValueError('this panel type ', config.solar.type_SCpanel, 'is not in the database!')
-    data = pd.read_excel(database_path, sheet_name="SOLAR_THERMAL_PANELS")
+    data = read_database(database_path, sheet_name="SOLAR_THERMAL_PANELS")
     panel_properties = data[data['code'] == type_SCpanel].reset_index().T.to_dict()[0]
 
     return panel_properties
@@ -898,18 +941,14 @@ def calc_optimal_mass_flow(q1, q2, q3, q4, E1, E2, E3, E4, m1, m2, m3, m4, dP1,
     Energy and Buildings, 2016.
     """
 
-    mass_flow_opt = np.empty(HOURS_IN_YEAR)
-    dP_opt = np.empty(HOURS_IN_YEAR)
     const = Area_a / 3600
-    mass_flow_all_kgpers = [m1 * const, m2 * const, m3 * const, m4 * const]  # [kg/s]
-    dP_all_Pa = [dP1 * Area_a, dP2 * Area_a, dP3 * Area_a, dP4 * Area_a]  # [Pa]
-    balances = [abs(q1) - E1 * 2, q2 - E2 * 2, q3 - E3 * 2, q4 - E4 * 2]  # energy generation function eq.(63)
-    for t in range(HOURS_IN_YEAR):
-        balances_time = [balances[0][t], balances[1][t], balances[2][t], balances[3][t]]
-        max_heat_production = np.max(balances_time)
-        ix_max_heat_production = np.where(balances_time == max_heat_production)
-        mass_flow_opt[t] = mass_flow_all_kgpers[ix_max_heat_production[0][0]]
-        dP_opt[t] = dP_all_Pa[ix_max_heat_production[0][0]]
+    mass_flow_all_kgpers = np.array([m1 * const, m2 * const, m3 * const, m4 * const], dtype=float)  # [kg/s]
+    dP_all_Pa = np.array([dP1 * Area_a, dP2 * Area_a, dP3 * Area_a, dP4 * Area_a], dtype=float)  # [Pa]
+    balances = np.vstack([abs(q1) - E1 * 2, q2 - E2 * 2, q3 - E3 * 2, q4 - E4 * 2])  # energy generation function eq.(63)
+    # the first flow condition with the maximum heat production in each hour
+    ix_max_heat_production = np.argmax(balances, axis=0)
+    mass_flow_opt = mass_flow_all_kgpers[ix_max_heat_production]
+    dP_opt = dP_all_Pa[ix_max_heat_production]
     return mass_flow_opt, dP_opt
 
 
@@ -922,10 +961,9 @@ def calc_optimal_mass_flow_2(m, q, dp):
     :return m: hourly mass flow rate [kg/s]
     :return dp: hourly pressure drop [Pa]
     """
-    for t in range(HOURS_IN_YEAR):
-        if q[t] <= 0:
-            m[t] = 0
-            dp[t] = 0
+    no_heat_production = q <= 0
+    m[no_heat_production] = 0
+    dp[no_heat_production] = 0
     return m, dp
 
 
@@ -935,7 +973,7 @@ def calc_Cinv_SC(Area_m2, locator, panel_type):
     Lifetime 35 years
     """
     if Area_m2 > 0.0:
-        SC_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="SOLAR_THERMAL_PANELS")
+        SC_cost_data = read_database(locator.get_database_conversion_systems(), sheet_name="SOLAR_THERMAL_PANELS")
         SC_cost_data = SC_cost_data[SC_cost_data['type'] == panel_type]
         cap_min = SC_cost_data['cap_min'].values[0]
         cap_max = SC_cost_data['cap_max'].values[0]
@@ -995,6 +1033,9 @@ def main(config):
     date_local = solar_equations.calc_datetime_local_from_weather_file(weather_data, latitude, longitude)
     print('reading weather data done')
 
+    # calculate the sun properties once, the buildings read them from the scenario-level cache
+    get_sun_properties(locator, latitude, longitude, weather_data, date_local, config)
+
     n = len(building_names)
     cea.utilities.parallel.vectorize(calc_SC, config.get_number_of_processes())(repeat(locator, n),
                                                                                 repeat(config, n),
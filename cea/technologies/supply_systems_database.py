@@ -6,7 +6,7 @@ is to avoid reading this data (which is constant during the lifetime of a script
 
 
 
-import pandas as pd
+from cea.utilities.database_cache import read_database
 
 # keep track of locators previously seen so we don't re-read excel files twice
 _locators = {}
@@ -54,9 +54,9 @@ class SupplySystemsDatabase(object):
         if locator in _locators:
             conversion_systems_worksheets, distribution_systems_worksheets, feedstocks_worksheets, energy_carriers_worksheet = _locators[locator]
         else:
-            conversion_systems_worksheets = pd.read_excel(locator.get_database_conversion_systems(), sheet_name=None)
-            distribution_systems_worksheets = pd.read_excel(locator.get_database_distribution_systems(), sheet_name=None)
-            feedstocks_worksheets = pd.read_excel(locator.get_database_feedstocks(), sheet_name=None)
-            energy_carriers_worksheet = pd.read_excel(locator.get_database_feedstocks(), sheet_name='ENERGY_CARRIERS')
+            conversion_systems_worksheets = read_database(locator.get_database_conversion_systems(), sheet_name=None)
+            distribution_systems_worksheets = read_database(locator.get_database_distribution_systems(), sheet_name=None)
+            feedstocks_worksheets = read_database(locator.get_database_feedstocks(), sheet_name=None)
+            energy_carriers_worksheet = read_database(locator.get_database_feedstocks(), sheet_name='ENERGY_CARRIERS')
             _locators[locator] = conversion_systems_worksheets, distribution_systems_worksheets, feedstocks_worksheets, energy_carriers_worksheet
         return conversion_systems_worksheets, distribution_systems_worksheets, feedstocks_worksheets, energy_carriers_worksheet
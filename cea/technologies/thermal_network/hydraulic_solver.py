@@ -0,0 +1,177 @@
+"""
+Sparse hydraulic solver for the edge mass flows of a thermal network (see
+:py:func:`cea.technologies.thermal_network.thermal_network.calc_mass_flow_edges`).
+
+The node-edge incidence matrix of a network only has two non-zero entries per edge. The solver stores it as a sparse
+matrix and factorizes the reduced system once per network layout, so solving a timestep is reduced to a pair of
+triangular solves. The Hardy-Cross loop corrections use a sparse loop-edge matrix instead of walking the loops.
+"""
+
+import collections
+import hashlib
+
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+
+__author__ = "Daren Thomas"
+__copyright__ = "Copyright 2024, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+# number of factorized network layouts kept in memory (the flow directions of the edges change the layout)
+HYDRAULIC_SOLVER_CACHE_SIZE = 32
+
+_hydraulic_solvers = collections.OrderedDict()
+
+
+class HydraulicSolver(object):
+    """
+    Factorization of the node-edge incidence matrix of a network without one of its node equations (the reference
+    node, e.g. the plant), which is redundant.
+
+    :ivar int reference_node: position of the node equation removed from the system
+    :ivar scipy.sparse.csr_matrix A: reduced incidence matrix ((n-1) x e)
+    :ivar scipy.sparse.csr_matrix loop_edge_matrix: sign of each edge e in each loop l, 1 if the edge points in the
+                                                    direction of the loop, -1 if against it, else 0 (l x e)
+    """
+
+    def __init__(self, edge_node_matrix, reference_node, loops=(), graph=None):
+        """
+        :param edge_node_matrix: incidence matrix of the network, 1 if edge e points to node n, -1 if it leaves node n,
+                                 else 0 (n x e)
+        :param int reference_node: position of the node equation to remove
+        :param list loops: fundamental loops of the network (lists of node positions), as returned by
+                           :py:meth:`cea.technologies.thermal_network.thermal_network.ThermalNetwork.find_loops`
+        :param graph: networkx graph of the network, with the ``edge_number`` of each edge
+        :type edge_node_matrix: np.ndarray
+        :type graph: nx.Graph
+        """
+        incidence = scipy.sparse.csr_matrix(edge_node_matrix, dtype=float)
+        self.reference_node = reference_node
+        keep = np.arange(incidence.shape[0]) != reference_node
+        self.A = incidence[keep]
+        self.loop_edge_matrix = calc_loop_edge_matrix(incidence, loops, graph)
+        self.abs_loop_edge_matrix = abs(self.loop_edge_matrix)
+
+        num_equations, num_edges = self.A.shape
+        self._dense_A = None
+        try:
+            if num_equations == num_edges:
+                # trees: the reduced system is well-determined
+                self._lu = scipy.sparse.linalg.splu(self.A.tocsc())
+                self._normal_equations = False
+            else:
+                # networks with loops: minimum-norm solution A^T (A A^T)^-1 b, as returned by np.linalg.lstsq
+                self._lu = scipy.sparse.linalg.splu((self.A @ self.A.T).tocsc())
+                self._normal_equations = True
+        except RuntimeError:
+            # singular system (e.g. disconnected network), fall back to the least-squares solution
+            print('The reduced node-edge matrix is singular, using a least-squares solution of the edge mass flows.')
+            self._dense_A = self.A.toarray()
+
+    def solve(self, node_mass_flows):
+        """
+        Solve the edge mass flows that satisfy the mass balance at each node.
+
+        :param node_mass_flows: mass flow at each node of the network, including the reference node (n x 1)
+        :type node_mass_flows: np.ndarray
+        :return: mass flow in each edge (e x 1)
+        :rtype: np.ndarray
+        """
+        b = np.delete(np.nan_to_num(np.ravel(node_mass_flows)), self.reference_node)
+        if self._dense_A is not None:
+            return np.linalg.lstsq(self._dense_A, b, rcond=-1)[0]
+        if self._normal_equations:
+            return self.A.T @ self._lu.solve(b)
+        return self._lu.solve(b)
+
+    def calc_node_balance(self, mass_flow_edge):
+        """
+        :return: the mass balance of each node, without the reference node, for the edge mass flows ((n-1) x 1)
+        :rtype: np.ndarray
+        """
+        return self.A @ mass_flow_edge
+
+    def calc_loop_corrections(self, pressure_loss_edge, pressure_loss_derivative_edge):
+        """
+        Calculate the Hardy-Cross mass flow correction of each loop.
+
+        :param pressure_loss_edge: signed pressure loss in each edge (e x 1)
+        :param pressure_loss_derivative_edge: absolute derivative of the pressure loss in each edge (e x 1)
+        :type pressure_loss_edge: np.ndarray
+        :type pressure_loss_derivative_edge: np.ndarray
+        :return: the mass flow correction of each edge (e x 1) and the pressure loss around each loop (l x 1)
+        :rtype: tuple[np.ndarray, np.ndarray]
+        """
+        sum_pressure_loss = self.loop_edge_matrix @ pressure_loss_edge
+        sum_derivative = self.abs_loop_edge_matrix @ pressure_loss_derivative_edge
+        no_correction = np.isclose(sum_derivative, 0)
+        delta_m_loop = -sum_pressure_loss / np.where(no_correction, 1.0, sum_derivative)
+        delta_m_loop[no_correction] = 0.0
+        return self.loop_edge_matrix.T @ delta_m_loop, sum_pressure_loss
+
+
+def calc_loop_edge_matrix(incidence, loops, graph):
+    """
+    Build the sparse loop-edge matrix: the sign of each edge in each loop, following the clockwise convention of the
+    Hardy-Cross method (1 if the edge points from a node of the loop to the next one, else -1).
+
+    :param incidence: node-edge incidence matrix (n x e)
+    :param list loops: fundamental loops (lists of node positions)
+    :param graph: networkx graph of the network, with the ``edge_number`` of each edge
+    :type incidence: scipy.sparse.csr_matrix
+    :type graph: nx.Graph
+    :rtype: scipy.sparse.csr_matrix
+    """
+    rows, columns, signs = [], [], []
+    for loop_number, loop in enumerate(loops):
+        for j, node in enumerate(loop):
+            next_node = loop[(j + 1) % len(loop)]
+            edge = graph.get_edge_data(node, next_node)['edge_number']
+            clockwise = incidence[node, edge] == 1 and incidence[next_node, edge] == -1
+            rows.append(loop_number)
+            columns.append(edge)
+            signs.append(1.0 if clockwise else -1.0)
+    return scipy.sparse.csr_matrix((signs, (rows, columns)), shape=(len(loops), incidence.shape[1]))
+
+
+def get_hydraulic_solver(edge_node_matrix, reference_node, loops=(), graph=None):
+    """
+    Return the :py:class:`HydraulicSolver` for a network layout, reusing the factorization for all timesteps with the
+    same layout.
+
+    :param edge_node_matrix: incidence matrix of the network (n x e)
+    :param int reference_node: position of the node equation to remove
+    :param list loops: fundamental loops of the network
+    :param graph: networkx graph of the network
+    :type edge_node_matrix: np.ndarray
+    :type graph: nx.Graph
+    :rtype: HydraulicSolver
+    """
+    edge_node_matrix = np.asarray(edge_node_matrix)
+    key = _calc_layout_key(edge_node_matrix, reference_node, loops)
+    if key in _hydraulic_solvers:
+        _hydraulic_solvers.move_to_end(key)
+        return _hydraulic_solvers[key]
+
+    solver = HydraulicSolver(edge_node_matrix, reference_node, loops, graph)
+    _hydraulic_solvers[key] = solver
+    if len(_hydraulic_solvers) > HYDRAULIC_SOLVER_CACHE_SIZE:
+        _hydraulic_solvers.popitem(last=False)
+    return solver
+
+
+def _calc_layout_key(edge_node_matrix, reference_node, loops):
+    """Hash of the non-zero entries of the incidence matrix (the layout), the reference node and the loops"""
+    nodes, edges = np.nonzero(edge_node_matrix)
+    key = hashlib.sha256()
+    key.update(repr((edge_node_matrix.shape, reference_node, [list(loop) for loop in loops])).encode('utf-8'))
+    key.update(nodes.astype(np.int64).tobytes())
+    key.update(edges.astype(np.int64).tobytes())
+    key.update(np.sign(edge_node_matrix[nodes, edges]).astype(np.int8).tobytes())
+    return key.hexdigest()
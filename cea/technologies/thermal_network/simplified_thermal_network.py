@@ -18,6 +18,7 @@ from cea.technologies.thermal_network.thermal_network_loss import calc_temperatu
 from cea.resources import geothermal
 from cea.technologies.constants import NETWORK_DEPTH
 from cea.utilities.epwreader import epw_reader
+from cea.utilities.database_cache import read_database
 
 __author__ = "Jimeno A. Fonseca"
 __copyright__ = "Copyright 2019, Architecture and Building Systems - ETH Zurich"
@@ -294,7 +295,7 @@ def thermal_network_simplified(locator, config, network_name=''):
         results = sim.run_sim()
         max_volume_flow_rates_m3s = results.link['flowrate'].abs().max()
         pipe_names = max_volume_flow_rates_m3s.index.values
-        pipe_catalog = pd.read_excel(locator.get_database_distribution_systems(), sheet_name='THERMAL_GRID')
+        pipe_catalog = read_database(locator.get_database_distribution_systems(), sheet_name='THERMAL_GRID')
         Pipe_DN, D_ext_m, D_int_m, D_ins_m = zip(
             *[calc_max_diameter(flow, pipe_catalog, velocity_ms=velocity_ms, peak_load_percentage=peak_load_percentage) for
               flow in max_volume_flow_rates_m3s])
@@ -0,0 +1,201 @@
+"""
+Array-based temperature propagation for the supply and return networks of a thermal network (see
+:py:func:`cea.technologies.thermal_network.thermal_network.calc_supply_temperatures` and
+:py:func:`cea.technologies.thermal_network.thermal_network.calc_return_temperatures`).
+
+If the flows of a timestep contain no directed loop (which is always the case in a tree network), the nodes can be
+sorted in levels along the direction of flow, so that every pipe entering a level leaves one of the levels before it.
+The temperatures are then propagated one level at a time with array operations, instead of searching the edge-node
+matrix for the next solvable node over and over (see
+:py:func:`cea.technologies.thermal_network.thermal_network.calculate_outflow_temp`). The levels only depend on the
+flow directions, so they are kept for the next timesteps. Flows with directed loops and timesteps with stagnant pipes
+are left to the iterative method.
+"""
+
+import collections
+import hashlib
+
+import numpy as np
+
+from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
+from cea.technologies.thermal_network.thermal_network_loss import calc_temperature_out_per_pipe
+
+__author__ = "Daren Thomas"
+__copyright__ = "Copyright 2024, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+# number of flow trees kept in memory (the flow directions of the edges change the levels)
+FLOW_TREE_CACHE_SIZE = 32
+
+# larger temperature changes along a pipe are capped to this value, as in calc_t_out [K]
+MAX_PIPE_TEMPERATURE_CHANGE = 30
+
+_flow_trees = collections.OrderedDict()
+
+
+class FlowTree(object):
+    """
+    The levels of the nodes of a network along the direction of flow, starting from the nodes with a given
+    temperature (the plants in the supply network, the ends of the branches in the return network).
+
+    :ivar np.ndarray inlet_nodes: the node each edge leaves (e)
+    :ivar np.ndarray outlet_nodes: the node each edge points to (e)
+    :ivar np.ndarray fixed_nodes: the nodes with a given temperature, the first level
+    :ivar np.ndarray branch_ends: True for the nodes without outflow (n)
+    :ivar list levels: the nodes of each level, with the edges entering and the edges leaving them
+    """
+
+    def __init__(self, edge_node_matrix, fixed_nodes):
+        """
+        :param edge_node_matrix: 1 if edge e points to node n, -1 if it leaves node n, else 0, with the edges pointing
+                                 in the direction of flow (n x e)
+        :param fixed_nodes: True for the nodes with a given temperature, the pipes entering them are not mixed (n)
+        :raises ValueError: if the flows contain a directed loop or a node that is not fixed has no inflow
+        """
+        z = np.asarray(edge_node_matrix)
+        number_of_nodes = z.shape[0]
+        fixed_nodes = np.asarray(fixed_nodes, dtype=bool)
+        self.inlet_nodes = np.argmin(z, axis=0)
+        self.outlet_nodes = np.argmax(z, axis=0)
+        self.fixed_nodes = np.flatnonzero(fixed_nodes)
+        self.branch_ends = np.ones(number_of_nodes, dtype=bool)
+        self.branch_ends[self.inlet_nodes] = False
+
+        # the pipes entering a fixed node do not change its temperature
+        mixed_edges = ~fixed_nodes[self.outlet_nodes]
+        unsolved_inflows = np.bincount(self.outlet_nodes[mixed_edges], minlength=number_of_nodes)
+        if (unsolved_inflows[~fixed_nodes] == 0).any():
+            raise ValueError('Only the fixed nodes of a flow tree can be without inflow')
+
+        # a node joins the next level once all the pipes entering it leave the levels before
+        node_level = np.full(number_of_nodes, -1)
+        level_nodes = self.fixed_nodes
+        level = 0
+        while level_nodes.size:
+            node_level[level_nodes] = level
+            leaving = mixed_edges & np.isin(self.inlet_nodes, level_nodes)
+            targets = self.outlet_nodes[leaving]
+            np.subtract.at(unsolved_inflows, targets, 1)
+            level_nodes = np.unique(targets[unsolved_inflows[targets] == 0])
+            level += 1
+        number_of_levels = level
+        if (node_level < 0).any():
+            raise ValueError('The flows contain a directed loop')
+
+        self.levels = []
+        for level in range(number_of_levels):
+            entering = np.flatnonzero(mixed_edges & (node_level[self.outlet_nodes] == level))
+            leaving = np.flatnonzero(node_level[self.inlet_nodes] == level)
+            self.levels.append((np.flatnonzero(node_level == level), entering, leaving))
+
+    def propagate(self, t_fixed_nodes, mass_flow, k, t_ground, thermal_network, substation_mass_flow=None,
+                  t_substation=None):
+        """
+        Calculate the node and pipe temperatures along the direction of flow. The temperature of a node is the mixing
+        temperature of the pipes (and, in the return network, the substation) entering it. At the ends of the supply
+        branches, the node takes the temperature of the warmest inflow, as in the iterative method.
+
+        :param t_fixed_nodes: temperatures of the fixed nodes [K]
+        :param mass_flow: positive mass flow of each edge [kg/s] (e)
+        :param k: aggregated heat conduction coefficient of each edge [kW/K] (e)
+        :param float t_ground: ground temperature [K]
+        :param substation_mass_flow: flow from the substations into the nodes of the return network [kg/s] (n)
+        :param t_substation: return temperature of the substations [K] (n)
+        :return: the temperature of the nodes, at the inlet of the pipes and at the outlet of the pipes [K]
+        :rtype: tuple[np.ndarray, np.ndarray, np.ndarray]
+        """
+        t_node = np.zeros(self.branch_ends.size)
+        t_node[self.fixed_nodes] = t_fixed_nodes
+        t_pipe_in = np.zeros(self.inlet_nodes.size)
+        t_pipe_out = np.zeros(self.inlet_nodes.size)
+        if substation_mass_flow is not None:
+            substation_mass_flow = np.maximum(substation_mass_flow, 0)
+            substation_heat_flow = np.where(np.isclose(substation_mass_flow, 0), 0,
+                                            substation_mass_flow * np.nan_to_num(t_substation))
+
+        for nodes, entering, leaving in self.levels:
+            if entering.size:
+                outlets = self.outlet_nodes[entering]
+                total_mass_flow = np.bincount(outlets, weights=mass_flow[entering], minlength=t_node.size)
+                total_heat_flow = np.bincount(outlets, weights=mass_flow[entering] * t_pipe_out[entering],
+                                              minlength=t_node.size)
+                if substation_mass_flow is None:
+                    t_node[nodes] = total_heat_flow[nodes] / total_mass_flow[nodes]
+                    ends = nodes[self.branch_ends[nodes]]
+                    if ends.size:
+                        t_node[ends] = -np.inf
+                        np.maximum.at(t_node, outlets, np.where(self.branch_ends[outlets], t_pipe_out[entering],
+                                                                -np.inf))
+                else:
+                    t_node[nodes] = ((total_heat_flow[nodes] + substation_heat_flow[nodes])
+                                     / (total_mass_flow[nodes] + substation_mass_flow[nodes]))
+            t_pipe_in[leaving] = t_node[self.inlet_nodes[leaving]]
+            t_pipe_out[leaving] = calc_pipe_outlet_temperatures(leaving, t_pipe_in[leaving], mass_flow[leaving],
+                                                                k[leaving], t_ground, thermal_network)
+        return t_node, t_pipe_in, t_pipe_out
+
+
+def calc_pipe_outlet_temperatures(edges, t_in, mass_flow, k, t_ground, thermal_network):
+    """
+    The outlet temperatures of the pipes, with the same rounding of the mass flows and capping of high temperature
+    losses as :py:func:`cea.technologies.thermal_network.thermal_network.calc_t_out`. The edges with a high temperature
+    loss are stored in ``thermal_network.problematic_edges`` with their lowest mass flow.
+
+    :param edges: the indices of the pipes
+    :rtype: np.ndarray
+    """
+    mass_flow = np.round(mass_flow, decimals=5)  # round to avoid errors at very very low massflows
+    t_out = calc_temperature_out_per_pipe(t_in, mass_flow, k, t_ground)
+    high_loss = np.abs(t_in - t_out) > MAX_PIPE_TEMPERATURE_CHANGE
+    for i in np.flatnonzero(high_loss):
+        e, m = edges[i], mass_flow[i]
+        print('High temperature loss on edge', e, '. Loss:', abs(t_in[i] - t_out[i]))
+        if str(e) not in thermal_network.problematic_edges.keys() or thermal_network.problematic_edges[str(e)] > m:
+            thermal_network.problematic_edges[str(e)] = m
+        if (k[i] / 2 - m * HEAT_CAPACITY_OF_WATER_JPERKGK / 1000) > 0:
+            print('Exit temperature decreasing at entry temperature increase. Possible at low massflows. Massflow:',
+                  m, ' on edge: ', e)
+    if thermal_network.network_type == 'DH':
+        t_out[high_loss] = t_in[high_loss] - MAX_PIPE_TEMPERATURE_CHANGE
+    else:
+        t_out[high_loss] = t_in[high_loss] + MAX_PIPE_TEMPERATURE_CHANGE
+    return t_out
+
+
+def calc_pipe_heat_losses(mass_flow, t_pipe_in, t_pipe_out):
+    """The heat lost by each pipe [kW]"""
+    return mass_flow * HEAT_CAPACITY_OF_WATER_JPERKGK / 1000 * (t_pipe_in - t_pipe_out)
+
+
+def get_flow_tree(edge_node_matrix, fixed_nodes, mass_flow):
+    """
+    Return the flow tree of the flow directions in ``edge_node_matrix``, reusing a previous one if the directions did
+    not change.
+
+    :return: the flow tree, or None if the temperatures need the iterative method (a pipe without flow, or a directed
+             loop)
+    :rtype: FlowTree
+    """
+    if not (np.round(mass_flow, decimals=5) > 0).all():
+        return None
+
+    z = np.ascontiguousarray(edge_node_matrix, dtype=np.int8)
+    fixed_nodes = np.ascontiguousarray(fixed_nodes, dtype=bool)
+    key = hashlib.sha1(z.tobytes() + fixed_nodes.tobytes() + repr(z.shape).encode()).hexdigest()
+    if key in _flow_trees:
+        _flow_trees.move_to_end(key)
+        return _flow_trees[key]
+
+    try:
+        flow_tree = FlowTree(z, fixed_nodes)
+    except ValueError:
+        flow_tree = None
+    _flow_trees[key] = flow_tree
+    while len(_flow_trees) > FLOW_TREE_CACHE_SIZE:
+        _flow_trees.popitem(last=False)
+    return flow_tree
@@ -19,6 +19,8 @@ import cea.config
 import cea.inputlocator
 import cea.technologies.thermal_network.substation_matrix as substation_matrix
 from cea.technologies.thermal_network.thermal_network_loss import calc_temperature_out_per_pipe
+from cea.technologies.thermal_network.hydraulic_solver import get_hydraulic_solver
+from cea.technologies.thermal_network.temperature_solver import get_flow_tree, calc_pipe_heat_losses
 import cea.utilities.parallel
 import cea.utilities.workerstream
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK, P_WATER_KGPERM3, HOURS_IN_YEAR
@@ -30,6 +32,7 @@ from cea.technologies.constants import ROUGHNESS, NETWORK_DEPTH, REDUCED_TIME_ST
     MAX_NODE_FLOW
 from cea.utilities import epwreader
 from cea.utilities.standardize_coordinates import get_lat_lon_projected_shapefile, get_projected_coordinate_system
+from cea.utilities.database_cache import read_database
 
 __author__ = "Martin Mosteiro Romero, Shanshan Hsieh, Lennart Rogenhofer"
 __copyright__ = "Copyright 2016, Architecture and Building Systems - ETH Zurich"
@@ -337,7 +340,8 @@ class ThermalNetwork(object):
         return loops, graph
 
 
-# collect the results of each call to hourly_thermal_calculation in a record
+# collect the results of each call to hourly_thermal_calculation in a record (see thermal_calculation_block for the
+# arrays with one row per hour that are sent back to the main process)
 HourlyThermalResults = collections.namedtuple('HourlyThermalResults',
                                               ['T_supply_nodes', 'T_return_nodes',
                                                'temperatures_at_plant_K',
@@ -354,6 +358,9 @@ HourlyThermalResults = collections.namedtuple('HourlyThermalResults',
                                                'velocities_in_supply_edges_mpers',
                                                'pressure_loss_supply_edge_kW'])
 
+# the hours are solved in contiguous blocks, this many per process to balance the load between the processes
+BLOCKS_PER_PROCESS = 4
+
 
 def thermal_network_main(locator, thermal_network, processes=1):
     """
@@ -484,8 +491,8 @@ def thermal_network_main(locator, thermal_network, processes=1):
                                                                    thermal_network.network_name))
 
     # read in HEX pressure loss values from database
-    HEX_prices = pd.read_excel(thermal_network.locator.get_database_conversion_systems(),
-                               sheet_name="HEAT_EXCHANGERS", index_col=0)
+    HEX_prices = read_database(thermal_network.locator.get_database_conversion_systems(), sheet_name="HEAT_EXCHANGERS")
+    HEX_prices = HEX_prices.set_index(HEX_prices.columns[0])
     a_p = HEX_prices['a']['District substation heat exchanger']
     b_p = HEX_prices['b']['District substation heat exchanger']
     c_p = HEX_prices['c']['District substation heat exchanger']
@@ -496,16 +503,25 @@ def thermal_network_main(locator, thermal_network, processes=1):
 
     print('Solving hydraulic and thermal network')
     ## Start solving hydraulic and thermal equations at each time-step
-    nhours = (thermal_network.stop_t - thermal_network.start_t)
-
-    hourly_thermal_results = cea.utilities.parallel.vectorize(hourly_thermal_calculation, processes)(
-        range(thermal_network.start_t, thermal_network.stop_t),
-        repeat(thermal_network, nhours))
+    # the network is sent to the workers once and each worker solves a contiguous block of hours
+    hour_blocks = calc_hour_blocks(thermal_network.start_t, thermal_network.stop_t, processes)
+    if not hour_blocks:
+        raise ValueError('There are no hours to simulate between start_t=%s and stop_t=%s'
+                         % (thermal_network.start_t, thermal_network.stop_t))
+    thermal_result_blocks = cea.utilities.parallel.vectorize(thermal_calculation_block, processes)(
+        [start_t for start_t, _ in hour_blocks],
+        [stop_t for _, stop_t in hour_blocks],
+        repeat(thermal_network, len(hour_blocks)))
+    csv_outputs = concatenate_thermal_result_blocks(thermal_result_blocks)
+
+    # the mass flows of the workers are not written back to the network of the main process
+    thermal_network.edge_mass_flow_df.iloc[thermal_network.start_t:thermal_network.stop_t] = \
+        csv_outputs['edge_mass_flows']
+    thermal_network.node_mass_flow_df.iloc[thermal_network.start_t:thermal_network.stop_t] = \
+        csv_outputs['node_mass_flows']
 
     # save results of hourly values over full year, write to csv
     # edge flow rates (flow direction corresponding to edge_node_df)
-    csv_outputs = {field: [getattr(htr, field) for htr in hourly_thermal_results]
-                   for field in HourlyThermalResults._fields}
     save_all_results_to_csv(csv_outputs, thermal_network)
 
     # identify all plants
@@ -518,10 +534,7 @@ def thermal_network_main(locator, thermal_network, processes=1):
     all_nodes_df_output = all_nodes_df_output.assign(Q_hex_plant_kW=pd.Series(np.zeros(len(all_nodes_df_output.index))))
     # calculate maximum plant heat demand
     for index_number, plant_index in enumerate(plant_indexes):
-        if len(plant_indexes) > 1:
-            max_demand = abs(max(csv_outputs['plant_heat_requirement'][index_number]))
-        else:
-            max_demand = abs(max(csv_outputs['plant_heat_requirement'], key=abs))
+        max_demand = np.abs(csv_outputs['plant_heat_requirement'][:, index_number]).max()
         # add plant heat demand to node.csv file
         ID = np.where(all_nodes_df_output['Name'] == 'NODE' + str(plant_index))[0][0]
         all_nodes_df_output['Q_hex_plant_kW'][ID] = max_demand
@@ -977,6 +990,63 @@ def hourly_thermal_calculation(t, thermal_network):
     return hourly_thermal_results
 
 
+def calc_hour_blocks(start_t, stop_t, processes):
+    """
+    Split the hours from ``start_t`` to ``stop_t`` into contiguous blocks, a few per process.
+
+    :return: the first and the last (excluded) hour of each block, no blocks if there are no hours
+    :rtype: list[tuple[int, int]]
+    """
+    number_of_hours = stop_t - start_t
+    if number_of_hours <= 0:
+        return []
+    number_of_blocks = 1 if processes <= 1 else min(number_of_hours, processes * BLOCKS_PER_PROCESS)
+    bounds = np.linspace(start_t, stop_t, number_of_blocks + 1).round().astype(int)
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def thermal_calculation_block(start_t, stop_t, thermal_network):
+    """
+    Solve the thermal and hydraulic network for the hours ``start_t`` to ``stop_t`` (see
+    :py:func:`hourly_thermal_calculation`). Instead of a record per hour, the results are returned as one array per
+    field of ``HourlyThermalResults`` with a row per hour, so that only a few compact arrays are sent back to the main
+    process.
+
+    A switch of the control strategy to CT (see :py:func:`hourly_thermal_calculation`) applies to the following hours
+    of the block only: the control strategy of ``thermal_network`` is restored at the end of the block, so that the
+    results do not depend on which blocks were solved before with the same network.
+
+    :rtype: dict[str, np.ndarray]
+    """
+    temperature_control = thermal_network.temperature_control
+    results_block = {}
+    try:
+        for row, t in enumerate(range(start_t, stop_t)):
+            hourly_thermal_results = hourly_thermal_calculation(t, thermal_network)
+            for field, value in zip(HourlyThermalResults._fields, hourly_thermal_results):
+                value = np.ravel(np.asarray(value, dtype=float))
+                if field not in results_block:
+                    results_block[field] = np.empty((stop_t - start_t, value.size))
+                results_block[field][row] = value
+    finally:
+        thermal_network.temperature_control = temperature_control
+    return results_block
+
+
+def concatenate_thermal_result_blocks(thermal_result_blocks):
+    """
+    Join the results of consecutive blocks of hours (see :py:func:`thermal_calculation_block`), blocks without hours
+    are skipped.
+
+    :rtype: dict[str, np.ndarray]
+    """
+    thermal_result_blocks = [block for block in thermal_result_blocks if block]
+    if not thermal_result_blocks:
+        raise ValueError('There are no thermal network results to concatenate')
+    return {field: np.concatenate([block[field] for block in thermal_result_blocks])
+            for field in HourlyThermalResults._fields}
+
+
 # ===========================
 # Hydraulic calculation
 # ===========================
@@ -1021,21 +1091,20 @@ def calc_mass_flow_edges(edge_node_df, mass_flow_substation_df, all_nodes_df, pi
     .. [Oppelt, T., et al., 2016] Oppelt, T., et al. Dynamic thermo-hydraulic model of district cooling networks.
        Applied Thermal Engineering, 2016.
     """
-    edge_node_df = edge_node_df.copy()
     loops, graph = find_loops(edge_node_df)  # identifies all linear independent loops
+    plant_index = np.where(all_nodes_df['Type'] == 'PLANT')[0][0]  # find index of the first plant node
+    node_mass_flows = mass_flow_substation_df.values[0]
     if loops:
         # print('Fundamental loops in the network:', loops)  # returns nodes that define loop, useful for visiual
         # verification in testing phase,
 
-        sum_delta_m_num = np.zeros((1, len(loops)))[0]
+        sum_delta_m_num = np.zeros(len(loops))
 
         # if loops exist:
         # 1. calculate initial guess solution of matrix A
         # delete first plant on an edge of matrix and solution space b as these are redundant
-        A = edge_node_df.drop(edge_node_df.index[0], 0)  # solution matrix A without loop equations (kirchhoff 2)
-        b_init = np.nan_to_num(mass_flow_substation_df.drop(mass_flow_substation_df.columns[0], 1).transpose())
-        # solution vector b of node demands
-        mass_flow_edge = np.linalg.lstsq(A, b_init, rcond=-1)[0].transpose()[0]  # solve system
+        solver = get_hydraulic_solver(edge_node_df.values, 0, loops, graph)
+        mass_flow_edge = solver.solve(node_mass_flows)  # solve system
 
         # setup iterations for implicit matrix solver
         tolerance = 0.01  # tolerance for mass flow convergence
@@ -1052,50 +1121,10 @@ def calc_mass_flow_edges(edge_node_df, mass_flow_substation_df, all_nodes_df, pi
                                                   2) * np.sign(m_old)  # calculate pressure losses
             delta_m_den = abs(calc_pressure_loss_pipe(pipe_diameter_m, pipe_length_m, m_old, T_edge_K,
                                                       1))  # calculate derivatives of pressure losses
-            delta_m_num = delta_m_num.transpose()
-
-            sum_delta_m_num = np.zeros((1, len(loops)))[0]
-            sum_delta_m_den = np.zeros((1, len(loops)))[0]
-
-            for i in range(len(loops)):
-                # calculate the mass flow correction for each loop
-                # iterate over loops
-                # save the edge number connecting the nodes of the loops into the variable index
-                for j in range(len(loops[i])):
-                    if j == len(loops[i]) - 1:
-                        value = loops[i][0]
-                    else:
-                        value = loops[i][j + 1]
-                    index = graph.get_edge_data(loops[i][j], value)
-                    # check if nodes  defined in clockwise loop, to keep sign convention for Hardy Cross Method
-                    if not (edge_node_df.iloc[loops[i][j]][index['edge_number']] == 1) & \
-                           (edge_node_df.iloc[value][index['edge_number']] == -1):
-                        clockwise = -1
-                    else:
-                        clockwise = 1
-                    sum_delta_m_num[i] = sum_delta_m_num[i] + delta_m_num[index["edge_number"]] * clockwise
-                    sum_delta_m_den[i] = sum_delta_m_den[i] + delta_m_den[index["edge_number"]]
-                # calculate flow correction for each loop
-                if np.isclose(sum_delta_m_den[i], 0):
-                    delta_m = 0
-                else:
-                    delta_m = -sum_delta_m_num[i] / sum_delta_m_den[i]
 
-                # apply mass flow correction to all edges of each loop
-                for j in range(len(loops[i])):
-                    if j == len(loops[i]) - 1:
-                        value = loops[i][0]
-                    else:
-                        value = loops[i][j + 1]
-                    index = graph.get_edge_data(loops[i][j], value)
-                    # check if nodes  defined in clockwise loop
-                    if not (edge_node_df.iloc[loops[i][j]][index['edge_number']] == 1) & \
-                           (edge_node_df.iloc[value][index['edge_number']] == -1):
-                        clockwise = -1
-                    else:
-                        clockwise = 1
-                    # apply loop correction
-                    mass_flow_edge[index["edge_number"]] = mass_flow_edge[index["edge_number"]] + delta_m * clockwise
+            # apply the mass flow correction of each loop to all edges of the loop
+            delta_m_edge, sum_delta_m_num = solver.calc_loop_corrections(delta_m_num, delta_m_den)
+            mass_flow_edge = mass_flow_edge + delta_m_edge
             iterations = iterations + 1
 
             # adapt tolerance to reduce total amount of iterations
@@ -1114,18 +1143,12 @@ def calc_mass_flow_edges(edge_node_df, mass_flow_substation_df, all_nodes_df, pi
 
     else:  # no loops
         # remove one equation (at plant node) to build a well-determined matrix, A.
-        plant_index = np.where(all_nodes_df['Type'] == 'PLANT')[0][0]  # find index of the first plant node
-        A = edge_node_df.drop(edge_node_df.index[plant_index])
-        b = np.nan_to_num(mass_flow_substation_df.T)
-        b = np.delete(b, plant_index)
-        mass_flow_edge = np.linalg.solve(A.values, b)
+        solver = get_hydraulic_solver(edge_node_df.values, plant_index)
+        mass_flow_edge = solver.solve(node_mass_flows)
 
     # verify calculated solution
-    plant_index = np.where(all_nodes_df['Type'] == 'PLANT')[0][0]  # find index of the first plant node
-    A = edge_node_df.drop(edge_node_df.index[plant_index])
-    b_verification = A.dot(mass_flow_edge)
-    b_original = np.nan_to_num(mass_flow_substation_df.T)
-    b_original = np.delete(b_original, plant_index)
+    b_verification = np.delete(edge_node_df.values.dot(mass_flow_edge), plant_index)
+    b_original = np.delete(np.nan_to_num(node_mass_flows), plant_index)
     if max(abs(b_original - b_verification)) > 0.01:
         print('Error in the defined mass flows, deviation of ', max(abs(b_original - b_verification)),
               ' from node demands.')
@@ -1175,7 +1198,7 @@ def assign_pipes_to_edges(thermal_network):
     """
 
     # import pipe catalog from Excel file
-    pipe_catalog = pd.read_excel(thermal_network.locator.get_database_distribution_systems(), sheet_name='THERMAL_GRID')
+    pipe_catalog = read_database(thermal_network.locator.get_database_distribution_systems(), sheet_name='THERMAL_GRID')
     pipe_catalog['mdot_min_kgs'] = pipe_catalog['Vdot_min_m3s'] * P_WATER_KGPERM3
     pipe_catalog['mdot_max_kgs'] = pipe_catalog['Vdot_max_m3s'] * P_WATER_KGPERM3
 
@@ -2547,11 +2570,8 @@ def calc_supply_temperatures(t, edge_node_df, mass_flow_df, k, thermal_network):
     m_d = np.zeros((z.shape[1], z.shape[1]))  # (exe) pipe mass flow rate matrix
     np.fill_diagonal(m_d, mass_flow_df)
 
-    # matrices to store results
-    t_e_out = z_pipe_out.copy()
-    t_e_in = z_pipe_in.copy().dot(-1)
-    t_node = np.zeros(z.shape[0])
-    z_note = z.copy()  # matrix to store information of solved nodes
+    # without loops in the flows, the node temperatures are solved level by level along the flow directions
+    flow_tree = get_flow_tree(z, (all_nodes_df['Type'] == 'PLANT').values, np.diagonal(m_d))
 
     # start node temperature calculation
     flag = 0
@@ -2564,95 +2584,15 @@ def calc_supply_temperatures(t, edge_node_df, mass_flow_df, k, thermal_network):
     t_plant_sup = t_plant_sup_0
     iteration = 0
     while flag == 0:
-        # not_stuck variable is necessary because of looped networks. Here it is possible that we have only a closed
-        # loop remaining and no obvious place to start. In this case, iteration with an initial value is necessary
-        not_stuck = np.array([True] * z.shape[0])
-        # count number of iterations
-        temp_iter = 0
-        # tolerance for convergence of temperature
-        temp_tolerance = 1
-        # initialize delta to some value above the tolerance
-        delta_temp_0 = 2
-        # iterate over temperatures for loop networks
-        while delta_temp_0 >= temp_tolerance:
-            t_e_out_old = np.array(t_e_out)
-
-            # reset_matrixes
-            z_note = z.copy()
-            t_e_out = z_pipe_out.copy()
-            t_e_in = z_pipe_in.copy().dot(-1)
-            t_node = np.zeros(z.shape[0])
-
-            # # calculate the pipe outlet temperature from the plant node
-            for i in range(z.shape[0]):
-                if all_nodes_df.iloc[i]['Type'] == 'PLANT':  # find plant node
-                    # write plant inlet temperature
-                    t_node[i] = t_plant_sup  # assume plant inlet temperature
-                    edge = np.where(t_e_in[i] != 0)[0]  # find edge index
-                    t_e_in[i] = t_e_in[i] * t_node[i]
-                    # calculate pipe outlet temperature
-                    calc_t_out(i, edge, k, m_d, z, t_e_in, t_e_out, t_ground__k, z_note, thermal_network)
-            plant_node = t_node.nonzero()[0]  # the node indices of the plant nodes in the edge-node index
-
-            # Identify all nodes with no in or outflows and delete those values from the z matrixes
-            # This is necessary to avoid getting stuck in a loop network with no mass flows inside the loop
-            for i in range(z_note.shape[0]):
-                if np.isclose(sum(np.dot(m_d, z_pipe_out[i])), 0.0) and np.isclose(sum(np.dot(m_d, z_pipe_in[i])), 0.0):
-                    t_node[i] = np.nan
-                    # no in our outflows, clear in and outflows at this node
-                    # and clear node incoming flows from the corresponding edges
-                    outflowing_edges = [a for a, x in enumerate(z_note[i]) if np.isclose(x, 1.0)]
-                    if outflowing_edges:
-                        for edge in outflowing_edges:  # delete values where we were supposed to flow to
-                            target_node = np.where(z_note[:, edge] == -1)[0]
-                            z_note[target_node, edge] = 0.0
-                            z_pipe_in[target_node, edge] = 0.0
-                            t_e_in[target_node, edge] = 0.0
-                    outflowing_edges = [a for a, x in enumerate(z_note[i]) if np.isclose(x, -1.0)]
-                    if outflowing_edges:
-                        for edge in outflowing_edges:  # delete values where we were supposed to flow to
-                            target_node = np.where(z_note[:, edge] == 1)[0]
-                            z_note[target_node, edge] = 0.0
-                            z_pipe_out[target_node, edge] = 0.0
-                            t_e_out[target_node, edge] = 0.0
-                    target_edges = [a for a, x in enumerate(z_note[i]) if not np.isclose(x, 0.0)]
-                    if target_edges:
-                        for target_edge in target_edges:
-                            z_note[i, target_edge] = 0.0
-                            z_pipe_in[i, target_edge] = 0.0
-                            z_pipe_out[i, target_edge] = 0.0
-                            t_e_in[i, target_edge] = 0.0
-                            t_e_out[i, target_edge] = 0.0
-
-            # # calculate pipe outlet temperature and node temperature for the rest
-            while np.count_nonzero(np.isclose(t_node, 0)) > 0:
-                if not_stuck.any():  # if there are no changes for all elements but we have not yet solved the system
-                    z, z_note, m_d, t_e_out, z_pipe_out, t_node, t_e_in, t_ground__k, not_stuck = calculate_outflow_temp(
-                        z,
-                        z_note,
-                        m_d,
-                        t_e_out,
-                        z_pipe_out,
-                        t_node,
-                        t_e_in,
-                        t_ground__k,
-                        not_stuck,
-                        k, thermal_network)
-                else:  # stuck! this can happen with loops
-                    for i in range(np.shape(t_e_out)[1]):
-                        # check if we have a mass flow on this edge
-                        if np.any(t_e_out[:, i] == 1):
-                            z_note[np.where(t_e_out[:, i] == 1), i] = 0  # remove inflow value from z_note
-                            if temp_iter < 1:  # do this in first iteration only, since there is no previous value
-                                t_e_out[np.where(t_e_out[:, i] == 1), i] = t_node[
-                                    t_node.nonzero()].mean()  # assume some node temperature
-                            else:
-                                t_e_out[np.where(t_e_out[:, i] == 1), i] = t_e_out_old[np.where(t_e_out[:, i] == 1), i]
-                            break
-                    not_stuck = np.array([True] * z.shape[0])
-
-            delta_temp_0 = np.max(abs(t_e_out_old - t_e_out))  # exit condition
-            temp_iter = temp_iter + 1
+        if flow_tree is not None:
+            t_node, t_pipe_in, t_pipe_out = flow_tree.propagate(t_plant_sup, np.diagonal(m_d), np.diagonal(k),
+                                                                t_ground__k, thermal_network)
+            plant_node = flow_tree.fixed_nodes
+            q_loss_edges_kw = calc_pipe_heat_losses(np.diagonal(m_d), t_pipe_in, t_pipe_out)
+        else:
+            t_node, plant_node, q_loss_edges_kw = calc_supply_temperatures_iterative(t_plant_sup, z, z_pipe_out,
+                                                                                     z_pipe_in, m_d, k, t_ground__k,
+                                                                                     thermal_network)
 
         # set maximum/minimum allowable plant supply temperatures
         t_boiling_K = 100 + 273.15
@@ -2673,12 +2613,6 @@ def calc_supply_temperatures(t, edge_node_df, mass_flow_df, k, thermal_network):
                     # increase by the maximum amount of temperature deficit at nodes
                     t_plant_sup = t_plant_sup + abs(d_t.min())
                     # check if this term is positive, looping causes t_e_out to sink instead of rise.
-
-                    # reset the matrices for supply network temperature calculation
-                    z_note = z.copy()
-                    t_e_out = z_pipe_out.copy()
-                    t_e_in = z_pipe_in.copy().dot(-1)
-                    t_node = np.zeros(z.shape[0])
                     iteration += 1
 
                 elif all(d_t > -0.1) is False and iteration > 30:
@@ -2707,10 +2641,6 @@ def calc_supply_temperatures(t, edge_node_df, mass_flow_df, k, thermal_network):
                     # increase plant supply temperature and re-iterate the node supply temperature calculation
                     # increase by the maximum amount of temperature deficit at nodes
                     t_plant_sup = t_plant_sup - abs(d_t.max())
-                    z_note = z.copy()
-                    t_e_out = z_pipe_out.copy()
-                    t_e_in = z_pipe_in.copy().dot(-1)
-                    t_node = np.zeros(z.shape[0])
                     iteration += 1
                 elif all(d_t < 0.1) is False and iteration > 30:
                     # end iteration if too many iterations
@@ -2736,6 +2666,116 @@ def calc_supply_temperatures(t, edge_node_df, mass_flow_df, k, thermal_network):
                 switch_control = True
                 print('switched control: ', thermal_network.temperature_control, ' temperature:', t_plant_sup)
 
+    return t_node.T, plant_node, q_loss_edges_kw, switch_control
+
+
+def calc_supply_temperatures_iterative(t_plant_sup, z, z_pipe_out, z_pipe_in, m_d, k, t_ground__k, thermal_network):
+    """
+    Calculate the node temperatures of the supply network for a plant supply temperature by searching the edge-node
+    matrix for solvable nodes (see :py:func:`calculate_outflow_temp`), iterating over the temperatures of looped
+    networks.
+
+    :param t_plant_sup: plant supply temperature [K]
+    :param z: edge-node matrix in the direction of flow (n x e)
+    :param z_pipe_out: pipe outlet matrix (n x e)
+    :param z_pipe_in: pipe inlet matrix (n x e)
+    :param m_d: pipe mass flow rate matrix (e x e)
+    :param k: aggregated heat conduction coefficient for each pipe (e x e)
+    :return: the node temperatures, the plant nodes and the heat losses of the pipes
+    """
+    all_nodes_df = thermal_network.all_nodes_df
+    t_e_out = z_pipe_out.copy()
+
+    # not_stuck variable is necessary because of looped networks. Here it is possible that we have only a closed
+    # loop remaining and no obvious place to start. In this case, iteration with an initial value is necessary
+    not_stuck = np.array([True] * z.shape[0])
+    # count number of iterations
+    temp_iter = 0
+    # tolerance for convergence of temperature
+    temp_tolerance = 1
+    # initialize delta to some value above the tolerance
+    delta_temp_0 = 2
+    # iterate over temperatures for loop networks
+    while delta_temp_0 >= temp_tolerance:
+        t_e_out_old = np.array(t_e_out)
+
+        # reset_matrixes
+        z_note = z.copy()
+        t_e_out = z_pipe_out.copy()
+        t_e_in = z_pipe_in.copy().dot(-1)
+        t_node = np.zeros(z.shape[0])
+
+        # # calculate the pipe outlet temperature from the plant node
+        for i in range(z.shape[0]):
+            if all_nodes_df.iloc[i]['Type'] == 'PLANT':  # find plant node
+                # write plant inlet temperature
+                t_node[i] = t_plant_sup  # assume plant inlet temperature
+                edge = np.where(t_e_in[i] != 0)[0]  # find edge index
+                t_e_in[i] = t_e_in[i] * t_node[i]
+                # calculate pipe outlet temperature
+                calc_t_out(i, edge, k, m_d, z, t_e_in, t_e_out, t_ground__k, z_note, thermal_network)
+        plant_node = t_node.nonzero()[0]  # the node indices of the plant nodes in the edge-node index
+
+        # Identify all nodes with no in or outflows and delete those values from the z matrixes
+        # This is necessary to avoid getting stuck in a loop network with no mass flows inside the loop
+        for i in range(z_note.shape[0]):
+            if np.isclose(sum(np.dot(m_d, z_pipe_out[i])), 0.0) and np.isclose(sum(np.dot(m_d, z_pipe_in[i])), 0.0):
+                t_node[i] = np.nan
+                # no in our outflows, clear in and outflows at this node
+                # and clear node incoming flows from the corresponding edges
+                outflowing_edges = [a for a, x in enumerate(z_note[i]) if np.isclose(x, 1.0)]
+                if outflowing_edges:
+                    for edge in outflowing_edges:  # delete values where we were supposed to flow to
+                        target_node = np.where(z_note[:, edge] == -1)[0]
+                        z_note[target_node, edge] = 0.0
+                        z_pipe_in[target_node, edge] = 0.0
+                        t_e_in[target_node, edge] = 0.0
+                outflowing_edges = [a for a, x in enumerate(z_note[i]) if np.isclose(x, -1.0)]
+                if outflowing_edges:
+                    for edge in outflowing_edges:  # delete values where we were supposed to flow to
+                        target_node = np.where(z_note[:, edge] == 1)[0]
+                        z_note[target_node, edge] = 0.0
+                        z_pipe_out[target_node, edge] = 0.0
+                        t_e_out[target_node, edge] = 0.0
+                target_edges = [a for a, x in enumerate(z_note[i]) if not np.isclose(x, 0.0)]
+                if target_edges:
+                    for target_edge in target_edges:
+                        z_note[i, target_edge] = 0.0
+                        z_pipe_in[i, target_edge] = 0.0
+                        z_pipe_out[i, target_edge] = 0.0
+                        t_e_in[i, target_edge] = 0.0
+                        t_e_out[i, target_edge] = 0.0
+
+        # # calculate pipe outlet temperature and node temperature for the rest
+        while np.count_nonzero(np.isclose(t_node, 0)) > 0:
+            if not_stuck.any():  # if there are no changes for all elements but we have not yet solved the system
+                z, z_note, m_d, t_e_out, z_pipe_out, t_node, t_e_in, t_ground__k, not_stuck = calculate_outflow_temp(
+                    z,
+                    z_note,
+                    m_d,
+                    t_e_out,
+                    z_pipe_out,
+                    t_node,
+                    t_e_in,
+                    t_ground__k,
+                    not_stuck,
+                    k, thermal_network)
+            else:  # stuck! this can happen with loops
+                for i in range(np.shape(t_e_out)[1]):
+                    # check if we have a mass flow on this edge
+                    if np.any(t_e_out[:, i] == 1):
+                        z_note[np.where(t_e_out[:, i] == 1), i] = 0  # remove inflow value from z_note
+                        if temp_iter < 1:  # do this in first iteration only, since there is no previous value
+                            t_e_out[np.where(t_e_out[:, i] == 1), i] = t_node[
+                                t_node.nonzero()].mean()  # assume some node temperature
+                        else:
+                            t_e_out[np.where(t_e_out[:, i] == 1), i] = t_e_out_old[np.where(t_e_out[:, i] == 1), i]
+                        break
+                not_stuck = np.array([True] * z.shape[0])
+
+        delta_temp_0 = np.max(abs(t_e_out_old - t_e_out))  # exit condition
+        temp_iter = temp_iter + 1
+
     # calculate pipe heat losses
     q_loss_edges_kw = np.zeros(z_note.shape[1])
     for edge in range(z_note.shape[1]):
@@ -2743,7 +2783,7 @@ def calc_supply_temperatures(t, edge_node_df, mass_flow_df, k, thermal_network):
             dT_edge = np.nanmax(t_e_in[:, edge]) - np.nanmax(t_e_out[:, edge])
             q_loss_edges_kw[edge] = m_d[edge, edge] * HEAT_CAPACITY_OF_WATER_JPERKGK / 1000 * dT_edge  # kW
 
-    return t_node.T, plant_node, q_loss_edges_kw, switch_control
+    return t_node, plant_node, q_loss_edges_kw
 
 
 def calculate_outflow_temp(z, z_note, m_d, t_e_out, z_pipe_out, t_node, t_e_in, t_ground_k, not_stuck, k,
@@ -2861,6 +2901,16 @@ def calc_return_temperatures(t_ground, edge_node_df, mass_flow_df, mass_flow_sub
     m_d = np.zeros((z.shape[1], z.shape[1]))  # (exe) pipe mass flow rate matrix
     np.fill_diagonal(m_d, mass_flow_df)
 
+    # without loops in the flows, the node temperatures are solved level by level from the ends of the branches
+    branch_ends = ~(z_pipe_out > 0).any(axis=1)
+    flow_tree = get_flow_tree(z, branch_ends, np.diagonal(m_d))
+    if flow_tree is not None and not np.isnan(t_return.values[0, branch_ends]).any():
+        t_node, t_pipe_in, t_pipe_out = flow_tree.propagate(t_return.values[0, branch_ends], np.diagonal(m_d),
+                                                            np.diagonal(k), t_ground, thermal_network,
+                                                            substation_mass_flow=np.diagonal(m_sub),
+                                                            t_substation=t_return.values[0])
+        return t_node, calc_pipe_heat_losses(np.diagonal(m_d), t_pipe_in, t_pipe_out)
+
     # matrices to store results
     t_e_out = z_pipe_out.copy()
     t_node = np.zeros(z.shape[0])
@@ -6,11 +6,13 @@ import json
 import os
 import unittest
 
+import numpy as np
 import pandas as pd
 
 from cea.demand.schedule_maker.schedule_maker import schedule_maker_main
 from cea.demand.building_properties import BuildingProperties
 from cea.demand.thermal_loads import calc_thermal_loads
+from cea.demand.batch_demand import calc_thermal_loads_batch
 from cea.utilities.date import get_date_range_hours_from_year
 from cea.utilities import epwreader
 
@@ -112,6 +114,60 @@ class TestCalcThermalLoads(unittest.TestCase):
                                    msg="qww_sys_kwh for %(b)s should be: %(qww_sys_kwh).5f, was %(expected_qww_sys_kwh).5f" % locals(),
                                    places=3)
 
+    def test_calc_thermal_loads_compiled_engine(self):
+        """The compiled RC-model engine should reproduce the results of the python engine"""
+        buildings = json.loads(self.test_config.get('test_calc_thermal_loads_other_buildings', 'results'))
+        self.config.general.multiprocessing = False
+        self.config.schedule_maker.schedule_model = "deterministic"
+        results = {}
+        for engine in ['python', 'compiled']:
+            self.config.demand.engine = engine
+            for building in buildings.keys():
+                bpr = self.building_properties[building]
+                schedule_maker_main(self.locator, self.config, building=building)
+                calc_thermal_loads(building, bpr, self.weather_data, self.date_range, self.locator,
+                                   self.use_dynamic_infiltration_calculation, self.resolution_output,
+                                   self.loads_output, self.massflows_output, self.temperatures_output,
+                                   self.config, self.debug)
+                results[(engine, building)] = pd.read_csv(self.locator.get_demand_results_file(building))
+        self.config.demand.engine = 'python'
+
+        for building in buildings.keys():
+            expected = results[('python', building)]
+            actual = results[('compiled', building)]
+            for column in expected.columns:
+                if expected[column].dtype.kind != 'f':
+                    continue
+                self.assertTrue(np.allclose(expected[column], actual[column], atol=1e-3, equal_nan=True),
+                                msg='Column %s of %s differs between demand engines' % (column, building))
+
+    def test_calc_thermal_loads_batch_engine(self):
+        """The batch engine should reproduce the results of the python engine for every building of the batch"""
+        buildings = list(json.loads(self.test_config.get('test_calc_thermal_loads_other_buildings', 'results')).keys())
+        self.config.general.multiprocessing = False
+        self.config.schedule_maker.schedule_model = "deterministic"
+        expected = {}
+        for building in buildings:
+            schedule_maker_main(self.locator, self.config, building=building)
+            calc_thermal_loads(building, self.building_properties[building], self.weather_data, self.date_range,
+                               self.locator, self.use_dynamic_infiltration_calculation, self.resolution_output,
+                               self.loads_output, self.massflows_output, self.temperatures_output, self.config,
+                               self.debug)
+            expected[building] = pd.read_csv(self.locator.get_demand_results_file(building))
+
+        calc_thermal_loads_batch(buildings, [self.building_properties[b] for b in buildings], self.weather_data,
+                                 self.date_range, self.locator, self.use_dynamic_infiltration_calculation,
+                                 self.resolution_output, self.loads_output, self.massflows_output,
+                                 self.temperatures_output, self.config, self.debug)
+        for building in buildings:
+            actual = pd.read_csv(self.locator.get_demand_results_file(building))
+            for column in expected[building].columns:
+                if expected[building][column].dtype.kind != 'f':
+                    continue
+                self.assertTrue(np.allclose(expected[building][column], actual[column], atol=1e-3, equal_nan=True),
+                                msg='Column %s of %s differs between demand engines' % (column, building))
+
+
 
 def run_for_single_building(building, bpr, weather_data, date, locator,
                             use_dynamic_infiltration_calculation, resolution_output, loads_output,
@@ -0,0 +1,85 @@
+"""
+Test the utilities/database_cache.py file
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from cea.utilities import database_cache
+
+
+class TestDatabaseCache(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'CONVERSION.xlsx')
+        self.write_database(1.0)
+        self.cache_folder = os.path.join(self.folder, 'cache')
+        patcher = mock.patch.object(database_cache, 'CACHE_FOLDER', self.cache_folder)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        database_cache.clear_database_cache()
+        shutil.rmtree(self.folder)
+
+    def write_database(self, efficiency):
+        with pd.ExcelWriter(self.path) as writer:
+            boilers = pd.DataFrame({'code': ['BO1', 'BO2'], 'eff': [efficiency, 0.9]})
+            boilers.to_excel(writer, sheet_name='BOILERS', index=False)
+            heat_pumps = pd.DataFrame({'code': ['HP1'], 'cop': [3.0]})
+            heat_pumps.to_excel(writer, sheet_name='HEAT_PUMPS', index=False)
+
+    def test_read_database(self):
+        """The cached sheets are the same as read by pandas, for all sheet_name arguments"""
+        for sheet_name in ['HEAT_PUMPS', 0, None, ['BOILERS']]:
+            expected = pd.read_excel(self.path, sheet_name=sheet_name)
+            for _ in range(2):
+                # the second read is served from the in-memory cache
+                result = database_cache.read_database(self.path, sheet_name=sheet_name)
+                if isinstance(expected, dict):
+                    self.assertEqual(list(expected.keys()), list(result.keys()))
+                    for name in expected:
+                        assert_frame_equal(expected[name], result[name])
+                else:
+                    assert_frame_equal(expected, result)
+
+        # the sheets returned are copies
+        database_cache.read_database(self.path, 'BOILERS')['eff'] = 0.0
+        self.assertEqual(1.0, database_cache.read_database(self.path, 'BOILERS')['eff'][0])
+
+    def test_modified_database(self):
+        """Modifying the workbook invalidates the caches"""
+        database_cache.read_database(self.path, 'BOILERS')
+        self.write_database(0.5)
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+        self.assertEqual(0.5, database_cache.read_database(self.path, 'BOILERS')['eff'][0])
+
+    @unittest.skipUnless(hasattr(os, 'getuid'), 'file ownership is only checked on POSIX systems')
+    def test_private_cache_folder(self):
+        """The binary cache is written to a folder only the user can access, and not used if it belongs to others"""
+        os.makedirs(self.cache_folder, mode=0o777)
+        os.chmod(self.cache_folder, 0o777)
+        database_cache.read_database(self.path, 'BOILERS')
+        self.assertEqual(0o700, os.stat(self.cache_folder).st_mode & 0o777)
+        self.assertEqual(1, len(os.listdir(self.cache_folder)))
+
+        # a cache folder of another user is not read from or written to
+        shutil.rmtree(self.cache_folder)
+        database_cache.clear_database_cache()
+        other_user = os.getuid() + 1
+        with mock.patch.object(database_cache.os, 'getuid', return_value=other_user), \
+                mock.patch.object(database_cache, '_read_cache_file') as read_cache_file:
+            self.assertEqual(1.0, database_cache.read_database(self.path, 'BOILERS')['eff'][0])
+        read_cache_file.assert_not_called()
+        self.assertEqual([], os.listdir(self.cache_folder))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Test the streaming of the results in resources/radiation/daysim.py
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from cea.constants import HOURS_IN_YEAR
+from cea.resources.radiation.daysim import BYTES_PER_SENSOR, calc_building_groups, remove_leap_day
+from cea.resources.radiation.daysim_scheduler import MIN_SENSORS_IN_CHUNK, calc_chunks
+from cea.resources.radiation.radiance import read_ill_sensor_groups
+
+
+class TestStreamingResults(unittest.TestCase):
+    def test_building_groups(self):
+        """The groups of buildings fit in the memory, except for buildings too large on their own"""
+        sensors_number_zone = [100, 300, 200, 0, 1000, 50]
+        max_memory_mb = 400 * BYTES_PER_SENSOR / 1024 ** 2
+        self.assertEqual([(0, 2), (2, 4), (4, 5), (5, 6)], calc_building_groups(sensors_number_zone, max_memory_mb))
+        self.assertEqual([(0, 6)], calc_building_groups(sensors_number_zone, 0))
+        self.assertEqual([], calc_building_groups([], 100))
+
+    def test_remove_leap_day(self):
+        solar_res = np.tile(np.arange(HOURS_IN_YEAR + 24, dtype=np.float32), (3, 1))
+        expected = np.delete(solar_res, range(1416, 1440), axis=1)
+        np.testing.assert_array_equal(expected, remove_leap_day(solar_res))
+
+    def test_read_ill_sensor_groups(self):
+        """The results of each group of sensors are the same as those read from the whole file"""
+        folder = tempfile.mkdtemp()
+        try:
+            ill_path = os.path.join(folder, 'chunk_0.ill')
+            # month, day and hour of each line, followed by two spaces and the results of the sensors
+            results = np.round(np.random.rand(7, 30) * 1000, 2).astype(np.float32)
+            with open(ill_path, 'w') as f:
+                for hour in range(30):
+                    f.write('1 1 %d.500  ' % hour + ' '.join('%.2f' % value for value in results[:, hour]) + '\n')
+
+            for sensor_groups in [[(0, 7)], [(0, 2), (2, 2), (2, 7)]]:
+                groups = list(read_ill_sensor_groups(ill_path, sensor_groups, 40, folder))
+                self.assertEqual(len(sensor_groups), len(groups))
+                for (first, last), group in zip(sensor_groups, groups):
+                    np.testing.assert_array_equal(results[first:last], group)
+                self.assertEqual(['chunk_0.ill'], os.listdir(folder))
+
+            with self.assertRaises(ValueError):
+                list(read_ill_sensor_groups(ill_path, [(0, 2), (2, 7)], 20, folder))
+            self.assertEqual(['chunk_0.ill'], os.listdir(folder))
+        finally:
+            shutil.rmtree(folder)
+
+
+class TestDaysimScheduler(unittest.TestCase):
+    def test_chunks(self):
+        """The chunks are sized by sensors, keep all buildings in order and are sorted by size"""
+        building_names = ['B%d' % i for i in range(10)]
+        sensors_buildings = [MIN_SENSORS_IN_CHUNK] * 8 + [20 * MIN_SENSORS_IN_CHUNK, MIN_SENSORS_IN_CHUNK // 2]
+        chunks = calc_chunks(building_names, sensors_buildings, num_processes=2, max_buildings_in_chunk=100)
+        self.assertEqual(['B8'], chunks[0][0])
+        self.assertEqual(20 * MIN_SENSORS_IN_CHUNK, chunks[0][1])
+        self.assertEqual(sorted(building_names), sorted(b for chunk, _ in chunks for b in chunk))
+        self.assertEqual(sorted((s for _, s in chunks), reverse=True), [s for _, s in chunks])
+
+        chunks = calc_chunks(building_names, [1] * 10, num_processes=2, max_buildings_in_chunk=3)
+        self.assertEqual([3, 3, 3, 1], [len(chunk) for chunk, _ in chunks])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Test the optimization/preprocessing/decentralized_buildings_cache.py file
+"""
+
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from cea.inputlocator import InputLocator
+from cea.optimization.preprocessing import decentralized_buildings_cache
+
+
+def get_result_files(locator, building_name):
+    return [locator.get_optimization_decentralized_folder_building_result_heating(building_name),
+            locator.get_optimization_decentralized_folder_building_result_heating_activation(building_name)]
+
+
+class TestDecentralizedBuildingsCache(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.locator = InputLocator(self.scenario)
+        self.total_demand = pd.DataFrame({'Name': ['B1', 'B2'], 'QH_sys_MWhyr': [10.0, 20.0]})
+        for building in ['B1', 'B2']:
+            self.write_demand_results(building, 1.0)
+
+    def tearDown(self):
+        shutil.rmtree(self.scenario)
+
+    def write_demand_results(self, building, Qhs_sys_kWh):
+        pd.DataFrame({'Qhs_sys_kWh': [Qhs_sys_kWh] * 3}).to_csv(self.locator.get_demand_results_file(building),
+                                                                index=False)
+
+    def write_results(self, buildings):
+        for building in buildings:
+            for path in get_result_files(self.locator, building):
+                pd.DataFrame({'Best configuration': [1]}).to_csv(path, index=False)
+
+    def calc_fingerprints(self, area=100.0):
+        return decentralized_buildings_cache.calc_decentralized_fingerprints(
+            self.locator, ['B1', 'B2'], self.total_demand, {'NG': 0.1}, {'NG': 0.2}, lambda building: area)
+
+    def get_changed_buildings(self, fingerprints, incremental=True):
+        return decentralized_buildings_cache.get_changed_buildings(self.locator, fingerprints, get_result_files,
+                                                                   incremental)
+
+    def test_unchanged_buildings_are_skipped(self):
+        fingerprints = self.calc_fingerprints()
+        self.assertEqual(['B1', 'B2'], self.get_changed_buildings(fingerprints))
+        self.write_results(['B1', 'B2'])
+        decentralized_buildings_cache.store_fingerprints(self.locator, fingerprints, get_result_files, ['B1', 'B2'])
+        self.assertEqual([], self.get_changed_buildings(self.calc_fingerprints()))
+        self.assertEqual(['B1', 'B2'], self.get_changed_buildings(self.calc_fingerprints(), incremental=False))
+
+    def test_changed_inputs(self):
+        """New demand results, other inputs or missing results invalidate the results of a building"""
+        fingerprints = self.calc_fingerprints()
+        self.write_results(['B1', 'B2'])
+        decentralized_buildings_cache.store_fingerprints(self.locator, fingerprints, get_result_files, ['B1', 'B2'])
+
+        self.write_demand_results('B2', 2.0)
+        self.assertEqual(['B2'], self.get_changed_buildings(self.calc_fingerprints()))
+        self.assertEqual(['B1', 'B2'], self.get_changed_buildings(self.calc_fingerprints(area=50.0)))
+
+    def test_missing_results(self):
+        fingerprints = self.calc_fingerprints()
+        self.write_results(['B1'])
+        decentralized_buildings_cache.store_fingerprints(self.locator, fingerprints, get_result_files, ['B1', 'B2'])
+        self.assertEqual(['B2'], self.get_changed_buildings(fingerprints))
+
+
+if __name__ == '__main__':
+    unittest.main()
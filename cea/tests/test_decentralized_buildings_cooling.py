@@ -0,0 +1,45 @@
+"""
+Test the ranking of the supply system configurations in optimization/preprocessing/decentralized_buildings_cooling.py
+"""
+
+import unittest
+
+import numpy as np
+
+from cea.optimization.preprocessing.decentralized_buildings_cooling import rank_results
+
+
+def calc_best_configuration(TAC_USD, GHG_tonCO2):
+    """The index of the best configuration, the configurations are numbered in the order of their results"""
+    number_of_configurations = len(TAC_USD)
+    configurations = np.arange(number_of_configurations)
+    TAC_USD = np.column_stack([configurations, TAC_USD])
+    TotalCO2 = np.column_stack([configurations, GHG_tonCO2])
+    TotalPrim = np.column_stack([configurations, np.zeros(number_of_configurations)])
+    Best, indexBest = rank_results(TAC_USD, TotalCO2, TotalPrim, number_of_configurations)
+    np.testing.assert_array_equal(np.where(configurations == indexBest, 1.0, 0.0), Best[:, 0])
+    return indexBest
+
+
+class TestRankResults(unittest.TestCase):
+    def test_single_best(self):
+        """A configuration that ranks first in cost and emissions is the best"""
+        self.assertEqual(1, calc_best_configuration([20.0, 10.0, 30.0], [2.0, 1.0, 3.0]))
+
+    def test_dominated_configuration(self):
+        """
+        A configuration that is worse than another one in both objectives still changes the best configuration: the
+        ranks and the mean values the configurations are compared with include it, so every configuration needs to
+        be simulated.
+        """
+        # DX, VCC, ACH with solar collectors, ACH with solar collectors and VCC
+        TAC_USD = [10.0, 14.0, 12.0, 50.0]
+        GHG_tonCO2 = [5.0, 1.0, 6.0, 50.0]
+        self.assertEqual(0, calc_best_configuration(TAC_USD, GHG_tonCO2))
+
+        # without configuration 2, which is dominated by configuration 0, configuration 1 would be chosen
+        self.assertEqual(1, calc_best_configuration(TAC_USD[:2] + TAC_USD[3:], GHG_tonCO2[:2] + GHG_tonCO2[3:]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Test the optimization/demand_matrix.py file
+"""
+
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from cea.constants import HOURS_IN_YEAR
+from cea.inputlocator import InputLocator
+from cea.optimization.demand_matrix import DEMAND_COLUMNS, DemandMatrix, HourlyMatrix, install_demand_matrix
+
+
+class TestDemandMatrix(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.locator = InputLocator(self.scenario)
+        raw_columns = set(column for columns in DEMAND_COLUMNS.values() for column in columns)
+        date = pd.date_range('2020-01-01', periods=HOURS_IN_YEAR, freq='H')
+        for number, name in enumerate(['B1', 'B2', 'B3']):
+            demand = pd.DataFrame({column: np.full(HOURS_IN_YEAR, float(number)) for column in raw_columns})
+            demand.insert(0, 'DATE', date)
+            demand.to_csv(self.locator.get_demand_results_file(name), index=False)
+
+        # only B3 has a decentralized heating system
+        pd.DataFrame({'E_hs_ww_req_W': np.full(HOURS_IN_YEAR, 1.0),
+                      'NG_BackupBoiler_req_W': np.full(HOURS_IN_YEAR, 2.0),
+                      'NG_Boiler_req_W': np.full(HOURS_IN_YEAR, 3.0)}).to_csv(
+            self.locator.get_optimization_decentralized_folder_building_result_heating_activation('B3'), index=False)
+        pd.DataFrame({'Best configuration': [0, 1], 'TAC_USD': [10.0, 5.0]}).to_csv(
+            self.locator.get_optimization_decentralized_folder_building_result_heating('B3'), index=False)
+        self.demand_matrix = DemandMatrix.load(self.locator, ['B1', 'B2', 'B3'])
+
+    def tearDown(self):
+        install_demand_matrix(None)
+        shutil.rmtree(self.scenario)
+
+    def test_sum(self):
+        """The buildings without demand have no rows, unknown buildings raise a KeyError"""
+        hourly_matrix = HourlyMatrix({'B1': {'Q': np.zeros(3)}, 'B2': {'Q': np.arange(3.0)}})
+        np.testing.assert_array_equal(np.arange(3.0), hourly_matrix.sum('Q', ['B1', 'B2']))
+        np.testing.assert_array_equal(np.zeros(3), hourly_matrix.sum('Q', ['B1']))
+        self.assertRaises(KeyError, hourly_matrix.sum, 'Q', ['B3'])
+
+        # E_hs_ww_kWh is the sum of E_hs_kWh and E_ww_kWh
+        np.testing.assert_array_equal(np.full(HOURS_IN_YEAR, 6.0),
+                                      self.demand_matrix.demand.sum('E_hs_ww_kWh', ['B1', 'B2', 'B3']))
+        self.assertEqual(5.0, self.demand_matrix.best_heating_configurations.loc['B3', 'TAC_USD'])
+        self.assertEqual(HOURS_IN_YEAR, len(self.demand_matrix.date))
+
+
+if __name__ == '__main__':
+    unittest.main()
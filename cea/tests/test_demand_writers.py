@@ -0,0 +1,81 @@
+"""
+Test the demand/demand_writers.py file
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+import cea.demand.demand_writers as demand_writers
+from cea.demand.demand_store import DemandStore
+from cea.inputlocator import InputLocator
+
+
+class TestDemandResultsFormats(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.locator = InputLocator(self.scenario)
+        self.df = pd.DataFrame({'DATE': pd.date_range('2020-01-01', periods=24, freq='H'),
+                                'Name': 'B1',
+                                'QH_sys_kWh': np.random.rand(24)})
+
+    def tearDown(self):
+        shutil.rmtree(self.scenario)
+
+    def test_roundtrip(self):
+        """Results written in any format are read back by `read_demand_results` and replace the previous format"""
+        for output_format in ['parquet', 'feather']:
+            path = self.locator.get_demand_results_file('B1', output_format)
+            demand_writers.write_columnar(self.df, path, output_format)
+            demand_writers.remove_stale_demand_results(self.locator, 'B1', output_format)
+            self.assertEqual(output_format, demand_writers.get_demand_results_format(self.locator, 'B1'))
+            assert_frame_equal(self.df, demand_writers.read_demand_results(self.locator, 'B1'))
+            assert_frame_equal(self.df[['QH_sys_kWh']],
+                               demand_writers.read_demand_results(self.locator, 'B1', columns=['QH_sys_kWh']))
+        self.assertEqual(['B1.feather'], os.listdir(os.path.dirname(path)))
+
+    def test_schema_io_format(self):
+        """The locator method reads and writes the format it is given, as positional or keyword argument"""
+        for output_format, read_file in [('parquet', pd.read_parquet), ('feather', pd.read_feather)]:
+            self.locator.get_demand_results_file.write(self.df, 'B1', output_format)
+            # the file at the path of the format is written in that format
+            assert_frame_equal(self.df, read_file(self.locator.get_demand_results_file('B1', output_format)))
+            assert_frame_equal(self.df, self.locator.get_demand_results_file.read('B1', output_format))
+            assert_frame_equal(self.df, self.locator.get_demand_results_file.read('B1', format=output_format))
+        self.assertRaises(ValueError, self.locator.get_demand_results_file.read, 'B1', 'xlsx')
+
+    def test_consolidated_store(self):
+        """Results appended to the store are compacted and aggregated to the yearly totals"""
+        store = DemandStore(self.locator)
+        areas = {'Af_m2': 100.0, 'Aroof_m2': 50.0, 'GFA_m2': 120.0, 'Aocc_m2': 90.0}
+        hourly_data = self.df.assign(people=2.0)
+        for name in ['B1', 'B2']:
+            store.append(name, hourly_data.assign(Name=name), areas)
+        totals = store.compact(['B2', 'B1'], ['QH_sys'])
+        self.assertEqual(['B2', 'B1'], list(totals['Name']))
+        self.assertAlmostEqual(self.df['QH_sys_kWh'].sum() / 1000, totals['QH_sys_MWhyr'][0])
+        self.assertAlmostEqual(self.df['QH_sys_kWh'].max(), totals['QH_sys0_kW'][0])
+        self.assertEqual(2.0, totals['people0'][0])
+
+        # recalculating a building keeps the results of the others
+        store.append('B1', hourly_data.assign(Name='B1', QH_sys_kWh=0.0), areas)
+        totals = store.compact(['B1'], ['QH_sys'])
+        self.assertEqual(0.0, totals['QH_sys_MWhyr'][0])
+        self.assertEqual(['B1', 'B2'], store.buildings())
+        self.assertEqual(demand_writers.DEMAND_STORE, demand_writers.get_demand_results_format(self.locator, 'B2'))
+        assert_frame_equal(hourly_data.assign(Name='B2'), demand_writers.read_demand_results(self.locator, 'B2'))
+
+    def test_missing_results(self):
+        self.assertFalse(demand_writers.demand_results_exist(self.locator, 'B2'))
+        self.assertRaises(FileNotFoundError, demand_writers.read_demand_results, self.locator, 'B2')
+        # looking for results does not create the store
+        self.assertFalse(os.path.exists(self.locator.get_demand_store_folder()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Test the utilities/fingerprints.py file
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from cea.utilities import fingerprints
+
+
+class TestFingerprints(unittest.TestCase):
+    def test_fingerprint_by_content(self):
+        """Equal contents have the same fingerprint, any change in the contents changes it"""
+        row = pd.Series({'type_hs': 'HVAC_HEATING_AS1', 'Af': 100.0, 'floors_ag': 3})
+        solar = np.linspace(0.0, 1.0, 8760)
+        fingerprint = fingerprints.calc_fingerprint(row, {'I_sol': solar}, None)
+        self.assertEqual(fingerprint, fingerprints.calc_fingerprint(row.copy(), {'I_sol': solar.copy()}, None))
+
+        changed_row = row.copy()
+        changed_row['Af'] = 100.5
+        self.assertNotEqual(fingerprint, fingerprints.calc_fingerprint(changed_row, {'I_sol': solar}, None))
+        self.assertNotEqual(fingerprint, fingerprints.calc_fingerprint(row, {'I_sol': solar * 2}, None))
+        self.assertNotEqual(fingerprints.calc_fingerprint('1'), fingerprints.calc_fingerprint(1))
+
+    def test_unchanged_buildings(self):
+        folder = tempfile.mkdtemp()
+        try:
+            self.assertEqual([], fingerprints.unchanged_buildings(folder, {'B1': 'a'}))
+            fingerprints.write_fingerprints(folder, {'B1': 'a', 'B2': 'b'})
+            fingerprints.write_fingerprints(folder, {'B2': 'c'})
+            self.assertEqual(['B1'], fingerprints.unchanged_buildings(folder, {'B1': 'a', 'B2': 'b', 'B3': 'c'}))
+        finally:
+            shutil.rmtree(folder)
+
+    def test_shapefile_fingerprint(self):
+        """The attributes of a shapefile (e.g. the building heights in the .dbf file) are part of its fingerprint"""
+        folder = tempfile.mkdtemp()
+        try:
+            path = os.path.join(folder, 'zone.shp')
+            for extension, contents in [('.shp', b'shapes'), ('.shx', b'index'), ('.dbf', b'height_ag 10')]:
+                with open(os.path.join(folder, 'zone' + extension), 'wb') as f:
+                    f.write(contents)
+            fingerprint = fingerprints.calc_shapefile_fingerprint(path)
+            self.assertEqual(fingerprint, fingerprints.calc_shapefile_fingerprint(path))
+
+            with open(os.path.join(folder, 'zone.dbf'), 'wb') as f:
+                f.write(b'height_ag 20')
+            self.assertNotEqual(fingerprint, fingerprints.calc_shapefile_fingerprint(path))
+        finally:
+            shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    unittest.main()
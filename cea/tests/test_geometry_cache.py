@@ -0,0 +1,90 @@
+"""
+Test the resources/radiation/geometry_cache.py file
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from cea.resources.radiation import geometry_cache
+
+
+class TestGeometryCache(unittest.TestCase):
+    def setUp(self):
+        self.geometry_pickle_dir = tempfile.mkdtemp()
+        self.zone_pickle_dir = os.path.join(self.geometry_pickle_dir, 'zone')
+        os.makedirs(self.zone_pickle_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.geometry_pickle_dir)
+
+    def write_pickles(self, fingerprints):
+        for building in fingerprints:
+            with open(os.path.join(self.zone_pickle_dir, building), 'w') as f:
+                f.write(building)
+        geometry_cache.save_fingerprints(self.zone_pickle_dir, fingerprints)
+
+    def test_zone_geometry_fingerprint(self):
+        """The geometry of a building changes with its window-to-wall ratios and the solids of its neighbours"""
+        fingerprint = geometry_cache.calc_zone_geometry_fingerprint('solid', [0.4] * 4, False, ['a', 'b'])
+        self.assertEqual(fingerprint, geometry_cache.calc_zone_geometry_fingerprint('solid', [0.4] * 4, False,
+                                                                                    ['b', 'a']))
+        self.assertNotEqual(fingerprint, geometry_cache.calc_zone_geometry_fingerprint('solid', [0.5] * 4, False,
+                                                                                       ['a', 'b']))
+        self.assertNotEqual(fingerprint, geometry_cache.calc_zone_geometry_fingerprint('solid', [0.4] * 4, False,
+                                                                                       ['a', 'c']))
+        # the neighbours don't matter if the adjacent walls are neglected
+        self.assertEqual(geometry_cache.calc_zone_geometry_fingerprint('solid', [0.4] * 4, True, ['a', 'b']),
+                         geometry_cache.calc_zone_geometry_fingerprint('solid', [0.4] * 4, True, ['a', 'c']))
+
+    def test_stale_buildings(self):
+        """Only the buildings with other inputs or without a pickle are generated again"""
+        self.write_pickles({'B1': 'x', 'B2': 'y', 'B3': 'z'})
+        os.remove(os.path.join(self.zone_pickle_dir, 'B3'))
+        stale = geometry_cache.stale_buildings(self.zone_pickle_dir, {'B1': 'x', 'B2': 'changed', 'B3': 'z',
+                                                                      'B4': 'new'})
+        self.assertEqual(['B2', 'B3', 'B4'], stale)
+
+        geometry_cache.forget_buildings(self.zone_pickle_dir, ['B1'])
+        self.assertEqual(['B1'], geometry_cache.stale_buildings(self.zone_pickle_dir, {'B1': 'x'}))
+
+    def test_solids(self):
+        """The solids are reused as long as their fingerprint did not change"""
+        geometry_cache.save_solids(self.geometry_pickle_dir, {'B1': [1, 2], 'B2': [3]}, {'B1': 'x', 'B2': 'y'})
+        solids = geometry_cache.load_solids(self.geometry_pickle_dir, {'B1': 'x', 'B2': 'changed', 'B3': 'z'})
+        self.assertEqual({'B1': [1, 2]}, solids)
+
+    def test_radiance_geometry(self):
+        """The Radiance geometry file is reused for the same geometry and materials"""
+        self.write_pickles({'B1': 'x', 'B2': 'y'})
+        geometry_cache.save_fingerprints(self.geometry_pickle_dir, {geometry_cache.TERRAIN_TIN_FILE: 'terrain'})
+        surface_properties = pd.DataFrame({'type_win': ['WIN1', 'WIN1'], 'type_wall': ['WALL1', 'WALL1'],
+                                           'type_roof': ['ROOF1', 'ROOF1']}, index=['B1', 'B2'])
+
+        fingerprint = geometry_cache.calc_radiance_geometry_fingerprint(self.geometry_pickle_dir, surface_properties,
+                                                                        ['B1', 'B2'], [])
+        rad_geometry_path = os.path.join(self.geometry_pickle_dir, 'staging.rad')
+        self.assertFalse(geometry_cache.copy_radiance_geometry(self.geometry_pickle_dir, fingerprint,
+                                                               rad_geometry_path))
+        with open(rad_geometry_path, 'w') as f:
+            f.write('geometry')
+        geometry_cache.save_radiance_geometry(self.geometry_pickle_dir, fingerprint, rad_geometry_path)
+        os.remove(rad_geometry_path)
+        self.assertTrue(geometry_cache.copy_radiance_geometry(self.geometry_pickle_dir, fingerprint,
+                                                              rad_geometry_path))
+        with open(rad_geometry_path, 'r') as f:
+            self.assertEqual('geometry', f.read())
+
+        surface_properties.loc['B2', 'type_win'] = 'WIN2'
+        self.assertNotEqual(fingerprint, geometry_cache.calc_radiance_geometry_fingerprint(
+            self.geometry_pickle_dir, surface_properties, ['B1', 'B2'], []))
+        # a building without a stored fingerprint is never reused
+        self.assertIsNone(geometry_cache.calc_radiance_geometry_fingerprint(self.geometry_pickle_dir,
+                                                                            surface_properties, ['B1', 'B3'], []))
+
+
+if __name__ == '__main__':
+    unittest.main()
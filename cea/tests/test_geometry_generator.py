@@ -0,0 +1,30 @@
+"""
+Test the spatial index of resources/radiation/geometry_generator.py
+"""
+
+import math
+import unittest
+
+import numpy as np
+
+from cea.resources.radiation.geometry_generator import NEIGHBOUR_DISTANCE, SolidIndex
+
+
+class TestSolidIndex(unittest.TestCase):
+    def test_query_neighbours(self):
+        """The neighbours are the same as comparing the bounding boxes of every pair of buildings"""
+        rng = np.random.default_rng(0)
+        corners = rng.random((300, 3)) * [2000, 2000, 10]
+        corners[1] = corners[0] + [NEIGHBOUR_DISTANCE, 0, 0]  # exactly at the distance
+        boxes = np.hstack([corners, corners + rng.random((300, 3)) * [50, 50, 30]])
+        index = SolidIndex(boxes)
+        for i in range(len(boxes)):
+            expected = [j for j in range(len(boxes))
+                        if math.sqrt((boxes[j, 1] - boxes[i, 1]) ** 2 + (boxes[j, 0] - boxes[i, 0]) ** 2)
+                        <= NEIGHBOUR_DISTANCE]
+            self.assertEqual(expected, list(index.query_neighbours(i)))
+        self.assertIn(1, index.query_neighbours(0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+"""
+Test the optimization/slave/hourly_dispatch.py file and the hourly dispatch of the district heating, cooling and
+electricity supply units.
+
+The expected results of the district cooling plant in ``test_hourly_dispatch.config`` were calculated with the former
+implementation of ``cooling_resource_activator``, which was called hour by hour.
+"""
+
+import configparser
+import json
+import os
+import unittest
+
+import numpy as np
+
+from cea.databases import databases_folder_path
+from cea.optimization.constants import ACH_T_IN_FROM_CHP_K
+from cea.optimization.slave.cooling_resource_activation import cooling_resource_activator
+from cea.optimization.slave.electricity_main import electricity_activation_curve, dispatch_to_electricity_requirement
+from cea.optimization.slave.heating_resource_activation import heating_source_activator
+from cea.optimization.slave.hourly_dispatch import calc_hourly_operation
+from cea.optimization.slave_data import SlaveData
+from cea.technologies.boiler import cond_boiler_op_cost
+from cea.technologies.chiller_absorption import AbsorptionChiller
+from cea.technologies.chiller_vapor_compression import VaporCompressionChiller
+from cea.technologies.cogeneration import calc_cop_CCGT
+from cea.technologies.storage_tank_pcm import Storage_tank_PCM
+from cea.utilities.database_cache import read_database
+
+CONVERSION_DATABASE = os.path.join(databases_folder_path, 'CH', 'components', 'CONVERSION.xlsx')
+
+# the inputs of the district cooling plant read from the test config
+COOLING_INPUTS = ['Q_thermal_req_W', 'T_district_cooling_supply_K', 'T_district_cooling_return_K',
+                  'Qc_water_body_potential_W', 'T_source_average_water_body_K', 'T_ground_K']
+COOLING_SIZES = ['NG_Trigen_ACH_size_W', 'WS_BaseVCC_size_W', 'WS_PeakVCC_size_W', 'AS_BaseVCC_size_W',
+                 'AS_PeakVCC_size_W', 'Storage_cooling_size_W']
+
+
+class ConversionDatabaseLocator(object):
+    def get_database_conversion_systems(self):
+        return CONVERSION_DATABASE
+
+
+class TestHourlyDispatch(unittest.TestCase):
+    def test_calc_hourly_operation(self):
+        """The model is only called in the hours the unit is running, with the values of that hour"""
+        calls = []
+
+        def model(Q_W, size_W):
+            calls.append(Q_W)
+            return Q_W / size_W, -Q_W
+
+        running = np.array([True, False, True])
+        load, negative = calc_hourly_operation(model, running, 2, np.array([1.0, 2.0, 3.0]), 4.0)
+        np.testing.assert_array_equal([0.25, 0.0, 0.75], load)
+        np.testing.assert_array_equal([-1.0, 0.0, -3.0], negative)
+        self.assertEqual([1.0, 3.0], calls)
+
+        # a unit that never runs
+        np.testing.assert_array_equal(np.zeros(3), calc_hourly_operation(model, np.zeros(3, dtype=bool), 1, 1.0, 4.0))
+
+    def test_boilers(self):
+        """The base boiler covers the load up to its capacity, the peak boiler the rest, the back-up what is left"""
+        master_to_slave_vars = SlaveData()
+        master_to_slave_vars.Boiler_on = 1
+        master_to_slave_vars.Boiler_Q_max_W = 1000.0
+        master_to_slave_vars.BoilerPeak_on = 1
+        master_to_slave_vars.BoilerPeak_Q_max_W = 500.0
+        Q_therm_req_W = np.array([0.0, 10.0, 800.0, 1300.0, 2000.0])
+        T_return_K = np.full(5, 323.15)
+        zeros = np.zeros(5)
+
+        results = heating_source_activator(Q_therm_req_W, master_to_slave_vars, zeros, zeros, zeros, zeros, zeros,
+                                           zeros, np.full(5, 343.15), T_return_K)
+        Q_BaseBoiler_gen_W, Q_PeakBoiler_gen_W, Q_uncovered_W = results[6:9]
+        NG_BaseBoiler_req_W = results[18]
+
+        # 10 W are below the minimum part load of both boilers
+        np.testing.assert_array_equal([0.0, 0.0, 800.0, 1000.0, 1000.0], Q_BaseBoiler_gen_W)
+        np.testing.assert_array_equal([0.0, 0.0, 0.0, 300.0, 500.0], Q_PeakBoiler_gen_W)
+        np.testing.assert_array_equal([0.0, 10.0, 0.0, 0.0, 500.0], Q_uncovered_W)
+        self.assertEqual(cond_boiler_op_cost(800.0, 1000.0, 323.15)[0], NG_BaseBoiler_req_W[2])
+
+
+class TestCoolingDispatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.test_config = configparser.ConfigParser()
+        cls.test_config.optionxform = str
+        cls.test_config.read(os.path.join(os.path.dirname(__file__), 'test_hourly_dispatch.config'))
+        cls.inputs = [np.array(json.loads(cls.test_config.get('input_cooling_dispatch', name)))
+                      for name in COOLING_INPUTS]
+
+    def calc_cooling_dispatch(self, storage_on):
+        """Dispatch all the cooling units of the district cooling plant for the hours of the test config"""
+        master_to_slave_vars = SlaveData()
+        master_to_slave_vars.NG_Trigen_on = 1
+        master_to_slave_vars.WS_BaseVCC_on = 1
+        master_to_slave_vars.WS_PeakVCC_on = 1
+        master_to_slave_vars.AS_BaseVCC_on = 1
+        master_to_slave_vars.AS_PeakVCC_on = 1
+        master_to_slave_vars.Storage_cooling_on = int(storage_on)
+        for name in COOLING_SIZES:
+            setattr(master_to_slave_vars, name, json.loads(self.test_config.get('input_cooling_dispatch', name)))
+
+        T_ground_K = self.inputs[-1]
+        daily_storage = Storage_tank_PCM(activation=master_to_slave_vars.Storage_cooling_on,
+                                         size_Wh=master_to_slave_vars.Storage_cooling_size_W,
+                                         database_model_parameters=read_database(CONVERSION_DATABASE,
+                                                                                 sheet_name="THERMAL_ENERGY_STORAGES"),
+                                         T_ambient_K=np.average(T_ground_K),
+                                         type_storage='TES2')
+        absorption_chiller = AbsorptionChiller(read_database(CONVERSION_DATABASE, sheet_name="ABSORPTION_CHILLERS"),
+                                               'double')
+        VC_chiller = VaporCompressionChiller(ConversionDatabaseLocator(), scale='DISTRICT')
+        CCGT_prop = calc_cop_CCGT(master_to_slave_vars.NG_Trigen_ACH_size_W, ACH_T_IN_FROM_CHP_K, "NG")
+
+        _, thermal_output, electricity_output, gas_output = cooling_resource_activator(*self.inputs,
+                                                                                       daily_storage,
+                                                                                       absorption_chiller,
+                                                                                       VC_chiller,
+                                                                                       CCGT_prop,
+                                                                                       master_to_slave_vars)
+        return dict(thermal_output, **electricity_output, **gas_output)
+
+    def check_cooling_dispatch(self, storage_on, section):
+        results = self.calc_cooling_dispatch(storage_on)
+        expected_results = {name: json.loads(value) for name, value in self.test_config.items(section)}
+        self.assertEqual(sorted(expected_results), sorted(results))
+        for name, expected in expected_results.items():
+            np.testing.assert_allclose(results[name], expected, rtol=1e-9, atol=1e-6, err_msg=name)
+
+    def test_cooling_resource_activator(self):
+        """All hours at once give the same results as the former dispatch hour by hour, without a daily storage"""
+        self.check_cooling_dispatch(False, 'expected_storage_off')
+
+    def test_cooling_resource_activator_with_storage(self):
+        """The charging and discharging of the daily storage is the same as in the former dispatch hour by hour"""
+        self.check_cooling_dispatch(True, 'expected_storage_on')
+
+
+def dispatch_hour(E_gen_W, E_req_hour_W):
+    """The former dispatch of the generation of one unit in a single hour (generation used, exported, requirement)"""
+    if E_gen_W > 0.0 and E_req_hour_W > 0.0:
+        delta_E = E_gen_W - E_req_hour_W
+        if delta_E >= 0.0:
+            return E_req_hour_W, delta_E, 0.0
+        return E_gen_W, 0.0, E_req_hour_W - E_gen_W
+    # since we cannot store it is then exported
+    return 0.0, E_gen_W, E_req_hour_W
+
+
+class TestElectricityDispatch(unittest.TestCase):
+    def test_dispatch_to_electricity_requirement(self):
+        """The generation covers the requirement up to the generation, the rest is exported"""
+        E_gen_W = np.array([0.0, 0.0, 5.0, 5.0, 5.0, 5.0])
+        E_req_hour_W = np.array([0.0, 3.0, 0.0, 3.0, 5.0, 8.0])
+        E_gen_directload_W, E_gen_export_W, E_req_hour_W = dispatch_to_electricity_requirement(E_gen_W, E_req_hour_W)
+        np.testing.assert_array_equal([0.0, 0.0, 0.0, 3.0, 5.0, 5.0], E_gen_directload_W)
+        np.testing.assert_array_equal([0.0, 0.0, 5.0, 2.0, 0.0, 0.0], E_gen_export_W)
+        np.testing.assert_array_equal([0.0, 3.0, 0.0, 0.0, 0.0, 3.0], E_req_hour_W)
+
+    def test_electricity_activation_curve(self):
+        """All hours at once give the same results as the former activation curve, hour by hour"""
+        random = np.random.RandomState(23)
+        hours = 200
+        E_req_hour_W = np.round(random.uniform(0.0, 1000.0, hours))
+        E_req_hour_W[random.rand(hours) < 0.1] = 0.0
+        # CHP, PVT, furnace dry, furnace wet, trigen, PV
+        E_gen_W = []
+        for _ in range(6):
+            generation = np.round(random.uniform(0.0, 600.0, hours))
+            generation[random.rand(hours) < 0.3] = 0.0
+            # a unit that covers exactly what is left
+            exact = random.rand(hours) < 0.1
+            generation[exact] = E_req_hour_W[exact]
+            E_gen_W.append(generation)
+        E_CHP_gen_W, E_PVT_gen_W, E_Furnace_dry_gen_W, E_Furnace_wet_gen_W, E_Trigen_NG_gen_W, E_PV_gen_W = E_gen_W
+
+        results = electricity_activation_curve(*E_gen_W, E_req_hour_W)
+
+        # the former activation curve, hour by hour: the units in their loading order, then the grid
+        loading_order = [E_CHP_gen_W, E_Furnace_dry_gen_W, E_Furnace_wet_gen_W, E_Trigen_NG_gen_W, E_PV_gen_W,
+                         E_PVT_gen_W]
+        directload = np.zeros((len(loading_order), hours))
+        export = np.zeros((len(loading_order), hours))
+        E_GRID_directload_W = np.zeros(hours)
+        for hour in range(hours):
+            E_req_W = E_req_hour_W[hour]
+            for unit, E_unit_gen_W in enumerate(loading_order):
+                directload[unit, hour], export[unit, hour], E_req_W = dispatch_hour(E_unit_gen_W[hour], E_req_W)
+            E_GRID_directload_W[hour] = E_req_W if E_req_W > 0.0 else 0.0
+
+        # the results are returned in the order CHP, trigen, furnace dry, furnace wet, PV, PVT, grid
+        expected_results = []
+        for unit in [0, 3, 1, 2, 4, 5]:
+            expected_results.extend([directload[unit], export[unit]])
+        expected_results.append(E_GRID_directload_W)
+
+        self.assertEqual(len(expected_results), len(results))
+        for result, expected in zip(results, expected_results):
+            np.testing.assert_array_equal(expected, result)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+"""
+Test the technologies/thermal_network/hydraulic_solver.py file
+"""
+
+import unittest
+
+import networkx as nx
+import numpy as np
+
+from cea.technologies.thermal_network.hydraulic_solver import get_hydraulic_solver
+
+
+class TestHydraulicSolver(unittest.TestCase):
+    def setUp(self):
+        # plant (node 0) supplying three consumers, the edges 1-2, 2-3 and 1-3 form a loop
+        self.edges = [(0, 1), (1, 2), (2, 3), (1, 3)]
+        self.edge_node_matrix = np.zeros((4, len(self.edges)))
+        graph = nx.Graph()
+        for edge_number, (start, end) in enumerate(self.edges):
+            self.edge_node_matrix[start, edge_number] = -1
+            self.edge_node_matrix[end, edge_number] = 1
+            graph.add_edge(start, end, edge_number=edge_number)
+        self.loops = nx.cycle_basis(graph, 0)
+        self.graph = graph
+        self.node_mass_flows = np.array([-6.0, 1.0, 2.0, 3.0])
+
+    def test_solve(self):
+        """The solutions match the dense least-squares (loops) and direct (trees) solutions"""
+        solver = get_hydraulic_solver(self.edge_node_matrix, 0, self.loops, self.graph)
+        expected = np.linalg.lstsq(self.edge_node_matrix[1:], self.node_mass_flows[1:], rcond=-1)[0]
+        np.testing.assert_allclose(expected, solver.solve(self.node_mass_flows), atol=1e-10)
+        self.assertIs(solver, get_hydraulic_solver(self.edge_node_matrix.copy(), 0, self.loops, self.graph))
+
+        tree = self.edge_node_matrix[:, :3]
+        expected = np.linalg.solve(tree[1:], self.node_mass_flows[1:])
+        np.testing.assert_allclose(expected, get_hydraulic_solver(tree, 0).solve(self.node_mass_flows), atol=1e-10)
+
+    def test_loop_corrections(self):
+        """The corrections balance the pressure losses around the loop and keep the mass balance of the nodes"""
+        solver = get_hydraulic_solver(self.edge_node_matrix, 0, self.loops, self.graph)
+        mass_flow_edge = solver.solve(self.node_mass_flows)
+        pressure_loss = mass_flow_edge * np.abs(mass_flow_edge)
+        delta_m_edge, sum_pressure_loss = solver.calc_loop_corrections(pressure_loss, 2 * np.abs(mass_flow_edge))
+        self.assertEqual(0.0, delta_m_edge[0])
+        np.testing.assert_allclose(self.node_mass_flows[1:], solver.calc_node_balance(mass_flow_edge + delta_m_edge))
+        loop_signs = solver.loop_edge_matrix.toarray()[0]
+        self.assertAlmostEqual(sum_pressure_loss[0], loop_signs.dot(pressure_loss))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Test the optimization/master/network_summary_cache.py file
+"""
+
+import multiprocessing
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+import pandas as pd
+
+from cea.inputlocator import InputLocator
+from cea.optimization.master import network_summary_cache
+
+
+def calc_summary_slowly(locator, barcode, calculations):
+    """Write a summary the way summarize_network.network_main does, counting the calculations in a file"""
+    time.sleep(0.2)
+    with open(calculations, 'a') as f:
+        f.write(barcode + '\n')
+    summary = pd.DataFrame({'Q_DHNf_W': [float(int(barcode, 2))]})
+    summary.to_csv(locator.get_optimization_network_results_summary('DH', barcode), index=False)
+    return summary
+
+
+def evaluate_network(scenario, barcode, calculations):
+    locator = InputLocator(scenario)
+    network_summary = network_summary_cache.get_network_summary(
+        locator, 'DH', barcode, 'inputs', lambda: calc_summary_slowly(locator, barcode, calculations))
+    return network_summary['Q_DHNf_W'].iloc[0]
+
+
+class TestNetworkSummaryCache(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.locator = InputLocator(self.scenario)
+        self.calculations = os.path.join(self.scenario, 'calculations.txt')
+        network_summary_cache._summaries.clear()
+
+    def tearDown(self):
+        network_summary_cache.install_statistics(None)
+        network_summary_cache.install_inputs_fingerprints({})
+        shutil.rmtree(self.scenario)
+
+    def get_calculations(self):
+        with open(self.calculations, 'r') as f:
+            return f.read().split()
+
+    def test_tiers(self):
+        """A summary is calculated once per inputs, then read from memory or, in a new process, from disk"""
+        network_summary_cache.create_statistics()
+        for _ in range(2):
+            self.assertEqual(5.0, evaluate_network(self.scenario, '101', self.calculations))
+        network_summary_cache._summaries.clear()
+        self.assertEqual(5.0, evaluate_network(self.scenario, '101', self.calculations))
+        self.assertEqual({'misses': 1, 'memory_hits': 1, 'disk_hits': 1, 'in_flight_hits': 0},
+                         network_summary_cache.report_statistics())
+
+        # other inputs invalidate the summary
+        summary_file = self.locator.get_optimization_network_results_summary('DH', '101')
+        network_summary_cache.get_network_summary(self.locator, 'DH', '101', 'other inputs',
+                                                  lambda: calc_summary_slowly(self.locator, '101', self.calculations))
+        self.assertEqual(['101', '101'], self.get_calculations())
+        self.assertIsNone(network_summary_cache.read_network_summary(summary_file, 'inputs'))
+
+    def test_concurrent_workers(self):
+        """Workers evaluating the same barcode at the same time calculate its summary only once"""
+        statistics = network_summary_cache.create_statistics()
+        pool = multiprocessing.Pool(4, initializer=network_summary_cache.install_statistics, initargs=(statistics,))
+        try:
+            results = pool.starmap(evaluate_network, [(self.scenario, '110', self.calculations)] * 4)
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEqual([6.0] * 4, results)
+        self.assertEqual(['110'], self.get_calculations())
+        counters = network_summary_cache.report_statistics()
+        self.assertEqual(1, counters['misses'])
+        self.assertEqual(4, sum(counters.values()))
+
+    def test_inputs_fingerprints(self):
+        """The fingerprints of the inputs are calculated once, by the master or by the first individual"""
+        ground_temp = [280.0] * 24
+        pd.DataFrame({'Name': ['B1', 'B2']}).to_csv(self.locator.get_total_demand(), index=False)
+        fingerprints = network_summary_cache.calc_network_inputs_fingerprints(self.locator, {'DH': ['B1', 'B2']},
+                                                                             ground_temp)
+        network_summary_cache.install_inputs_fingerprints(fingerprints)
+        fingerprint = network_summary_cache.get_network_inputs_fingerprint(self.locator, 'DH', ['B1', 'B2'],
+                                                                           ground_temp)
+        self.assertEqual(list(fingerprints.values()), [fingerprint])
+
+        # the inputs are not read again during the run
+        pd.DataFrame({'Name': ['B1', 'B2', 'B3']}).to_csv(self.locator.get_total_demand(), index=False)
+        self.assertEqual(fingerprint, network_summary_cache.get_network_inputs_fingerprint(self.locator, 'DH',
+                                                                                           ['B1', 'B2'], ground_temp))
+        network_summary_cache.install_inputs_fingerprints({})
+        self.assertNotEqual(fingerprint, network_summary_cache.get_network_inputs_fingerprint(self.locator, 'DH',
+                                                                                              ['B1', 'B2'],
+                                                                                              ground_temp))
+
+    def test_stale_lock(self):
+        """The lock of a worker that is no longer running is removed straight away"""
+        summary_file = self.locator.get_optimization_network_results_summary('DH', '101')
+        lock_file = os.path.splitext(summary_file)[0] + '.lock'
+        finished = subprocess.Popen([sys.executable, '-c', 'pass'])
+        finished.wait()
+        for owner, stale in [('{host} {pid}'.format(host=socket.gethostname(), pid=finished.pid), True),
+                             ('{host} {pid}'.format(host=socket.gethostname(), pid=os.getpid()), False),
+                             ('other-host 1', False), ('', False)]:
+            with open(lock_file, 'w') as f:
+                f.write(owner)
+            self.assertEqual(stale, network_summary_cache.is_stale_lock(lock_file))
+
+        # the processes of other hosts cannot be checked, their lock files time out
+        old = time.time() - network_summary_cache.STALE_LOCK_TIMEOUT - 1
+        os.utime(lock_file, (old, old))
+        self.assertTrue(network_summary_cache.is_stale_lock(lock_file))
+
+        with open(lock_file, 'w') as f:
+            f.write('{host} {pid}'.format(host=socket.gethostname(), pid=finished.pid))
+        start = time.time()
+        with network_summary_cache.network_summary_lock(summary_file):
+            self.assertLess(time.time() - start, 1.0)
+        self.assertFalse(os.path.exists(lock_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+Test the utilities/parallel.py file
+"""
+
+import unittest
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+import cea.utilities.parallel as parallel
+
+
+def weighted_sum(i, weights, weather_data):
+    return i * float(weights.sum()) + float(weather_data['drybulb_C'].sum())
+
+
+def append_and_count(i, items):
+    items.append(i)
+    return len(items)
+
+
+class TestVectorize(unittest.TestCase):
+    def test_pool_matches_single_process(self):
+        """The persistent pool (with shared inputs) returns the same results, in order, as a simple loop"""
+        n = 20
+        weights = np.ones(100000)  # large enough to be placed in shared memory
+        weather_data = pd.DataFrame({'drybulb_C': np.linspace(-10.0, 30.0, 8760)})
+        completed = []
+
+        expected = parallel.vectorize(weighted_sum, 1)(range(n), repeat(weights, n), repeat(weather_data, n))
+        for _ in range(2):
+            # the second call reuses the pool of the first call
+            result = parallel.vectorize(weighted_sum, 2, on_complete=lambda i, n, args, r: completed.append(args[0]))(
+                range(n), repeat(weights, n), repeat(weather_data, n))
+            self.assertEqual(expected, result)
+        self.assertEqual(list(range(n)) * 2, completed)
+        self.assertEqual(parallel.get_worker_pool(2)._shared, {})
+
+    def test_shared_objects_are_not_changed_by_other_tasks(self):
+        """Each task gets its own copy of a shared object, whichever worker runs it and whatever ran before"""
+        n = 20
+        items = list(range(100000))  # large enough to be placed in shared memory
+        result = parallel.vectorize(append_and_count, 2, chunksize=n)(range(n), repeat(items, n))
+        self.assertEqual([100001] * n, result)
+
+
+if __name__ == "__main__":
+    unittest.main()
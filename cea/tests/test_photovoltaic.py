@@ -0,0 +1,150 @@
+"""
+Test the array calculation of technologies/solar/photovoltaic.py
+
+The expected results in ``test_photovoltaic.config`` were calculated with the former implementation of
+``calc_pv_generation``, which called ``np.vectorize(calc_absorbed_radiation_PV)`` hour by hour for each group of
+sensors.
+"""
+
+import configparser
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from cea.constants import HOURS_IN_YEAR
+from cea.inputlocator import InputLocator
+from cea.technologies.solar import photovoltaic
+
+# the properties of the types of PV panels of the CH database
+PANEL_PROPERTIES_PV = {
+    'PV1': {'PV_a0': 0.935823, 'PV_a1': 0.054289, 'PV_a2': 0.008677, 'PV_a3': 0.000527, 'PV_a4': -0.000011,
+            'PV_n': 0.16, 'PV_th': 0.002, 'PV_noct': 43.5, 'PV_Bref': 0.0035, 'misc_losses': 0.1},
+    'PV2': {'PV_a0': 0.918093, 'PV_a1': 0.086257, 'PV_a2': -0.024459, 'PV_a3': 0.002816, 'PV_a4': -0.000126,
+            'PV_n': 0.15, 'PV_th': 0.002, 'PV_noct': 43.9, 'PV_Bref': 0.0044, 'misc_losses': 0.1},
+}
+
+# the hours of the expected hourly results: a day in winter and a day in summer
+EXPECTED_HOURS = list(range(408, 432)) + list(range(4104, 4128))
+
+LATITUDE = 47.4
+
+
+def read_test_config():
+    test_config = configparser.ConfigParser()
+    test_config.optionxform = str
+    test_config.read(os.path.join(os.path.dirname(__file__), 'test_photovoltaic.config'))
+    return test_config
+
+
+def synthetic_year():
+    """
+    The sensor groups, weather and sun properties of a synthetic year: a simple sun path at ``LATITUDE`` and four
+    groups of sensors (a roof, two south walls and an east wall).
+    """
+    hours = np.arange(HOURS_IN_YEAR)
+    day, hour = hours // 24, hours % 24
+    lat = np.radians(LATITUDE)
+    declination = np.radians(23.45) * np.sin(2 * np.pi * (284 + day + 1) / 365)
+    hour_angle = np.radians(15.0 * (hour + 0.5 - 12))
+    cos_Sz = np.sin(lat) * np.sin(declination) + np.cos(lat) * np.cos(declination) * np.cos(hour_angle)
+    Sz_deg = np.degrees(np.arccos(np.clip(cos_Sz, -1.0, 1.0)))
+    Az_deg = (180.0 + np.degrees(np.arctan2(np.sin(hour_angle),
+                                            np.cos(hour_angle) * np.sin(lat) - np.tan(declination) * np.cos(lat))))
+    solar_properties = pd.DataFrame({'Sz': Sz_deg, 'Az': Az_deg, 'g': np.degrees(declination),
+                                     'ha': np.degrees(hour_angle)})
+
+    clearness = 0.55 + 0.35 * np.sin(2 * np.pi * day / 7.3) ** 2
+    I_horizontal = np.maximum(cos_Sz, 0.0) * 1000.0 * clearness
+    hourly_radiation = pd.DataFrame({0: I_horizontal,
+                                     1: 0.7 * I_horizontal + 40 * (cos_Sz > 0),
+                                     2: 0.5 * I_horizontal,
+                                     3: 0.4 * I_horizontal * (hour < 12)})
+    prop_observers = pd.DataFrame({'area_installed_module_m2': [120.0, 35.5, 20.25, 12.0],
+                                   'B_deg': [12.0, 90.0, 90.0, 90.0],
+                                   'surface_azimuth_deg': [180.0, 180.0, 185.0, 90.0],
+                                   'type_orientation': ['roofs_top', 'walls_south', 'walls_south', 'walls_east']})
+    sensor_groups = {'number_groups': 4, 'prop_observers': prop_observers, 'hourlydata_groups': hourly_radiation}
+    weather_data = pd.DataFrame({'ratio_diffhout': 1.0 - 0.6 * clearness,
+                                 'drybulb_C': 10.0 - 12.0 * np.cos(2 * np.pi * day / 365) + 5.0 * np.sin(hour_angle)})
+    date_local = pd.date_range('2019-01-01', periods=HOURS_IN_YEAR, freq='H')
+    return sensor_groups, weather_data, date_local, solar_properties
+
+
+class TestAbsorbedRadiationPV(unittest.TestCase):
+    def test_array_calculation(self):
+        """The (groups x hours) calculation gives the results of the former calculation of each group and hour"""
+        test_config = read_test_config()
+        inputs = {name: np.array(json.loads(value)) for name, value in test_config.items('input_absorbed_radiation')}
+        I_sol = inputs['I_sol_Wperm2']
+        I_diffuse = 0.3 * I_sol
+        I_direct = I_sol - I_diffuse
+        tilt = np.radians(inputs['tilt_deg'])[:, np.newaxis]
+        Sz = np.radians(inputs['Sz_deg'])
+        teta = np.radians(inputs['teta_deg'])
+        teta_ed, teta_eg = photovoltaic.calc_diffuseground_comp(tilt)
+
+        absorbed = photovoltaic.calc_absorbed_radiation_PV(I_sol, I_direct, I_diffuse, tilt, Sz, teta, teta_ed,
+                                                           teta_eg, PANEL_PROPERTIES_PV['PV1'])
+        expected = json.loads(test_config.get('expected_absorbed_radiation', 'absorbed_radiation_Wperm2'))
+        np.testing.assert_allclose(absorbed, expected, rtol=1e-9, atol=1e-9)
+
+
+class TestPVGeneration(unittest.TestCase):
+    def test_pv_generation_panel_types(self):
+        """Each type of panel gives the results of the former calculation of the type on its own"""
+        test_config = read_test_config()
+        sensor_groups, weather_data, date_local, solar_properties = synthetic_year()
+        list_results = photovoltaic.calc_pv_generation_panel_types(
+            sensor_groups, weather_data, date_local, solar_properties, LATITUDE,
+            [PANEL_PROPERTIES_PV['PV1'], PANEL_PROPERTIES_PV['PV2']])
+        self.assertEqual(2, len(list_results))
+
+        for panel_type, results in zip(['PV1', 'PV2'], list_results):
+            section = 'expected_pv_generation_' + panel_type
+            self.assertEqual(sorted(name for name, _ in test_config.items(section)), sorted(results.columns))
+            self.assertTrue((results.index == date_local).all())
+            for column, value in test_config.items(section):
+                expected = json.loads(value)
+                np.testing.assert_allclose(results[column].sum(), expected['total'], rtol=1e-9, atol=1e-6,
+                                           err_msg=panel_type + ' ' + column)
+                np.testing.assert_allclose(results[column].values[EXPECTED_HOURS], expected['hourly'], rtol=1e-9,
+                                           atol=1e-6, err_msg=panel_type + ' ' + column)
+
+        # the calculation of a single type is the calculation of the first type
+        pd.testing.assert_frame_equal(list_results[0], photovoltaic.calc_pv_generation(
+            sensor_groups, weather_data, date_local, solar_properties, LATITUDE, PANEL_PROPERTIES_PV['PV1']))
+
+
+class TestComparedPanelTypes(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.locator = InputLocator(self.scenario)
+
+    def tearDown(self):
+        shutil.rmtree(self.scenario)
+
+    def test_file_names(self):
+        """The results of the compared types of panels are written next to the results of type-pvpanel"""
+        self.assertEqual('B1_PV.csv', os.path.basename(self.locator.PV_results('B1')))
+        self.assertEqual('B1_PV_PV2.csv', os.path.basename(self.locator.PV_results('B1', 'PV2')))
+
+        hourly_results = pd.DataFrame({'Date': pd.date_range('2019-01-01', periods=3, freq='H').astype(str),
+                                       'E_PV_gen_kWh': [0.0, 1.0, 2.0], 'Area_PV_m2': 10.0})
+        for building in ['B1', 'B2']:
+            hourly_results.to_csv(self.locator.PV_results(building, 'PV2'), index=False)
+        photovoltaic.write_aggregate_results(None, self.locator, ['B1', 'B2'], 'PV2')
+
+        self.assertEqual({'B1_PV_PV2.csv', 'B2_PV_PV2.csv', 'PV_PV2_total.csv', 'PV_PV2_total_buildings.csv'},
+                         set(os.listdir(self.locator.solar_potential_folder())))
+        totals = pd.read_csv(self.locator.PV_totals('PV2'))
+        self.assertEqual([0.0, 2.0, 4.0], list(totals['E_PV_gen_kWh']))
+        self.assertEqual(['B1', 'B2'], list(pd.read_csv(self.locator.PV_total_buildings('PV2'))['Name']))
+
+
+if __name__ == "__main__":
+    unittest.main()
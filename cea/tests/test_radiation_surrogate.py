@@ -0,0 +1,64 @@
+"""
+Test the resources/radiation/simplified/surrogate.py file
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from cea.resources.radiation.daysim import SURFACES
+from cea.resources.radiation.simplified import surrogate
+
+
+def make_sensors(n, surface_type='walls', orientation='south', z=5.0):
+    return pd.DataFrame({'SURFACE': ['srf%d' % i for i in range(n)], 'TYPE': surface_type, 'orientation': orientation,
+                         'intersection': 0, 'AREA_m2': 1.0, 'Xcoor': 0.0, 'Ycoor': 0.0, 'Zcoor': z,
+                         'Xdir': 0.0, 'Ydir': -1.0, 'Zdir': 0.0})
+
+
+class TestSurrogate(unittest.TestCase):
+    def test_obstruction(self):
+        """A building in front of a south facade obstructs the southern sector only"""
+        sensors = make_sensors(1)
+        # a 10 m high wall 10 m south of the sensor (at 5 m), and one behind the facade
+        points = np.array([[0.0, -10.0, 10.0], [0.0, 10.0, 50.0]])
+        features = surrogate.calc_features(sensors, 0.0, points, radius=50.0)
+        obstruction = features[0, -surrogate.N_SECTORS:]
+        south = surrogate.N_SECTORS // 2
+        self.assertAlmostEqual(np.sin(np.arctan2(5.0, 10.0)), obstruction[south])
+        self.assertEqual(0.0, np.delete(obstruction, south).max())
+        self.assertAlmostEqual(0.5, features[0, 1])  # the height, scaled
+
+    def test_fit(self):
+        """The model recovers the hourly coefficients of radiation that is linear in the features"""
+        rng = np.random.default_rng(0)
+        hours = 48
+        coefficients = rng.random((len(surrogate.FEATURES), hours)) * 100
+        statistics = surrogate.TrainingStatistics()
+        for surface in ['walls_south', 'roofs_top']:
+            features = np.column_stack([np.ones(200), rng.random((200, len(surrogate.FEATURES) - 1))])
+            statistics.add(np.array([surface] * 200), features, features @ coefficients)
+        model = surrogate.SurrogateModel.fit(statistics, radius=50.0)
+
+        features = np.column_stack([np.ones(10), rng.random((10, len(surrogate.FEATURES) - 1))])
+        labels = np.array(['walls_south'] * 5 + ['windows_north'] * 5)
+        np.testing.assert_allclose(features @ coefficients, model.predict(labels, features), rtol=1e-2)
+        self.assertEqual((len(SURFACES), len(surrogate.FEATURES), hours), model.coefficients.shape)
+
+    def test_accuracy_report(self):
+        """Only the surfaces of the building are reported"""
+        daysim = pd.DataFrame({column: 0.0 for surface in SURFACES for column in [f"{surface}_kW", f"{surface}_m2"]},
+                              index=range(2))
+        daysim['walls_south_kW'] = [1.0, 3.0]
+        daysim['walls_south_m2'] = 10.0
+        predicted = pd.DataFrame({surface: 0.0 for surface in SURFACES}, index=range(2))
+        predicted['walls_south'] = [2.0, 3.0]
+        report = surrogate.calc_accuracy_report('B1', predicted, daysim)
+        self.assertEqual(['walls_south'], list(report['surface']))
+        self.assertAlmostEqual(25.0, report['error_annual_%'].iloc[0])
+        self.assertAlmostEqual(np.sqrt(0.5) / 2 * 100, report['nrmse_hourly_%'].iloc[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
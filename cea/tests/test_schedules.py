@@ -7,14 +7,17 @@ test data - you should only do this if you are sure that the new data is correct
 import configparser
 import json
 import os
+import types
 import unittest
 
+import numpy as np
 import pandas as pd
 
 import cea.config
 from cea.datamanagement.archetypes_mapper import calculate_average_multiuse
 from cea.demand.building_properties import BuildingProperties
-from cea.demand.schedule_maker.schedule_maker import schedule_maker_main
+from cea.demand.schedule_maker.schedule_maker import schedule_maker_main, calc_occupant_schedules, \
+    get_random_generator
 from cea.inputlocator import ReferenceCaseOpenLocator
 from cea.utilities import epwreader
 
@@ -82,6 +85,62 @@ class TestScheduleCreation(unittest.TestCase):
                                                                                        reference_results[schedule]))
 
 
+class TestStochasticSchedules(unittest.TestCase):
+    """The stochastic occupant schedules are reproducible for a given seed"""
+
+    # probability of presence of an office: absent at night, mostly present during working hours
+    deterministic_schedule = np.tile([0.0] * 8 + [0.8] * 4 + [0.4] + [0.8] * 5 + [0.1] * 6, 365)
+    buildings = ['B1001', 'B1002', 'B1003']
+
+    def calc_schedules(self, random_seed, buildings):
+        return {building: calc_occupant_schedules(self.deterministic_schedule, 20,
+                                                  get_random_generator(random_seed, building))
+                for building in buildings}
+
+    def test_same_seed_same_schedules(self):
+        first = self.calc_schedules(42, self.buildings)
+        second = self.calc_schedules(42, self.buildings)
+        for building in self.buildings:
+            np.testing.assert_array_equal(first[building], second[building])
+
+    def test_different_seeds_different_schedules(self):
+        first = self.calc_schedules(42, self.buildings)
+        second = self.calc_schedules(43, self.buildings)
+        for building in self.buildings:
+            self.assertFalse(np.array_equal(first[building], second[building]))
+        # the buildings do not share a stream either
+        self.assertFalse(np.array_equal(first['B1001'], first['B1002']))
+
+    def test_independent_of_building_order(self):
+        in_order = self.calc_schedules(42, self.buildings)
+        reversed_order = self.calc_schedules(42, self.buildings[::-1])
+        single = self.calc_schedules(42, ['B1002'])
+        for building in self.buildings:
+            np.testing.assert_array_equal(in_order[building], reversed_order[building])
+        np.testing.assert_array_equal(in_order['B1002'], single['B1002'])
+
+    def test_random_generator_per_building(self):
+        """The stream of a building does not depend on the streams of the buildings simulated before or alongside it
+        (e.g. by the same worker process)"""
+        alone = {building: get_random_generator(42, building).random(100) for building in self.buildings}
+        generators = {building: get_random_generator(42, building) for building in self.buildings[::-1]}
+        interleaved = {building: [] for building in self.buildings}
+        for _ in range(10):
+            for building in self.buildings:
+                interleaved[building].extend(generators[building].random(10))
+        for building in self.buildings:
+            np.testing.assert_array_equal(alone[building], interleaved[building])
+
+    def test_negative_seed(self):
+        """A negative seed is reported before any schedule is calculated"""
+        config = types.SimpleNamespace(schedule_maker=types.SimpleNamespace(buildings=self.buildings,
+                                                                             schedule_model='stochastic',
+                                                                             random_seed=-1))
+        with self.assertRaisesRegex(ValueError, 'random seed'):
+            schedule_maker_main(None, config)
+
+
+
 def get_test_config_path():
     """return the path to the test data configuration file (``cea/tests/test_schedules.config``)"""
     return os.path.join(os.path.dirname(__file__), 'test_schedules.config')
@@ -0,0 +1,50 @@
+"""
+Test the hourly calculation of technologies/solar/solar_collector.py and technologies/solar/photovoltaic_thermal.py
+"""
+
+import unittest
+
+import numpy as np
+
+from cea.technologies.solar import photovoltaic_thermal, solar_collector
+
+
+class TestCollectorEngines(unittest.TestCase):
+    def setUp(self):
+        hours = np.arange(72)
+        sun = np.clip(np.sin((hours % 24 - 6) / 12 * np.pi), 0, None)
+        self.q_rad_vector = 700.0 * sun
+        self.Tamb_vector_C = 15.0 + 8.0 * sun
+        # alternate between the nominal flow rate and no flow, to test the transitions
+        self.specific_flows_kgpers = np.where(hours % 7 < 4, 0.02, 0.0)
+
+    def test_solar_collector(self):
+        """The compiled and the python engines calculate the same results"""
+        args = (8000.0, 3680.0, 10, 60.0, self.Tamb_vector_C, 1.8, 3.5, 0.01, self.q_rad_vector,
+                self.specific_flows_kgpers)
+        compiled = solar_collector.do_hourly_calculation(*args)
+        python = solar_collector.do_hourly_calculation.py_func(*args)
+        for compiled_result, python_result in zip(compiled, python):
+            np.testing.assert_allclose(python_result, compiled_result)
+        self.assertGreater(compiled[1].max(), 0.0)
+
+    def test_photovoltaic_thermal(self):
+        absorbed_radiation_PV_Wperm2 = 0.9 * self.q_rad_vector
+        args = (0.0035, 8000.0, 3680.0, 10, 35.0, self.Tamb_vector_C, absorbed_radiation_PV_Wperm2, 1.5, 3.5, 0.01,
+                0.16, self.q_rad_vector, self.specific_flows_kgpers)
+        compiled = photovoltaic_thermal.do_hourly_calculation(*args)
+        python = photovoltaic_thermal.do_hourly_calculation.py_func(*args)
+        for compiled_result, python_result in zip(compiled, python):
+            np.testing.assert_allclose(python_result, compiled_result)
+
+    def test_optimal_mass_flow(self):
+        """The flow condition with the highest balance is selected, the first one on ties"""
+        q = [np.array([1.0, 0.0]), np.array([2.0, 0.0]), np.array([3.0, 0.0]), np.array([2.5, 0.0])]
+        E = [np.zeros(2)] * 4
+        mass_flow, dP = solar_collector.calc_optimal_mass_flow(*(q + E + [0, 36, 72, 18, 0, 10, 20, 5, 100.0]))
+        np.testing.assert_allclose([2.0, 0.0], mass_flow)
+        np.testing.assert_allclose([2000.0, 0.0], dP)
+
+
+if __name__ == "__main__":
+    unittest.main()
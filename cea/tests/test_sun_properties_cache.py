@@ -0,0 +1,64 @@
+"""
+Test the utilities/sun_properties_cache.py file
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import cea.config
+import cea.inputlocator
+from cea.utilities import epwreader, solar_equations, sun_properties_cache
+
+
+class TestSunPropertiesCache(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.locator = cea.inputlocator.InputLocator(self.scenario)
+        self.config = cea.config.Configuration(cea.config.DEFAULT_CONFIG)
+        weather_path = os.path.join(os.path.dirname(cea.config.__file__), 'databases', 'weather',
+                                    'Zuerich-Kloten_2030_AB1_TMY.epw')
+        self.weather_data = epwreader.epw_reader(weather_path)
+        self.latitude, self.longitude = 47.37, 8.54
+        self.datetime_local = solar_equations.calc_datetime_local_from_weather_file(self.weather_data, self.latitude,
+                                                                                    self.longitude)
+
+    def tearDown(self):
+        sun_properties_cache._sun_properties.clear()
+        shutil.rmtree(self.scenario)
+
+    def get_sun_properties(self):
+        return sun_properties_cache.get_sun_properties(self.locator, self.latitude, self.longitude,
+                                                       self.weather_data.copy(), self.datetime_local, self.config)
+
+    def test_get_sun_properties(self):
+        """The stored sun properties are the same as calculated, and are read from the files once stored"""
+        expected = solar_equations.calc_sun_properties(self.latitude, self.longitude, self.weather_data.copy(),
+                                                       self.datetime_local, self.config)
+        self.get_sun_properties()
+        sun_properties_cache._sun_properties.clear()
+        result = self.get_sun_properties()
+        for field in expected._fields:
+            if isinstance(getattr(expected, field), pd.Series):
+                pd.testing.assert_series_equal(getattr(expected, field), getattr(result, field), check_freq=False)
+            else:
+                self.assertAlmostEqual(getattr(expected, field), getattr(result, field))
+        self.assertIsInstance(result.Sz.values, np.memmap)
+
+    def test_key(self):
+        """The sun properties are stored separately for each location and solar window"""
+        self.get_sun_properties()
+        self.longitude = 9.0
+        self.get_sun_properties()
+        self.config.solar.solar_window_solstice = 2
+        self.get_sun_properties()
+        files = os.listdir(self.locator.get_sun_properties_folder())
+        self.assertEqual(3, len([f for f in files if f.endswith('.npy')]))
+
+
+if __name__ == "__main__":
+    unittest.main()
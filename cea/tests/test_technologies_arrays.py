@@ -0,0 +1,89 @@
+"""
+Test the array versions of the technology models in cea.technologies against their scalar versions evaluated hour by
+hour (with np.vectorize), for the 8760 hours of a year. The results of both must be the same.
+"""
+
+import os
+import unittest
+
+import numpy as np
+
+from cea.constants import HOURS_IN_YEAR
+from cea.databases import databases_folder_path
+from cea.technologies import boiler, burner, chiller_absorption, chiller_vapor_compression, cooling_tower
+from cea.technologies import direct_expansion_units, heatpumps
+from cea.utilities.database_cache import read_database
+
+CONVERSION_DATABASE = os.path.join(databases_folder_path, 'CH', 'components', 'CONVERSION.xlsx')
+
+
+class ConversionDatabaseLocator(object):
+    def get_database_conversion_systems(self):
+        return CONVERSION_DATABASE
+
+
+class TestTechnologiesArrays(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        random = np.random.default_rng(42)
+        # a load in 70% of the hours of the year
+        in_operation = random.random(HOURS_IN_YEAR) < 0.7
+        cls.q_load_Wh = np.where(in_operation, random.random(HOURS_IN_YEAR) * 2e6, 0.0)
+        cls.mdot_kgpers = np.where(in_operation, random.random(HOURS_IN_YEAR) * 100.0, 0.0)
+        cls.T_sup_K = 279.15 + random.random(HOURS_IN_YEAR) * 2.0
+        cls.T_re_K = cls.T_sup_K + 4.0 + random.random(HOURS_IN_YEAR) * 6.0
+        cls.T_return_boiler_K = 303.15 + random.random(HOURS_IN_YEAR) * 50.0
+        cls.T_hw_in_C = 80.0 + random.random(HOURS_IN_YEAR) * 20.0
+        cls.T_ground_K = 283.15 + random.random(HOURS_IN_YEAR) * 5.0
+
+    def compare(self, scalar_model, array_model, *args):
+        """Run both versions of a model, return their results (as arrays)"""
+        return np.vectorize(scalar_model)(*args), array_model(*args)
+
+    def test_calc_VCC(self):
+        VC_chiller = chiller_vapor_compression.VaporCompressionChiller(ConversionDatabaseLocator(), 'BUILDING')
+        scalar_results, array_results = self.compare(chiller_vapor_compression.calc_VCC,
+                                                     chiller_vapor_compression.calc_VCC_array,
+                                                     self.q_load_Wh, self.T_sup_K, self.T_re_K, 303.15, VC_chiller)
+        for output in ['wdot_W', 'q_cw_W', 'q_chw_W']:
+            np.testing.assert_array_equal([operation[output] for operation in scalar_results], array_results[output])
+
+    def test_calc_CT(self):
+        scalar_results, array_results = self.compare(cooling_tower.calc_CT, cooling_tower.calc_CT_array,
+                                                     self.q_load_Wh, 1.5e6)
+        np.testing.assert_allclose(scalar_results, array_results, rtol=1e-12)
+
+    def test_calc_Cop_boiler(self):
+        scalar_results, array_results = self.compare(boiler.calc_Cop_boiler, boiler.calc_Cop_boiler_array,
+                                                     self.q_load_Wh, self.q_load_Wh.max(), self.T_return_boiler_K)
+        np.testing.assert_array_equal(scalar_results, array_results)
+
+    def test_calc_cop_burner(self):
+        scalar_results, array_results = self.compare(burner.calc_cop_burner, burner.calc_cop_burner_array,
+                                                     self.q_load_Wh, 2e6)
+        np.testing.assert_array_equal(scalar_results, array_results)
+
+    def test_calc_DX(self):
+        scalar_results, array_results = self.compare(direct_expansion_units.calc_DX,
+                                                     direct_expansion_units.calc_DX_array,
+                                                     self.mdot_kgpers, self.T_sup_K, self.T_re_K)
+        np.testing.assert_array_equal(scalar_results, array_results)
+
+    def test_calc_Cop_GHP(self):
+        """The supply temperatures include temperatures above the maximum condenser temperature of the heat pump"""
+        T_DH_sup_K = np.linspace(373.15, 423.15, HOURS_IN_YEAR)
+        scalar_results, array_results = self.compare(heatpumps.calc_Cop_GHP, heatpumps.calc_Cop_GHP_array,
+                                                     self.T_ground_K, self.mdot_kgpers, T_DH_sup_K, T_DH_sup_K - 10.0)
+        for scalar_result, array_result in zip(scalar_results, array_results):
+            np.testing.assert_array_equal(scalar_result, array_result)
+
+    def test_calc_chiller_main(self):
+        """The loads cover all size categories of the double effect chillers"""
+        chiller_prop = read_database(CONVERSION_DATABASE, sheet_name="ABSORPTION_CHILLERS")
+        mdot_kgpers = self.mdot_kgpers * 10.0
+        scalar_results, array_results = self.compare(
+            chiller_absorption.calc_chiller_main, chiller_absorption.calc_chiller_main_array, mdot_kgpers,
+            self.T_sup_K, self.T_re_K, self.T_hw_in_C, self.T_ground_K,
+            chiller_absorption.AbsorptionChiller(chiller_prop, 'double'))
+        for output in ['wdot_W', 'q_cw_W', 'q_hw_W', 'T_hw_out_C', 'q_chw_W', 'EER']:
+            np.testing.assert_array_equal([operation[output] for operation in scalar_results], array_results[output])
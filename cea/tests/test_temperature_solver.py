@@ -0,0 +1,130 @@
+"""
+Test the technologies/thermal_network/temperature_solver.py file
+"""
+
+import types
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
+from cea.technologies.thermal_network.temperature_solver import FlowTree, calc_pipe_heat_losses, get_flow_tree
+
+
+def make_edge_node_matrix(edges, number_of_nodes):
+    edge_node_matrix = np.zeros((number_of_nodes, len(edges)))
+    for edge_number, (start, end) in enumerate(edges):
+        edge_node_matrix[start, edge_number] = -1
+        edge_node_matrix[end, edge_number] = 1
+    return edge_node_matrix
+
+
+def make_random_tree(random, number_of_nodes):
+    """
+    A random tree supplied by a plant at node 0, with a consumer at every other node.
+
+    :return: the edge-node matrix in the direction of flow, the mass flow of the consumers and of the edges
+    """
+    parents = [int(random.integers(0, node)) for node in range(1, number_of_nodes)]
+    edge_node_matrix = make_edge_node_matrix(list(zip(parents, range(1, number_of_nodes))), number_of_nodes)
+    consumer_mass_flow = np.round(random.uniform(0.1, 2.0, number_of_nodes), 3)
+    consumer_mass_flow[0] = 0.0
+    # the edge entering node i (edge i - 1) carries the flow of all the consumers downstream of it
+    mass_flow = np.zeros(number_of_nodes - 1)
+    for node in range(number_of_nodes - 1, 0, -1):
+        mass_flow[node - 1] += consumer_mass_flow[node]
+        if parents[node - 1] > 0:
+            mass_flow[parents[node - 1] - 1] += mass_flow[node - 1]
+    return edge_node_matrix, consumer_mass_flow, mass_flow
+
+
+class TestTemperatureSolver(unittest.TestCase):
+    def setUp(self):
+        # plant (node 0) supplying node 1, which supplies the consumers 2 and 3
+        self.edge_node_matrix = make_edge_node_matrix([(0, 1), (1, 2), (1, 3)], 4)
+        self.plant = np.array([True, False, False, False])
+        self.thermal_network = types.SimpleNamespace(problematic_edges={}, network_type='DH')
+
+    def test_levels(self):
+        """The nodes are sorted along the direction of flow"""
+        flow_tree = FlowTree(self.edge_node_matrix, self.plant)
+        self.assertEqual([[0], [1], [2, 3]], [list(nodes) for nodes, _, _ in flow_tree.levels])
+
+        # flows into the plant from both sides form a directed loop through node 1
+        looped = make_edge_node_matrix([(0, 1), (1, 2), (2, 1)], 3)
+        self.assertRaises(ValueError, FlowTree, looped, np.array([True, False, False]))
+        self.assertIsNone(get_flow_tree(looped, np.array([True, False, False]), np.ones(3)))
+        # stagnant pipes are left to the iterative method
+        self.assertIsNone(get_flow_tree(self.edge_node_matrix, self.plant, np.array([2.0, 1.0, 0.0])))
+
+    def test_propagate(self):
+        """Without heat losses, the temperatures of the return network are the mixing temperatures of the flows"""
+        mass_flow = np.array([3.0, 1.0, 2.0])
+        flow_tree = get_flow_tree(self.edge_node_matrix, self.plant, mass_flow)
+        t_node, _, _ = flow_tree.propagate(350.0, mass_flow, np.zeros(3), 280.0, self.thermal_network)
+        np.testing.assert_allclose([350.0] * 4, t_node)
+
+        # the return network, with a substation at node 1
+        return_matrix = -make_edge_node_matrix([(0, 1), (1, 2), (1, 3)], 4)
+        return_mass_flow = np.array([4.0, 1.0, 2.0])
+        branch_ends = ~(return_matrix > 0).any(axis=1)
+        flow_tree = get_flow_tree(return_matrix, branch_ends, return_mass_flow)
+        t_substation = np.array([0.0, 300.0, 310.0, 320.0])
+        t_node, _, _ = flow_tree.propagate(t_substation[branch_ends], return_mass_flow, np.zeros(3), 280.0,
+                                           self.thermal_network, substation_mass_flow=np.array([-4.0, 1.0, 1.0, 2.0]),
+                                           t_substation=t_substation)
+        t_mixed = (300.0 + 310.0 + 2 * 320.0) / 4
+        np.testing.assert_allclose([t_mixed, t_mixed, 310.0, 320.0], t_node)
+
+    def test_heat_losses(self):
+        """The outlet temperatures approach the ground temperature and large losses are capped"""
+        mass_flow = np.array([3.0, 1.0, 2.0])
+        k = np.array([0.1, 0.1, 100.0])
+        flow_tree = get_flow_tree(self.edge_node_matrix, self.plant, mass_flow)
+        t_node, t_pipe_in, t_pipe_out = flow_tree.propagate(350.0, mass_flow, k, 280.0, self.thermal_network)
+        self.assertTrue((t_pipe_out < t_pipe_in).all())
+        self.assertAlmostEqual(t_node[1] - 30, t_node[3])
+        self.assertEqual({'2': 2.0}, self.thermal_network.problematic_edges)
+
+        # heat balance of the first pipe, following the exact solution of the outlet temperature
+        heat_capacity_flow = mass_flow[0] * HEAT_CAPACITY_OF_WATER_JPERKGK / 1000
+        heat_loss = k[0] * ((t_pipe_in[0] + t_pipe_out[0]) / 2 - 280.0)
+        self.assertAlmostEqual(heat_capacity_flow * (t_pipe_in[0] - t_pipe_out[0]), heat_loss)
+
+
+    def test_iterative_method(self):
+        """The flow tree and the iterative method give the same temperatures and heat losses on random trees"""
+        from cea.technologies.thermal_network import thermal_network
+
+        random = np.random.default_rng(42)
+        for _ in range(10):
+            number_of_nodes = int(random.integers(3, 30))
+            edge_node_matrix, consumer_mass_flow, mass_flow = make_random_tree(random, number_of_nodes)
+            k = random.uniform(0.01, 0.1, number_of_nodes - 1)
+            network = types.SimpleNamespace(problematic_edges={}, network_type='DH', all_nodes_df=pd.DataFrame(
+                {'Type': ['PLANT'] + ['CONSUMER'] * (number_of_nodes - 1)}))
+
+            # supply network
+            flow_tree = get_flow_tree(edge_node_matrix, np.arange(number_of_nodes) == 0, mass_flow)
+            t_node, t_pipe_in, t_pipe_out = flow_tree.propagate(350.0, mass_flow, k, 280.0, network)
+            expected_t_node, _, expected_heat_losses = thermal_network.calc_supply_temperatures_iterative(
+                350.0, edge_node_matrix.copy(), edge_node_matrix.clip(min=0), edge_node_matrix.clip(max=0),
+                np.diag(mass_flow), np.diag(k), 280.0, network)
+            np.testing.assert_allclose(expected_t_node, t_node, rtol=1e-10)
+            np.testing.assert_allclose(expected_heat_losses, calc_pipe_heat_losses(mass_flow, t_pipe_in, t_pipe_out),
+                                       rtol=1e-8, atol=1e-9)
+
+            # return network
+            t_return = pd.DataFrame([np.r_[np.nan, random.uniform(310.0, 330.0, number_of_nodes - 1)]])
+            args = (280.0, pd.DataFrame(edge_node_matrix), mass_flow, consumer_mass_flow, np.diag(k), t_return, network)
+            t_node, heat_losses = thermal_network.calc_return_temperatures(*args)
+            with mock.patch.object(thermal_network, 'get_flow_tree', return_value=None):
+                expected_t_node, expected_heat_losses = thermal_network.calc_return_temperatures(*args)
+            np.testing.assert_allclose(expected_t_node, t_node, rtol=1e-10)
+            np.testing.assert_allclose(expected_heat_losses, heat_losses, rtol=1e-8, atol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Test the blocks of hours the thermal network is solved in by technologies/thermal_network/thermal_network.py
+"""
+
+import types
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import cea.technologies.thermal_network.thermal_network as thermal_network_module
+from cea.technologies.thermal_network.thermal_network import HourlyThermalResults, calc_hour_blocks, \
+    concatenate_thermal_result_blocks, thermal_calculation_block
+
+
+def fake_hourly_thermal_calculation(t, thermal_network):
+    """Results of the shapes of ``hourly_thermal_calculation``: node vectors, edge rows, plant lists and scalars"""
+    results = []
+    for number, field in enumerate(HourlyThermalResults._fields):
+        if number % 3 == 0:
+            results.append(np.arange(4) * t + number)
+        elif number % 3 == 1:
+            results.append(pd.Series([t, -t, number * 0.5], index=['PIPE0', 'PIPE1', 'PIPE2']))
+        else:
+            results.append(t * 0.25 + number)
+    return HourlyThermalResults(*results)
+
+
+# the hour in which the fake calculation switches the control strategy to CT
+SWITCH_CONTROL_HOUR = 6
+
+
+def fake_switching_thermal_calculation(t, thermal_network):
+    """Switch the control strategy to CT from ``SWITCH_CONTROL_HOUR`` on, the results depend on the strategy"""
+    if t == SWITCH_CONTROL_HOUR:
+        thermal_network.temperature_control = 'CT'
+    results = fake_hourly_thermal_calculation(t, thermal_network)
+    if thermal_network.temperature_control == 'CT':
+        results = HourlyThermalResults(*[np.negative(value) for value in results])
+    return results
+
+
+class TestThermalCalculationBlocks(unittest.TestCase):
+    def test_hour_blocks(self):
+        """The blocks cover every hour exactly once, in order"""
+        for start_t, stop_t, processes in [(0, 2016, 6), (5, 55, 3), (0, 10, 1), (3, 5, 8)]:
+            hour_blocks = calc_hour_blocks(start_t, stop_t, processes)
+            self.assertEqual(list(range(start_t, stop_t)),
+                             [t for block_start, block_stop in hour_blocks for t in range(block_start, block_stop)])
+            self.assertTrue(all(block_stop > block_start for block_start, block_stop in hour_blocks))
+
+        # one block without parallel processes, no more blocks than hours
+        self.assertEqual([(0, 10)], calc_hour_blocks(0, 10, 1))
+        self.assertEqual([(0, 1), (1, 2), (2, 3)], calc_hour_blocks(0, 3, 8))
+        # no hours, no blocks
+        self.assertEqual([], calc_hour_blocks(7, 7, 4))
+        self.assertEqual([], calc_hour_blocks(7, 7, 1))
+        self.assertRaises(ValueError, concatenate_thermal_result_blocks, [])
+
+    def test_blocks_match_hourly_results(self):
+        """The results of the blocks of hours are the results of each hour"""
+        start_t, stop_t, processes = 5, 55, 3
+        hour_blocks = calc_hour_blocks(start_t, stop_t, processes)
+        # the hours are not split evenly between the blocks
+        self.assertGreater(len(set(block_stop - block_start for block_start, block_stop in hour_blocks)), 1)
+
+        with mock.patch.object(thermal_network_module, 'hourly_thermal_calculation',
+                               fake_hourly_thermal_calculation):
+            blocked_results = concatenate_thermal_result_blocks(
+                [thermal_calculation_block(block_start, block_stop, types.SimpleNamespace(temperature_control='VT'))
+                 for block_start, block_stop in hour_blocks])
+        hourly_results = [fake_hourly_thermal_calculation(t, None) for t in range(start_t, stop_t)]
+
+        self.assertEqual(set(HourlyThermalResults._fields), set(blocked_results))
+        for field in HourlyThermalResults._fields:
+            expected = np.array([np.ravel(getattr(results, field)) for results in hourly_results], dtype=float)
+            np.testing.assert_array_equal(expected, blocked_results[field], err_msg=field)
+
+    def test_control_switch_stays_in_block(self):
+        """A switch to CT applies to the rest of its block, not to the blocks solved after it with the same network"""
+        start_t, stop_t, processes = 5, 55, 3
+        hour_blocks = calc_hour_blocks(start_t, stop_t, processes)
+        first_block_stop = hour_blocks[0][1]
+        self.assertLess(SWITCH_CONTROL_HOUR + 1, first_block_stop)
+
+        # like a worker of the pool, solve all the blocks with one network
+        thermal_network = types.SimpleNamespace(temperature_control='VT')
+        with mock.patch.object(thermal_network_module, 'hourly_thermal_calculation',
+                               fake_switching_thermal_calculation):
+            blocked_results = concatenate_thermal_result_blocks(
+                [thermal_calculation_block(block_start, block_stop, thermal_network)
+                 for block_start, block_stop in hour_blocks])
+        self.assertEqual('VT', thermal_network.temperature_control)
+
+        for field in HourlyThermalResults._fields:
+            expected = np.array([np.ravel(getattr(fake_hourly_thermal_calculation(t, None), field))
+                                 for t in range(start_t, stop_t)], dtype=float)
+            switched = np.arange(start_t, stop_t)
+            switched = (switched >= SWITCH_CONTROL_HOUR) & (switched < first_block_stop)
+            expected[switched] = -expected[switched]
+            np.testing.assert_array_equal(expected, blocked_results[field], err_msg=field)
+
+
+if __name__ == '__main__':
+    unittest.main()
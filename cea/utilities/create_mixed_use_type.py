@@ -15,6 +15,7 @@ import cea.inputlocator
 from cea.datamanagement.archetypes_mapper import calculate_average_multiuse
 from cea.datamanagement.schedule_helper import calc_single_mixed_schedule, ScheduleData
 from cea.utilities.schedule_reader import save_cea_schedule
+from cea.utilities.database_cache import read_database
 
 
 __author__ = "Reynold Mok"
@@ -117,7 +118,7 @@ def main(config):
     use_type_ratios_dict = {k: float(v) for k, v in [ratio.split('|') for ratio in use_type_ratios]}
 
     locator = cea.inputlocator.InputLocator(scenario=config.scenario)
-    use_type_properties_df = pd.read_excel(locator.get_database_use_types_properties(), sheet_name=None)
+    use_type_properties_df = read_database(locator.get_database_use_types_properties(), sheet_name=None)
     internal_loads_df = use_type_properties_df['INTERNAL_LOADS']
     indoor_comfort_df = use_type_properties_df['INDOOR_COMFORT']
 
@@ -0,0 +1,164 @@
+"""
+Cached access to the Excel databases (``inputs/technology``).
+
+Parsing a workbook with openpyxl takes seconds, and most scripts read the same workbooks (often sheet by sheet) again
+and again. :py:func:`read_database` parses all sheets of a workbook once and keeps them
+
+- in memory, for the rest of the process
+- in a binary (pickle) cache in the cache folder of the user, shared by all processes and scripts
+
+Both caches are keyed by the path, modification time and size of the workbook, so editing a database invalidates them.
+Since loading a pickle can execute code, the binary cache is only used if its folder belongs to the user and nobody
+else can write to it.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+import pandas as pd
+
+__author__ = "Daren Thomas"
+__copyright__ = "Copyright 2024, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+CACHE_FOLDER = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')),
+                            'cea', 'database-cache')
+
+# bump this to invalidate the binary caches when the cached format changes
+CACHE_VERSION = 1
+
+# workbooks parsed by this process: {path: (key, {sheet_name: DataFrame})}
+_databases = {}
+
+
+def read_database(path, sheet_name=0):
+    """
+    Read sheets of an Excel database, like ``pd.read_excel(path, sheet_name=sheet_name)``, but parse the workbook only
+    once (see module documentation). The returned DataFrames are copies and can be modified by the caller.
+
+    :param str path: path to the workbook
+    :param sheet_name: name (or position) of the sheet to read, a list of them or None to read all sheets
+    :type sheet_name: str | int | list | None
+    :return: the sheet (or a dict of sheets for a list / None)
+    :rtype: pd.DataFrame | dict[str, pd.DataFrame]
+    """
+    sheets = get_database_sheets(path)
+    if sheet_name is None:
+        return {name: sheet.copy() for name, sheet in sheets.items()}
+    if isinstance(sheet_name, list):
+        return {name: _get_sheet(sheets, name, path) for name in sheet_name}
+    return _get_sheet(sheets, sheet_name, path)
+
+
+def get_database_sheets(path):
+    """
+    Return all sheets of a workbook (from the in-memory cache, the binary cache or by parsing the workbook). Do not
+    modify the returned DataFrames, use :py:func:`read_database` to get copies.
+
+    :param str path: path to the workbook
+    :rtype: dict[str, pd.DataFrame]
+    """
+    path = os.path.abspath(path)
+    key = _cache_key(path)
+    if path in _databases and _databases[path][0] == key:
+        return _databases[path][1]
+
+    cache_folder = _get_private_cache_folder()
+    if cache_folder is None:
+        sheets = pd.read_excel(path, sheet_name=None)
+    else:
+        cache_file = os.path.join(cache_folder, '{path}-{key}.pickle'.format(path=_hash(path), key=key))
+        sheets = _read_cache_file(cache_file)
+        if sheets is None:
+            sheets = pd.read_excel(path, sheet_name=None)
+            _write_cache_file(cache_file, sheets)
+            _remove_outdated_cache_files(path, cache_file)
+    _databases[path] = (key, sheets)
+    return sheets
+
+
+def clear_database_cache():
+    """Clear the in-memory cache of this process (the binary caches are invalidated by changes to the workbooks)"""
+    _databases.clear()
+
+
+def _get_sheet(sheets, sheet_name, path):
+    if isinstance(sheet_name, int):
+        sheet_name = list(sheets.keys())[sheet_name]
+    if sheet_name not in sheets:
+        raise ValueError("Worksheet named '{sheet_name}' not found in {path}".format(sheet_name=sheet_name, path=path))
+    return sheets[sheet_name].copy()
+
+
+def _hash(value):
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()[:32]
+
+
+def _cache_key(path):
+    stat = os.stat(path)
+    return _hash('{version}|{path}|{mtime}|{size}|{pandas}'.format(version=CACHE_VERSION, path=path,
+                                                                   mtime=stat.st_mtime_ns, size=stat.st_size,
+                                                                   pandas=pd.__version__))
+
+
+def _get_private_cache_folder():
+    """
+    Create the binary cache folder, accessible only by the user. Returns None if the folder can not be used safely:
+    it belongs to another user or can not be created.
+    """
+    try:
+        os.makedirs(CACHE_FOLDER, mode=0o700, exist_ok=True)
+        if hasattr(os, 'getuid'):
+            stat = os.stat(CACHE_FOLDER)
+            if stat.st_uid != os.getuid():
+                print('Not using the database cache {folder}, it belongs to another user'.format(folder=CACHE_FOLDER))
+                return None
+            if stat.st_mode & 0o077:
+                os.chmod(CACHE_FOLDER, 0o700)
+    except OSError as e:
+        print('Could not create database cache {folder}: {e}'.format(folder=CACHE_FOLDER, e=e))
+        return None
+    return CACHE_FOLDER
+
+
+def _read_cache_file(cache_file):
+    if not os.path.exists(cache_file):
+        return None
+    try:
+        with open(cache_file, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        # a corrupt or incompatible cache file is simply replaced
+        return None
+
+
+def _write_cache_file(cache_file, sheets):
+    try:
+        # write to a temporary file first, other processes may be reading the cache file
+        fd, temporary_file = tempfile.mkstemp(dir=os.path.dirname(cache_file), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(sheets, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file, cache_file)
+    except OSError as e:
+        # the cache is an optimization, not being able to write it is not an error
+        print('Could not write database cache {cache_file}: {e}'.format(cache_file=cache_file, e=e))
+
+
+def _remove_outdated_cache_files(path, cache_file):
+    """Remove the caches of previous versions of the workbook"""
+    cache_folder = os.path.dirname(cache_file)
+    prefix = _hash(path) + '-'
+    for file_name in os.listdir(cache_folder):
+        outdated_file = os.path.join(cache_folder, file_name)
+        if file_name.startswith(prefix) and outdated_file != cache_file:
+            try:
+                os.remove(outdated_file)
+            except OSError:
+                pass
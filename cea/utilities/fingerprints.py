@@ -0,0 +1,194 @@
+"""
+Content fingerprints of the inputs of a building, used to skip buildings whose inputs did not change since their
+results were written (see the ``incremental`` parameter of the demand and schedule-maker scripts).
+
+A fingerprint is a hash of python objects (building properties, configuration values, ...) and of the contents of
+input files. The fingerprints of the buildings are stored in a ``fingerprints.json`` file next to their results.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+__author__ = "Daren Thomas"
+__copyright__ = "Copyright 2024, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+FINGERPRINTS_FILE = 'fingerprints.json'
+
+# the files of a shapefile that change its geometry or attributes
+SHAPEFILE_EXTENSIONS = ['.shp', '.shx', '.dbf', '.prj', '.cpg']
+
+# read input files in blocks of this size (bytes) when hashing them
+BLOCK_SIZE = 1024 * 1024
+
+
+def calc_fingerprint(*objects):
+    """
+    Calculate the fingerprint of a sequence of objects: scalars, strings, numpy arrays, pandas objects, dicts, lists and
+    objects with attributes (e.g. :py:class:`cea.demand.building_properties.BuildingPropertiesRow`) are hashed by
+    content.
+
+    :return: the hex digest of the fingerprint
+    :rtype: str
+    """
+    fingerprint = hashlib.sha256()
+    for obj in objects:
+        _update_fingerprint(fingerprint, obj)
+    return fingerprint.hexdigest()
+
+
+def calc_file_fingerprint(path):
+    """
+    Calculate the fingerprint of the contents of a file.
+
+    :param str path: path to the file
+    :return: the hex digest of the contents, or ``'missing'`` if the file does not exist
+    :rtype: str
+    """
+    if not os.path.exists(path):
+        return 'missing'
+    fingerprint = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), b''):
+            fingerprint.update(block)
+    return fingerprint.hexdigest()
+
+
+def calc_shapefile_fingerprint(path):
+    """
+    Calculate the fingerprint of the contents of a shapefile and its sidecar files: the attributes of the shapes (e.g.
+    the heights of the buildings) are stored in the ``.dbf`` file, not in the ``.shp`` file.
+
+    :param str path: path to the ``.shp`` file
+    :return: the hex digest of the contents of the files
+    :rtype: str
+    """
+    root = os.path.splitext(path)[0]
+    return calc_fingerprint([calc_file_fingerprint(root + extension) for extension in SHAPEFILE_EXTENSIONS])
+
+
+def read_fingerprints(folder):
+    """
+    Read the fingerprints of the buildings stored in ``folder``.
+
+    :param str folder: the folder with the results of the buildings
+    :return: the fingerprint of each building (empty if no fingerprints were stored yet)
+    :rtype: dict[str, str]
+    """
+    path = os.path.join(folder, FINGERPRINTS_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except ValueError:
+        # a corrupt file only means the buildings are recalculated
+        print('Could not read fingerprints file {path}, recalculating all buildings'.format(path=path))
+        return {}
+
+
+def write_fingerprints(folder, fingerprints):
+    """
+    Store the fingerprints of buildings in ``folder``, keeping the stored fingerprints of the other buildings.
+
+    :param str folder: the folder with the results of the buildings
+    :param fingerprints: the fingerprint of each building whose results were written
+    :type fingerprints: dict[str, str]
+    """
+    stored_fingerprints = read_fingerprints(folder)
+    stored_fingerprints.update(fingerprints)
+    # write to a temporary file first, so an interrupted run does not leave a corrupt file
+    fd, temporary_file = tempfile.mkstemp(dir=folder, suffix='.json')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(stored_fingerprints, f, indent=2, sort_keys=True)
+    os.replace(temporary_file, os.path.join(folder, FINGERPRINTS_FILE))
+
+
+def remove_fingerprints(folder, buildings):
+    """
+    Forget the stored fingerprints of buildings in ``folder``, before their results are overwritten.
+
+    :param str folder: the folder with the results of the buildings
+    :param list[str] buildings: the buildings to forget
+    """
+    stored_fingerprints = read_fingerprints(folder)
+    if not any(building in stored_fingerprints for building in buildings):
+        return
+    for building in buildings:
+        stored_fingerprints.pop(building, None)
+    fd, temporary_file = tempfile.mkstemp(dir=folder, suffix='.json')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(stored_fingerprints, f, indent=2, sort_keys=True)
+    os.replace(temporary_file, os.path.join(folder, FINGERPRINTS_FILE))
+
+
+def unchanged_buildings(folder, fingerprints):
+    """
+    Return the buildings whose fingerprint matches the fingerprint stored with their results.
+
+    :param str folder: the folder with the results of the buildings
+    :param fingerprints: the current fingerprint of each building
+    :type fingerprints: dict[str, str]
+    :rtype: list[str]
+    """
+    stored_fingerprints = read_fingerprints(folder)
+    return [building for building, fingerprint in fingerprints.items()
+            if stored_fingerprints.get(building) == fingerprint]
+
+
+def _update_fingerprint(fingerprint, obj):
+    """Add the contents of ``obj`` to the ``fingerprint`` (a hashlib object), tagged by type to avoid collisions"""
+    if obj is None:
+        fingerprint.update(b'N;')
+    elif isinstance(obj, str):
+        fingerprint.update(b'S%d:' % len(obj.encode('utf-8')))
+        fingerprint.update(obj.encode('utf-8'))
+    elif isinstance(obj, bytes):
+        fingerprint.update(b'B%d:' % len(obj))
+        fingerprint.update(obj)
+    elif isinstance(obj, (bool, int, float, np.generic)):
+        fingerprint.update('V{!r};'.format(obj.item() if isinstance(obj, np.generic) else obj).encode('utf-8'))
+    elif isinstance(obj, np.ndarray):
+        fingerprint.update('A{}{};'.format(obj.dtype.str, obj.shape).encode('utf-8'))
+        if obj.dtype.hasobject:
+            for item in obj.ravel():
+                _update_fingerprint(fingerprint, item)
+        else:
+            fingerprint.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, pd.Series):
+        fingerprint.update(b'PS;')
+        _update_fingerprint(fingerprint, list(obj.index))
+        _update_fingerprint(fingerprint, obj.values)
+    elif isinstance(obj, pd.DataFrame):
+        fingerprint.update(b'PD;')
+        _update_fingerprint(fingerprint, list(obj.index))
+        for column in obj.columns:
+            _update_fingerprint(fingerprint, column)
+            _update_fingerprint(fingerprint, obj[column].values)
+    elif isinstance(obj, dict):
+        fingerprint.update(b'D%d;' % len(obj))
+        for key in sorted(obj, key=str):
+            _update_fingerprint(fingerprint, key)
+            _update_fingerprint(fingerprint, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        fingerprint.update(b'L%d;' % len(obj))
+        for item in obj:
+            _update_fingerprint(fingerprint, item)
+    elif hasattr(obj, '__dict__') or hasattr(obj, '__slots__'):
+        attributes = dict(getattr(obj, '__dict__', {}))
+        attributes.update({name: getattr(obj, name) for name in getattr(obj, '__slots__', ())
+                           if hasattr(obj, name)})
+        fingerprint.update('O{};'.format(type(obj).__name__).encode('utf-8'))
+        _update_fingerprint(fingerprint, attributes)
+    else:
+        _update_fingerprint(fingerprint, repr(obj))
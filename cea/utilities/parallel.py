@@ -11,13 +11,28 @@ not applying this technique to the demand script.
 
 This module exports the function `map` which is intended to replace both ``map_async`` and the builtin ``map`` function
 (which was used when ``config.multiprocessing == False``). This simplifies multiprocessing.
+
+Since the same scripts are often run one after the other in a workflow (demand, schedule maker, PV, PVT, SC, thermal
+network...), the processes are kept in a persistent ``WorkerPool`` (see ``get_worker_pool``) that is reused by all calls
+with the same number of processes. Arguments that are the same object for every call of ``func`` (e.g.
+``repeat(weather_data, n)``) are placed in shared memory once per call and the workers only receive a small handle to
+them (see ``WorkerPool.share``). Shared numpy arrays are read-only views, other shared objects are unpickled afresh
+for every task. Tasks are submitted in chunks and results are streamed back in order.
 """
 
+import atexit
+import itertools
+import logging
 import multiprocessing
+import os
+import pickle
 import sys
-import logging
-from itertools import repeat
-from cea.utilities.workerstream import stream_from_queue, QueueWorkerStream
+import uuid
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from cea.utilities.workerstream import QueueWorkerStream
 
 __author__ = "Daren Thomas"
 __copyright__ = "Copyright 2019, Architecture and Building Systems - ETH Zurich"
@@ -29,7 +44,11 @@ __email__ = "cea@arch.ethz.ch"
 __status__ = "Production"
 
 
-def vectorize(func, processes=1, on_complete=None):
+# arguments repeated for every call of ``func`` are placed in shared memory if they are at least this large
+SHARE_THRESHOLD_BYTES = 64 * 1024
+
+
+def vectorize(func, processes=1, on_complete=None, chunksize=None):
     """
     Similar to ``numpy.vectorize``, this function wraps ``func`` so that it operates on sequences (of same length)
     of inputs and outputs a sequence of results, similar to ``map(func, *args)``.
@@ -46,7 +65,10 @@ def vectorize(func, processes=1, on_complete=None):
     - args: the arguments passed to this call to ``func``
     - result: the return value of this call to ``func``
 
-    .. note: due to the way multiprocessing works, ``func`` and ``on_complete`` need to be module-level functions
+    .. note: due to the way multiprocessing works, ``func`` needs to be a module-level function
+
+    .. note: if processes > 1, ``on_complete`` is called in the main process, in the order of the arguments, as the
+        results are streamed back from the worker pool.
 
     .. note: the if processes > 1, then the first argument to the vectorized ``func`` will be converted to a list before
         running. This should not have any side effects, but is necessary if the args are constructed with
@@ -55,85 +77,261 @@ def vectorize(func, processes=1, on_complete=None):
     :param func: The function to vectorize
     :param int processes: The number of processes to use (use ``config.get_number_of_processes()``)
     :param on_complete: An optional function to call for each completed call to ``func``.
+    :param int chunksize: The number of calls sent to a worker at once (default: a few chunks per process)
     """
     if processes > 1:
-        return __multiprocess_wrapper(func, processes, on_complete)
+        return __multiprocess_wrapper(func, processes, on_complete, chunksize)
     else:
         return single_process_wrapper(func, on_complete)
 
 
-def __multiprocess_wrapper(func, processes, on_complete):
-    """Create a worker pool to map the function, taking care to set up STDOUT and STDERR"""
+def __multiprocess_wrapper(func, processes, on_complete, chunksize):
+    """Map the function on the persistent worker pool, taking care to set up STDOUT and STDERR"""
 
     def wrapper(*args):
         print("Using {processes} CPU's".format(processes=processes))
-        pool = multiprocessing.Pool(processes)
-        manager = multiprocessing.Manager()
+        return get_worker_pool(processes).map(func, *args, on_complete=on_complete, chunksize=chunksize)
 
-        # a queue for STDOUT and STDERR output of sub-processes (see cea.utilities.workerstream.QueueWorkerStream)
-        queue = manager.Queue()
+    return wrapper
 
-        # make sure the first arg is a list (not a generator) since we need the length of the sequence
-        args = [list(a) for a in args]
-        n = len(args[0])  # the number of iterations to map
 
-        # set up the list of i-values for on_complete
-        i_queue = manager.Queue()
-        for i in range(n):
-            i_queue.put(i)
+class SharedInput(object):
+    """
+    Picklable handle to an input placed in shared memory by ``WorkerPool.share``. Numpy arrays are shared as such
+    (workers get a read-only view on the shared buffer), all other objects are pickled into shared memory once and
+    unpickled for each task, so that changes a task makes to its copy are not seen by the next task of the worker.
+    """
+
+    def __init__(self, call_id, name, size, shape=None, dtype=None):
+        self.call_id = call_id
+        self.name = name
+        self.size = size
+        self.shape = shape
+        self.dtype = dtype
+
+    def __repr__(self):
+        return "SharedInput({name})".format(name=self.name)
+
+    def resolve(self):
+        """Return the shared object - to be called in a worker process"""
+        if _worker_cache['call_id'] != self.call_id:
+            _clear_worker_cache()
+            _worker_cache['call_id'] = self.call_id
+        objects = _worker_cache['objects']
+        if self.name not in objects:
+            shm = shared_memory.SharedMemory(name=self.name)
+            if self.shape is not None:
+                value = np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf)
+                value.flags.writeable = False
+            else:
+                value = None
+            objects[self.name] = (shm, value)
+        shm, value = objects[self.name]
+        if value is None:
+            # a fresh copy for every task - the tasks of a worker must not see each other's changes
+            return pickle.loads(shm.buf[:self.size])
+        return value
+
+
+# shared inputs resolved by a worker process during the current call
+_worker_cache = {'call_id': None, 'objects': {}}
+
+
+def _clear_worker_cache():
+    objects, _worker_cache['objects'] = _worker_cache['objects'], {}
+    blocks = [shm for shm, _ in objects.values()]
+    objects.clear()
+    for shm in blocks:
+        try:
+            shm.close()
+        except BufferError:
+            # a view on the buffer is still in use, the block is freed when the worker exits
+            pass
+
+
+class WorkerPool(object):
+    """
+    A pool of worker processes that is kept alive between calls to ``map``. The STDOUT and STDERR of the workers is
+    redirected once, when the workers are started, to a queue that is streamed to the main process while waiting for
+    results.
+    """
 
-        args = [repeat(func, n),
-                repeat(queue, n),
-                repeat(on_complete, n),
-                repeat(i_queue, n),
-                repeat(n, n)] + args
-        args = zip(*args)
+    def __init__(self, processes):
+        self.processes = processes
+        self.queue = multiprocessing.SimpleQueue()
+        if os.name == 'posix':
+            # workers need to use the resource tracker of this process, or they report the shared inputs as leaked
+            resource_tracker.ensure_running()
+        self.pool = multiprocessing.Pool(processes, initializer=_init_worker, initargs=(self.queue,))
+        self._shared = {}
+
+    def share(self, value, call_id, data=None):
+        """
+        Place ``value`` in shared memory and return a ``SharedInput`` handle to pass to the workers instead of the
+        value. The shared memory is released with ``release``.
+
+        :param data: the pickled ``value``, if already at hand (not used for numpy arrays)
+        """
+        if isinstance(value, np.ndarray) and value.dtype != object:
+            value = np.ascontiguousarray(value)
+            shm = shared_memory.SharedMemory(create=True, size=max(value.nbytes, 1))
+            np.ndarray(value.shape, dtype=value.dtype, buffer=shm.buf)[...] = value
+            handle = SharedInput(call_id, shm.name, value.nbytes, value.shape, value.dtype)
+        else:
+            if data is None:
+                data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+            shm.buf[:len(data)] = data
+            handle = SharedInput(call_id, shm.name, len(data))
+        self._shared.setdefault(call_id, []).append(shm)
+        return handle
+
+    def release(self, call_id):
+        """Free the shared memory of all inputs shared for ``call_id``"""
+        for shm in self._shared.pop(call_id, []):
+            shm.close()
+            shm.unlink()
+
+    def imap(self, func, *args, **kwargs):
+        """
+        Map ``func`` to the sequences in ``args`` on the worker pool and yield the results in order, as they are
+        completed. Arguments that are the same (large) object for every call are shared with ``share``.
+
+        :param func: a module-level function
+        :param args: sequences of arguments of same length
+        :param on_complete: (keyword) optional function, called in this process for each result (see ``vectorize``)
+        :param chunksize: (keyword) number of calls sent to a worker at once
+        """
+        on_complete = kwargs.get('on_complete')
+        chunksize = kwargs.get('chunksize')
+
+        # make sure the args are lists (not generators) since we need the length of the sequence
+        args = [list(a) for a in args]
+        n = len(args[0])  # the number of iterations to map
+        if n == 0:
+            return
+        if not chunksize:
+            chunksize = max(1, n // (self.processes * 4))
+
+        call_id = uuid.uuid4().hex
+        try:
+            worker_args = [self._share_repeated(a, call_id) for a in args]
+            tasks = list(zip(*worker_args))
+            chunks = ((func, tasks[i:i + chunksize]) for i in range(0, n, chunksize))
+            results = self.pool.imap(_apply_func_with_shared_inputs, chunks)
+            i = 0
+            while i < n:
+                for result in self._next_result(results):
+                    if on_complete:
+                        on_complete(i, n, tuple(a[i] for a in args), result)
+                    yield result
+                    i += 1
+        finally:
+            self.stream_output()
+            self.release(call_id)
+
+    def map(self, func, *args, **kwargs):
+        """Same as ``imap``, but return the list of all results"""
+        return list(self.imap(func, *args, **kwargs))
+
+    def _share_repeated(self, values, call_id):
+        """Replace a sequence repeating the same large object by a sequence of shared memory handles"""
+        first = values[0]
+        if len(values) < 2 or not all(v is first for v in values):
+            return values
+        data = None
+        if isinstance(first, np.ndarray) and first.dtype != object:
+            size = first.nbytes
+        else:
+            try:
+                data = pickle.dumps(first, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                # not picklable on its own - leave it to multiprocessing to report
+                return values
+            size = len(data)
+        if size < SHARE_THRESHOLD_BYTES:
+            return values
+        return itertools.repeat(self.share(first, call_id, data), len(values))
+
+    def _next_result(self, results):
+        """Wait for the results of the next chunk while streaming the output of the workers"""
+        while True:
+            self.stream_output()
+            try:
+                return results.next(timeout=0.1)
+            except multiprocessing.TimeoutError:
+                pass
+
+    def stream_output(self):
+        """Stream the STDOUT and STDERR messages of the workers to this process"""
+        while not self.queue.empty():
+            stream, msg = self.queue.get()
+            if stream == 'stdout':
+                sys.stdout.write(msg)
+            elif stream == 'stderr':
+                sys.stderr.write(msg)
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        self.stream_output()
+        for call_id in list(self._shared.keys()):
+            self.release(call_id)
+
+
+# the persistent worker pools, by number of processes
+_worker_pools = {}
+
+
+def get_worker_pool(processes):
+    """
+    Return the persistent ``WorkerPool`` with ``processes`` workers, starting it on first use.
 
-        map_result = pool.map_async(__apply_func_with_worker_stream, args)
+    :param int processes: The number of processes to use (use ``config.get_number_of_processes()``)
+    :rtype: WorkerPool
+    """
+    if processes not in _worker_pools:
+        _worker_pools[processes] = WorkerPool(processes)
+    return _worker_pools[processes]
 
-        while not map_result.ready():
-            stream_from_queue(queue)
-        result = map_result.get()
 
-        pool.close()
-        pool.join()
+def shutdown_worker_pools():
+    """Stop the workers of all persistent pools (called at exit)"""
+    while _worker_pools:
+        _, worker_pool = _worker_pools.popitem()
+        worker_pool.close()
 
-        # process the rest of the queue
-        while not queue.empty():
-            stream_from_queue(queue)
-        return result
 
-    return wrapper
+atexit.register(shutdown_worker_pools)
 
 
-def __apply_func_with_worker_stream(args):
+def _init_worker(queue):
     """
-    Call func, using ``queue`` to redirect stdout and stderr, with a tuple of args because multiprocessing.Pool.map
-    only accepts one argument for the function.
+    Set up logging and redirect STDOUT and STDERR through ``queue``.
 
-    This function is called _inside_ a separate process.
+    This function is called _inside_ a separate process, once when the worker is started.
     """
-
-    # set up logging
     logger = multiprocessing.log_to_stderr()
     logger.setLevel(logging.WARNING)
     from cea import suppress_3rd_party_debug_loggers
     suppress_3rd_party_debug_loggers()
 
-    # unpack the arguments
-    func, queue, on_complete, i_queue, n, args = args[0], args[1], args[2], args[3], args[4], args[5:]
-
-    # set up printing to stderr and stdout to go through the queue
     sys.stdout = QueueWorkerStream('stdout', queue)
     sys.stderr = QueueWorkerStream('stderr', queue)
 
-    # CALL
-    result = func(*args)
 
-    if on_complete:
-        on_complete(i_queue.get(), n, args, result)
+def _apply_func_with_shared_inputs(chunk):
+    """
+    Call func for each tuple of args in a chunk of tasks, resolving the ``SharedInput`` handles to the shared objects.
 
-    return result
+    This function is called _inside_ a separate process.
+    """
+    func, tasks = chunk
+    results = []
+    for args in tasks:
+        args = [a.resolve() if isinstance(a, SharedInput) else a for a in args]
+        results.append(func(*args))
+    return results
 
 
 def single_process_wrapper(func, on_complete):
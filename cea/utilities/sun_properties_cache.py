@@ -0,0 +1,120 @@
+"""
+Scenario-level cache of the sun properties (see :py:func:`cea.utilities.solar_equations.calc_sun_properties`).
+
+The sun path, the transmissivity and the worst hour for the spacing of panels only depend on the location and the
+weather file of a scenario, but the PV, PVT and SC scripts used to calculate them for every building. They are now
+calculated once per scenario and stored in a binary ``.npy`` file (the hourly series) and a ``.json`` file (the
+scalars), named after a fingerprint of their inputs. The workers memory-map the hourly series instead of running the
+ephemeris again.
+"""
+
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from cea.utilities.fingerprints import calc_fingerprint
+from cea.utilities.solar_equations import SunProperties, calc_sun_properties
+
+__author__ = "Daren Thomas"
+__copyright__ = "Copyright 2024, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+# change this when calc_sun_properties changes, to invalidate the stored sun properties
+SUN_PROPERTIES_CACHE_VERSION = 1
+
+# the hourly series of SunProperties stored in the .npy file (rows), with the names of the series
+SUN_PROPERTIES_SERIES = [('g', 'declination'), ('Sz', 'zenith'), ('Az', 'azimuth'), ('ha', 'hour_angle')]
+
+# the weather data used by calc_sun_properties
+WEATHER_COLUMNS = ['month', 'day', 'hour', 'dayofyear', 'difhorrad_Whm2', 'glohorrad_Whm2']
+
+# sun properties already loaded by this process, by path
+_sun_properties = {}
+
+
+def get_sun_properties(locator, latitude, longitude, weather_data, datetime_local, config):
+    """
+    Return the sun properties of the scenario, calculating and storing them the first time they are used.
+
+    Takes the same arguments as :py:func:`cea.utilities.solar_equations.calc_sun_properties`, plus the ``locator``.
+    The hourly series of the result are read-only, memory-mapped arrays.
+
+    :param locator: An InputLocator to locate the cache folder
+    :type locator: cea.inputlocator.InputLocator
+    :rtype: cea.utilities.solar_equations.SunProperties
+    """
+    key = calc_sun_properties_key(latitude, longitude, weather_data, datetime_local, config)
+    folder = locator.get_sun_properties_folder()
+    path = os.path.join(folder, key + '.npy')
+    if path in _sun_properties:
+        return _sun_properties[path]
+
+    sun_properties = read_sun_properties(folder, key, datetime_local)
+    if sun_properties is None:
+        write_sun_properties(folder, key,
+                             calc_sun_properties(latitude, longitude, weather_data, datetime_local, config))
+        sun_properties = read_sun_properties(folder, key, datetime_local)
+    _sun_properties[path] = sun_properties
+    return sun_properties
+
+
+def calc_sun_properties_key(latitude, longitude, weather_data, datetime_local, config):
+    """The fingerprint of the inputs of :py:func:`cea.utilities.solar_equations.calc_sun_properties`"""
+    return calc_fingerprint(SUN_PROPERTIES_CACHE_VERSION, float(latitude), float(longitude), str(datetime_local.tz),
+                            datetime_local.asi8, config.solar.solar_window_solstice, weather_data[WEATHER_COLUMNS])
+
+
+def read_sun_properties(folder, key, datetime_local):
+    """
+    Read the sun properties stored under ``key``.
+
+    :return: the sun properties, or None if they were not stored yet (or the files can't be read)
+    :rtype: cea.utilities.solar_equations.SunProperties
+    """
+    series_path = os.path.join(folder, key + '.npy')
+    scalars_path = os.path.join(folder, key + '.json')
+    if not (os.path.exists(series_path) and os.path.exists(scalars_path)):
+        return None
+    try:
+        series = np.load(series_path, mmap_mode='r')
+        with open(scalars_path, 'r') as f:
+            scalars = json.load(f)
+    except (OSError, ValueError):
+        print('Could not read the sun properties in {folder}, recalculating them'.format(folder=folder))
+        return None
+    if series.shape != (len(SUN_PROPERTIES_SERIES), len(datetime_local)):
+        return None
+
+    hourly = {field: pd.Series(series[i], index=datetime_local, name=name, copy=False)
+              for i, (field, name) in enumerate(SUN_PROPERTIES_SERIES)}
+    return SunProperties(trr_mean=scalars['trr_mean'], worst_sh=scalars['worst_sh'], worst_Az=scalars['worst_Az'],
+                         **hourly)
+
+
+def write_sun_properties(folder, key, sun_properties):
+    """
+    Store the sun properties under ``key``. The files are written to temporary files first, so that a worker never
+    reads a partially written file. The ``.json`` file is written last, its presence marks complete sun properties.
+
+    :type sun_properties: cea.utilities.solar_equations.SunProperties
+    """
+    series = np.array([np.asarray(getattr(sun_properties, field), dtype=float)
+                       for field, _ in SUN_PROPERTIES_SERIES])
+    fd, temporary_file = tempfile.mkstemp(dir=folder, suffix='.npy')
+    with os.fdopen(fd, 'wb') as f:
+        np.save(f, series)
+    os.replace(temporary_file, os.path.join(folder, key + '.npy'))
+
+    scalars = {field: float(getattr(sun_properties, field)) for field in ['trr_mean', 'worst_sh', 'worst_Az']}
+    fd, temporary_file = tempfile.mkstemp(dir=folder, suffix='.json')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(scalars, f, indent=2)
+    os.replace(temporary_file, os.path.join(folder, key + '.json'))